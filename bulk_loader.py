@@ -0,0 +1,210 @@
+"""
+Bulk CSV to MySQL Loader for WelVision
+Streams CSV files into MySQL in chunks with one transaction per chunk
+"""
+
+import csv
+import os
+
+from mysql.connector import Error
+
+from config import BULK_TRANSFER_CHUNK_SIZE, BULK_TRANSFER_USE_LOAD_DATA
+from database import db_manager
+from db_pool import db_pool
+
+
+def count_csv_rows(csv_file):
+    """Count data rows in a CSV file (excluding the header)"""
+    if not os.path.exists(csv_file):
+        return 0
+    with open(csv_file, 'r', newline='', encoding='utf-8') as file:
+        return max(0, sum(1 for _ in csv.reader(file)) - 1)
+
+
+def _read_chunks(csv_file, key_column, chunk_size):
+    """Yield lists of CSV rows (dicts), skipping rows without a key"""
+    with open(csv_file, 'r', newline='', encoding='utf-8') as file:
+        chunk = []
+        for row in csv.DictReader(file):
+            if not row.get(key_column):
+                continue
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def rejects_file_for(csv_file):
+    """Side file collecting the rows of ``csv_file`` that could not be converted"""
+    return os.path.splitext(csv_file)[0] + "_rejected.csv"
+
+
+def _write_rejects(rejects_file, rows):
+    """Append unconvertible CSV rows to the rejects file (header on first write)"""
+    fieldnames = [key for key in rows[0] if key is not None]
+    new_file = not os.path.exists(rejects_file)
+    with open(rejects_file, 'a', newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, fieldnames=fieldnames, extrasaction='ignore')
+        if new_file:
+            writer.writeheader()
+        writer.writerows(rows)
+
+
+def _load_data_infile(csv_file, table, columns):
+    """
+    Load a CSV with LOAD DATA LOCAL INFILE, skipping rows whose unique key exists.
+
+    Returns:
+        int: Rows loaded, or None if LOCAL INFILE is not available
+    """
+    connection = db_manager.create_connection(allow_local_infile=True)
+    if connection is None:
+        return None
+    try:
+        cursor = connection.cursor()
+        cursor.execute("SELECT @@GLOBAL.local_infile")
+        enabled = cursor.fetchone()
+        if not enabled or not int(enabled[0]):
+            cursor.close()
+            return None
+
+        cursor.execute(
+            f"LOAD DATA LOCAL INFILE %s IGNORE INTO TABLE {table} "
+            "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' "
+            "LINES TERMINATED BY '\\r\\n' IGNORE 1 LINES "
+            f"({', '.join(columns)})",
+            (os.path.abspath(csv_file),)
+        )
+        loaded = cursor.rowcount
+        connection.commit()
+        cursor.close()
+        return loaded
+    except Error as e:
+        print(f"⚠️ LOAD DATA LOCAL INFILE unavailable, falling back to batched inserts: {e}")
+        connection.rollback()
+        return None
+    finally:
+        connection.close()
+
+
+def bulk_load_csv(csv_file, table, columns, row_to_values, key_column, replace_existing=False,
+                  chunk_size=BULK_TRANSFER_CHUNK_SIZE, progress_callback=None,
+                  use_load_data=BULK_TRANSFER_USE_LOAD_DATA, rejects_file=None):
+    """
+    Stream a CSV file into a MySQL table.
+
+    Rows are sent with a multi-row ``executemany`` INSERT and committed once
+    per chunk, on its own pooled connection so the loader can run in a
+    worker thread. Loading is idempotent on ``key_column``: with the default mode
+    rows whose key already exists are skipped (requires a UNIQUE key), with
+    ``replace_existing`` the existing rows for the chunk's keys are deleted
+    in the same transaction before inserting. Re-running after a failure
+    therefore never duplicates the chunks that were already committed.
+
+    Rows ``row_to_values`` cannot convert are appended to ``rejects_file``
+    before the chunk is committed, so clearing the source CSV afterwards
+    never loses them; if they cannot be saved the load fails.
+
+    Args:
+        csv_file: Path of the CSV to load
+        table: Destination table
+        columns: Destination columns, in the order ``row_to_values`` returns them
+        row_to_values: Callable converting a CSV row dict to a values tuple, or
+            None to load the ``columns`` of each row as they are
+        key_column: Column identifying a record (e.g. 'prediction_id')
+        replace_existing: Replace rows with the same key instead of skipping them
+        chunk_size: Rows per transaction
+        progress_callback: Optional callable(rows_done, rows_total)
+        use_load_data: Try LOAD DATA LOCAL INFILE first (skip-existing mode
+            without ``row_to_values`` only, since the server reads the file
+            directly; the CSV header must match ``columns``)
+        rejects_file: Where malformed rows go (default: <csv name>_rejected.csv)
+
+    Returns:
+        tuple: (success: bool, message: str, rows_loaded: int)
+    """
+    if not os.path.exists(csv_file):
+        return True, f"No CSV file {csv_file} to transfer", 0
+
+    total = count_csv_rows(csv_file)
+    if total == 0:
+        return True, f"{csv_file} is empty", 0
+    if progress_callback:
+        progress_callback(0, total)
+
+    # LOAD DATA would bypass row_to_values (conversions, and callers that collect keys/days in it)
+    if use_load_data and not replace_existing and row_to_values is None:
+        loaded = _load_data_infile(csv_file, table, columns)
+        if loaded is not None:
+            if progress_callback:
+                progress_callback(total, total)
+            return True, f"Loaded {total} rows into {table} ({loaded} new)", total
+
+    if row_to_values is None:
+        row_to_values = lambda row: tuple(row[column] for column in columns)
+
+    placeholders = ", ".join(["%s"] * len(columns))
+    insert_query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+    if not replace_existing:
+        insert_query += f" ON DUPLICATE KEY UPDATE {key_column} = {key_column}"
+
+    try:
+        connection = db_pool.acquire(autocommit=False)
+    except Error as e:
+        return False, f"Failed to connect to database: {e}", 0
+
+    rejects_file = rejects_file or rejects_file_for(csv_file)
+    done = 0
+    skipped = 0
+    try:
+        cursor = connection.cursor()
+        for chunk in _read_chunks(csv_file, key_column, chunk_size):
+            values = []
+            keys = []
+            rejected = []
+            for row in chunk:
+                try:
+                    values.append(row_to_values(row))
+                    keys.append(row[key_column])
+                except (KeyError, ValueError, TypeError, SyntaxError) as e:
+                    rejected.append(row)
+                    print(f"⚠️ Skipping malformed row {row.get(key_column)} in {csv_file}: {e}")
+            if rejected:
+                try:
+                    _write_rejects(rejects_file, rejected)
+                except OSError as e:
+                    return False, f"Could not save {len(rejected)} malformed rows to {rejects_file}: {e}", done
+                skipped += len(rejected)
+            if not values:
+                continue
+
+            try:
+                # autocommit is off, so everything up to commit() is one transaction
+                if replace_existing:
+                    # Only rows that converted: a malformed row must not delete its stored version
+                    cursor.execute(
+                        f"DELETE FROM {table} WHERE {key_column} IN ({', '.join(['%s'] * len(keys))})",
+                        keys
+                    )
+                cursor.executemany(insert_query, values)
+                connection.commit()
+            except Error:
+                connection.rollback()
+                raise
+
+            done += len(values)
+            if progress_callback:
+                progress_callback(done + skipped, total)
+        cursor.close()
+
+        message = f"Transferred {done} rows into {table}"
+        if skipped:
+            message += f", {skipped} malformed rows saved to {rejects_file}"
+        return True, message, done
+
+    except Error as e:
+        return False, f"Error loading {csv_file} into {table} after {done} rows: {e}", done
+    finally:
+        connection.close()
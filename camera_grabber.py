@@ -0,0 +1,140 @@
+"""
+Latest-Frame Camera Grabber for WelVision
+Keeps the camera driver buffer drained on a dedicated thread and decodes a
+frame only when a consumer asks for one
+"""
+
+import threading
+import time
+from collections import namedtuple
+
+import cv2
+
+from config import GRABBER_MAX_FAILURES
+
+# A decoded frame with its capture sequence number and time.monotonic() capture timestamp
+GrabbedFrame = namedtuple("GrabbedFrame", ["frame", "seq", "capture_time"])
+
+
+class LatestFrameGrabber:
+    """
+    Owns a cv2.VideoCapture and keeps it drained.
+
+    ``cv2.VideoCapture.read()`` returns the oldest frame queued in the
+    driver, which is several frames stale whenever the consumer is slower
+    than the camera. The grabber thread calls ``grab()`` continuously, so
+    the driver queue never fills, and decodes (``retrieve()``) only the
+    first frame grabbed after a consumer asked for one. Every grab gets a
+    sequence number and a monotonic timestamp, from which frame_source
+    reports the frame age at decision time (the lag between the roller
+    being photographed and being judged).
+
+    Only the grabber thread touches the capture object, so grab and
+    retrieve never race.
+    """
+
+    def __init__(self, capture, name="camera", max_failures=GRABBER_MAX_FAILURES):
+        """
+        Args:
+            capture: Opened cv2.VideoCapture (released by ``stop``)
+            name: Label for reports
+            max_failures: Consecutive failed grabs before the source counts as ended
+        """
+        self.capture = capture
+        self.name = name
+        self.max_failures = max_failures
+
+        self.running = False
+        self.ended = False
+        self._thread = None
+        self._wanted = threading.Event()
+        self._ready = threading.Event()
+        self._latest = None
+
+        self.grabbed = 0
+        self.retrieved = 0
+
+        try:
+            # Where the backend supports it, keep at most one frame in the driver
+            self.capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        except Exception:
+            pass
+
+    def start(self):
+        """Start the grab thread"""
+        if self.running:
+            return
+        self.running = True
+        self.ended = False
+        self._thread = threading.Thread(target=self._run, name=f"{self.name}-grabber", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=1.0):
+        """Stop grabbing and release the capture"""
+        self.running = False
+        self._ready.set()
+        if self._thread and self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=timeout)
+        self._thread = None
+        self.capture.release()
+
+    def _run(self):
+        failures = 0
+        while self.running:
+            ok = self.capture.grab()
+            capture_time = time.monotonic()
+            if not ok:
+                failures += 1
+                if failures >= self.max_failures:
+                    print(f"❌ {self.name}: no frames from camera, grabber stopped")
+                    self.ended = True
+                    break
+                time.sleep(0.01)
+                continue
+            failures = 0
+            self.grabbed += 1
+
+            if self._wanted.is_set():
+                ok, frame = self.capture.retrieve()
+                if ok:
+                    self.retrieved += 1
+                    self._latest = GrabbedFrame(frame, self.grabbed, capture_time)
+                    self._wanted.clear()
+                    self._ready.set()
+        self.running = False
+        self._ready.set()
+
+    def read(self, timeout=1.0):
+        """
+        Get a freshly captured frame.
+
+        Waits for the next grab (at most one frame interval) and decodes it,
+        so the frame is never older than the request.
+
+        Returns:
+            GrabbedFrame or None on timeout or once the camera stopped delivering
+        """
+        if not self.running:
+            return None
+        self._ready.clear()
+        self._wanted.set()
+        if not self._ready.wait(timeout) or not self.running:
+            return None
+        return self._latest
+
+    def isOpened(self):
+        """Mirror cv2.VideoCapture.isOpened for existing callers"""
+        return self.running and not self.ended and self.capture.isOpened()
+
+    def get_stats(self):
+        """
+        Get grabber statistics.
+
+        Returns:
+            dict: frames grabbed, decoded and drained unread
+        """
+        return {
+            'grabbed': self.grabbed,
+            'retrieved': self.retrieved,
+            'drained': self.grabbed - self.retrieved
+        }
@@ -0,0 +1,214 @@
+"""
+Camera Device Registry for WelVision
+Parallel, time-limited camera discovery with a TTL cache and per-device ownership,
+so status queries never reopen hardware that inference is using
+"""
+
+import threading
+import time
+
+import cv2
+
+from config import CAMERA_PROBE_COUNT, CAMERA_PROBE_TIMEOUT, CAMERA_REGISTRY_TTL
+
+
+def probe_camera(index):
+    """
+    Open a camera index and read one frame.
+
+    Returns:
+        dict: 'available', 'error' and, when a frame was read, 'resolution' (width, height)
+    """
+    capture = cv2.VideoCapture(index)
+    try:
+        if not capture.isOpened():
+            return {'available': False, 'error': "Failed to open camera"}
+        ret, frame = capture.read()
+        if not ret or frame is None:
+            return {'available': False, 'error': "Failed to read frame"}
+        return {'available': True, 'error': None, 'resolution': (frame.shape[1], frame.shape[0])}
+    finally:
+        capture.release()
+
+
+class CameraRegistry:
+    """
+    Single source of truth for which cameras exist and who is using them.
+
+    ``discover`` probes every index on its own thread and waits at most
+    ``timeout`` seconds for the lot, so a camera whose driver hangs costs
+    one timeout instead of stalling the scan; a probe that finishes late is
+    ignored. Results are cached for ``ttl`` seconds and shared by every
+    caller, so revisiting a tab does not touch the hardware. Components
+    ``acquire`` a device before opening it and ``release`` it afterwards;
+    a held device is reported as available (and by whom) without being
+    probed, so discovery never collides with a running camera.
+
+    ``discover`` blocks; call it from a worker (e.g. ui_executor), never
+    the Tk thread. ``status`` and ``available_indices`` only read the cache.
+    """
+
+    def __init__(self, probe_count=CAMERA_PROBE_COUNT, timeout=CAMERA_PROBE_TIMEOUT,
+                 ttl=CAMERA_REGISTRY_TTL, probe=probe_camera):
+        """
+        Args:
+            probe_count: Camera indices probed (0 .. probe_count - 1)
+            timeout: Seconds a discovery waits for all probes
+            ttl: Seconds discovery results are served from cache
+            probe: Callable(index) -> probe result dict
+        """
+        self.probe_count = probe_count
+        self.timeout = timeout
+        self.ttl = ttl
+        self.probe = probe
+
+        self._devices = {}        # index -> {'available', 'error', 'resolution', 'probed_at'}
+        self._holders = {}        # index -> owner label
+        self._probing = {}        # index -> probe thread (outlives a timed-out discovery)
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+        self._discover_lock = threading.Lock()
+        self._stats = {'discoveries': 0, 'cache_hits': 0, 'timeouts': 0}
+
+    def _is_fresh(self):
+        return bool(self._devices) and time.monotonic() < self._expires_at
+
+    def discover(self, force=False):
+        """
+        Get the state of every camera index, probing only if the cache expired.
+
+        Args:
+            force: Probe even if the cached results are still fresh
+
+        Returns:
+            dict: {index: {'available', 'error', 'resolution', 'holder'}}
+        """
+        with self._lock:
+            if not force and self._is_fresh():
+                self._stats['cache_hits'] += 1
+                return self._snapshot()
+
+        # Concurrent callers wait for the discovery in progress instead of probing again
+        with self._discover_lock:
+            with self._lock:
+                if not force and self._is_fresh():
+                    self._stats['cache_hits'] += 1
+                    return self._snapshot()
+                held = set(self._holders)
+
+            results = {}
+            threads = []
+            started = time.monotonic()
+            for index in range(self.probe_count):
+                previous = self._probing.get(index)
+                if index in held or (previous is not None and previous.is_alive()):
+                    # Never open a camera in use, nor one whose last probe is still hanging
+                    continue
+                thread = threading.Thread(target=self._probe_into, args=(index, results),
+                                          name=f"camera-probe-{index}", daemon=True)
+                self._probing[index] = thread
+                thread.start()
+                threads.append((index, thread))
+
+            deadline = started + self.timeout
+            for index, thread in threads:
+                thread.join(max(0.0, deadline - time.monotonic()))
+
+            now = time.monotonic()
+            with self._lock:
+                for index, _ in threads:
+                    result = results.get(index)
+                    if result is None:
+                        self._stats['timeouts'] += 1
+                        result = {'available': False, 'error': f"No response within {self.timeout:.0f} s"}
+                    self._devices[index] = dict(result, probed_at=now)
+                self._expires_at = now + self.ttl
+                self._stats['discoveries'] += 1
+                available = [index for index, device in self._devices.items()
+                             if device['available'] or index in self._holders]
+                snapshot = self._snapshot()
+
+        print(f"📷 Camera discovery: {len(available)} camera(s) {sorted(available)} "
+              f"in {now - started:.2f} s")
+        return snapshot
+
+    def _probe_into(self, index, results):
+        try:
+            results[index] = self.probe(index)
+        except Exception as e:
+            results[index] = {'available': False, 'error': str(e)}
+
+    def _snapshot(self):
+        """Copy of the device table with holders filled in (lock held)"""
+        snapshot = {}
+        for index, device in self._devices.items():
+            entry = {'available': device['available'], 'error': device.get('error'),
+                     'resolution': device.get('resolution'), 'holder': self._holders.get(index)}
+            if entry['holder'] is not None:
+                entry['available'] = True
+                entry['error'] = None
+            snapshot[index] = entry
+        for index, holder in self._holders.items():
+            snapshot.setdefault(index, {'available': True, 'error': None, 'resolution': None, 'holder': holder})
+        return snapshot
+
+    def available_indices(self):
+        """Cached indices of cameras that answered the last probe or are in use"""
+        with self._lock:
+            return sorted(index for index, device in self._snapshot().items() if device['available'])
+
+    def status(self, index):
+        """
+        Cached state of one camera; never opens the device.
+
+        Returns:
+            dict: 'connected', 'error' and 'holder' (None if free). A camera
+                  not probed yet reports 'Not checked yet'.
+        """
+        with self._lock:
+            device = self._snapshot().get(index)
+        if device is None:
+            return {'connected': False, 'error': "Not checked yet", 'holder': None}
+        return {'connected': device['available'], 'error': device['error'], 'holder': device['holder']}
+
+    def acquire(self, index, owner):
+        """
+        Claim a camera before opening it.
+
+        Returns:
+            bool: False if another component holds the camera
+        """
+        with self._lock:
+            holder = self._holders.get(index)
+            if holder is not None and holder != owner:
+                print(f"⚠️ Camera {index} is in use by {holder}, {owner} cannot open it")
+                return False
+            self._holders[index] = owner
+            return True
+
+    def release(self, index, owner):
+        """Give a camera back (no-op if ``owner`` does not hold it)"""
+        with self._lock:
+            if self._holders.get(index) == owner:
+                del self._holders[index]
+
+    def mark_failed(self, index, error):
+        """Record that a camera failed to open so the cache stops advertising it"""
+        with self._lock:
+            self._devices[index] = {'available': False, 'error': error, 'probed_at': time.monotonic()}
+
+    def get_stats(self):
+        """
+        Get registry statistics.
+
+        Returns:
+            dict: discoveries run, cache hits, probe timeouts and current holders
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['holders'] = dict(self._holders)
+        return stats
+
+
+# Global camera registry instance
+camera_registry = CameraRegistry()
@@ -121,3 +121,97 @@ CSV_HEADERS = {
            "Rust", "Dent", "Spherical Mark", "Damage", "Flat Line", 
            "Damage on End", "Roller", "Report Date", "Report Time", "Comment"]
 }
+
+# Shared-memory frame ring configuration
+# Number of frame slots per camera stream; 3 lets the writer always have a
+# free slot while a reader holds the newest complete frame.
+FRAME_RING_SLOTS = 3
+
+# Live feed display (Inference tab canvases)
+LIVE_FEED_SIZE = (400, 250)       # (width, height) drawn on the canvas
+LIVE_FEED_INTERVAL_MS = 30        # Poll interval for new frames
+
+# Batched inference engine
+INFERENCE_BATCH_WINDOW_MS = 10    # Max wait for the other camera's frame before running a batch
+INFERENCE_NUM_THREADS = 0         # PyTorch intra-op threads (0 = all CPU cores)
+
+# Inference backends (inference_backends)
+INFERENCE_BACKEND = "auto"        # "auto" (ONNX Runtime when an up-to-date .onnx export exists), "onnxruntime" or "torch"
+ONNX_EXPORT_ON_UPLOAD = True      # Export uploaded .pt weights to ONNX next to the copied file
+ONNX_EXPORT_IMGSZ = 640           # Export/inference size, same as the ultralytics predict default
+ONNX_INTRA_OP_THREADS = 0         # ONNX Runtime intra-op threads per session (0 = physical cores)
+ONNX_INTER_OP_THREADS = 1         # Sessions run sequentially on the engine worker, one is enough
+
+# Background model loading (model_loader, model_registry)
+MODEL_WARMUP_PASSES = 3           # Forward passes per model on a blank FRAME_SHAPE frame before it is used
+MODEL_WARMUP_TIMEOUT = 60.0       # Seconds a hot-swap warm-up may take on the engine worker before the switch is abandoned
+MODEL_CACHE_MAX_MODELS = 4        # Loaded models kept resident (LRU by weights file hash) for instant switching
+
+# Presence-gated inference (presence_gate)
+PRESENCE_GATING_ENABLED = True    # Infer only frames captured while the proximity sensor reports a roller
+PRESENCE_DELAY_MS = 0             # Sensor edge to roller-under-camera travel time
+PRESENCE_WINDOW_MS = 500          # Frames are inferred for at least this long after the delayed edge
+
+# Staged capture -> infer -> annotate -> display pipelines (pipeline, inspection_pipeline)
+CAMERA_INDEX = {"OD": 0, "BF": 1}  # cv2.VideoCapture index of each inspection camera
+PIPELINE_QUEUE_SIZE = 1           # Frames buffered in front of each stage (live cameras keep only the newest)
+PIPELINE_TARGET_FPS = 30          # Capture pacing; a camera that delivers slower is not delayed further
+
+# Latest-frame camera grabbers (camera_grabber)
+GRABBER_MAX_FAILURES = 30         # Consecutive failed grabs before a camera counts as disconnected
+
+# Camera discovery and ownership (camera_registry)
+CAMERA_PROBE_COUNT = 5            # Camera indices probed (0-4)
+CAMERA_PROBE_TIMEOUT = 3.0        # Seconds a discovery waits for all (parallel) probes
+CAMERA_REGISTRY_TTL = 60          # Seconds discovery results are served from cache
+
+# Frame sources (frame_source). None uses the live camera at CAMERA_INDEX; a stand-in spec
+# ("synthetic", "synthetic:1280x960", an image directory or a video file, optionally "@<fps>")
+# runs the preview and inspection pipelines without camera hardware, e.g. "synthetic@90" for 3x line speed.
+FRAME_SOURCES = {"OD": None, "BF": None}
+STANDIN_SOURCE_FPS = 30           # Default rate of stand-in sources (0 = as fast as the pipeline reads)
+
+# INT8 post-training quantization (model_quantization)
+QUANT_CALIBRATION_IMAGES = 200    # Max roller images read from the calibration folder
+QUANT_EVAL_FRACTION = 0.2         # Share of those images held out for the INT8 vs FP32 comparison
+QUANT_MATCH_IOU = 0.5             # Same-class IoU for an INT8 detection to count as matching FP32
+
+# Inspection session counters (roller_inspection_logger)
+SESSION_SNAPSHOT_INTERVAL = 200   # Events appended to the session log between CSV snapshots
+SESSION_LOG_FSYNC = False         # fsync every session event (survives power loss, slower)
+
+# Bulk CSV -> MySQL transfer (Reset)
+BULK_TRANSFER_CHUNK_SIZE = 1000       # Rows per executemany batch / transaction
+BULK_TRANSFER_USE_LOAD_DATA = False   # Try LOAD DATA LOCAL INFILE first for loads without a row transform (needs local_infile=ON)
+
+# Prediction write-behind logger (prediction_tracker)
+PREDICTION_QUEUE_SIZE = 10000         # Records buffered in memory at most (dropped and counted beyond that)
+PREDICTION_FLUSH_ROWS = 200           # Write a batch once this many records are pending
+PREDICTION_FLUSH_INTERVAL_MS = 500    # ...or once the oldest pending record is this old
+PREDICTION_RETRY_INTERVAL_MS = 1000   # Wait before retrying a batch that failed to write
+PREDICTION_FSYNC = True               # fsync the CSV after every batch
+
+# MySQL connection pool (db_pool)
+DB_POOL_SIZE = 8                      # Max open connections (UI, loggers, workers)
+DB_POOL_ACQUIRE_TIMEOUT = 5.0         # Seconds to wait for a free connection
+DB_POOL_HEALTH_CHECK_INTERVAL = 30.0  # Ping a connection only if unverified for this long
+DB_POOL_RETRY_BACKOFF = 1.0           # First reconnect backoff after a failed connect (seconds)
+DB_POOL_RETRY_BACKOFF_MAX = 30.0      # Backoff cap
+
+# Diagnosis report table
+DIAGNOSIS_PAGE_SIZE = 100             # Sessions fetched per keyset page
+DIAGNOSIS_PREFETCH_AT = 0.9           # Fetch the next page once scrolled past this fraction
+
+# Reference data cache (ref_cache): seconds an entry is served before re-reading MySQL.
+# Writes through DatabaseManager invalidate immediately; the TTL covers edits made elsewhere.
+REF_CACHE_TTL = {
+    'rollers': 300,          # roller types / roller_informations lookups
+    'thresholds': 60,        # current_thresholds
+    'od_models': 300,        # od_models list and active model
+    'bigface_models': 300    # bigface_models list and active model
+}
+
+# Background database work for the Tk UI (ui_executor)
+UI_EXECUTOR_WORKERS = 2               # Worker threads for blocking DB calls (each borrows one pooled connection per task)
+UI_EXECUTOR_POLL_MS = 15              # How often the Tk thread collects finished results
+TK_CALLBACK_BUDGET_MS = 100           # Log any Tk callback running longer than this (0 = watchdog off)
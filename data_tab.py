@@ -19,6 +19,7 @@ Key Features:
 import tkinter as tk
 import tkinter.ttk as ttk
 import tkinter.messagebox as messagebox
+from ui_executor import ui_executor
 
 class DataTab:
     """
@@ -326,11 +327,15 @@ class DataTab:
 
 
     def load_current_global_limits(self):
-        """Load current global limits from database and display them."""
+        """Load current global limits from database (on a ui_executor worker) and display them."""
+        from database import db_manager
+        ui_executor.submit(db_manager.get_global_limits, key="data.global_limits",
+                           on_success=self._show_current_global_limits,
+                           on_error=self._on_current_global_limits_error)
+
+    def _show_current_global_limits(self, limits):
+        """Display the fetched global limits and fill the input fields."""
         try:
-            from database import db_manager
-            limits = db_manager.get_global_limits()
-            
             if limits:
                 # Update current limits display
                 limits_text = (f"D: {limits['min_diameter']}-{limits['max_diameter']}mm, "
@@ -365,8 +370,11 @@ class DataTab:
                 print("⚠️ No global limits found in database")
                 
         except Exception as e:
-            print(f"Error loading global limits: {e}")
-            self.current_limits_label.config(text="Error loading limits", fg="#dc3545")
+            self._on_current_global_limits_error(e)
+
+    def _on_current_global_limits_error(self, e):
+        print(f"Error loading global limits: {e}")
+        self.current_limits_label.config(text="Error loading limits", fg="#dc3545")
 
     def save_global_limits(self):
         """Save global limits to database."""
@@ -496,11 +504,15 @@ class DataTab:
         self.load_admin_global_limits()
 
     def load_admin_global_limits(self):
-        """Load and display global limits for admin users."""
+        """Load (on a ui_executor worker) and display global limits for admin users."""
+        from database import db_manager
+        ui_executor.submit(db_manager.get_global_limits, key="data.admin_global_limits",
+                           on_success=self._show_admin_global_limits,
+                           on_error=self._on_admin_global_limits_error)
+
+    def _show_admin_global_limits(self, limits):
+        """Display the fetched global limits for admin users."""
         try:
-            from database import db_manager
-            limits = db_manager.get_global_limits()
-            
             # Clear existing display
             for widget in self.admin_limits_display_frame.winfo_children():
                 widget.destroy()
@@ -588,31 +600,38 @@ class DataTab:
                 print("⚠️ No global limits found for admin display")
                 
         except Exception as e:
-            print(f"Error loading admin global limits: {e}")
-            self.admin_current_limits_label.config(text="Error loading limits", fg="#dc3545")
-            error_label = tk.Label(self.admin_limits_display_frame, 
-                                 text=f"Error loading global limits: {e}",
-                                 font=("Arial", 11), fg="#dc3545", bg="#0a2158")
-            error_label.pack(pady=20)
+            self._on_admin_global_limits_error(e)
+
+    def _on_admin_global_limits_error(self, e):
+        print(f"Error loading admin global limits: {e}")
+        for widget in self.admin_limits_display_frame.winfo_children():
+            widget.destroy()
+        self.admin_current_limits_label.config(text="Error loading limits", fg="#dc3545")
+        error_label = tk.Label(self.admin_limits_display_frame, 
+                             text=f"Error loading global limits: {e}",
+                             font=("Arial", 11), fg="#dc3545", bg="#0a2158")
+        error_label.pack(pady=20)
 
     def load_admin_roller_types(self):
-        """Load available roller types for admin validation info."""
-        try:
-            # Get roller types from database
-            from database import db_manager
-            roller_types = db_manager.get_all_roller_types()
-            
-            if roller_types:
-                self.admin_roller_type_combo['values'] = roller_types
-                print(f"✅ Loaded {len(roller_types)} roller types for admin validation info")
-            else:
-                self.admin_roller_type_combo['values'] = []
-                print("⚠️ No roller types found for admin validation info")
-                
-        except Exception as e:
-            print(f"Error loading roller types for admin: {e}")
-            # Fallback with sample data
-            self.admin_roller_type_combo['values'] = ["RT-6300", "RT63", "RT630", "32310", "4TN1248"]
+        """Load available roller types for admin validation info (on a ui_executor worker)."""
+        # Get roller types from database
+        from database import db_manager
+        ui_executor.submit(db_manager.get_all_roller_types, key="data.admin_roller_types",
+                           on_success=self._show_admin_roller_types,
+                           on_error=self._on_admin_roller_types_error)
+
+    def _show_admin_roller_types(self, roller_types):
+        if roller_types:
+            self.admin_roller_type_combo['values'] = roller_types
+            print(f"✅ Loaded {len(roller_types)} roller types for admin validation info")
+        else:
+            self.admin_roller_type_combo['values'] = []
+            print("⚠️ No roller types found for admin validation info")
+
+    def _on_admin_roller_types_error(self, e):
+        print(f"Error loading roller types for admin: {e}")
+        # Fallback with sample data
+        self.admin_roller_type_combo['values'] = ["RT-6300", "RT63", "RT630", "32310", "4TN1248"]
 
     def on_admin_roller_type_selected(self, event=None):
         """Handle admin roller type selection and display specifications."""
@@ -621,16 +640,20 @@ class DataTab:
             self.display_admin_specifications(selected_type)
 
     def display_admin_specifications(self, roller_type):
-        """Display specifications for the selected roller type to admin."""
+        """Display specifications for the selected roller type to admin (read on a ui_executor worker)."""
+        # Get specifications from database
+        from database import db_manager
+        ui_executor.submit(db_manager.get_roller_specifications, roller_type, key="data.admin_specifications",
+                           on_success=lambda specs: self._show_admin_specifications(roller_type, specs),
+                           on_error=lambda e: self._on_admin_specifications_error(roller_type, e))
+
+    def _show_admin_specifications(self, roller_type, specs):
+        """Display the fetched specifications of a roller type."""
         try:
             # Clear existing display
             for widget in self.admin_specs_display_frame.winfo_children():
                 widget.destroy()
             
-            # Get specifications from database
-            from database import db_manager
-            specs = db_manager.get_roller_specifications(roller_type)
-            
             if specs:
                 # Create specifications display
                 title_label = tk.Label(self.admin_specs_display_frame, 
@@ -699,8 +722,13 @@ class DataTab:
                 print(f"⚠️ No specifications found for {roller_type}")
                 
         except Exception as e:
-            print(f"Error displaying admin specifications: {e}")
-            error_label = tk.Label(self.admin_specs_display_frame, 
-                                 text=f"Error loading specifications: {e}",
-                                 font=("Arial", 11), fg="#dc3545", bg="#0a2158")
-            error_label.pack(pady=20)
+            self._on_admin_specifications_error(roller_type, e)
+
+    def _on_admin_specifications_error(self, roller_type, e):
+        print(f"Error displaying admin specifications for {roller_type}: {e}")
+        for widget in self.admin_specs_display_frame.winfo_children():
+            widget.destroy()
+        error_label = tk.Label(self.admin_specs_display_frame, 
+                             text=f"Error loading specifications: {e}",
+                             font=("Arial", 11), fg="#dc3545", bg="#0a2158")
+        error_label.pack(pady=20)
@@ -6,37 +6,81 @@ Handles MySQL database operations with secure authentication using salted passwo
 import mysql.connector
 from mysql.connector import Error
 import hashlib
+import json
 import secrets
-from datetime import datetime
-from config import DB_CONFIG, DEFAULT_OD_DEFECT_THRESHOLDS, DEFAULT_BF_DEFECT_THRESHOLDS, DEFAULT_OD_DEFECT_THRESHOLDS, DEFAULT_BF_DEFECT_THRESHOLDS
+from datetime import datetime, date, timedelta
+from prediction_codec import decode_predictions_text
+from db_pool import db_pool
+from inspection_rollup import inspection_rollup
+from ref_cache import ref_cache, cached
+from config import DB_CONFIG, DEFAULT_OD_DEFECT_THRESHOLDS, DEFAULT_BF_DEFECT_THRESHOLDS, DEFAULT_OD_DEFECT_THRESHOLDS, DEFAULT_BF_DEFECT_THRESHOLDS, DIAGNOSIS_PAGE_SIZE
 
 class DatabaseManager:
     def __init__(self):
-        self.connection = None
+        self.pool = db_pool
         self.salt_length = 32  # 32 bytes = 256 bits salt
     
+    @property
+    def connection(self):
+        """Connection checked out for the calling thread (None until connect())"""
+        return self.pool.current_thread_connection()
+    
     def connect(self):
-        """Establish database connection"""
+        """Check out a pooled database connection for the calling thread"""
+        is_new = self.pool.current_thread_connection() is None
+        if self._checkout() is None:
+            return False
+        if is_new:
+            print("Successfully connected to MySQL database")
+        return True
+    
+    def _checkout(self):
+        """
+        Return the calling thread's pooled connection, checking one out on demand.
+        
+        A connection that fails its (rate-limited) health check is replaced.
+        ui_executor returns a worker's connection after each job, so queries
+        on worker threads never share a connection with the Tk thread.
+        
+        Returns:
+            PooledConnection, or None if the database is unreachable
+        """
+        connection = self.pool.current_thread_connection()
+        if connection is not None and connection.is_connected():
+            return connection
         try:
-            self.connection = mysql.connector.connect(
+            return self.pool.thread_connection()
+        except Error as e:
+            print(f"Error connecting to MySQL: {e}")
+            return None
+    
+    def create_connection(self, **options):
+        """
+        Open a separate (unpooled) connection for special options.
+        
+        Args:
+            **options: Extra mysql.connector options (e.g. allow_local_infile=True)
+            
+        Returns:
+            MySQLConnection or None if the connection failed
+        """
+        try:
+            return mysql.connector.connect(
                 host=DB_CONFIG['HOST'],
                 port=DB_CONFIG['PORT'],
                 database=DB_CONFIG['DATABASE'],
                 user=DB_CONFIG['USER'],
                 password=DB_CONFIG['PASSWORD'],
-                autocommit=True
+                **options
             )
-            if self.connection.is_connected():
-                print("Successfully connected to MySQL database")
-                return True
         except Error as e:
             print(f"Error connecting to MySQL: {e}")
-            return False
+            return None
     
     def disconnect(self):
-        """Close database connection"""
-        if self.connection and self.connection.is_connected():
-            self.connection.close()
+        """Return the calling thread's connection to the pool"""
+        if self.connection:
+            self.pool.release_thread_connection()
             print("MySQL connection closed")
     
     def generate_salt(self):
@@ -66,12 +110,12 @@ class DatabaseManager:
         Authenticate user with employee_id, password, and role
         Returns (success, message, user_data)
         """
-        if not self.connection:
-            if not self.connect():
-                return False, "Database connection failed", None
+        connection = self._checkout()
+        if connection is None:
+            return False, "Database connection failed", None
         
         try:
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
             
             # Get user data including salt
             query = """
@@ -121,8 +165,12 @@ class DatabaseManager:
     
     def increment_failed_attempts(self, employee_id):
         """Increment failed login attempts and lock account if necessary"""
+        connection = self._checkout()
+        if connection is None:
+            return
+        
         try:
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
             
             # Get current failed attempts
             cursor.execute("SELECT failed_attempts FROM users WHERE employee_id = %s", (employee_id,))
@@ -144,15 +192,19 @@ class DatabaseManager:
                     cursor.execute("UPDATE users SET failed_attempts = %s WHERE employee_id = %s", 
                                  (failed_attempts, employee_id))
                 
-                self.connection.commit()
+                connection.commit()
                 
         except Error as e:
             print(f"Error updating failed attempts: {e}")
     
     def reset_failed_attempts(self, employee_id):
         """Reset failed login attempts after successful login"""
+        connection = self._checkout()
+        if connection is None:
+            return
+        
         try:
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
             query = """
             UPDATE users SET 
                 failed_attempts = 0, 
@@ -160,28 +212,32 @@ class DatabaseManager:
             WHERE employee_id = %s
             """
             cursor.execute(query, (employee_id,))
-            self.connection.commit()
+            connection.commit()
         except Error as e:
             print(f"Error resetting failed attempts: {e}")
     
     def update_last_login(self, employee_id):
         """Update last login timestamp"""
+        connection = self._checkout()
+        if connection is None:
+            return
+        
         try:
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
             query = "UPDATE users SET last_login = NOW() WHERE employee_id = %s"
             cursor.execute(query, (employee_id,))
-            self.connection.commit()
+            connection.commit()
         except Error as e:
             print(f"Error updating last login: {e}")
     
     def create_user(self, employee_id, email, password, role):
         """Create a new user with hashed password"""
-        if not self.connection:
-            if not self.connect():
-                return False, "Database connection failed"
+        connection = self._checkout()
+        if connection is None:
+            return False, "Database connection failed"
         
         try:
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
             
             # Check if user already exists
             cursor.execute("SELECT employee_id FROM users WHERE employee_id = %s", (employee_id,))
@@ -198,7 +254,7 @@ class DatabaseManager:
             """
             
             cursor.execute(query, (employee_id, email, hashed_password, salt, role))
-            self.connection.commit()
+            connection.commit()
             
             return True, f"User {employee_id} created successfully"
             
@@ -210,17 +266,18 @@ class DatabaseManager:
     
     def log_system_event(self, user_id, action, details=None, level='INFO'):
         """Log system events for audit trail"""
-        if not self.connection:
+        connection = self._checkout()
+        if connection is None:
             return
         
         try:
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
             query = """
             INSERT INTO system_logs (user_id, action, details, level, timestamp)
             VALUES (%s, %s, %s, %s, NOW())
             """
             cursor.execute(query, (user_id, action, details, level))
-            self.connection.commit()
+            connection.commit()
         except Error as e:
             print(f"Error logging system event: {e}")
         finally:
@@ -230,11 +287,11 @@ class DatabaseManager:
     def create_roller_table(self):
         """Create roller_informations table if it doesn't exist"""
         try:
-            if not self.connection or not self.connection.is_connected():
-                if not self.connect():
-                    return False
+            connection = self._checkout()
+            if connection is None:
+                return False
             
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
             create_table_query = """
             CREATE TABLE IF NOT EXISTS roller_informations (
                 id INT AUTO_INCREMENT PRIMARY KEY,
@@ -251,7 +308,7 @@ class DatabaseManager:
             )
             """
             cursor.execute(create_table_query)
-            self.connection.commit()
+            connection.commit()
             cursor.close()
             print("✅ Roller informations table created/verified")
             return True
@@ -277,11 +334,11 @@ class DatabaseManager:
             tuple: (success: bool, message: str)
         """
         try:
-            if not self.connection or not self.connection.is_connected():
-                if not self.connect():
-                    return False, "Database connection failed"
+            connection = self._checkout()
+            if connection is None:
+                return False, "Database connection failed"
             
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
             
             # Insert new roller - include 'name' field which is required by the database
             # Use roller_type as the name since they serve similar purposes
@@ -290,7 +347,8 @@ class DatabaseManager:
             VALUES (%s, %s, %s, %s, %s, %s)
             """
             cursor.execute(insert_query, (roller_type, roller_type, diameter, thickness, length, created_by))
-            self.connection.commit()
+            connection.commit()
+            ref_cache.invalidate('rollers')
             
             roller_id = cursor.lastrowid
             cursor.close()
@@ -314,11 +372,11 @@ class DatabaseManager:
             list: List of dictionaries containing roller data
         """
         try:
-            if not self.connection or not self.connection.is_connected():
-                if not self.connect():
-                    return []
+            connection = self._checkout()
+            if connection is None:
+                return []
             
-            cursor = self.connection.cursor(dictionary=True)
+            cursor = connection.cursor(dictionary=True)
             query = """
             SELECT id, name, roller_type, diameter, thickness, length, 
                    status, created_at, updated_at, created_by
@@ -348,11 +406,11 @@ class DatabaseManager:
             dict or None: Roller data dictionary or None if not found
         """
         try:
-            if not self.connection or not self.connection.is_connected():
-                if not self.connect():
-                    return None
+            connection = self._checkout()
+            if connection is None:
+                return None
             
-            cursor = self.connection.cursor(dictionary=True)
+            cursor = connection.cursor(dictionary=True)
             query = """
             SELECT id, name, roller_type, diameter, thickness, length, 
                    status, created_at, updated_at, created_by
@@ -387,11 +445,11 @@ class DatabaseManager:
             tuple: (success: bool, message: str)
         """
         try:
-            if not self.connection or not self.connection.is_connected():
-                if not self.connect():
-                    return False, "Database connection failed"
+            connection = self._checkout()
+            if connection is None:
+                return False, "Database connection failed"
             
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
             
             # Check if roller exists
             check_query = "SELECT id FROM roller_informations WHERE id = %s"
@@ -409,7 +467,8 @@ class DatabaseManager:
             WHERE id = %s
             """
             cursor.execute(update_query, (roller_type, roller_type, diameter, thickness, length, roller_id))
-            self.connection.commit()
+            connection.commit()
+            ref_cache.invalidate('rollers')
             
             rows_affected = cursor.rowcount
             cursor.close()
@@ -428,11 +487,11 @@ class DatabaseManager:
     def delete_roller(self, roller_id, deleted_by=None):
         """Delete a roller record"""
         try:
-            if not self.connection or not self.connection.is_connected():
-                if not self.connect():
-                    return False, "Database connection failed"
+            connection = self._checkout()
+            if connection is None:
+                return False, "Database connection failed"
             
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
             
             # Get roller info before deletion for logging
             check_query = "SELECT roller_type FROM roller_informations WHERE id = %s"
@@ -447,7 +506,8 @@ class DatabaseManager:
             # Delete the roller
             delete_query = "DELETE FROM roller_informations WHERE id = %s"
             cursor.execute(delete_query, (roller_id,))
-            self.connection.commit()
+            connection.commit()
+            ref_cache.invalidate('rollers')
             
             rows_affected = cursor.rowcount
             cursor.close()
@@ -463,14 +523,15 @@ class DatabaseManager:
             print(f"❌ Error deleting roller: {e}")
             return False, f"Database error: {e}"
     
+    @cached('rollers')
     def get_roller_types(self):
         """Get unique roller types for dropdown"""
         try:
-            if not self.connection or not self.connection.is_connected():
-                if not self.connect():
-                    return []
+            connection = self._checkout()
+            if connection is None:
+                return []
             
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
             query = """
             SELECT DISTINCT roller_type 
             FROM roller_informations 
@@ -487,6 +548,7 @@ class DatabaseManager:
             print(f"❌ Error retrieving roller types: {e}")
             return []
     
+    @cached('rollers')
     def get_roller_by_type(self, roller_type):
         """
         Get roller information by roller type (returns first match).
@@ -501,11 +563,11 @@ class DatabaseManager:
             dict or None: Roller data dictionary or None if not found
         """
         try:
-            if not self.connection or not self.connection.is_connected():
-                if not self.connect():
-                    return None
+            connection = self._checkout()
+            if connection is None:
+                return None
             
-            cursor = self.connection.cursor(dictionary=True)
+            cursor = connection.cursor(dictionary=True)
             query = """
             SELECT id, name, roller_type, diameter, thickness, length, 
                    status, created_at, updated_at, created_by
@@ -527,11 +589,11 @@ class DatabaseManager:
     def create_threshold_tables(self):
         """Create threshold tracking tables for OD and BigFace models"""
         try:
-            if not self.connection or not self.connection.is_connected():
-                if not self.connect():
-                    return False
+            connection = self._checkout()
+            if connection is None:
+                return False
             
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
             
             # Create OD Model Threshold Tracking Table
             od_table_query = """
@@ -549,7 +611,8 @@ class DatabaseManager:
                 change_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 session_id VARCHAR(100),
                 INDEX idx_employee (employee_id),
-                INDEX idx_timestamp (change_timestamp)
+                INDEX idx_timestamp (change_timestamp),
+                INDEX idx_employee_timestamp (employee_id, change_timestamp)
             )
             """
             cursor.execute(od_table_query)
@@ -567,7 +630,8 @@ class DatabaseManager:
                 change_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 session_id VARCHAR(100),
                 INDEX idx_employee (employee_id),
-                INDEX idx_timestamp (change_timestamp)
+                INDEX idx_timestamp (change_timestamp),
+                INDEX idx_employee_timestamp (employee_id, change_timestamp)
             )
             """
             cursor.execute(bf_table_query)
@@ -585,7 +649,7 @@ class DatabaseManager:
             """
             cursor.execute(current_thresholds_query)
             
-            self.connection.commit()
+            connection.commit()
             cursor.close()
             
             # Initialize default threshold values if tables are empty
@@ -600,8 +664,12 @@ class DatabaseManager:
     
     def _initialize_default_thresholds(self):
         """Initialize default threshold values in current_thresholds table"""
+        connection = self._checkout()
+        if connection is None:
+            return
+        
         try:
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
             
             # Check if default values exist
             cursor.execute("SELECT COUNT(*) FROM current_thresholds")
@@ -643,7 +711,8 @@ class DatabaseManager:
                     VALUES (%s, %s, %s)
                 """, ('BIGFACE', json.dumps(bf_data), 'SYSTEM'))
                 
-                self.connection.commit()
+                connection.commit()
+                ref_cache.invalidate('thresholds')
                 print("✅ Default threshold values initialized")
             
             cursor.close()
@@ -654,11 +723,11 @@ class DatabaseManager:
     def save_od_thresholds(self, employee_id, thresholds, session_id=None):
         """Save OD model threshold changes to history and update current values"""
         try:
-            if not self.connection or not self.connection.is_connected():
-                if not self.connect():
-                    return False, "Database connection failed"
+            connection = self._checkout()
+            if connection is None:
+                return False, "Database connection failed"
             
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
             
             # Insert into history table
             history_query = """
@@ -703,7 +772,8 @@ class DatabaseManager:
                 updated_by = VALUES(updated_by)
             """, ('OD', json.dumps(threshold_data), employee_id))
             
-            self.connection.commit()
+            connection.commit()
+            ref_cache.invalidate('thresholds')
             cursor.close()
             
             # Log the change
@@ -718,11 +788,11 @@ class DatabaseManager:
     def save_bigface_thresholds(self, employee_id, thresholds, session_id=None):
         """Save BigFace model threshold changes to history and update current values"""
         try:
-            if not self.connection or not self.connection.is_connected():
-                if not self.connect():
-                    return False, "Database connection failed"
+            connection = self._checkout()
+            if connection is None:
+                return False, "Database connection failed"
             
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
             
             # Insert into history table
             history_query = """
@@ -760,7 +830,8 @@ class DatabaseManager:
                 updated_by = VALUES(updated_by)
             """, ('BIGFACE', json.dumps(threshold_data), employee_id))
             
-            self.connection.commit()
+            connection.commit()
+            ref_cache.invalidate('thresholds')
             cursor.close()
             
             # Log the change
@@ -772,14 +843,15 @@ class DatabaseManager:
             print(f"❌ Error saving BigFace thresholds: {e}")
             return False, f"Database error: {e}"
     
+    @cached('thresholds')
     def get_current_thresholds(self, model_type):
         """Retrieve current threshold values for specified model"""
         try:
-            if not self.connection or not self.connection.is_connected():
-                if not self.connect():
-                    return None
+            connection = self._checkout()
+            if connection is None:
+                return None
             
-            cursor = self.connection.cursor(dictionary=True)
+            cursor = connection.cursor(dictionary=True)
             
             cursor.execute("""
                 SELECT threshold_data, last_updated, updated_by 
@@ -825,11 +897,11 @@ class DatabaseManager:
     def get_threshold_history(self, model_type, start_date=None, end_date=None, employee_id=None, limit=100):
         """Retrieve threshold change history for specified model"""
         try:
-            if not self.connection or not self.connection.is_connected():
-                if not self.connect():
-                    return []
+            connection = self._checkout()
+            if connection is None:
+                return []
             
-            cursor = self.connection.cursor(dictionary=True)
+            cursor = connection.cursor(dictionary=True)
             
             # Build query based on model type
             if model_type == 'OD':
@@ -847,14 +919,15 @@ class DatabaseManager:
             query = f"SELECT {columns} FROM {table_name} WHERE 1=1"
             params = []
             
-            # Add filters
-            if start_date:
-                query += " AND DATE(change_timestamp) >= %s"
-                params.append(start_date)
+            # Add filters (half-open range on the raw column so the index is usable)
+            start, end = self._day_range(start_date, end_date)
+            if start is not None:
+                query += " AND change_timestamp >= %s"
+                params.append(start)
             
-            if end_date:
-                query += " AND DATE(change_timestamp) <= %s"
-                params.append(end_date)
+            if end is not None:
+                query += " AND change_timestamp < %s"
+                params.append(end)
             
             if employee_id:
                 query += " AND employee_id = %s"
@@ -869,7 +942,7 @@ class DatabaseManager:
             
             return history
             
-        except Error as e:
+        except (Error, ValueError) as e:
             print(f"❌ Error retrieving threshold history: {e}")
             return []
     
@@ -887,11 +960,11 @@ class DatabaseManager:
             if not confirm_deletion:
                 return False, "Deletion not confirmed", 0
             
-            if not self.connection or not self.connection.is_connected():
-                if not self.connect():
-                    return False, "Database connection failed", 0
+            connection = self._checkout()
+            if connection is None:
+                return False, "Database connection failed", 0
             
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
             total_deleted = 0
             
             # Clear OD history
@@ -920,7 +993,7 @@ class DatabaseManager:
                 
                 print(f"🗑️ Cleared {bf_deleted} BigFace threshold history records")
             
-            self.connection.commit()
+            connection.commit()
             cursor.close()
             
             # Log the deletion
@@ -940,11 +1013,11 @@ class DatabaseManager:
     def create_model_management_table(self):
         """Create separate tables for OD and BigFace models with simplified schema"""
         try:
-            if not self.connection or not self.connection.is_connected():
-                if not self.connect():
-                    return False
+            connection = self._checkout()
+            if connection is None:
+                return False
             
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
             
             # Create OD Models table
             od_models_query = """
@@ -955,6 +1028,9 @@ class DatabaseManager:
                 upload_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 uploaded_by VARCHAR(20),
                 is_active BOOLEAN DEFAULT FALSE,
+                model_precision VARCHAR(10) DEFAULT 'FP32',
+                base_model_id INT NULL,
+                quantization_report JSON NULL,
                 INDEX idx_upload_date (upload_date),
                 INDEX idx_active (is_active)
             )
@@ -970,13 +1046,16 @@ class DatabaseManager:
                 upload_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 uploaded_by VARCHAR(20),
                 is_active BOOLEAN DEFAULT FALSE,
+                model_precision VARCHAR(10) DEFAULT 'FP32',
+                base_model_id INT NULL,
+                quantization_report JSON NULL,
                 INDEX idx_upload_date (upload_date),
                 INDEX idx_active (is_active)
             )
             """
             cursor.execute(bf_models_query)
             
-            self.connection.commit()
+            connection.commit()
             cursor.close()
             
             print("✅ OD and BigFace model tables created/verified successfully")
@@ -986,14 +1065,22 @@ class DatabaseManager:
             print(f"❌ Error creating model tables: {e}")
             return False
     
-    def upload_od_model(self, model_name, model_path, uploaded_by, set_active=False):
-        """Upload an OD model to database"""
+    def upload_od_model(self, model_name, model_path, uploaded_by, set_active=False,
+                    model_precision="FP32", base_model_id=None, quantization_report=None):
+        """
+        Upload an OD model to database.
+
+        Args:
+            model_precision: 'FP32', or 'INT8' for a quantized variant
+            base_model_id: Model the variant was derived from
+            quantization_report: Accuracy/latency comparison against the base model (dict)
+        """
         try:
-            if not self.connection or not self.connection.is_connected():
-                if not self.connect():
-                    return False, "Database connection failed"
+            connection = self._checkout()
+            if connection is None:
+                return False, "Database connection failed"
             
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
             
             # Check if model with same name already exists
             cursor.execute("SELECT id FROM od_models WHERE model_name = %s", (model_name,))
@@ -1007,12 +1094,15 @@ class DatabaseManager:
             
             # Insert new model
             cursor.execute("""
-                INSERT INTO od_models (model_name, model_path, uploaded_by, is_active)
-                VALUES (%s, %s, %s, %s)
-            """, (model_name, model_path, uploaded_by, set_active))
+                INSERT INTO od_models (model_name, model_path, uploaded_by, is_active,
+                                 model_precision, base_model_id, quantization_report)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+            """, (model_name, model_path, uploaded_by, set_active, model_precision, base_model_id,
+                  json.dumps(quantization_report) if quantization_report is not None else None))
             
             model_id = cursor.lastrowid
-            self.connection.commit()
+            connection.commit()
+            ref_cache.invalidate('od_models')
             cursor.close()
             
             # Log the upload
@@ -1025,14 +1115,22 @@ class DatabaseManager:
             print(f"❌ Error uploading OD model: {e}")
             return False, f"Database error: {e}"
     
-    def upload_bigface_model(self, model_name, model_path, uploaded_by, set_active=False):
-        """Upload a BigFace model to database"""
+    def upload_bigface_model(self, model_name, model_path, uploaded_by, set_active=False,
+                    model_precision="FP32", base_model_id=None, quantization_report=None):
+        """
+        Upload a BigFace model to database.
+
+        Args:
+            model_precision: 'FP32', or 'INT8' for a quantized variant
+            base_model_id: Model the variant was derived from
+            quantization_report: Accuracy/latency comparison against the base model (dict)
+        """
         try:
-            if not self.connection or not self.connection.is_connected():
-                if not self.connect():
-                    return False, "Database connection failed"
+            connection = self._checkout()
+            if connection is None:
+                return False, "Database connection failed"
             
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
             
             # Check if model with same name already exists
             cursor.execute("SELECT id FROM bigface_models WHERE model_name = %s", (model_name,))
@@ -1046,12 +1144,15 @@ class DatabaseManager:
             
             # Insert new model
             cursor.execute("""
-                INSERT INTO bigface_models (model_name, model_path, uploaded_by, is_active)
-                VALUES (%s, %s, %s, %s)
-            """, (model_name, model_path, uploaded_by, set_active))
+                INSERT INTO bigface_models (model_name, model_path, uploaded_by, is_active,
+                                 model_precision, base_model_id, quantization_report)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+            """, (model_name, model_path, uploaded_by, set_active, model_precision, base_model_id,
+                  json.dumps(quantization_report) if quantization_report is not None else None))
             
             model_id = cursor.lastrowid
-            self.connection.commit()
+            connection.commit()
+            ref_cache.invalidate('bigface_models')
             cursor.close()
             
             # Log the upload
@@ -1064,16 +1165,18 @@ class DatabaseManager:
             print(f"❌ Error uploading BigFace model: {e}")
             return False, f"Database error: {e}"
     
+    @cached('od_models')
     def get_od_models(self):
         """Retrieve all OD models from database"""
         try:
-            if not self.connection or not self.connection.is_connected():
-                if not self.connect():
-                    return []
+            connection = self._checkout()
+            if connection is None:
+                return []
             
-            cursor = self.connection.cursor(dictionary=True)
+            cursor = connection.cursor(dictionary=True)
             cursor.execute("""
-                SELECT id, model_name, model_path, upload_date, uploaded_by, is_active
+                SELECT id, model_name, model_path, upload_date, uploaded_by, is_active,
+                       model_precision, base_model_id, quantization_report
                 FROM od_models 
                 ORDER BY upload_date DESC
             """)
@@ -1085,16 +1188,18 @@ class DatabaseManager:
             print(f"❌ Error retrieving OD models: {e}")
             return []
     
+    @cached('bigface_models')
     def get_bigface_models(self):
         """Retrieve all BigFace models from database"""
         try:
-            if not self.connection or not self.connection.is_connected():
-                if not self.connect():
-                    return []
+            connection = self._checkout()
+            if connection is None:
+                return []
             
-            cursor = self.connection.cursor(dictionary=True)
+            cursor = connection.cursor(dictionary=True)
             cursor.execute("""
-                SELECT id, model_name, model_path, upload_date, uploaded_by, is_active
+                SELECT id, model_name, model_path, upload_date, uploaded_by, is_active,
+                       model_precision, base_model_id, quantization_report
                 FROM bigface_models 
                 ORDER BY upload_date DESC
             """)
@@ -1106,14 +1211,22 @@ class DatabaseManager:
             print(f"❌ Error retrieving BigFace models: {e}")
             return []
     
+    def get_od_model_by_name(self, model_name):
+        """Get an OD model record by name, served from the cached model list"""
+        return next((model for model in self.get_od_models() if model['model_name'] == model_name), None)
+    
+    def get_bigface_model_by_name(self, model_name):
+        """Get a BigFace model record by name, served from the cached model list"""
+        return next((model for model in self.get_bigface_models() if model['model_name'] == model_name), None)
+    
     def delete_od_model(self, model_id, deleted_by):
         """Delete an OD model from database"""
         try:
-            if not self.connection or not self.connection.is_connected():
-                if not self.connect():
-                    return False, "Database connection failed"
+            connection = self._checkout()
+            if connection is None:
+                return False, "Database connection failed"
             
-            cursor = self.connection.cursor(dictionary=True)
+            cursor = connection.cursor(dictionary=True)
             
             # Get model info before deletion
             cursor.execute("SELECT * FROM od_models WHERE id = %s", (model_id,))
@@ -1130,7 +1243,8 @@ class DatabaseManager:
                 cursor.close()
                 return False, "OD model not found or already deleted"
             
-            self.connection.commit()
+            connection.commit()
+            ref_cache.invalidate('od_models')
             cursor.close()
             
             # Log the deletion
@@ -1146,11 +1260,11 @@ class DatabaseManager:
     def delete_bigface_model(self, model_id, deleted_by):
         """Delete a BigFace model from database"""
         try:
-            if not self.connection or not self.connection.is_connected():
-                if not self.connect():
-                    return False, "Database connection failed"
+            connection = self._checkout()
+            if connection is None:
+                return False, "Database connection failed"
             
-            cursor = self.connection.cursor(dictionary=True)
+            cursor = connection.cursor(dictionary=True)
             
             # Get model info before deletion
             cursor.execute("SELECT * FROM bigface_models WHERE id = %s", (model_id,))
@@ -1167,7 +1281,8 @@ class DatabaseManager:
                 cursor.close()
                 return False, "BigFace model not found or already deleted"
             
-            self.connection.commit()
+            connection.commit()
+            ref_cache.invalidate('bigface_models')
             cursor.close()
             
             # Log the deletion
@@ -1183,11 +1298,11 @@ class DatabaseManager:
     def set_active_od_model(self, model_id, activated_by):
         """Set an OD model as active"""
         try:
-            if not self.connection or not self.connection.is_connected():
-                if not self.connect():
-                    return False, "Database connection failed"
+            connection = self._checkout()
+            if connection is None:
+                return False, "Database connection failed"
             
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
             
             # Deactivate all OD models
             cursor.execute("UPDATE od_models SET is_active = FALSE")
@@ -1199,7 +1314,8 @@ class DatabaseManager:
                 cursor.close()
                 return False, "OD model not found"
             
-            self.connection.commit()
+            connection.commit()
+            ref_cache.invalidate('od_models')
             cursor.close()
             
             # Log the activation
@@ -1215,11 +1331,11 @@ class DatabaseManager:
     def set_active_bigface_model(self, model_id, activated_by):
         """Set a BigFace model as active"""
         try:
-            if not self.connection or not self.connection.is_connected():
-                if not self.connect():
-                    return False, "Database connection failed"
+            connection = self._checkout()
+            if connection is None:
+                return False, "Database connection failed"
             
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
             
             # Deactivate all BigFace models
             cursor.execute("UPDATE bigface_models SET is_active = FALSE")
@@ -1231,7 +1347,8 @@ class DatabaseManager:
                 cursor.close()
                 return False, "BigFace model not found"
             
-            self.connection.commit()
+            connection.commit()
+            ref_cache.invalidate('bigface_models')
             cursor.close()
             
             # Log the activation
@@ -1244,14 +1361,15 @@ class DatabaseManager:
             print(f"❌ Error activating BigFace model: {e}")
             return False, f"Database error: {e}"
     
+    @cached('od_models')
     def get_active_od_model(self):
         """Get the currently active OD model"""
         try:
-            if not self.connection or not self.connection.is_connected():
-                if not self.connect():
-                    return None
+            connection = self._checkout()
+            if connection is None:
+                return None
             
-            cursor = self.connection.cursor(dictionary=True)
+            cursor = connection.cursor(dictionary=True)
             cursor.execute("SELECT * FROM od_models WHERE is_active = TRUE LIMIT 1")
             model = cursor.fetchone()
             cursor.close()
@@ -1261,14 +1379,15 @@ class DatabaseManager:
             print(f"❌ Error getting active OD model: {e}")
             return None
     
+    @cached('bigface_models')
     def get_active_bigface_model(self):
         """Get the currently active BigFace model"""
         try:
-            if not self.connection or not self.connection.is_connected():
-                if not self.connect():
-                    return None
+            connection = self._checkout()
+            if connection is None:
+                return None
             
-            cursor = self.connection.cursor(dictionary=True)
+            cursor = connection.cursor(dictionary=True)
             cursor.execute("SELECT * FROM bigface_models WHERE is_active = TRUE LIMIT 1")
             model = cursor.fetchone()
             cursor.close()
@@ -1281,11 +1400,11 @@ class DatabaseManager:
     def create_inspection_session_tables(self):
         """Create inspection session tables for OD and BigFace models"""
         try:
-            if not self.connection or not self.connection.is_connected():
-                if not self.connect():
-                    return False
+            connection = self._checkout()
+            if connection is None:
+                return False
             
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
             
             # Create OD inspection sessions table
             create_od_sessions_table = """
@@ -1339,7 +1458,7 @@ class DatabaseManager:
             cursor.execute(create_od_sessions_table)
             cursor.execute(create_bf_sessions_table)
             
-            self.connection.commit()
+            connection.commit()
             cursor.close()
             
             print("✅ Inspection session tables created successfully")
@@ -1352,11 +1471,11 @@ class DatabaseManager:
     def create_inspection_session(self, session_id, model_type, roller_type=None, employee_id=None):
         """Create a new inspection session"""
         try:
-            if not self.connection or not self.connection.is_connected():
-                if not self.connect():
-                    return False, "Database connection failed"
+            connection = self._checkout()
+            if connection is None:
+                return False, "Database connection failed"
             
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
             
             table_name = "od_inspection_sessions" if model_type.upper() == "OD" else "bf_inspection_sessions"
             
@@ -1366,7 +1485,7 @@ class DatabaseManager:
             """
             
             cursor.execute(query, (session_id, roller_type, employee_id))
-            self.connection.commit()
+            connection.commit()
             cursor.close()
             
             print(f"✅ {model_type} inspection session created: {session_id}")
@@ -1379,11 +1498,11 @@ class DatabaseManager:
     def update_inspection_session(self, session_id, model_type, **kwargs):
         """Update inspection session data"""
         try:
-            if not self.connection or not self.connection.is_connected():
-                if not self.connect():
-                    return False, "Database connection failed"
+            connection = self._checkout()
+            if connection is None:
+                return False, "Database connection failed"
             
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
             
             table_name = "od_inspection_sessions" if model_type.upper() == "OD" else "bf_inspection_sessions"
             
@@ -1406,7 +1525,7 @@ class DatabaseManager:
             query = f"UPDATE {table_name} SET {', '.join(update_fields)} WHERE session_id = %s"
             
             cursor.execute(query, values)
-            self.connection.commit()
+            connection.commit()
             cursor.close()
             
             print(f"✅ {model_type} inspection session updated: {session_id}")
@@ -1420,11 +1539,14 @@ class DatabaseManager:
                                start_date=None, end_date=None, limit=100):
         """Retrieve inspection sessions with filtering options"""
         try:
-            if not self.connection or not self.connection.is_connected():
-                if not self.connect():
-                    return []
+            connection = self._checkout()
+            if connection is None:
+                return []
+            
+            cursor = connection.cursor(dictionary=True)
             
-            cursor = self.connection.cursor(dictionary=True)
+            # Half-open datetime bounds keep the start_of_session index usable
+            start, end = self._day_range(start_date, end_date)
             
             # If no model type specified, get from both tables
             if model_type is None:
@@ -1443,12 +1565,12 @@ class DatabaseManager:
                 
                 # Add filters for OD table
                 params = []
-                if start_date:
-                    query += " AND DATE(start_of_session) >= %s"
-                    params.append(start_date)
-                if end_date:
-                    query += " AND DATE(start_of_session) <= %s"
-                    params.append(end_date)
+                if start is not None:
+                    query += " AND start_of_session >= %s"
+                    params.append(start)
+                if end is not None:
+                    query += " AND start_of_session < %s"
+                    params.append(end)
                 
                 query += ")"
                 
@@ -1466,17 +1588,18 @@ class DatabaseManager:
                 """
                 
                 # Add same filters for BF table
-                if start_date:
-                    query += " AND DATE(start_of_session) >= %s"
-                    params.append(start_date)
-                if end_date:
-                    query += " AND DATE(start_of_session) <= %s"
-                    params.append(end_date)
+                if start is not None:
+                    query += " AND start_of_session >= %s"
+                    params.append(start)
+                if end is not None:
+                    query += " AND start_of_session < %s"
+                    params.append(end)
                 
                 query += ") ORDER BY start_time DESC"
                 
                 if limit:
-                    query += f" LIMIT {limit}"
+                    query += " LIMIT %s"
+                    params.append(int(limit))
                 
             else:
                 # Query specific model type using actual column names
@@ -1502,17 +1625,18 @@ class DatabaseManager:
                 params = []
                 
                 # Add filters using actual column names
-                if start_date:
-                    query += " AND DATE(start_of_session) >= %s"
-                    params.append(start_date)
-                if end_date:
-                    query += " AND DATE(start_of_session) <= %s"
-                    params.append(end_date)
+                if start is not None:
+                    query += " AND start_of_session >= %s"
+                    params.append(start)
+                if end is not None:
+                    query += " AND start_of_session < %s"
+                    params.append(end)
                 
                 query += " ORDER BY start_of_session DESC"
                 
                 if limit:
-                    query += f" LIMIT {limit}"
+                    query += " LIMIT %s"
+                    params.append(int(limit))
             
             cursor.execute(query, params)
             sessions = cursor.fetchall()
@@ -1521,18 +1645,182 @@ class DatabaseManager:
             print(f"✅ Retrieved {len(sessions)} inspection sessions")
             return sessions
             
-        except Error as e:
+        except (Error, ValueError) as e:
             print(f"❌ Error retrieving inspection sessions: {e}")
             return []
 
+    @staticmethod
+    def _day_range(start_date, end_date):
+        """
+        Convert an inclusive 'YYYY-MM-DD' date range into half-open datetime bounds.
+        
+        Comparing a raw DATETIME/TIMESTAMP column against [start, end + 1 day)
+        keeps the predicate sargable, unlike DATE(column).
+        """
+        def to_datetime(value):
+            if value is None or value == "":
+                return None
+            if isinstance(value, datetime):
+                return value
+            if isinstance(value, date):
+                return datetime(value.year, value.month, value.day)
+            return datetime.strptime(str(value)[:10], "%Y-%m-%d")
+        
+        start = to_datetime(start_date)
+        end = to_datetime(end_date)
+        if end is not None:
+            end = end.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        return start, end
+    
+    def _session_filter_sql(self, model_type, roller_type, start, end):
+        """Build the WHERE clause shared by the paged session queries for one table"""
+        predictions_table = "od_predictions" if model_type == "OD" else "bf_predictions"
+        conditions = []
+        params = []
+        if start is not None:
+            conditions.append("s.start_of_session >= %s")
+            params.append(start)
+        if end is not None:
+            conditions.append("s.start_of_session < %s")
+            params.append(end)
+        if roller_type:
+            # Sessions carry no roller type; it is recorded with each prediction
+            conditions.append(f"EXISTS (SELECT 1 FROM {predictions_table} p "
+                              "WHERE p.session_id = s.session_id AND p.roller_type = %s)")
+            params.append(roller_type)
+        return conditions, params
+    
+    def get_inspection_sessions_page(self, model_type=None, roller_type=None, start_date=None,
+                                     end_date=None, after_key=None, page_size=DIAGNOSIS_PAGE_SIZE):
+        """
+        Retrieve one page of inspection sessions, newest first, with keyset pagination.
+        
+        All filters run in SQL against start_of_session (indexed), so a page
+        costs one query regardless of how many sessions exist.
+        
+        Args:
+            model_type (str): 'OD', 'BF' or None for both
+            roller_type (str): Only sessions that inspected this roller type
+            start_date, end_date: Inclusive date range ('YYYY-MM-DD', date or datetime)
+            after_key (tuple): Key returned with the previous page, None for the first page
+            page_size (int): Max sessions to return
+            
+        Returns:
+            tuple: (sessions: list of dicts, next_key: tuple or None when there are no more pages)
+        """
+        try:
+            connection = self._checkout()
+            if connection is None:
+                return [], None
+            
+            model_types = [model_type.upper()] if model_type else ["OD", "BF"]
+            start, end = self._day_range(start_date, end_date)
+            
+            selects = []
+            params = []
+            for table_model in model_types:
+                sessions_table = "od_inspection_sessions" if table_model == "OD" else "bf_inspection_sessions"
+                predictions_table = "od_predictions" if table_model == "OD" else "bf_predictions"
+                conditions, table_params = self._session_filter_sql(table_model, roller_type, start, end)
+                
+                if after_key:
+                    # Rows sort by (start_time DESC, model_type DESC, id DESC); resolve
+                    # the key per table so each part stays a range scan on the index
+                    key_time, key_model, key_id = after_key
+                    if table_model == key_model:
+                        conditions.append("(s.start_of_session < %s OR (s.start_of_session = %s AND s.id < %s))")
+                        table_params.extend([key_time, key_time, key_id])
+                    elif table_model < key_model:
+                        conditions.append("s.start_of_session <= %s")
+                        table_params.append(key_time)
+                    else:
+                        conditions.append("s.start_of_session < %s")
+                        table_params.append(key_time)
+                
+                where = " WHERE " + " AND ".join(conditions) if conditions else ""
+                selects.append(f"""
+                (SELECT '{table_model}' AS model_type, s.id, s.session_id,
+                 (SELECT p.roller_type FROM {predictions_table} p WHERE p.session_id = s.session_id LIMIT 1) AS roller_type,
+                 (SELECT p.employee_id FROM {predictions_table} p WHERE p.session_id = s.session_id LIMIT 1) AS employee_id,
+                 s.start_of_session AS start_time, s.end_of_session AS end_time,
+                 s.total_inspected, s.total_accepted, s.total_rejected
+                 FROM {sessions_table} s{where}
+                 ORDER BY s.start_of_session DESC, s.id DESC LIMIT %s)""")
+                params.extend(table_params)
+                params.append(page_size + 1)
+            
+            query = " UNION ALL ".join(selects) + " ORDER BY start_time DESC, model_type DESC, id DESC LIMIT %s"
+            params.append(page_size + 1)
+            
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute(query, params)
+            sessions = cursor.fetchall()
+            cursor.close()
+            
+            next_key = None
+            if len(sessions) > page_size:
+                sessions = sessions[:page_size]
+                last = sessions[-1]
+                next_key = (last['start_time'], last['model_type'], last['id'])
+            return sessions, next_key
+            
+        except (Error, ValueError) as e:
+            print(f"❌ Error retrieving inspection session page: {e}")
+            return [], None
+    
+    def get_inspection_session_summary(self, model_type=None, roller_type=None, start_date=None, end_date=None):
+        """
+        Aggregate inspection totals per model with the same filters as get_inspection_sessions_page.
+        
+        Returns:
+            dict: {'OD': {...}, 'BF': {...}} with 'sessions', 'total_inspected',
+                  'total_accepted' and 'total_rejected' for each requested model
+        """
+        model_types = [model_type.upper()] if model_type else ["OD", "BF"]
+        summary = {
+            table_model: {'sessions': 0, 'total_inspected': 0, 'total_accepted': 0, 'total_rejected': 0}
+            for table_model in model_types
+        }
+        try:
+            connection = self._checkout()
+            if connection is None:
+                return summary
+            
+            start, end = self._day_range(start_date, end_date)
+            selects = []
+            params = []
+            for table_model in model_types:
+                sessions_table = "od_inspection_sessions" if table_model == "OD" else "bf_inspection_sessions"
+                conditions, table_params = self._session_filter_sql(table_model, roller_type, start, end)
+                where = " WHERE " + " AND ".join(conditions) if conditions else ""
+                selects.append(f"""
+                SELECT '{table_model}' AS model_type, COUNT(*) AS sessions,
+                       COALESCE(SUM(s.total_inspected), 0) AS total_inspected,
+                       COALESCE(SUM(s.total_accepted), 0) AS total_accepted,
+                       COALESCE(SUM(s.total_rejected), 0) AS total_rejected
+                FROM {sessions_table} s{where}""")
+                params.extend(table_params)
+            
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute(" UNION ALL ".join(selects), params)
+            for row in cursor.fetchall():
+                summary[row['model_type']] = {key: int(row[key]) for key in
+                                              ('sessions', 'total_inspected', 'total_accepted', 'total_rejected')}
+            cursor.close()
+            return summary
+            
+        except (Error, ValueError) as e:
+            print(f"❌ Error summarizing inspection sessions: {e}")
+            return summary
+
     def get_session_by_id(self, session_id, model_type=None):
         """Get a specific session by ID"""
         try:
-            if not self.connection or not self.connection.is_connected():
-                if not self.connect():
-                    return None
+            connection = self._checkout()
+            if connection is None:
+                return None
             
-            cursor = self.connection.cursor(dictionary=True)
+            cursor = connection.cursor(dictionary=True)
             
             if model_type:
                 table_name = "od_inspection_sessions" if model_type.upper() == "OD" else "bf_inspection_sessions"
@@ -1561,11 +1849,11 @@ class DatabaseManager:
     def delete_inspection_session(self, session_id, model_type):
         """Delete an inspection session"""
         try:
-            if not self.connection or not self.connection.is_connected():
-                if not self.connect():
-                    return False, "Database connection failed"
+            connection = self._checkout()
+            if connection is None:
+                return False, "Database connection failed"
             
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
             
             table_name = "od_inspection_sessions" if model_type.upper() == "OD" else "bf_inspection_sessions"
             
@@ -1575,7 +1863,7 @@ class DatabaseManager:
                 cursor.close()
                 return False, "Session not found"
             
-            self.connection.commit()
+            connection.commit()
             cursor.close()
             
             print(f"✅ {model_type} inspection session deleted: {session_id}")
@@ -1588,11 +1876,11 @@ class DatabaseManager:
     def create_roller_specifications_table(self):
         """Create roller specifications table if it doesn't exist"""
         try:
-            if not self.connection or not self.connection.is_connected():
-                if not self.connect():
-                    return False
+            connection = self._checkout()
+            if connection is None:
+                return False
             
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
             create_table_query = """
             CREATE TABLE IF NOT EXISTS roller_specifications (
                 id INT AUTO_INCREMENT PRIMARY KEY,
@@ -1629,7 +1917,7 @@ class DatabaseManager:
                 cursor.execute("ALTER TABLE roller_specifications ADD COLUMN max_length DECIMAL(10,3) NOT NULL DEFAULT 0 AFTER min_length")
                 print("✅ Added max_length column to roller_specifications table")
             
-            self.connection.commit()
+            connection.commit()
             cursor.close()
             print("✅ Roller specifications table created/verified")
             return True
@@ -1648,11 +1936,11 @@ class DatabaseManager:
             dict or None: Specifications data dictionary or None if not found
         """
         try:
-            if not self.connection or not self.connection.is_connected():
-                if not self.connect():
-                    return None
+            connection = self._checkout()
+            if connection is None:
+                return None
             
-            cursor = self.connection.cursor(dictionary=True)
+            cursor = connection.cursor(dictionary=True)
             query = """
             SELECT roller_type, min_diameter, max_diameter, min_thickness, max_thickness, 
                    min_length, max_length, created_at, updated_at, updated_by
@@ -1688,14 +1976,14 @@ class DatabaseManager:
             bool: True if successful, False otherwise
         """
         try:
-            if not self.connection or not self.connection.is_connected():
-                if not self.connect():
-                    return False
+            connection = self._checkout()
+            if connection is None:
+                return False
             
             # Ensure the specifications table exists
             self.create_roller_specifications_table()
             
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
             
             # Use INSERT ... ON DUPLICATE KEY UPDATE for upsert operation
             query = """
@@ -1724,7 +2012,8 @@ class DatabaseManager:
                 specs_data['updated_by']
             ))
             
-            self.connection.commit()
+            connection.commit()
+            ref_cache.invalidate('rollers')
             cursor.close()
             
             # Log the event
@@ -1752,11 +2041,11 @@ class DatabaseManager:
             list: List of dictionaries containing all specifications
         """
         try:
-            if not self.connection or not self.connection.is_connected():
-                if not self.connect():
-                    return []
+            connection = self._checkout()
+            if connection is None:
+                return []
             
-            cursor = self.connection.cursor(dictionary=True)
+            cursor = connection.cursor(dictionary=True)
             query = """
             SELECT roller_type, min_diameter, max_diameter, min_thickness, max_thickness, 
                    min_length, max_length, created_at, updated_at, updated_by
@@ -1785,11 +2074,11 @@ class DatabaseManager:
             tuple: (success: bool, message: str)
         """
         try:
-            if not self.connection or not self.connection.is_connected():
-                if not self.connect():
-                    return False, "Database connection failed"
+            connection = self._checkout()
+            if connection is None:
+                return False, "Database connection failed"
             
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
             
             # Check if specifications exist
             check_query = "SELECT roller_type FROM roller_specifications WHERE roller_type = %s"
@@ -1802,7 +2091,8 @@ class DatabaseManager:
             # Delete the specifications
             delete_query = "DELETE FROM roller_specifications WHERE roller_type = %s"
             cursor.execute(delete_query, (roller_type,))
-            self.connection.commit()
+            connection.commit()
+            ref_cache.invalidate('rollers')
             
             rows_affected = cursor.rowcount
             cursor.close()
@@ -1905,11 +2195,11 @@ class DatabaseManager:
     def create_global_limits_table(self):
         """Create global roller limits table if it doesn't exist"""
         try:
-            if not self.connection or not self.connection.is_connected():
-                if not self.connect():
-                    return False
+            connection = self._checkout()
+            if connection is None:
+                return False
             
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
             create_table_query = """
             CREATE TABLE IF NOT EXISTS global_roller_limits (
                 id INT AUTO_INCREMENT PRIMARY KEY,
@@ -1926,7 +2216,7 @@ class DatabaseManager:
             """
             
             cursor.execute(create_table_query)
-            self.connection.commit()
+            connection.commit()
             cursor.close()
             print("✅ Global roller limits table created/verified")
             return True
@@ -1952,14 +2242,14 @@ class DatabaseManager:
             bool: True if successful, False otherwise
         """
         try:
-            if not self.connection or not self.connection.is_connected():
-                if not self.connect():
-                    return False
+            connection = self._checkout()
+            if connection is None:
+                return False
             
             # Ensure the global limits table exists
             self.create_global_limits_table()
             
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
             
             # Clear existing limits (only one row should exist)
             cursor.execute("DELETE FROM global_roller_limits")
@@ -1981,7 +2271,7 @@ class DatabaseManager:
                 limits_data['updated_by']
             ))
             
-            self.connection.commit()
+            connection.commit()
             cursor.close()
             
             # Log the event
@@ -2009,11 +2299,11 @@ class DatabaseManager:
             dict or None: Global limits data dictionary or None if not found
         """
         try:
-            if not self.connection or not self.connection.is_connected():
-                if not self.connect():
-                    return None
+            connection = self._checkout()
+            if connection is None:
+                return None
             
-            cursor = self.connection.cursor(dictionary=True)
+            cursor = connection.cursor(dictionary=True)
             query = """
             SELECT min_diameter, max_diameter, min_thickness, max_thickness, 
                    min_length, max_length, created_at, updated_at, updated_by
@@ -2111,6 +2401,7 @@ class DatabaseManager:
                 'message': f"Validation error: {e}"
             }
 
+    @cached('rollers')
     def get_all_roller_types(self):
         """
         Get all unique roller types from both roller_informations and roller_specifications tables.
@@ -2119,11 +2410,11 @@ class DatabaseManager:
             list: List of unique roller types
         """
         try:
-            if not self.connection or not self.connection.is_connected():
-                if not self.connect():
-                    return []
+            connection = self._checkout()
+            if connection is None:
+                return []
             
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
             
             # Get roller types from both tables and combine them
             query = """
@@ -2147,82 +2438,50 @@ class DatabaseManager:
             # Fallback to just roller_informations table
             return self.get_roller_types()
     
-    def get_defect_wise_statistics(self, component_type=None, report_type=None, from_date=None, to_date=None):
-        """Get defect-wise statistics based on filters"""
-        try:
-            if not self.connection or not self.connection.is_connected():
-                if not self.connect():
-                    return {}
-            
-            cursor = self.connection.cursor()
-            
-            # Build base query with filters
-            params = []
-            where_conditions = []
-            
-            if from_date and to_date:
-                where_conditions.append("session_date BETWEEN %s AND %s")
-                params.extend([from_date, to_date])
-            else:
-                # Default to last 30 days
-                where_conditions.append("session_date >= DATE_SUB(NOW(), INTERVAL 30 DAY)")
-            
-            if component_type:
-                where_conditions.append("roller_type = %s")
-                params.append(component_type)
-            
-            if report_type and report_type != "Overall":
-                if report_type == "OD":
-                    where_conditions.append("model_type = 'OD'")
-                elif report_type == "BigFace":
-                    where_conditions.append("model_type = 'BF'")
-            
-            # Get total rejected count as base for defect calculations
-            base_query = """
-            SELECT COALESCE(SUM(total_rejected), 0) as total_rejected
-            FROM (
-                SELECT total_rejected FROM od_inspection_sessions WHERE 1=1
-                UNION ALL
-                SELECT total_rejected FROM bf_inspection_sessions WHERE 1=1
-            ) as combined_sessions
-            """
-            
-            if where_conditions:
-                base_query = base_query.replace("WHERE 1=1", "WHERE " + " AND ".join(where_conditions))
-            
-            cursor.execute(base_query, params + params)  # params twice for both tables
-            result = cursor.fetchone()
-            total_rejected = result[0] if result and result[0] else 0
-            
-            # Calculate defect distribution based on typical defect patterns
-            # These factors can be adjusted based on your actual defect tracking data
-            defect_factors = {
-                "Rust": 0.35,           # 35% of defects are rust-related
-                "Damage": 0.20,         # 20% are physical damage
-                "High Head": 0.15,      # 15% are high head defects
-                "Down Head": 0.10,      # 10% are down head defects
-                "Surface Defect": 0.12, # 12% are surface defects
-                "Dimension Error": 0.08 # 8% are dimension errors
-            }
-            
-            defect_data = {}
-            for defect_type, factor in defect_factors.items():
-                defect_data[defect_type] = int(total_rejected * factor)
+    def get_prediction_detections(self, component_type, prediction_id):
+        """
+        Retrieve one stored prediction with its decoded detections.
+        
+        Args:
+            component_type (str): 'od' or 'bf'
+            prediction_id (str): Prediction identifier
             
+        Returns:
+            dict or None: Prediction row with a 'detections' list
+                          [{'class_name', 'confidence', 'box'}], or None if not found
+        """
+        try:
+            connection = self._checkout()
+            if connection is None:
+                return None
+            
+            table_name = 'od_predictions' if component_type == 'od' else 'bf_predictions'
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute(f"SELECT * FROM {table_name} WHERE prediction_id = %s", (prediction_id,))
+            prediction = cursor.fetchone()
             cursor.close()
-            return defect_data
             
-        except Error as e:
-            print(f"❌ Error getting defect-wise statistics: {e}")
-            # Return sample data for demonstration
-            return {
-                "Rust": 15,
-                "Damage": 8,
-                "High Head": 5,
-                "Down Head": 3,
-                "Surface Defect": 12,
-                "Dimension Error": 7
-            }
+            if prediction:
+                prediction['detections'] = decode_predictions_text(prediction.pop('raw_predictions', ''))
+            return prediction
+            
+        except (Error, ValueError, SyntaxError) as e:
+            print(f"❌ Error retrieving prediction {prediction_id}: {e}")
+            return None
+    
+    def get_defect_wise_statistics(self, component_type=None, report_type=None, from_date=None, to_date=None):
+        """
+        Get defect-wise statistics based on filters.
+        
+        Counts come from the daily rollups of the *_predictions tables: the
+        number of inspected rollers in which each defect was detected.
+        
+        Returns:
+            dict: {defect label: roller count}
+        """
+        model_type = {"OD": "OD", "BigFace": "BF", "BF": "BF"}.get(report_type)
+        return inspection_rollup.get_defect_counts(model_type=model_type, roller_type=component_type,
+                                                   start_date=from_date, end_date=to_date)
 
 # Global database manager instance
 db_manager = DatabaseManager() 
\ No newline at end of file
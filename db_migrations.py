@@ -0,0 +1,483 @@
+"""
+Versioned Schema Migrations for WelVision
+Applies numbered schema changes once and records them in schema_migrations
+
+Usage:
+    python db_migrations.py                      # create tables / apply pending migrations
+    python db_migrations.py --explain-check      # EXPLAIN the report queries on seeded copies
+"""
+
+import re
+import time
+
+from mysql.connector import Error
+
+from db_pool import db_pool
+
+MIGRATIONS_TABLE = "schema_migrations"
+MIGRATION_LOCK = "welvision_schema_migrations"
+
+
+def _table_exists(cursor, table):
+    cursor.execute("SELECT COUNT(*) FROM information_schema.tables "
+                   "WHERE table_schema = DATABASE() AND table_name = %s", (table,))
+    return cursor.fetchone()[0] > 0
+
+
+def _table_columns(cursor, table):
+    cursor.execute("SELECT column_name FROM information_schema.columns "
+                   "WHERE table_schema = DATABASE() AND table_name = %s", (table,))
+    return {row[0].lower() for row in cursor.fetchall()}
+
+
+def _index_exists(cursor, table, index_name):
+    cursor.execute("SELECT COUNT(*) FROM information_schema.statistics "
+                   "WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s",
+                   (table, index_name))
+    return cursor.fetchone()[0] > 0
+
+
+def _add_index(cursor, table, index_name, columns):
+    """
+    Add an index unless it exists. Tables that do not exist yet are skipped
+    (their CREATE TABLE already declares the index), as are tables whose
+    schema lacks one of the columns.
+    """
+    if not _table_exists(cursor, table):
+        return
+    missing = set(column.lower() for column in columns) - _table_columns(cursor, table)
+    if missing:
+        print(f"⚠️ Skipping {table}.{index_name}: no column(s) {', '.join(sorted(missing))}")
+        return
+    if _index_exists(cursor, table, index_name):
+        return
+    cursor.execute(f"ALTER TABLE {table} ADD INDEX {index_name} ({', '.join(columns)})")
+    print(f"✅ Added index {table}.{index_name} ({', '.join(columns)})")
+
+
+def _add_column(cursor, table, column, definition):
+    """Add a column unless it exists; tables that do not exist yet are skipped"""
+    if not _table_exists(cursor, table) or column.lower() in _table_columns(cursor, table):
+        return
+    cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    print(f"✅ Added column {table}.{column}")
+
+
+def _migration_001_report_indexes(cursor):
+    """Composite indexes for the Diagnosis / Settings report filters"""
+    for table in ("od_inspection_sessions", "bf_inspection_sessions"):
+        _add_index(cursor, table, "idx_start_session", ("start_of_session", "session_id"))
+        # Only the older session schema has roller_type / employee_id columns
+        _add_index(cursor, table, "idx_roller_start", ("roller_type", "start_of_session"))
+        _add_index(cursor, table, "idx_employee_start", ("employee_id", "start_of_session"))
+    for table in ("od_predictions", "bf_predictions"):
+        _add_index(cursor, table, "idx_session_roller", ("session_id", "roller_type"))
+        _add_index(cursor, table, "idx_roller_timestamp", ("roller_type", "timestamp"))
+        _add_index(cursor, table, "idx_employee_timestamp", ("employee_id", "timestamp"))
+    for table in ("od_threshold_history", "bigface_threshold_history"):
+        _add_index(cursor, table, "idx_employee_timestamp", ("employee_id", "change_timestamp"))
+
+
+def _migration_002_bootstrap_all_tables(cursor):
+    """
+    Marker: from this version on bootstrap_schema creates every table at
+    startup (prediction and session tables used to be created on the first
+    transfer). Bumping the version makes older databases run the bootstrap
+    DDL once; the DDL itself lives in _bootstrap_steps.
+    """
+
+
+def _migration_003_model_precision(cursor):
+    """Precision, base model and quantization report columns for quantized model variants"""
+    for table in ("od_models", "bigface_models"):
+        _add_column(cursor, table, "model_precision", "VARCHAR(10) DEFAULT 'FP32'")
+        _add_column(cursor, table, "base_model_id", "INT NULL")
+        _add_column(cursor, table, "quantization_report", "JSON NULL")
+
+
+def _migration_004_inspection_rollups(cursor):
+    """Daily inspection rollup and per-session day tables, backfilled from the predictions"""
+    from inspection_rollup import inspection_rollup
+
+    inspection_rollup.create_tables(cursor)
+    for model_type in ("OD", "BF"):
+        inspection_rollup._rebuild_range(cursor, model_type, None, None)
+
+
+# (version, description, function(cursor)) - append only, never renumber.
+# Any change to a CREATE TABLE statement needs a new migration here so
+# existing databases pick it up.
+MIGRATIONS = [
+    (1, "Composite indexes for report filters", _migration_001_report_indexes),
+    (2, "Create all application tables at bootstrap", _migration_002_bootstrap_all_tables),
+    (3, "Model precision and quantization report columns", _migration_003_model_precision),
+    (4, "Daily inspection rollups", _migration_004_inspection_rollups),
+]
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def _ensure_migrations_table(cursor):
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} (
+            version INT PRIMARY KEY,
+            description VARCHAR(200) NOT NULL,
+            duration_ms INT DEFAULT 0,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def get_schema_version(cursor):
+    """Return the highest applied migration version (0 if none)"""
+    cursor.execute(f"SELECT COALESCE(MAX(version), 0) FROM {MIGRATIONS_TABLE}")
+    return cursor.fetchone()[0]
+
+
+def run_migrations():
+    """
+    Apply every migration newer than the recorded schema version.
+
+    Migrations run in version order under a named MySQL lock, so two
+    stations starting at once do not apply the same change twice. Each one
+    is recorded as soon as it succeeds; a failed migration stops the run and
+    is retried on the next start.
+
+    Returns:
+        tuple: (success: bool, message: str)
+    """
+    try:
+        with db_pool.connection() as connection:
+            cursor = connection.cursor()
+            try:
+                cursor.execute("SELECT GET_LOCK(%s, 30)", (MIGRATION_LOCK,))
+                if not cursor.fetchone()[0]:
+                    return False, "Timed out waiting for another station's migrations"
+                try:
+                    _ensure_migrations_table(cursor)
+                    current = get_schema_version(cursor)
+                    applied = 0
+                    for version, description, migrate in MIGRATIONS:
+                        if version <= current:
+                            continue
+                        started = time.perf_counter()
+                        migrate(cursor)
+                        duration_ms = int((time.perf_counter() - started) * 1000)
+                        cursor.execute(
+                            f"INSERT INTO {MIGRATIONS_TABLE} (version, description, duration_ms) VALUES (%s, %s, %s)",
+                            (version, description, duration_ms))
+                        applied += 1
+                        print(f"✅ Applied migration {version}: {description} ({duration_ms} ms)")
+                finally:
+                    cursor.execute("SELECT RELEASE_LOCK(%s)", (MIGRATION_LOCK,))
+                    cursor.fetchone()
+            finally:
+                cursor.close()
+
+        if applied:
+            return True, f"Applied {applied} migration(s), schema version {LATEST_VERSION}"
+        return True, f"Schema up to date (version {current})"
+
+    except Error as e:
+        print(f"❌ Error applying migrations: {e}")
+        return False, f"Database error: {e}"
+
+
+# ---------------------------------------------------------------------------
+# Startup bootstrap: run table DDL only when the schema version is behind
+# ---------------------------------------------------------------------------
+
+_schema_ready = False
+last_bootstrap = {'seconds': 0.0, 'ran_ddl': False, 'version': 0}
+
+
+def _recorded_version():
+    """Schema version recorded in schema_migrations (0 if the table does not exist yet)"""
+    with db_pool.connection() as connection:
+        cursor = connection.cursor()
+        try:
+            return get_schema_version(cursor)
+        except Error as e:
+            if getattr(e, 'errno', None) == 1146:  # ER_NO_SUCH_TABLE
+                return 0
+            raise
+        finally:
+            cursor.close()
+
+
+def _bootstrap_steps():
+    """Every application table, in creation order (all CREATE TABLE IF NOT EXISTS)"""
+    from database import db_manager
+    from init_database import create_users_table, create_system_logs_table
+    from prediction_tracker import prediction_tracker
+    from roller_inspection_logger import roller_logger
+    from inspection_rollup import inspection_rollup
+
+    return [
+        ("users", create_users_table),
+        ("system logs", create_system_logs_table),
+        ("roller informations", db_manager.create_roller_table),
+        ("roller specifications", db_manager.create_roller_specifications_table),
+        ("global roller limits", db_manager.create_global_limits_table),
+        ("threshold tracking", db_manager.create_threshold_tables),
+        ("model management", db_manager.create_model_management_table),
+        # The session schema written by the CSV transfer and read by the reports
+        ("inspection sessions", roller_logger._create_database_tables),
+        ("predictions", prediction_tracker._create_prediction_tables),
+        # Derived from the predictions, so created after them
+        ("inspection rollups", inspection_rollup.create_schema),
+    ]
+
+
+def bootstrap_schema(force=False):
+    """
+    Create and upgrade the database schema in one step.
+
+    When the version recorded in schema_migrations is current, this costs a
+    single SELECT and no DDL (no metadata locks). Otherwise every table is
+    created if missing and the pending migrations are applied; the version
+    is only advanced when all of it succeeded, so a failed bootstrap is
+    retried on the next start. Within a process, later calls return at once.
+
+    Args:
+        force: Run the table DDL even if the recorded version is current
+
+    Returns:
+        tuple: (success: bool, message: str, seconds: float)
+    """
+    global _schema_ready
+    if _schema_ready and not force:
+        return True, f"Schema version {last_bootstrap['version']} already verified", 0.0
+
+    started = time.perf_counter()
+    ran_ddl = False
+    try:
+        version = _recorded_version()
+        if version >= LATEST_VERSION and not force:
+            success, message = True, f"Schema version {version} is current, table setup skipped"
+        else:
+            ran_ddl = True
+            from database import db_manager
+            if not db_manager.connect():
+                raise Error(msg="Database connection failed")
+
+            failed = []
+            for name, create in _bootstrap_steps():
+                try:
+                    if create() is False:
+                        failed.append(name)
+                except Exception as e:
+                    print(f"❌ Error creating {name} tables: {e}")
+                    failed.append(name)
+
+            if failed:
+                success, message = False, f"Schema setup failed for: {', '.join(failed)}"
+            else:
+                success, message = run_migrations()
+                version = LATEST_VERSION if success else version
+
+    except Error as e:
+        success, message = False, f"Database error: {e}"
+
+    seconds = time.perf_counter() - started
+    last_bootstrap.update(seconds=seconds, ran_ddl=ran_ddl, version=version if success else 0)
+    _schema_ready = success
+    print(f"{'✅' if success else '❌'} Schema bootstrap: {message} ({seconds * 1000:.1f} ms)")
+    return success, message, seconds
+
+
+def ensure_schema():
+    """Cheap guard for code paths that write to the database (e.g. CSV transfers)"""
+    return bootstrap_schema()[0]
+
+
+# ---------------------------------------------------------------------------
+# EXPLAIN regression check: the report queries must use an index
+# ---------------------------------------------------------------------------
+
+EXPLAIN_TABLES = ("od_inspection_sessions", "bf_inspection_sessions", "od_predictions", "bf_predictions",
+                  "od_threshold_history", "bigface_threshold_history")
+EXPLAIN_PREFIX = "explain_"
+
+# 0..999999 from six cross-joined digit tables (no recursive CTE needed)
+_DIGITS = "(SELECT 0 d UNION ALL SELECT 1 UNION ALL SELECT 2 UNION ALL SELECT 3 UNION ALL SELECT 4 " \
+          "UNION ALL SELECT 5 UNION ALL SELECT 6 UNION ALL SELECT 7 UNION ALL SELECT 8 UNION ALL SELECT 9)"
+_SEQUENCE = ("(SELECT d0.d + 10 * d1.d + 100 * d2.d + 1000 * d3.d + 10000 * d4.d + 100000 * d5.d AS n "
+             f"FROM {_DIGITS} d0, {_DIGITS} d1, {_DIGITS} d2, {_DIGITS} d3, {_DIGITS} d4, {_DIGITS} d5) seq")
+
+_SEED_QUERIES = {
+    "od_inspection_sessions": """
+        INSERT INTO {table} (session_id, start_of_session, end_of_session, total_inspected, total_accepted, total_rejected)
+        SELECT CONCAT('EXPLAIN_', n), NOW() - INTERVAL n MINUTE, NOW() - INTERVAL n MINUTE + INTERVAL 50 SECOND,
+               100, 90, 10 FROM {sequence} WHERE n < %s""",
+    "od_predictions": """
+        INSERT INTO {table} (prediction_id, session_id, timestamp, roller_type, employee_id, status, rust_count)
+        SELECT CONCAT('EXPLAIN_P', n), CONCAT('EXPLAIN_', n DIV 10), NOW() - INTERVAL n MINUTE,
+               ELT(1 + MOD(n, 4), 'RT-6300', 'RT-320 18X', 'RT-100', 'RT-200'), CONCAT('E', MOD(n, 50)),
+               IF(MOD(n, 10) = 0, 'REJECTED', 'ACCEPTED'), IF(MOD(n, 10) = 0, 1, 0) FROM {sequence} WHERE n < %s""",
+    "od_threshold_history": """
+        INSERT INTO {table} (employee_id, change_timestamp, session_id)
+        SELECT CONCAT('E', MOD(n, 50)), NOW() - INTERVAL n MINUTE, CONCAT('EXPLAIN_', n) FROM {sequence} WHERE n < %s"""
+}
+_SEED_QUERIES["bf_inspection_sessions"] = _SEED_QUERIES["od_inspection_sessions"]
+_SEED_QUERIES["bf_predictions"] = _SEED_QUERIES["od_predictions"]
+_SEED_QUERIES["bigface_threshold_history"] = _SEED_QUERIES["od_threshold_history"]
+
+
+class _QueryCapture:
+    """Connection stand-in that records the statements a DatabaseManager method would run"""
+
+    def __init__(self):
+        self.statements = []
+
+    def is_connected(self):
+        return True
+
+    def cursor(self, *args, **kwargs):
+        return self
+
+    def execute(self, query, params=()):
+        self.statements.append((query, list(params)))
+
+    def fetchall(self):
+        return []
+
+    def fetchone(self):
+        return None
+
+    def close(self):
+        pass
+
+
+def _capture_report_queries():
+    """Build the report statements exactly as DatabaseManager issues them"""
+    from datetime import datetime, timedelta
+    from database import DatabaseManager
+
+    class CapturingManager(DatabaseManager):
+        def __init__(self, capture):
+            super().__init__()
+            self._capture = capture
+
+        @property
+        def connection(self):
+            return self._capture
+
+    capture = _QueryCapture()
+    manager = CapturingManager(capture)
+    end_date = datetime.now().strftime("%Y-%m-%d")
+    start_date = (datetime.now() - timedelta(days=7)).strftime("%Y-%m-%d")
+
+    checks = [
+        ("sessions page", lambda: manager.get_inspection_sessions_page(
+            start_date=start_date, end_date=end_date)),
+        ("sessions page, roller filter", lambda: manager.get_inspection_sessions_page(
+            roller_type="RT-6300", start_date=start_date, end_date=end_date)),
+        ("sessions page, next page", lambda: manager.get_inspection_sessions_page(
+            model_type="OD", start_date=start_date, end_date=end_date,
+            after_key=(datetime.now() - timedelta(days=3), "OD", 500000))),
+        ("session summary", lambda: manager.get_inspection_session_summary(
+            start_date=start_date, end_date=end_date)),
+        ("get_inspection_sessions", lambda: manager.get_inspection_sessions(
+            start_date=start_date, end_date=end_date, limit=100)),
+        ("threshold history", lambda: manager.get_threshold_history(
+            "OD", start_date=start_date, end_date=end_date)),
+        ("threshold history, employee", lambda: manager.get_threshold_history(
+            "BIGFACE", start_date=start_date, end_date=end_date, employee_id="E7")),
+    ]
+
+    queries = []
+    for name, build in checks:
+        del capture.statements[:]
+        build()
+        queries.extend((name, query, params) for query, params in capture.statements)
+    return queries
+
+
+def check_index_usage(rows=1000000, keep=False):
+    """
+    Seed scratch copies of the report tables and EXPLAIN the report queries.
+
+    Each table is copied with CREATE TABLE ... LIKE (so it carries the
+    migrated indexes), filled with ``rows`` synthetic rows, and every
+    statement the report methods build is EXPLAINed against the copies.
+    A statement fails the check if any table access is a full scan or uses
+    no key.
+
+    Args:
+        rows: Rows to seed per table (max 1,000,000)
+        keep: Keep the seeded copies for manual inspection
+
+    Returns:
+        bool: True if every query uses an index
+    """
+    rows = min(int(rows), 1000000)
+    bootstrap_schema()
+    try:
+        return _explain_seeded_copies(rows, keep)
+    except Error as e:
+        print(f"❌ EXPLAIN check failed: {e}")
+        return False
+
+
+def _explain_seeded_copies(rows, keep):
+    table_pattern = re.compile(r"\b(" + "|".join(EXPLAIN_TABLES) + r")\b")
+    ok = True
+
+    with db_pool.connection() as connection:
+        cursor = connection.cursor()
+        try:
+            for table in EXPLAIN_TABLES:
+                if not _table_exists(cursor, table):
+                    print(f"❌ {table} does not exist - run python db_migrations.py --force first")
+                    return False
+                scratch = EXPLAIN_PREFIX + table
+                started = time.perf_counter()
+                cursor.execute(f"DROP TABLE IF EXISTS {scratch}")
+                cursor.execute(f"CREATE TABLE {scratch} LIKE {table}")
+                cursor.execute(_SEED_QUERIES[table].format(table=scratch, sequence=_SEQUENCE), (rows,))
+                cursor.execute(f"ANALYZE TABLE {scratch}")
+                cursor.fetchall()
+                print(f"📊 Seeded {scratch} with {rows} rows in {time.perf_counter() - started:.1f}s")
+
+            explain_cursor = connection.cursor(dictionary=True)
+            for name, query, params in _capture_report_queries():
+                scratch_query = table_pattern.sub(lambda match: EXPLAIN_PREFIX + match.group(1), query)
+                explain_cursor.execute("EXPLAIN " + scratch_query, params)
+                plan = explain_cursor.fetchall()
+                scans = [row for row in plan
+                         if row.get('table') and not str(row['table']).startswith('<')
+                         and (row.get('type') == 'ALL' or not row.get('key'))]
+                status = "✅" if not scans else "❌"
+                ok = ok and not scans
+                print(f"{status} {name}")
+                for row in plan:
+                    print(f"     {str(row.get('table')):<30} type={str(row.get('type')):<8} "
+                          f"key={str(row.get('key')):<24} rows={row.get('rows')}")
+            explain_cursor.close()
+        finally:
+            if not keep:
+                for table in EXPLAIN_TABLES:
+                    cursor.execute(f"DROP TABLE IF EXISTS {EXPLAIN_PREFIX + table}")
+            cursor.close()
+
+    print("✅ All report queries use an index" if ok else "❌ Some report queries scan a full table")
+    return ok
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Create the WelVision schema and apply migrations")
+    parser.add_argument("--force", action="store_true", help="Run the table DDL even if the schema is current")
+    parser.add_argument("--explain-check", action="store_true",
+                        help="Seed scratch tables and verify the report queries use indexes")
+    parser.add_argument("--rows", type=int, default=1000000, help="Rows per seeded table (max 1,000,000)")
+    parser.add_argument("--keep", action="store_true", help="Keep the seeded scratch tables")
+    args = parser.parse_args()
+
+    if args.explain_check:
+        sys.exit(0 if check_index_usage(args.rows, args.keep) else 1)
+
+    success, message, seconds = bootstrap_schema(force=args.force)
+    sys.exit(0 if success else 1)
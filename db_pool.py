@@ -0,0 +1,295 @@
+"""
+MySQL Connection Pool for WelVision
+Thread-safe bounded pool shared by DatabaseManager, PasswordManager and the loggers
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import mysql.connector
+from mysql.connector import Error
+
+from config import (DB_CONFIG, DB_POOL_SIZE, DB_POOL_ACQUIRE_TIMEOUT, DB_POOL_HEALTH_CHECK_INTERVAL,
+                    DB_POOL_RETRY_BACKOFF, DB_POOL_RETRY_BACKOFF_MAX)
+
+
+class PoolError(Error):
+    """Raised when no connection can be checked out (pool exhausted or database down)"""
+
+
+class PooledConnection:
+    """
+    Proxy for a MySQL connection checked out from a ConnectionPool.
+
+    Behaves like the underlying connection, except that ``close()`` returns
+    it to the pool and ``is_connected()`` only pings the server when the
+    connection has not been verified within the pool's health-check interval.
+    """
+
+    def __init__(self, pool, raw, last_checked):
+        self._pool = pool
+        self._raw = raw
+        self._last_checked = last_checked
+        self._released = False
+        self._broken = False
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def is_connected(self):
+        """Cheap health check: ping at most once per health-check interval"""
+        if self._released or self._broken:
+            return False
+        now = time.monotonic()
+        if now - self._last_checked < self._pool.health_check_interval:
+            return True
+        if self._pool._ping(self._raw):
+            self._last_checked = now
+            return True
+        self._broken = True
+        return False
+
+    def close(self):
+        """Return the connection to the pool"""
+        self._pool.release(self)
+
+
+class _ThreadCheckout:
+    """Holds a thread's connection and returns it to the pool when the thread exits"""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __del__(self):
+        try:
+            self.connection.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe MySQL connection pool.
+
+    - At most ``size`` connections exist; ``acquire`` waits up to
+      ``acquire_timeout`` for one to be returned.
+    - Idle connections are pinged on checkout only if they have not been
+      used for ``health_check_interval`` seconds; dead ones are replaced.
+    - After a failed connect, new connection attempts fail fast until an
+      exponentially growing backoff (``retry_backoff`` .. ``retry_backoff_max``)
+      has passed, so a database outage does not stall every caller.
+    - ``thread_connection`` gives each thread its own connection, so UI and
+      logging threads never share a socket.
+    """
+
+    def __init__(self, size=DB_POOL_SIZE, acquire_timeout=DB_POOL_ACQUIRE_TIMEOUT,
+                 health_check_interval=DB_POOL_HEALTH_CHECK_INTERVAL, retry_backoff=DB_POOL_RETRY_BACKOFF,
+                 retry_backoff_max=DB_POOL_RETRY_BACKOFF_MAX, autocommit=True, **connect_options):
+        self.size = size
+        self.acquire_timeout = acquire_timeout
+        self.health_check_interval = health_check_interval
+        self.retry_backoff = retry_backoff
+        self.retry_backoff_max = retry_backoff_max
+        self.autocommit = autocommit
+        self.connect_options = connect_options or {
+            'host': DB_CONFIG['HOST'],
+            'port': DB_CONFIG['PORT'],
+            'database': DB_CONFIG['DATABASE'],
+            'user': DB_CONFIG['USER'],
+            'password': DB_CONFIG['PASSWORD']
+        }
+
+        self._idle = deque()  # (raw connection, last verified monotonic time)
+        self._in_use = 0
+        self._cond = threading.Condition()
+        self._local = threading.local()
+
+        self._next_attempt = 0.0
+        self._current_backoff = retry_backoff
+
+        self._stats = {'opened': 0, 'checkouts': 0, 'waits': 0, 'pings': 0,
+                       'health_failures': 0, 'connect_failures': 0}
+
+    def _open(self):
+        """Open a new server connection, honouring the reconnect backoff"""
+        now = time.monotonic()
+        if now < self._next_attempt:
+            raise PoolError(f"Database unavailable, next reconnect attempt in {self._next_attempt - now:.1f}s")
+        try:
+            raw = mysql.connector.connect(autocommit=self.autocommit, **self.connect_options)
+        except Error:
+            with self._cond:
+                self._stats['connect_failures'] += 1
+                self._next_attempt = time.monotonic() + self._current_backoff
+                self._current_backoff = min(self.retry_backoff_max, self._current_backoff * 2)
+            raise
+        with self._cond:
+            self._stats['opened'] += 1
+            self._current_backoff = self.retry_backoff
+            self._next_attempt = 0.0
+        return raw
+
+    def _ping(self, raw):
+        """Round-trip health check"""
+        self._stats['pings'] += 1
+        try:
+            raw.ping(reconnect=False)
+            return True
+        except Exception:
+            self._stats['health_failures'] += 1
+            return False
+
+    @staticmethod
+    def _discard(raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def acquire(self, timeout=None, autocommit=None):
+        """
+        Check out a connection.
+
+        Args:
+            timeout: Seconds to wait when the pool is exhausted (default: acquire_timeout)
+            autocommit: Override the pool's autocommit for this checkout
+
+        Returns:
+            PooledConnection: call ``close()`` to return it
+
+        Raises:
+            PoolError: If the pool stays exhausted or the database is unreachable
+        """
+        timeout = self.acquire_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        raw, last_checked = None, 0.0
+
+        with self._cond:
+            while True:
+                if self._idle:
+                    raw, last_checked = self._idle.pop()
+                    break
+                if self._in_use < self.size:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolError(f"No database connection available (pool size {self.size})")
+                self._stats['waits'] += 1
+                self._cond.wait(remaining)
+            self._in_use += 1
+            self._stats['checkouts'] += 1
+
+        try:
+            now = time.monotonic()
+            if raw is not None and now - last_checked >= self.health_check_interval:
+                if self._ping(raw):
+                    last_checked = now
+                else:
+                    self._discard(raw)
+                    raw = None
+            if raw is None:
+                raw = self._open()
+                last_checked = time.monotonic()
+            if autocommit is not None and autocommit != self.autocommit:
+                raw.autocommit = autocommit
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+        return PooledConnection(self, raw, last_checked)
+
+    def release(self, connection):
+        """Return a checked-out connection to the pool"""
+        if connection._released:
+            return
+        connection._released = True
+        raw = connection._raw
+
+        if connection._broken:
+            self._discard(raw)
+            raw = None
+        else:
+            try:
+                # Leave no open transaction or unread result for the next user
+                if raw.unread_result:
+                    raw.consume_results()
+                if raw.in_transaction:
+                    raw.rollback()
+                if raw.autocommit != self.autocommit:
+                    raw.autocommit = self.autocommit
+            except Exception:
+                self._discard(raw)
+                raw = None
+
+        with self._cond:
+            self._in_use -= 1
+            if raw is not None:
+                self._idle.append((raw, connection._last_checked))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout=None, autocommit=None):
+        """Context manager: check out a connection and always return it"""
+        connection = self.acquire(timeout, autocommit)
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+    def current_thread_connection(self):
+        """Return the calling thread's checked-out connection, or None"""
+        checkout = getattr(self._local, 'checkout', None)
+        if checkout is None or checkout.connection._released:
+            return None
+        return checkout.connection
+
+    def thread_connection(self):
+        """
+        Return the calling thread's connection, checking one out if needed.
+
+        The connection stays with the thread until ``release_thread_connection``
+        or until the thread exits. A connection that failed its health check
+        is replaced.
+        """
+        connection = self.current_thread_connection()
+        if connection is not None and not connection._broken:
+            return connection
+        if connection is not None:
+            connection.close()
+        connection = self.acquire()
+        self._local.checkout = _ThreadCheckout(connection)
+        return connection
+
+    def release_thread_connection(self):
+        """Return the calling thread's connection to the pool"""
+        checkout = getattr(self._local, 'checkout', None)
+        if checkout is not None:
+            self._local.checkout = None
+            checkout.connection.close()
+
+    def close_all(self):
+        """Close idle connections (checked-out ones close when returned)"""
+        with self._cond:
+            while self._idle:
+                raw, _ = self._idle.pop()
+                self._discard(raw)
+
+    def get_stats(self):
+        """
+        Get pool statistics.
+
+        Returns:
+            dict: size, in_use, idle and checkout/ping/failure counters
+        """
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update(size=self.size, in_use=self._in_use, idle=len(self._idle))
+        return stats
+
+
+# Global pool instance
+db_pool = ConnectionPool()
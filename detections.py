@@ -0,0 +1,274 @@
+"""
+Vectorized Detection Post-Processing for WelVision
+One NumPy array per frame for boxes, confidences and class ids, with vectorized
+statistics and drawing on the downscaled display image
+
+Run ``python detections.py`` for a micro-benchmark at 0, 10 and 100 detections.
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+
+def normalize_class_name(class_name):
+    """Class name as the loggers count it ('Spherical Mark' -> 'spherical_mark')"""
+    return str(class_name).lower().replace(' ', '_')
+
+
+class Detections:
+    """
+    The detections of one frame.
+
+    ``boxes`` is an (N, 4) float32 array of x1, y1, x2, y2 in frame pixels,
+    ``confidences`` (N,) float32 and ``class_ids`` (N,) int32, all in model
+    output order (highest confidence first); ``names`` maps class id to
+    class name. Statistics (max confidence, per-class counts, best detection
+    per class) are computed on the arrays without building Python objects.
+
+    For existing callers a Detections also behaves as the list of
+    ``{'class_name', 'confidence', 'box'}`` dicts it replaces: ``len``,
+    truth value and iteration work, and ``to_predictions`` builds the list
+    (once, with one ``tolist`` per column) when a dict view is needed.
+    """
+
+    __slots__ = ("boxes", "confidences", "class_ids", "names", "_predictions")
+
+    def __init__(self, boxes, confidences, class_ids, names):
+        self.boxes = boxes
+        self.confidences = confidences
+        self.class_ids = class_ids
+        self.names = names
+        self._predictions = None
+
+    @classmethod
+    def from_arrays(cls, boxes, confidences, class_ids, names):
+        """Wrap per-frame arrays (copied only if dtype or layout differ)"""
+        return cls(np.asarray(boxes, dtype=np.float32).reshape(-1, 4),
+                   np.asarray(confidences, dtype=np.float32).reshape(-1),
+                   np.asarray(class_ids, dtype=np.int32).reshape(-1),
+                   names)
+
+    @classmethod
+    def empty(cls, names=None):
+        return cls.from_arrays(np.empty((0, 4)), np.empty(0), np.empty(0), names or {})
+
+    @classmethod
+    def from_results(cls, result):
+        """
+        Convert one ultralytics Results object.
+
+        Each tensor crosses to NumPy once per frame instead of once per box.
+        """
+        boxes = result.boxes
+        if boxes is None or len(boxes) == 0:
+            return cls.empty(result.names)
+        return cls.from_arrays(boxes.xyxy.cpu().numpy(), boxes.conf.cpu().numpy(),
+                               boxes.cls.cpu().numpy(), result.names)
+
+    @classmethod
+    def from_predictions(cls, predictions):
+        """Build from prediction dicts (stub detectors, logged records); a missing box becomes zeros"""
+        if isinstance(predictions, Detections):
+            return predictions
+        if not predictions:
+            return cls.empty()
+        ids = {}
+        class_ids = [ids.setdefault(prediction.get('class_name', ''), len(ids)) for prediction in predictions]
+        return cls.from_arrays([prediction.get('box') or (0, 0, 0, 0) for prediction in predictions],
+                               [prediction.get('confidence', 0.0) for prediction in predictions],
+                               class_ids, {class_id: name for name, class_id in ids.items()})
+
+    def __len__(self):
+        return len(self.confidences)
+
+    def __iter__(self):
+        return iter(self.to_predictions())
+
+    def __repr__(self):
+        return f"Detections({len(self)} boxes, max confidence {self.max_confidence():.3f})"
+
+    def class_name(self, class_id):
+        return self.names.get(class_id, str(class_id))
+
+    def to_predictions(self):
+        """The prediction dicts used by the loggers (built once and cached)"""
+        if self._predictions is None:
+            names = [self.class_name(class_id) for class_id in self.class_ids.tolist()]
+            confidences = np.round(self.confidences.astype(np.float64), 3).tolist()
+            boxes = self.boxes.astype(np.int32).tolist()
+            self._predictions = [{'class_name': name, 'confidence': confidence, 'box': box}
+                                 for name, confidence, box in zip(names, confidences, boxes)]
+        return self._predictions
+
+    def select(self, index):
+        """Subset by boolean mask or index array"""
+        return Detections(self.boxes[index], self.confidences[index], self.class_ids[index], self.names)
+
+    def filter(self, min_confidence):
+        """Detections at or above ``min_confidence``"""
+        keep = self.confidences >= min_confidence
+        return self if keep.all() else self.select(keep)
+
+    def max_confidence(self):
+        return float(self.confidences.max()) if len(self) else 0.0
+
+    def confidence_stats(self):
+        """
+        Returns:
+            tuple: (avg, max, min) confidence rounded to 3 decimals, zeros if empty
+        """
+        if not len(self):
+            return 0.0, 0.0, 0.0
+        confidences = self.confidences.astype(np.float64)
+        return (round(float(confidences.mean()), 3), round(float(confidences.max()), 3),
+                round(float(confidences.min()), 3))
+
+    def class_counts(self):
+        """Detections per normalized class name, e.g. {'roller': 1, 'rust': 2}"""
+        counts = {}
+        if not len(self):
+            return counts
+        class_ids, per_class = np.unique(self.class_ids, return_counts=True)
+        for class_id, count in zip(class_ids.tolist(), per_class.tolist()):
+            name = normalize_class_name(self.class_name(class_id))
+            counts[name] = counts.get(name, 0) + count
+        return counts
+
+    def best_per_class(self):
+        """The most confident detection of each class, highest confidence first"""
+        if len(self) < 2:
+            return self
+        order = np.lexsort((-self.confidences, self.class_ids))
+        sorted_ids = self.class_ids[order]
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = sorted_ids[1:] != sorted_ids[:-1]
+        best = order[first]
+        return self.select(best[np.argsort(-self.confidences[best], kind='stable')])
+
+
+def as_detections(predictions):
+    """Detections for a Detections, a list of prediction dicts or None"""
+    if predictions is None:
+        return Detections.empty()
+    return Detections.from_predictions(predictions)
+
+
+def draw_detections(image, detections, threshold, label, scale=1.0, offset=(0, 0), font_scale=0.6, thickness=2):
+    """
+    Draw boxes and confidences onto ``image`` in place.
+
+    Box coordinates are scaled and offset in one array operation, so the
+    image can be the downscaled display frame instead of a full-resolution
+    copy. ``scale`` is one factor or an (x, y) pair for a display that does
+    not keep the frame's aspect ratio. Boxes at or above ``threshold`` are
+    green, others red.
+
+    Returns:
+        The image
+    """
+    detections = as_detections(detections)
+    if not len(detections):
+        return image
+    scale = np.asarray(scale, dtype=np.float64)
+    if scale.ndim:
+        scale = np.tile(scale, 2)  # (x, y) -> (x1, y1, x2, y2)
+    boxes = np.rint(detections.boxes * scale).astype(np.int32)
+    boxes[:, [0, 2]] += offset[0]
+    boxes[:, [1, 3]] += offset[1]
+    accepted = (detections.confidences >= threshold).tolist()
+    for (x1, y1, x2, y2), confidence, ok in zip(boxes.tolist(), detections.confidences.tolist(), accepted):
+        color = (0, 255, 0) if ok else (0, 0, 255)
+        cv2.rectangle(image, (x1, y1), (x2, y2), color, thickness)
+        cv2.putText(image, f"{label}: {confidence:.2f}", (x1, max(y1 - 5, 10)),
+                    cv2.FONT_HERSHEY_SIMPLEX, font_scale, color, thickness)
+    return image
+
+
+# ---------------------------------------------------------------------------
+# Micro-benchmark: per-box Python post-processing vs. the vectorized path
+# ---------------------------------------------------------------------------
+
+def _synthetic_output(count, frame_shape, seed=0):
+    """Random boxes, confidences and class ids shaped like one frame's model output"""
+    rng = np.random.default_rng(seed)
+    height, width = frame_shape[:2]
+    x1 = rng.uniform(0, width - 100, count)
+    y1 = rng.uniform(0, height - 100, count)
+    boxes = np.column_stack((x1, y1, x1 + rng.uniform(20, 100, count), y1 + rng.uniform(20, 100, count)))
+    confidences = np.sort(rng.uniform(0.25, 1.0, count))[::-1]
+    return boxes.astype(np.float32), confidences.astype(np.float32), rng.integers(0, 7, count).astype(np.float32)
+
+
+def _per_box_path(frame, boxes, confidences, class_ids, names, threshold, display_size):
+    """The former preview loop: per-box scalar pulls, Python statistics, drawing on a full-resolution copy"""
+    predictions = []
+    for index in range(len(confidences)):
+        predictions.append({'class_name': names[int(class_ids[index])],
+                            'confidence': float(confidences[index]),
+                            'box': [int(value) for value in boxes[index]]})
+    max_confidence = max((prediction['confidence'] for prediction in predictions), default=0)
+    counts = {}
+    for prediction in predictions:
+        counts[prediction['class_name']] = counts.get(prediction['class_name'], 0) + 1
+    annotated = frame.copy()
+    for prediction in predictions:
+        x1, y1, x2, y2 = prediction['box']
+        color = (0, 255, 0) if prediction['confidence'] >= threshold else (0, 0, 255)
+        cv2.rectangle(annotated, (x1, y1), (x2, y2), color, 2)
+        cv2.putText(annotated, f"OD: {prediction['confidence']:.2f}", (x1, y1 - 10),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+    return cv2.resize(annotated, display_size), max_confidence, counts
+
+
+def _vectorized_path(frame, boxes, confidences, class_ids, names, threshold, display_size):
+    """One array per column, vectorized statistics, drawing on the downscaled image"""
+    detections = Detections.from_arrays(boxes, confidences, class_ids, names)
+    max_confidence = detections.max_confidence()
+    counts = detections.class_counts()
+    display = cv2.resize(frame, display_size)
+    draw_detections(display, detections, threshold, "OD", scale=display_size[0] / frame.shape[1],
+                    font_scale=0.4, thickness=1)
+    return display, max_confidence, counts
+
+
+def run_benchmark(counts=(0, 10, 100), repeats=200, frame_shape=None, display_size=(380, 285)):
+    """
+    Time both post-processing paths per frame.
+
+    Args:
+        counts: Detections per frame to test
+        repeats: Frames timed per case
+        frame_shape: Camera frame shape (default: config FRAME_SHAPE)
+        display_size: (width, height) of the display image
+
+    Returns:
+        dict: {count: {'per_box_us', 'vectorized_us', 'speedup'}}
+    """
+    from config import FRAME_SHAPE
+
+    frame_shape = frame_shape or FRAME_SHAPE
+    frame = np.random.default_rng(1).integers(0, 255, frame_shape, dtype=np.uint8)
+    names = {0: 'roller', 1: 'rust', 2: 'dent', 3: 'spherical_mark', 4: 'damage', 5: 'flat_line', 6: 'damage_on_end'}
+    report = {}
+    for count in counts:
+        boxes, confidences, class_ids = _synthetic_output(count, frame_shape)
+        timings = {}
+        for name, path in (('per_box_us', _per_box_path), ('vectorized_us', _vectorized_path)):
+            path(frame, boxes, confidences, class_ids, names, 0.5, display_size)  # warm-up
+            start = time.perf_counter()
+            for _ in range(repeats):
+                path(frame, boxes, confidences, class_ids, names, 0.5, display_size)
+            timings[name] = round((time.perf_counter() - start) / repeats * 1e6, 1)
+        timings['speedup'] = round(timings['per_box_us'] / timings['vectorized_us'], 2) if timings['vectorized_us'] else 0.0
+        report[count] = timings
+    return report
+
+
+if __name__ == "__main__":
+    results = run_benchmark()
+    print("📊 Detection post-processing per frame (extract + stats + annotate for display):")
+    for count, timings in results.items():
+        print(f"   {count:>3} detections: per-box {timings['per_box_us']:9.1f} µs | "
+              f"vectorized {timings['vectorized_us']:9.1f} µs | {timings['speedup']:.2f}x")
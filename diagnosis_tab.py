@@ -11,11 +11,19 @@ from datetime import datetime, timedelta
 import pandas as pd
 from PIL import ImageGrab
 from database import db_manager
+from inspection_rollup import inspection_rollup
+from ui_executor import ui_executor
+from config import DIAGNOSIS_PAGE_SIZE, DIAGNOSIS_PREFETCH_AT
 
 class DiagnosisTab:
     def __init__(self, parent, app_instance):
         self.parent = parent
         self.app = app_instance
+        self.app.diagnosis_data = []
+        # Keyset paging state for the report table
+        self._filters = {}
+        self._next_key = None
+        self._page_loading = False
         self.setup_tab()
     
     def setup_tab(self):
@@ -27,9 +35,6 @@ class DiagnosisTab:
                               font=("Arial", 16, "bold"), fg="white", bg="#0a2158")
         title_label.pack(pady=(0, 10))
 
-        # Load session data from database
-        self.load_diagnosis_data()
-
         # Top section: Component Type selection and report generation controls
         top_frame = tk.Frame(diagnosis_container, bg="#0a2158")
         top_frame.pack(fill=tk.X, pady=5)
@@ -60,7 +65,9 @@ class DiagnosisTab:
 
         table_scrollbar = ttk.Scrollbar(self.app.table_frame, orient="vertical", command=self.app.report_tree.yview)
         table_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.app.report_tree.configure(yscrollcommand=table_scrollbar.set)
+        # Rows are fetched page by page as the table is scrolled towards the end
+        self.app.report_tree.configure(
+            yscrollcommand=lambda first, last: self._on_table_scroll(table_scrollbar, first, last))
 
         # Enable mouse wheel scrolling for the table
         def _on_mousewheel(event):
@@ -171,12 +178,22 @@ class DiagnosisTab:
         # Initial report generation - do this after app is fully initialized
         self.after_idle_generate_report()
 
-    def load_component_types(self):
-        """Load component types from database and populate the combobox"""
+    def load_component_types(self, on_loaded=None):
+        """
+        Load component types from database and populate the combobox.
+
+        The types are read on a ui_executor worker; ``on_loaded()`` runs on
+        the Tk thread once the combobox is filled.
+        """
+        # Bind change event to trigger filtering
+        self.app.type_combobox.bind('<<ComboboxSelected>>', self.on_filter_change)
+        ui_executor.submit(db_manager.get_roller_types, key="diagnosis.component_types",
+                           on_success=lambda component_types: self._show_component_types(component_types, on_loaded),
+                           on_error=self._on_component_types_error)
+
+    def _show_component_types(self, component_types, on_loaded=None):
+        """Populate the component type combobox with the fetched types"""
         try:
-            # Get component types from database
-            component_types = db_manager.get_roller_types()
-            
             if component_types:
                 # Add "All" option and update combobox values
                 all_types = ["All"] + component_types
@@ -190,17 +207,19 @@ class DiagnosisTab:
                 self.app.type_combobox['values'] = fallback_types
                 self.app.type_var.set("All")
                 print("⚠️ No component types found in database, using fallback values")
-                
-            # Bind change event to trigger filtering
-            self.app.type_combobox.bind('<<ComboboxSelected>>', self.on_filter_change)
             
         except Exception as e:
-            # Fallback to hardcoded values if there's an error
-            fallback_types = ["All", "RT-6300", "RT-320 18X"]
-            self.app.type_combobox['values'] = fallback_types
-            self.app.type_var.set("All")
-            self.app.type_combobox.bind('<<ComboboxSelected>>', self.on_filter_change)
-            print(f"❌ Error loading component types from database: {e}")
+            self._on_component_types_error(e)
+            return
+        if on_loaded:
+            on_loaded()
+
+    def _on_component_types_error(self, e):
+        # Fallback to hardcoded values if there's an error
+        fallback_types = ["All", "RT-6300", "RT-320 18X"]
+        self.app.type_combobox['values'] = fallback_types
+        self.app.type_var.set("All")
+        print(f"❌ Error loading component types from database: {e}")
 
     def on_filter_change(self, event=None):
         """Handle filter change events to automatically update the report"""
@@ -220,95 +239,136 @@ class DiagnosisTab:
 
     def refresh_component_types(self):
         """Refresh the component type dropdown (call this when roller types are updated)"""
-        try:
-            print("🔄 Refreshing component type dropdown...")
-            # Store current selection to restore it if possible
-            current_selection = self.app.type_var.get()
-            
-            # Reload component types from database
-            self.load_component_types()
-            
-            # Try to restore previous selection if it still exists
-            if current_selection:
-                component_types = list(self.app.type_combobox['values'])
-                if current_selection in component_types:
-                    self.app.type_var.set(current_selection)
-                else:
-                    # If previous selection no longer exists, set to "All"
-                    self.app.type_var.set("All")
-                    
-            # Refresh the report with new filter options
-            self.generate_report()
-            
-            print("✅ Component type dropdown refreshed successfully")
-        except Exception as e:
-            print(f"❌ Error refreshing component type dropdown: {e}")
-
-    def load_diagnosis_data(self):
-        """Load diagnosis data from database inspection sessions"""
-        try:
-            # Get session data from database with extended date range
-            sessions = db_manager.get_inspection_sessions(limit=500)
-            
-            if sessions:
-                # Convert database sessions to diagnosis data format
-                self.app.diagnosis_data = []
-                for session in sessions:
-                    # Map database session to diagnosis format
-                    component_type = session.get('roller_type', 'Unknown')
-                    employee_id = session.get('employee_id', 'N/A')
-                    model_type = session.get('model_type', 'N/A')
-                    total_inspected = session.get('total_inspected', 0)
-                    total_accepted = session.get('total_accepted', 0)
-                    total_rejected = session.get('total_rejected', 0)
-                    
-                    # Calculate acceptance rate
-                    if total_inspected > 0:
-                        acceptance_rate = f"{(total_accepted / total_inspected * 100):.1f}%"
-                    else:
-                        acceptance_rate = "0.0%"
-                    
-                    # Format dates
-                    start_time = session.get('start_time', datetime.now())
-                    if isinstance(start_time, datetime):
-                        report_date = start_time.strftime("%Y-%m-%d")
-                        report_time = start_time.strftime("%H:%M:%S")
-                    elif isinstance(start_time, str):
-                        try:
-                            parsed_time = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
-                            report_date = parsed_time.strftime("%Y-%m-%d")
-                            report_time = parsed_time.strftime("%H:%M:%S")
-                        except:
-                            report_date = start_time[:10] if len(start_time) >= 10 else "N/A"
-                            report_time = start_time[11:19] if len(start_time) >= 19 else "N/A"
+        print("🔄 Refreshing component type dropdown...")
+        # Store current selection to restore it if possible
+        current_selection = self.app.type_var.get()
+        
+        def restore_selection():
+            try:
+                # Try to restore previous selection if it still exists
+                if current_selection:
+                    component_types = list(self.app.type_combobox['values'])
+                    if current_selection in component_types:
+                        self.app.type_var.set(current_selection)
                     else:
-                        report_date = "N/A"
-                        report_time = "N/A"
-                    
-                    diagnosis_record = (
-                        component_type,        # Component Type
-                        employee_id,          # Employee ID  
-                        model_type,           # Model Type
-                        total_inspected,      # Total Inspected
-                        total_accepted,       # Total Accepted
-                        total_rejected,       # Total Rejected
-                        acceptance_rate,      # Acceptance Rate
-                        report_date,          # Report Date
-                        report_time           # Report Time
-                    )
-                    
-                    self.app.diagnosis_data.append(diagnosis_record)
+                        # If previous selection no longer exists, set to "All"
+                        self.app.type_var.set("All")
                 
-                print(f"✅ Loaded {len(self.app.diagnosis_data)} inspection session records from database")
-            else:
-                # Initialize empty data if no sessions found
-                self.app.diagnosis_data = []
-                print("⚠️ No inspection session data found in database")
+                # Refresh the report with new filter options
+                self.generate_report()
                 
-        except Exception as e:
-            print(f"❌ Error loading data from database: {e}")
-            # Initialize empty data on error
+                print("✅ Component type dropdown refreshed successfully")
+            except Exception as e:
+                print(f"❌ Error refreshing component type dropdown: {e}")
+        
+        # Reload component types from database
+        self.load_component_types(on_loaded=restore_selection)
+
+    def _current_filters(self):
+        """Translate the filter widgets into get_inspection_sessions_page arguments"""
+        component_type = self.app.type_var.get()
+        report_type = self.app.report_type_var.get()
+        return {
+            'model_type': {"BigFace": "BF", "OD": "OD"}.get(report_type),
+            'roller_type': component_type if component_type and component_type != "All" else None,
+            'start_date': self.app.from_date_var.get() or None,
+            'end_date': self.app.to_date_var.get() or None
+        }
+
+    @staticmethod
+    def _format_session_row(session):
+        """Convert a database session into a report table row"""
+        total_inspected = session.get('total_inspected') or 0
+        total_accepted = session.get('total_accepted') or 0
+        total_rejected = session.get('total_rejected') or 0
+
+        # Calculate acceptance rate
+        if total_inspected > 0:
+            acceptance_rate = f"{(total_accepted / total_inspected * 100):.1f}%"
+        else:
+            acceptance_rate = "0.0%"
+
+        # Format dates
+        start_time = session.get('start_time')
+        if isinstance(start_time, datetime):
+            report_date = start_time.strftime("%Y-%m-%d")
+            report_time = start_time.strftime("%H:%M:%S")
+        else:
+            report_date = "N/A"
+            report_time = "N/A"
+
+        return (
+            session.get('roller_type') or 'Unknown',   # Component Type
+            session.get('employee_id') or 'N/A',       # Employee ID
+            session.get('model_type', 'N/A'),          # Model Type
+            total_inspected,                           # Total Inspected
+            total_accepted,                            # Total Accepted
+            total_rejected,                            # Total Rejected
+            acceptance_rate,                           # Acceptance Rate
+            report_date,                               # Report Date
+            report_time                                # Report Time
+        )
+
+    def load_diagnosis_data(self, reset=False):
+        """
+        Load the next page of inspection sessions into the report table.
+
+        The page is read on a ui_executor worker and appended when it
+        arrives; a reset supersedes any page still in flight.
+
+        Args:
+            reset: Start again from the newest session with the current filters
+        """
+        if reset:
+            self._filters = self._current_filters()
+            self._next_key = None
             self.app.diagnosis_data = []
+            self.app.report_tree.delete(*self.app.report_tree.get_children())
+        elif self._next_key is None:
+            self._page_loading = False
+            return
+
+        self._page_loading = True
+        ui_executor.submit(db_manager.get_inspection_sessions_page, key="diagnosis.page",
+                           after_key=self._next_key, page_size=DIAGNOSIS_PAGE_SIZE, **self._filters,
+                           on_success=self._show_sessions_page, on_error=self._on_sessions_page_error)
+
+    def _show_sessions_page(self, page):
+        """Append a fetched page of sessions to the report table"""
+        sessions, self._next_key = page
+        self._page_loading = False
+
+        for session in sessions:
+            record = self._format_session_row(session)
+            self.app.diagnosis_data.append(record)
+            self.app.report_tree.insert("", "end", values=record)
+
+        print(f"✅ Loaded {len(sessions)} inspection sessions "
+              f"({len(self.app.diagnosis_data)} shown{', more available' if self._next_key else ''})")
+
+    def _on_sessions_page_error(self, e):
+        print(f"❌ Error loading data from database: {e}")
+        self._next_key = None
+        self._page_loading = False
+
+    def _on_table_scroll(self, scrollbar, first, last):
+        """Keep the scrollbar in sync and fetch the next page near the end of the table"""
+        scrollbar.set(first, last)
+        if self._next_key is not None and not self._page_loading and float(last) >= DIAGNOSIS_PREFETCH_AT:
+            self._page_loading = True
+            self.parent.after_idle(self.load_diagnosis_data)
+
+    @staticmethod
+    def _iter_filtered_sessions(filters):
+        """Yield every session matching the report filters, page by page"""
+        after_key = None
+        while True:
+            sessions, after_key = db_manager.get_inspection_sessions_page(
+                after_key=after_key, page_size=DIAGNOSIS_PAGE_SIZE, **filters)
+            for session in sessions:
+                yield session
+            if after_key is None:
+                return
 
     def after_idle_generate_report(self):
         """Generate initial report after app is fully initialized"""
@@ -319,87 +379,49 @@ class DiagnosisTab:
             print(f"Could not generate initial report: {e}")
 
     def generate_report(self):
-        """Generate report based on selected criteria with comprehensive filtering"""
+        """Generate report based on selected criteria; filtering and paging run in the database"""
         try:
-            # Clear existing data
-            for item in self.app.report_tree.get_children():
-                self.app.report_tree.delete(item)
-            
-            # Get filter criteria
-            component_type = self.app.type_var.get()
-            report_type = self.app.report_type_var.get()
-            from_date = self.app.from_date_var.get()
-            to_date = self.app.to_date_var.get()
-            
-            print(f"🔍 Filtering with: Component={component_type}, Report={report_type}, From={from_date}, To={to_date}")
-            
-            # Filter data based on criteria
-            filtered_data = []
-            for item in self.app.diagnosis_data:
-                # Skip if data doesn't have enough columns
-                if len(item) < 9:
-                    continue
-                
-                # Extract data fields
-                item_component_type = item[0]  # Component Type
-                item_model_type = item[2]      # Model Type
-                item_report_date = item[7]     # Report Date 
-                
-                # Filter by component type (if not "All" or empty)
-                if component_type and component_type != "All":
-                    if item_component_type != component_type:
-                        continue
-                
-                # Filter by report type/model type (if not "Overall" or "All")
-                if report_type and report_type not in ["Overall", "All"]:
-                    if report_type == "BigFace" and item_model_type != "BF":
-                        continue
-                    elif report_type == "OD" and item_model_type != "OD":
-                        continue
-                
-                # Filter by date range
-                try:
-                    if from_date and to_date:
-                        if from_date <= item_report_date <= to_date:
-                            filtered_data.append(item)
-                    else:
-                        # No date filter, include all
-                        filtered_data.append(item)
-                except Exception as date_error:
-                    print(f"Date comparison error: {date_error}")
-                    # Include item if date comparison fails
-                    filtered_data.append(item)
-            
-            # Populate table with filtered data
-            for item in filtered_data:
-                self.app.report_tree.insert("", "end", values=item)
-            
-            # Update charts
-            self.update_charts(filtered_data)
-            
-            print(f"✅ Generated report: {len(filtered_data)} records found")
-            
-            # Show status message
-            status_msg = f"Found {len(filtered_data)} records"
-            if component_type and component_type != "All":
-                status_msg += f" for {component_type}"
-            if report_type and report_type not in ["Overall", "All"]:
-                status_msg += f" ({report_type} model)"
-            print(status_msg)
-            
+            # Restart paging with the new filters and load the first page
+            self.load_diagnosis_data(reset=True)
+            filters = self._filters
+
+            print(f"🔍 Filtering with: Component={filters['roller_type'] or 'All'}, "
+                  f"Model={filters['model_type'] or 'Overall'}, From={filters['start_date']}, To={filters['end_date']}")
+
+            # Chart data comes from the daily rollups, not the session rows
+            ui_executor.submit(self._fetch_chart_data, filters, key="diagnosis.charts",
+                               on_success=self._show_chart_data)
+
         except Exception as e:
             error_msg = f"Failed to generate report: {str(e)}"
             print(f"❌ {error_msg}")
             messagebox.showerror("Error", error_msg)
 
-    def update_charts(self, data):
-        """Update charts with filtered data showing roller inspection statistics and defect analysis"""
+    @staticmethod
+    def _fetch_chart_data(filters):
+        """Read chart totals and defect counts for the filters (runs on a worker thread)"""
+        return inspection_rollup.get_totals(**filters), inspection_rollup.get_defect_counts(**filters)
+
+    def _show_chart_data(self, chart_data):
+        totals, defect_data = chart_data
+        self.update_charts(totals, defect_data)
+        print(f"✅ Generated report: {totals['total_inspected']} rollers inspected "
+              f"in {totals['sessions']} sessions")
+
+    def update_charts(self, totals, defect_data):
+        """
+        Update charts with roller inspection statistics and defect analysis.
+
+        Args:
+            totals: Filtered totals from inspection_rollup.get_totals
+            defect_data: {defect label: roller count} from inspection_rollup.get_defect_counts
+        """
         try:
             # Clear canvases
             self.app.status_canvas.delete("all")
             self.app.defect_canvas.delete("all")
             
-            if not data:
+            if not totals['total_inspected']:
                 # Show "No data" message
                 self.app.status_canvas.create_text(200, 150, text="No data to display", 
                                                   font=("Arial", 14), fill="gray")
@@ -408,15 +430,15 @@ class DiagnosisTab:
                 return
             
             # Calculate overall statistics
-            total_inspected = sum(item[3] for item in data)  # Total Inspected
-            total_accepted = sum(item[4] for item in data)   # Total Accepted
-            total_rejected = sum(item[5] for item in data)   # Total Rejected
+            total_inspected = totals['total_inspected']
+            total_accepted = totals['total_accepted']
+            total_rejected = totals['total_rejected']
             
             # Left Chart - Status Chart (Total Inspected, Accepted, Rejected)
             self.draw_status_chart(total_inspected, total_accepted, total_rejected)
             
             # Right Chart - Defect-wise Chart
-            self.draw_defect_chart(data)
+            self.draw_defect_chart(defect_data)
             
         except Exception as e:
             print(f"❌ Error updating charts: {e}")
@@ -502,7 +524,7 @@ class DiagnosisTab:
         canvas.create_text(x3 + bar_width//2, chart_bottom - rejected_height - 10, 
                           text=str(total_rejected), font=("Arial", 11, "bold"), fill="darkred")
     
-    def draw_defect_chart(self, data):
+    def draw_defect_chart(self, defect_data):
         """Draw the right chart showing defect-wise count of rollers"""
         canvas = self.app.defect_canvas
         canvas_width = canvas.winfo_width() if canvas.winfo_width() > 1 else 400
@@ -513,9 +535,6 @@ class DiagnosisTab:
                           font=("Arial", 14, "bold"), fill="black")
         
         try:
-            # Get defect-wise data from database based on current filters
-            defect_data = self.get_defect_wise_data()
-            
             if not defect_data:
                 canvas.create_text(canvas_width//2, canvas_height//2, text="No defect data available", 
                                   font=("Arial", 12), fill="gray")
@@ -576,37 +595,6 @@ class DiagnosisTab:
             canvas.create_text(canvas_width//2, canvas_height//2, text="Error loading defect data", 
                               font=("Arial", 12), fill="red")
     
-    def get_defect_wise_data(self):
-        """Get defect-wise data based on current filters"""
-        try:
-            # Get current filter values
-            component_type = self.app.type_var.get()
-            report_type = self.app.report_type_var.get()
-            from_date = self.app.from_date_var.get()
-            to_date = self.app.to_date_var.get()
-            
-            # Get defect data from database
-            defect_data = db_manager.get_defect_wise_statistics(
-                component_type=component_type if component_type != "All" else None,
-                report_type=report_type if report_type != "Overall" else None,
-                from_date=from_date,
-                to_date=to_date
-            )
-            
-            return defect_data
-            
-        except Exception as e:
-            print(f"❌ Error getting defect-wise data: {e}")
-            # Return sample defect data for demonstration
-            return {
-                "Rust": 15,
-                "Damage": 8,
-                "High Head": 5,
-                "Down Head": 3,
-                "Surface Defect": 12,
-                "Dimension Error": 7
-            }
-
     def save_chart(self):
         """Save chart as image"""
         try:
@@ -624,98 +612,87 @@ class DiagnosisTab:
             messagebox.showerror("Error", f"Failed to save chart: {str(e)}")
 
     def export_to_excel(self):
-        """Export current data to Excel"""
-        try:
-            # Get current data from table
-            data = []
-            for item in self.app.report_tree.get_children():
-                values = self.app.report_tree.item(item, 'values')
-                data.append(values)
-            
-            if not data:
-                messagebox.showwarning("No Data", "No data to export.")
-                return
-            
-            # Create DataFrame
-            columns = ["Component Type", "Employee ID", "Model Type", "Total Inspected", 
-                      "Total Accepted", "Total Rejected", "Acceptance Rate", "Report Date", "Report Time"]
-            df = pd.DataFrame(data, columns=columns)
-            
-            # Generate filename
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"diagnosis_report_{timestamp}.xlsx"
-            
-            # Save to Excel
-            df.to_excel(filename, index=False)
-            
-            messagebox.showinfo("Export Successful", f"Data exported to {filename}")
-            print(f"✅ Data exported to {filename}")
-            
-        except Exception as e:
-            error_msg = f"Error exporting to Excel: {e}"
-            print(f"❌ {error_msg}")
-            messagebox.showerror("Export Error", error_msg)
+        """Export current data to Excel (read and written on a ui_executor worker)"""
+        ui_executor.submit(self._write_excel_export, dict(self._filters), key="diagnosis.export",
+                           on_success=self._on_excel_exported, on_error=self._on_excel_export_error)
+
+    @classmethod
+    def _write_excel_export(cls, filters):
+        """
+        Write every session matching ``filters`` to an Excel file (worker thread).
+
+        Returns:
+            str: File name, or None if no session matched
+        """
+        # Export every matching session, not only the pages loaded into the table
+        data = [cls._format_session_row(session) for session in cls._iter_filtered_sessions(filters)]
+        if not data:
+            return None
+        
+        # Create DataFrame
+        columns = ["Component Type", "Employee ID", "Model Type", "Total Inspected", 
+                  "Total Accepted", "Total Rejected", "Acceptance Rate", "Report Date", "Report Time"]
+        df = pd.DataFrame(data, columns=columns)
+        
+        # Generate filename
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"diagnosis_report_{timestamp}.xlsx"
+        
+        # Save to Excel
+        df.to_excel(filename, index=False)
+        return filename
+
+    def _on_excel_exported(self, filename):
+        if filename is None:
+            messagebox.showwarning("No Data", "No data to export.")
+            return
+        messagebox.showinfo("Export Successful", f"Data exported to {filename}")
+        print(f"✅ Data exported to {filename}")
+
+    def _on_excel_export_error(self, e):
+        error_msg = f"Error exporting to Excel: {e}"
+        print(f"❌ {error_msg}")
+        messagebox.showerror("Export Error", error_msg)
     
     def generate_monthly_report(self):
-        """Generate and display monthly report based on current filters"""
+        """Generate and display monthly report based on current filters (aggregated on a ui_executor worker)"""
+        # Get current filter settings
+        settings = {
+            'component_type': self.app.type_var.get(),
+            'report_type': self.app.report_type_var.get(),
+            'from_date': self.app.from_date_var.get(),
+            'to_date': self.app.to_date_var.get()
+        }
+        
+        # Aggregate in the database over every matching session
+        ui_executor.submit(db_manager.get_inspection_session_summary, key="diagnosis.monthly_report",
+                           on_success=lambda summary: self._show_monthly_report(summary, **settings),
+                           on_error=self._on_monthly_report_error, **self._current_filters())
+
+    def _show_monthly_report(self, summary, component_type, report_type, from_date, to_date):
+        """Show the monthly report for the fetched per-model totals"""
         try:
-            # Get current filter settings
-            component_type = self.app.type_var.get()
-            report_type = self.app.report_type_var.get()
-            from_date = self.app.from_date_var.get()
-            to_date = self.app.to_date_var.get()
-            
-            # Calculate filtered data statistics
-            filtered_data = []
-            for item in self.app.diagnosis_data:
-                if len(item) < 9:
-                    continue
-                
-                item_component_type = item[0]
-                item_model_type = item[2]
-                item_report_date = item[7]
-                
-                # Apply same filters as generate_report
-                if component_type and component_type != "All":
-                    if item_component_type != component_type:
-                        continue
-                
-                if report_type and report_type not in ["Overall", "All"]:
-                    if report_type == "BigFace" and item_model_type != "BF":
-                        continue
-                    elif report_type == "OD" and item_model_type != "OD":
-                        continue
-                
-                try:
-                    if from_date and to_date:
-                        if from_date <= item_report_date <= to_date:
-                            filtered_data.append(item)
-                    else:
-                        filtered_data.append(item)
-                except:
-                    filtered_data.append(item)
+            od_totals = summary.get('OD', {'sessions': 0, 'total_inspected': 0, 'total_accepted': 0})
+            bf_totals = summary.get('BF', {'sessions': 0, 'total_inspected': 0, 'total_accepted': 0})
             
-            if not filtered_data:
+            total_sessions = sum(totals['sessions'] for totals in summary.values())
+            if not total_sessions:
                 messagebox.showwarning("No Data", "No data available for the selected filters to generate monthly report.")
                 return
             
             # Calculate statistics
-            total_sessions = len(filtered_data)
-            total_inspected = sum(item[3] for item in filtered_data)
-            total_accepted = sum(item[4] for item in filtered_data)
-            total_rejected = sum(item[5] for item in filtered_data)
+            total_inspected = sum(totals['total_inspected'] for totals in summary.values())
+            total_accepted = sum(totals['total_accepted'] for totals in summary.values())
+            total_rejected = sum(totals['total_rejected'] for totals in summary.values())
             success_rate = (total_accepted / total_inspected * 100) if total_inspected > 0 else 0
             
             # Model breakdown
-            od_sessions = [item for item in filtered_data if item[2] == 'OD']
-            bf_sessions = [item for item in filtered_data if item[2] == 'BF']
-            
-            od_inspected = sum(item[3] for item in od_sessions) if od_sessions else 0
-            od_accepted = sum(item[4] for item in od_sessions) if od_sessions else 0
+            od_inspected = od_totals['total_inspected']
+            od_accepted = od_totals['total_accepted']
             od_rate = (od_accepted / od_inspected * 100) if od_inspected > 0 else 0
             
-            bf_inspected = sum(item[3] for item in bf_sessions) if bf_sessions else 0
-            bf_accepted = sum(item[4] for item in bf_sessions) if bf_sessions else 0
+            bf_inspected = bf_totals['total_inspected']
+            bf_accepted = bf_totals['total_accepted']
             bf_rate = (bf_accepted / bf_inspected * 100) if bf_inspected > 0 else 0
             
             # Show comprehensive monthly report
@@ -734,8 +711,8 @@ OVERALL STATISTICS:
 • Overall Success Rate: {success_rate:.1f}%
 
 MODEL BREAKDOWN:
-• OD Model: {len(od_sessions)} sessions, {od_inspected} inspected, {od_accepted} accepted ({od_rate:.1f}%)
-• BF Model: {len(bf_sessions)} sessions, {bf_inspected} inspected, {bf_accepted} accepted ({bf_rate:.1f}%)
+• OD Model: {od_totals['sessions']} sessions, {od_inspected} inspected, {od_accepted} accepted ({od_rate:.1f}%)
+• BF Model: {bf_totals['sessions']} sessions, {bf_inspected} inspected, {bf_accepted} accepted ({bf_rate:.1f}%)
 
 QUALITY ASSESSMENT:
 • Quality Status: {'Excellent' if success_rate >= 95 else 'Good' if success_rate >= 85 else 'Needs Improvement' if success_rate >= 70 else 'Critical'}
@@ -749,22 +726,22 @@ Report Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"""
             print(f"📊 Monthly report generated with {total_sessions} sessions, {total_inspected} rollers inspected")
             
         except Exception as e:
-            error_msg = f"Failed to generate monthly report: {str(e)}"
-            print(f"❌ {error_msg}")
-            messagebox.showerror("Error", error_msg)
+            self._on_monthly_report_error(e)
+
+    def _on_monthly_report_error(self, e):
+        error_msg = f"Failed to generate monthly report: {str(e)}"
+        print(f"❌ {error_msg}")
+        messagebox.showerror("Error", error_msg)
 
     def load_inspection_sessions(self):
         """Method called from main app to load initial data"""
-        self.load_diagnosis_data()
-        # Refresh the report after loading new data
-        if hasattr(self, 'generate_report'):
-            self.generate_report()
+        # Reloads the first page and the totals with the current filters
+        self.generate_report()
     
     def process_action(self):
         """Handle Process button action"""
         try:
             # Refresh data and regenerate report
-            self.load_diagnosis_data()
             self.generate_report()
             messagebox.showinfo("Process", "Data processed and report updated successfully!")
             print("✅ Data processed successfully")
@@ -789,7 +766,6 @@ Report Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"""
         """Handle Diagnosis button action - refresh current page"""
         try:
             # Refresh diagnosis page data
-            self.load_diagnosis_data()
             self.generate_report()
             messagebox.showinfo("Diagnosis", "Diagnosis page refreshed successfully!")
             print("🔄 Diagnosis page refreshed")
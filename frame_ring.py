@@ -0,0 +1,316 @@
+"""
+Shared-memory Frame Ring for WelVision Camera Streams
+Lock-free multi-slot frame buffer shared between camera, inference and display workers
+"""
+
+import time
+from multiprocessing import RawArray, RawValue
+
+import numpy as np
+
+from config import FRAME_SHAPE, FRAME_RING_SLOTS
+
+
+class FrameRing:
+    """
+    Single-producer frame ring backed by shared memory.
+
+    Each slot carries a sequence number that follows the seqlock protocol:
+    the writer marks the slot odd while copying and even once the frame is
+    complete, then publishes the slot as the latest one. Readers never take
+    a lock; they copy the latest slot and retry if its sequence changed while
+    they were reading. The writer therefore never waits for a reader, and a
+    reader always gets the newest complete frame.
+
+    The ring can be passed to ``multiprocessing.Process`` arguments like the
+    ``Array`` objects it replaces.
+    """
+
+    def __init__(self, frame_shape=FRAME_SHAPE, slots=FRAME_RING_SLOTS):
+        if slots < 2:
+            raise ValueError("FrameRing needs at least 2 slots")
+
+        self.frame_shape = tuple(frame_shape)
+        self.slots = slots
+        self.frame_size = int(np.prod(self.frame_shape))
+
+        # Frame storage and per-slot metadata
+        self._buffer = RawArray('B', self.frame_size * slots)
+        self._slot_seq = RawArray('q', slots)
+        self._slot_time = RawArray('d', slots)
+
+        # Published state: index of newest complete slot and frame counter
+        self._latest_slot = RawValue('i', -1)
+        self._frame_count = RawValue('q', 0)
+
+        self._frames = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_frames'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+    def _slot_views(self):
+        """Return (lazily created) numpy views over every slot"""
+        if self._frames is None:
+            flat = np.frombuffer(self._buffer, dtype=np.uint8)
+            self._frames = flat.reshape((self.slots,) + self.frame_shape)
+        return self._frames
+
+    def write(self, frame, timestamp=None):
+        """
+        Publish a new frame without waiting for readers.
+
+        Args:
+            frame: numpy array matching ``frame_shape`` (uint8)
+            timestamp: Optional capture time (``time.perf_counter()`` clock)
+
+        Returns:
+            int: Sequence number of the published frame
+        """
+        frames = self._slot_views()
+        slot = (self._latest_slot.value + 1) % self.slots
+
+        seq = self._slot_seq[slot]
+        self._slot_seq[slot] = seq + 1          # odd: slot is being written
+        np.copyto(frames[slot], frame, casting='unsafe')
+        self._slot_time[slot] = time.perf_counter() if timestamp is None else timestamp
+        self._slot_seq[slot] = seq + 2          # even: slot is complete
+
+        self._frame_count.value += 1
+        self._latest_slot.value = slot
+        return self._frame_count.value
+
+    def read_latest(self, out=None, max_retries=5):
+        """
+        Copy the newest complete frame.
+
+        Args:
+            out: Optional preallocated array to copy into
+            max_retries: Attempts before giving up when the writer keeps
+                overtaking the reader
+
+        Returns:
+            tuple: (generation: int, frame: ndarray or None, timestamp: float)
+                generation is 0 and frame is None until the first write.
+        """
+        frames = self._slot_views()
+        if out is None:
+            out = np.empty(self.frame_shape, dtype=np.uint8)
+
+        for _ in range(max_retries):
+            slot = self._latest_slot.value
+            if slot < 0:
+                return 0, None, 0.0
+
+            generation = self._frame_count.value
+            seq_before = self._slot_seq[slot]
+            if seq_before & 1:
+                continue
+
+            np.copyto(out, frames[slot])
+            timestamp = self._slot_time[slot]
+
+            if self._slot_seq[slot] == seq_before:
+                return generation, out, timestamp
+
+        return 0, None, 0.0
+
+    def view_latest(self):
+        """
+        Borrow the newest complete slot without copying.
+
+        The view stays valid only while ``is_current`` returns True for the
+        returned token; callers that derive data from it (e.g. a resized
+        display image) must check ``is_current`` afterwards and drop the
+        result if the writer recycled the slot in the meantime.
+
+        Returns:
+            tuple: (generation, view or None, token)
+        """
+        frames = self._slot_views()
+        slot = self._latest_slot.value
+        if slot < 0:
+            return 0, None, None
+
+        generation = self._frame_count.value
+        seq = self._slot_seq[slot]
+        if seq & 1:
+            return 0, None, None
+
+        return generation, frames[slot], (slot, seq)
+
+    def is_current(self, token):
+        """Check that a slot borrowed with ``view_latest`` was not overwritten"""
+        if token is None:
+            return False
+        slot, seq = token
+        return self._slot_seq[slot] == seq
+
+    def latest_generation(self):
+        """Return the number of frames published so far (0 = none yet)"""
+        return self._frame_count.value
+
+    def latest_timestamp(self):
+        """Return the capture timestamp of the newest frame (0.0 = none yet)"""
+        slot = self._latest_slot.value
+        return self._slot_time[slot] if slot >= 0 else 0.0
+
+
+# ---------------------------------------------------------------------------
+# Benchmark: FrameRing vs. the previous single Array + Lock per stream
+# ---------------------------------------------------------------------------
+
+STALL_THRESHOLD_MS = 1.0
+
+
+class _LockedFrameBuffer:
+    """Previous design: one shared Array guarded by a Lock (benchmark baseline)"""
+
+    def __init__(self, frame_shape=FRAME_SHAPE):
+        from multiprocessing import Array, Lock
+
+        self.frame_shape = tuple(frame_shape)
+        self.array = Array('B', int(np.prod(self.frame_shape)))
+        self.lock = Lock()
+        self.timestamp = RawValue('d', 0.0)
+        self.generation = RawValue('q', 0)
+
+    def write(self, frame):
+        wait_start = time.perf_counter()
+        with self.lock:
+            waited = time.perf_counter() - wait_start
+            np_frame = np.frombuffer(self.array.get_obj(), dtype=np.uint8).reshape(self.frame_shape)
+            np.copyto(np_frame, frame)
+            self.timestamp.value = time.perf_counter()
+            self.generation.value += 1
+        return waited
+
+    def read_latest(self, out):
+        with self.lock:
+            np_frame = np.frombuffer(self.array.get_obj(), dtype=np.uint8).reshape(self.frame_shape)
+            np.copyto(out, np_frame)
+            return self.generation.value, out, self.timestamp.value
+
+
+def _percentile(values, pct):
+    """Return the pct-th percentile of a list (nearest rank)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def _benchmark_writer(buffer, fps, duration, results):
+    """Camera-like producer: publish one frame per tick and record stalls"""
+    frame = np.random.randint(0, 255, buffer.frame_shape, dtype=np.uint8)
+    interval = 1.0 / fps
+    write_times = []
+    waits = []
+    next_tick = time.perf_counter()
+    end_time = next_tick + duration
+
+    while next_tick < end_time:
+        start = time.perf_counter()
+        if isinstance(buffer, FrameRing):
+            buffer.write(frame)
+            waited = 0.0
+        else:
+            waited = buffer.write(frame)
+        write_times.append((time.perf_counter() - start) * 1000)
+        waits.append(waited * 1000)
+
+        next_tick += interval
+        delay = next_tick - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+    results['writes'] = len(write_times)
+    results['write_p50_ms'] = _percentile(write_times, 50)
+    results['write_p99_ms'] = _percentile(write_times, 99)
+    results['stalls'] = sum(1 for w in waits if w > STALL_THRESHOLD_MS)
+    results['max_wait_ms'] = max(waits) if waits else 0.0
+
+
+def _benchmark_mode(buffer, fps, duration):
+    """Run one writer process against a display-rate reader in this process"""
+    from multiprocessing import Manager, Process
+
+    with Manager() as manager:
+        results = manager.dict()
+        writer = Process(target=_benchmark_writer, args=(buffer, fps, duration, results))
+        writer.start()
+
+        out = np.empty(buffer.frame_shape, dtype=np.uint8)
+        read_times = []
+        frame_ages = []
+        last_generation = 0
+
+        while writer.is_alive():
+            start = time.perf_counter()
+            generation, frame, timestamp = buffer.read_latest(out)
+            done = time.perf_counter()
+            if frame is not None and generation != last_generation:
+                read_times.append((done - start) * 1000)
+                frame_ages.append((done - timestamp) * 1000)
+                last_generation = generation
+            time.sleep(0.002)
+
+        writer.join()
+        summary = dict(results)
+
+    summary['reads'] = len(read_times)
+    summary['read_p50_ms'] = _percentile(read_times, 50)
+    summary['read_p99_ms'] = _percentile(read_times, 99)
+    summary['age_p50_ms'] = _percentile(frame_ages, 50)
+    summary['age_p99_ms'] = _percentile(frame_ages, 99)
+    return summary
+
+
+def run_benchmark(duration=5.0, fps_values=(30, 60), slots=FRAME_RING_SLOTS):
+    """
+    Compare writer stalls and reader latency of FrameRing vs. Array + Lock.
+
+    Args:
+        duration: Seconds to run each configuration
+        fps_values: Producer frame rates to test
+        slots: Number of ring slots
+
+    Returns:
+        list: One result dict per (mode, fps) combination
+    """
+    report = []
+    for fps in fps_values:
+        for mode in ("array+lock", "frame_ring"):
+            if mode == "frame_ring":
+                buffer = FrameRing(FRAME_SHAPE, slots)
+            else:
+                buffer = _LockedFrameBuffer(FRAME_SHAPE)
+
+            summary = _benchmark_mode(buffer, fps, duration)
+            summary['mode'] = mode
+            summary['fps'] = fps
+            report.append(summary)
+
+            print(f"📊 {mode:<11} @ {fps} fps | writes {summary.get('writes', 0):5d} | "
+                  f"write p50/p99 {summary.get('write_p50_ms', 0):.2f}/{summary.get('write_p99_ms', 0):.2f} ms | "
+                  f"stalls>{STALL_THRESHOLD_MS:.0f}ms {summary.get('stalls', 0):4d} "
+                  f"(max wait {summary.get('max_wait_ms', 0):.2f} ms) | "
+                  f"read p50/p99 {summary['read_p50_ms']:.2f}/{summary['read_p99_ms']:.2f} ms | "
+                  f"frame age p50/p99 {summary['age_p50_ms']:.2f}/{summary['age_p99_ms']:.2f} ms")
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the shared-memory frame ring")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per configuration")
+    parser.add_argument("--slots", type=int, default=FRAME_RING_SLOTS, help="Ring slots per camera")
+    args = parser.parse_args()
+
+    run_benchmark(duration=args.duration, slots=args.slots)
@@ -0,0 +1,375 @@
+"""
+Frame Sources for WelVision
+One interface for live cameras and their stand-ins (image directory, video
+file, synthetic generator), so the inspection pipeline runs the same with or
+without camera hardware
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+from camera_grabber import GrabbedFrame, LatestFrameGrabber
+from camera_registry import camera_registry
+from config import CAMERA_INDEX, FRAME_SHAPE, FRAME_SOURCES, STANDIN_SOURCE_FPS
+from pipeline import FramePacer
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+class FrameSource:
+    """
+    Base class of everything the capture stages read frames from.
+
+    ``start()`` opens the source (False if it is unavailable), ``read()``
+    returns a GrabbedFrame (frame, seq, time.monotonic() capture time) or
+    None, ``stop()`` releases it. A finite source sets ``ended`` once it is
+    exhausted. Consumers call ``record_decision`` when they act on a frame;
+    ``get_stats`` reports frames delivered and the frame age at decision time.
+
+    Stand-in sources produce frames in ``_next_frame`` and are paced to
+    ``fps`` (0 = as fast as the consumer reads), so a pipeline can be driven
+    at line speed or a multiple of it without cameras.
+    """
+
+    live = False
+
+    def __init__(self, name, fps=STANDIN_SOURCE_FPS, stats_window=300):
+        self.name = name
+        self.fps = fps
+        self.running = False
+        self.ended = False
+        self.delivered = 0
+        self._pacer = FramePacer(fps)
+        self._ages = deque(maxlen=stats_window)
+        self._ages_lock = threading.Lock()
+
+    def start(self):
+        """Open the source; returns False if it is unavailable"""
+        self.running = True
+        self.ended = False
+        return True
+
+    def stop(self):
+        """Release the source"""
+        self.running = False
+
+    def isOpened(self):
+        return self.running and not self.ended
+
+    def _next_frame(self):
+        """Produce the next frame, or None at the end of a finite source"""
+        raise NotImplementedError
+
+    def read(self, timeout=1.0):
+        """
+        Get the next frame.
+
+        Returns:
+            GrabbedFrame or None when the source is stopped or exhausted
+        """
+        if not self.isOpened():
+            return None
+        self._pacer.wait()
+        frame = self._next_frame()
+        if frame is None:
+            self.ended = True
+            return None
+        self.delivered += 1
+        return GrabbedFrame(frame, self.delivered, time.monotonic())
+
+    def record_decision(self, capture_time, decided_at=None):
+        """Record the age of a frame at the moment a decision was made from it"""
+        decided_at = time.monotonic() if decided_at is None else decided_at
+        with self._ages_lock:
+            self._ages.append((decided_at - capture_time) * 1000)
+
+    def get_stats(self):
+        """
+        Get source statistics.
+
+        Returns:
+            dict: frames delivered and frame age at decision time (ms, p50/p99/max)
+        """
+        with self._ages_lock:
+            ages = sorted(self._ages)
+
+        def pct(p):
+            if not ages:
+                return 0.0
+            return round(ages[min(len(ages) - 1, int(p / 100.0 * len(ages)))], 1)
+
+        return {
+            'delivered': self.delivered,
+            'decisions': len(ages),
+            'age_p50_ms': pct(50),
+            'age_p99_ms': pct(99),
+            'age_max_ms': round(ages[-1], 1) if ages else 0.0
+        }
+
+    def print_report(self):
+        """Print frames delivered and the frame age at decision time"""
+        stats = self.get_stats()
+        drained = f", {stats['drained']} drained unread" if 'drained' in stats else ""
+        print(f"📊 {self.name} source: {stats['delivered']} frames{drained} | frame age at decision "
+              f"p50 {stats['age_p50_ms']:.1f} ms, p99 {stats['age_p99_ms']:.1f} ms, max {stats['age_max_ms']:.1f} ms")
+
+
+class CameraSource(FrameSource):
+    """
+    Live camera, claimed in the camera registry and read through a LatestFrameGrabber.
+
+    ``frame_shape`` and ``fps`` are requested from the driver. Reads are
+    paced by the camera itself and capped at ``fps`` for cameras that
+    deliver faster.
+    """
+
+    live = True
+
+    def __init__(self, index, name, frame_shape=None, fps=None):
+        super().__init__(name, fps=fps or 0)
+        self.index = index
+        self.frame_shape = frame_shape
+        self.requested_fps = fps
+        self.grabber = None
+        self._grabber_stats = {}
+
+    def start(self):
+        if not camera_registry.acquire(self.index, self.name):
+            return False
+        capture = cv2.VideoCapture(self.index)
+        if not capture.isOpened():
+            print(f"❌ Error: Camera {self.index} ({self.name}) failed to open!")
+            capture.release()
+            camera_registry.release(self.index, self.name)
+            camera_registry.mark_failed(self.index, "Failed to open camera")
+            return False
+
+        if self.frame_shape is not None:
+            capture.set(cv2.CAP_PROP_FRAME_WIDTH, self.frame_shape[1])
+            capture.set(cv2.CAP_PROP_FRAME_HEIGHT, self.frame_shape[0])
+        if self.requested_fps:
+            capture.set(cv2.CAP_PROP_FPS, self.requested_fps)
+
+        # Keep the driver buffer drained so consumers always get the newest frame
+        self.grabber = LatestFrameGrabber(capture, self.name)
+        self.grabber.start()
+        return super().start()
+
+    def stop(self):
+        super().stop()
+        if self.grabber is not None:
+            self.grabber.stop()
+            self._grabber_stats = self.grabber.get_stats()
+            self.grabber = None
+            camera_registry.release(self.index, self.name)
+
+    def isOpened(self):
+        return self.grabber is not None and self.grabber.isOpened()
+
+    def read(self, timeout=1.0):
+        if self.grabber is None:
+            return None
+        self._pacer.wait()
+        grabbed = self.grabber.read(timeout)
+        if grabbed is None:
+            self.ended = self.grabber.ended
+            return None
+        self.delivered += 1
+        return grabbed
+
+    def get_stats(self):
+        stats = super().get_stats()
+        stats.update(self.grabber.get_stats() if self.grabber is not None else self._grabber_stats)
+        return stats
+
+
+class ImageDirectorySource(FrameSource):
+    """Images of a directory in name order, optionally looping"""
+
+    def __init__(self, path, name, fps=STANDIN_SOURCE_FPS, loop=False):
+        super().__init__(name, fps)
+        self.path = path
+        self.loop = loop
+        self._files = []
+        self._position = 0
+
+    def start(self):
+        if not os.path.isdir(self.path):
+            print(f"❌ {self.name}: image directory {self.path} not found")
+            return False
+        self._files = [os.path.join(self.path, file_name) for file_name in sorted(os.listdir(self.path))
+                       if file_name.lower().endswith(IMAGE_EXTENSIONS)]
+        if not self._files:
+            print(f"❌ {self.name}: no images in {self.path}")
+            return False
+        self._position = 0
+        return super().start()
+
+    def _next_frame(self):
+        # At most one pass over the files, so a directory of unreadable images ends the source
+        for _ in range(len(self._files)):
+            if self._position >= len(self._files):
+                if not self.loop:
+                    return None
+                self._position = 0
+            file_path = self._files[self._position]
+            self._position += 1
+            frame = cv2.imread(file_path)
+            if frame is not None:
+                return frame
+        return None
+
+
+class VideoFileSource(FrameSource):
+    """
+    Frames of a video file, optionally looping.
+
+    Every frame is decoded in order (no grabber draining), so a replay
+    sees each recorded roller.
+    """
+
+    def __init__(self, path, name, fps=STANDIN_SOURCE_FPS, loop=False):
+        super().__init__(name, fps)
+        self.path = path
+        self.loop = loop
+        self.capture = None
+
+    def start(self):
+        self.capture = cv2.VideoCapture(self.path)
+        if not self.capture.isOpened():
+            print(f"❌ {self.name}: cannot open video {self.path}")
+            self.capture.release()
+            self.capture = None
+            return False
+        return super().start()
+
+    def stop(self):
+        super().stop()
+        if self.capture is not None:
+            self.capture.release()
+            self.capture = None
+
+    def _next_frame(self):
+        ret, frame = self.capture.read()
+        if not ret and self.loop:
+            self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.capture.read()
+        return frame if ret else None
+
+
+class SyntheticSource(FrameSource):
+    """
+    Generated frames of a bright roller moving across a dark belt.
+
+    A few frames are rendered up front and cycled, so generating costs a
+    copy per frame and the source can outrun any real camera.
+    """
+
+    def __init__(self, name, fps=STANDIN_SOURCE_FPS, frame_shape=FRAME_SHAPE, count=None, variants=8, seed=0):
+        """
+        Args:
+            name: Label for reports
+            fps: Frames per second (0 = as fast as the consumer reads)
+            frame_shape: (height, width, channels) of the frames
+            count: Frames before the source ends (None = endless)
+            variants: Distinct frames rendered up front
+        """
+        super().__init__(name, fps)
+        self.frame_shape = tuple(frame_shape)
+        self.count = count
+        self.variants = max(1, variants)
+        self.seed = seed
+        self._frames = []
+
+    def _render(self):
+        height, width = self.frame_shape[:2]
+        rng = np.random.default_rng(self.seed)
+        frames = []
+        for variant in range(self.variants):
+            frame = rng.integers(20, 50, size=self.frame_shape, dtype=np.uint8)
+            center = (int(width * (variant + 0.5) / self.variants), height // 2)
+            cv2.circle(frame, center, min(height, width) // 4, (200, 200, 200), -1)
+            frames.append(frame)
+        return frames
+
+    def start(self):
+        if not self._frames:
+            self._frames = self._render()
+        return super().start()
+
+    def _next_frame(self):
+        if self.count is not None and self.delivered >= self.count:
+            return None
+        return self._frames[self.delivered % self.variants].copy()
+
+
+def parse_source_spec(spec):
+    """
+    Split a source spec into (target, fps).
+
+    A trailing ``@<fps>`` sets the rate of a stand-in source, e.g.
+    ``synthetic@90`` (3x line speed) or ``/data/od_rollers@0`` (unpaced).
+    """
+    target, separator, rate = spec.rpartition('@')
+    if separator:
+        try:
+            return target, float(rate)
+        except ValueError:
+            pass
+    return spec, None
+
+
+def open_frame_source(spec, name, frame_shape=None, fps=None, loop=False):
+    """
+    Create a (not yet started) frame source from a spec.
+
+    Args:
+        spec: Camera index (int or ``camera:<index>``), ``synthetic`` or
+              ``synthetic:<width>x<height>``, an image directory or a video
+              file, optionally followed by ``@<fps>``
+        name: Label for reports and the camera registry
+        frame_shape: Resolution requested from a camera
+        fps: Camera fps to request / default rate of stand-in sources
+        loop: Restart image directories and videos at the end
+
+    Returns:
+        FrameSource
+    """
+    if isinstance(spec, int):
+        return CameraSource(spec, name, frame_shape, fps)
+
+    target, spec_fps = parse_source_spec(str(spec))
+    rate = spec_fps if spec_fps is not None else (fps if fps is not None else STANDIN_SOURCE_FPS)
+
+    if target.startswith('camera:'):
+        return CameraSource(int(target.split(':', 1)[1]), name, frame_shape, fps)
+    if target == 'synthetic' or target.startswith('synthetic:'):
+        shape = FRAME_SHAPE
+        if ':' in target:
+            width, height = (int(value) for value in target.split(':', 1)[1].lower().split('x'))
+            shape = (height, width, 3)
+        return SyntheticSource(name, rate, shape)
+    if os.path.isdir(target):
+        return ImageDirectorySource(target, name, rate, loop)
+    if os.path.isfile(target):
+        return VideoFileSource(target, name, rate, loop)
+    raise ValueError(f"Unknown frame source '{spec}'")
+
+
+def configured_source(camera_key, name, camera_index=None, frame_shape=None, fps=None):
+    """
+    Frame source of a station camera: the FRAME_SOURCES stand-in if one is
+    configured, otherwise the live camera (``camera_index`` or CAMERA_INDEX).
+    Stand-in files loop so a GUI session does not run dry.
+    """
+    spec = FRAME_SOURCES.get(camera_key)
+    if spec is None:
+        spec = CAMERA_INDEX[camera_key] if camera_index is None else camera_index
+    else:
+        print(f"🧪 {name}: using stand-in frame source '{spec}'")
+    return open_frame_source(spec, name, frame_shape, fps, loop=True)
@@ -0,0 +1,379 @@
+"""
+Inference Backends for WelVision
+Pluggable detectors (PyTorch via ultralytics, ONNX Runtime on CPU) that turn BGR frames into
+per-frame Detections consumed by the loggers, plus ONNX export and a side-by-side benchmark
+"""
+
+import ast
+import os
+import time
+
+import cv2
+import numpy as np
+
+from config import (INFERENCE_BACKEND, ONNX_EXPORT_IMGSZ, ONNX_INTRA_OP_THREADS, ONNX_INTER_OP_THREADS)
+from detections import Detections
+from inference_engine import load_recorded_frames
+
+
+def onnx_path_for(weights_path):
+    """Path of the ONNX export that belongs to a weights file (same folder, same stem)"""
+    return os.path.splitext(weights_path)[0] + ".onnx"
+
+
+def onnx_export_is_current(weights_path, onnx_path=None):
+    """
+    True if the ONNX export of a weights file exists and is not older than the weights.
+
+    An export older than its weights belongs to a previous upload under the
+    same name (or to an export that failed since) and must not be served.
+    """
+    onnx_path = onnx_path or onnx_path_for(weights_path)
+    try:
+        return os.path.getmtime(onnx_path) >= os.path.getmtime(weights_path)
+    except OSError:
+        return False
+
+
+def backend_source(weights_path, backend=INFERENCE_BACKEND):
+    """
+    The file ``load_backend`` loads for a weights file: its current ONNX
+    export under 'auto'/'onnxruntime', otherwise the weights themselves.
+    """
+    if backend in ("auto", "onnxruntime") and not weights_path.lower().endswith(".onnx"):
+        onnx_path = onnx_path_for(weights_path)
+        if onnx_export_is_current(weights_path, onnx_path):
+            return onnx_path
+    return weights_path
+
+
+class InferenceBackend:
+    """
+    A loaded detector.
+
+    ``predict`` takes a list of BGR frames and returns, per frame, a
+    detections.Detections (boxes in frame pixel coordinates, sorted by
+    confidence, highest first), which also iterates as the
+    ``{'class_name', 'confidence', 'box': [x1, y1, x2, y2]}`` dicts the
+    loggers use.
+    """
+
+    name = "base"
+
+    def __init__(self, weights_path):
+        self.weights_path = weights_path
+
+    @property
+    def weights_key(self):
+        """Identifies the weights; cameras with the same key can share a batch"""
+        return os.path.normcase(os.path.abspath(self.weights_path))
+
+    def configure_threads(self, num_threads):
+        """Give this backend ``num_threads`` CPU threads (default: nothing to configure)"""
+
+    def predict(self, frames, conf=0.25):
+        raise NotImplementedError
+
+    def __call__(self, frame, conf=0.25):
+        """Single-frame helper"""
+        return self.predict([frame], conf)[0]
+
+
+class TorchBackend(InferenceBackend):
+    """ultralytics YOLO on PyTorch CPU (the original inference path)"""
+
+    name = "torch"
+
+    def __init__(self, weights_path):
+        from ultralytics import YOLO
+
+        super().__init__(weights_path)
+        self.model = YOLO(weights_path)
+        self.model.to('cpu')
+        self.names = self.model.names
+
+    def configure_threads(self, num_threads):
+        try:
+            import torch
+            torch.set_num_threads(num_threads)
+        except Exception as e:
+            print(f"⚠️ Could not configure PyTorch threads: {e}")
+
+    def predict(self, frames, conf=0.25):
+        results = self.model(frames if len(frames) > 1 else frames[0], conf=conf, verbose=False)
+        return [Detections.from_results(result) for result in results]
+
+
+class OnnxRuntimeBackend(InferenceBackend):
+    """
+    YOLO detection model exported to ONNX, run with ONNX Runtime on CPU.
+
+    Pre- and post-processing follow ultralytics' predictor: letterbox with
+    grey (114) padding (minimal stride-aligned rectangle when the export has
+    dynamic height/width), class-aware NMS at IoU 0.7, at most 300 boxes,
+    boxes scaled back to the original frame. Thread counts are fixed per
+    session at load time.
+    """
+
+    name = "onnxruntime"
+
+    IOU_THRESHOLD = 0.7
+    MAX_DETECTIONS = 300
+    MAX_WH = 7680  # class offset for class-aware NMS, as in ultralytics
+
+    def __init__(self, onnx_path, intra_op_threads=ONNX_INTRA_OP_THREADS,
+                 inter_op_threads=ONNX_INTER_OP_THREADS, imgsz=ONNX_EXPORT_IMGSZ):
+        import onnxruntime as ort
+
+        super().__init__(onnx_path)
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+        if inter_op_threads:
+            options.inter_op_num_threads = inter_op_threads
+        self.session = ort.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.input_dtype = np.float16 if model_input.type == "tensor(float16)" else np.float32
+        batch, _, height, width = model_input.shape
+        self.fixed_batch = batch if isinstance(batch, int) else None
+        self.dynamic_size = not (isinstance(height, int) and isinstance(width, int))
+
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.names = ast.literal_eval(metadata["names"]) if "names" in metadata else {}
+        self.stride = int(ast.literal_eval(metadata.get("stride", "32")))
+        if self.dynamic_size:
+            size = ast.literal_eval(metadata["imgsz"]) if "imgsz" in metadata else imgsz
+            self.imgsz = tuple(size) if isinstance(size, (list, tuple)) else (size, size)
+        else:
+            self.imgsz = (height, width)
+
+    def _letterbox(self, frame):
+        """Resize and pad a frame to the model input; returns (image, gain, (pad_x, pad_y))"""
+        height, width = frame.shape[:2]
+        target_h, target_w = self.imgsz
+        gain = min(target_h / height, target_w / width)
+        new_w, new_h = int(round(width * gain)), int(round(height * gain))
+        pad_w, pad_h = target_w - new_w, target_h - new_h
+        if self.dynamic_size:
+            pad_w, pad_h = pad_w % self.stride, pad_h % self.stride
+        pad_w, pad_h = pad_w / 2, pad_h / 2
+
+        if (width, height) != (new_w, new_h):
+            frame = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+        top, bottom = int(round(pad_h - 0.1)), int(round(pad_h + 0.1))
+        left, right = int(round(pad_w - 0.1)), int(round(pad_w + 0.1))
+        image = cv2.copyMakeBorder(frame, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(114, 114, 114))
+        return image, gain, (left, top)
+
+    def _to_tensor(self, images):
+        """BGR HWC uint8 images -> RGB NCHW float in [0, 1]"""
+        batch = np.stack(images)[..., ::-1].transpose(0, 3, 1, 2)
+        return np.ascontiguousarray(batch, dtype=self.input_dtype) / self.input_dtype(255)
+
+    def _postprocess(self, output, conf, gain, pad, frame_shape):
+        """Decode one (4 + classes, anchors) output into Detections"""
+        output = output.T.astype(np.float32, copy=False)
+        scores = output[:, 4:]
+        class_ids = scores.argmax(axis=1)
+        confidences = scores[np.arange(len(scores)), class_ids]
+        keep = confidences >= conf
+        if not keep.any():
+            return Detections.empty(self.names)
+        xywh, class_ids, confidences = output[keep, :4], class_ids[keep], confidences[keep]
+
+        # Class-aware NMS on (x, y, w, h) boxes shifted apart per class
+        nms_boxes = np.column_stack((xywh[:, :2] - xywh[:, 2:] / 2 + (class_ids * self.MAX_WH)[:, None],
+                                     xywh[:, 2:]))
+        indices = cv2.dnn.NMSBoxes(nms_boxes.tolist(), confidences.tolist(), conf, self.IOU_THRESHOLD,
+                                   top_k=self.MAX_DETECTIONS)
+        indices = np.asarray(indices, dtype=int).reshape(-1)
+        if not len(indices):
+            return Detections.empty(self.names)
+        xywh, class_ids, confidences = xywh[indices], class_ids[indices], confidences[indices]
+
+        boxes = np.empty_like(xywh)
+        boxes[:, :2] = xywh[:, :2] - xywh[:, 2:] / 2
+        boxes[:, 2:] = xywh[:, :2] + xywh[:, 2:] / 2
+        boxes[:, [0, 2]] -= pad[0]
+        boxes[:, [1, 3]] -= pad[1]
+        boxes /= gain
+        boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, frame_shape[1])
+        boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, frame_shape[0])
+
+        return Detections.from_arrays(boxes, confidences, class_ids, self.names)
+
+    def predict(self, frames, conf=0.25):
+        letterboxed = [self._letterbox(frame) for frame in frames]
+
+        # One session run per batch when the export allows it and the shapes match
+        if self.fixed_batch not in (None, len(frames)) or len({image.shape for image, _, _ in letterboxed}) > 1:
+            groups = [[index] for index in range(len(frames))]
+        else:
+            groups = [list(range(len(frames)))]
+
+        predictions = [None] * len(frames)
+        for group in groups:
+            tensor = self._to_tensor([letterboxed[index][0] for index in group])
+            outputs = self.session.run(None, {self.input_name: tensor})[0]
+            for index, output in zip(group, outputs):
+                _, gain, pad = letterboxed[index]
+                predictions[index] = self._postprocess(output, conf, gain, pad, frames[index].shape)
+        return predictions
+
+
+def export_onnx(weights_path, imgsz=ONNX_EXPORT_IMGSZ):
+    """
+    Export ultralytics .pt weights to ONNX next to the weights file.
+
+    The export has dynamic batch and image size, so both cameras can share
+    a batch and frames keep the minimal letterbox padding.
+
+    Returns:
+        str: Path of the .onnx file
+    """
+    from ultralytics import YOLO
+
+    start = time.perf_counter()
+    exported = YOLO(weights_path).export(format="onnx", imgsz=imgsz, dynamic=True, simplify=True)
+    onnx_path = onnx_path_for(weights_path)
+    if exported and os.path.abspath(exported) != os.path.abspath(onnx_path):
+        os.replace(exported, onnx_path)
+    print(f"✅ Exported {os.path.basename(weights_path)} to ONNX in {time.perf_counter() - start:.1f}s: {onnx_path}")
+    return onnx_path
+
+
+def load_backend(weights_path, backend=INFERENCE_BACKEND):
+    """
+    Load a detector for a weights file with the configured backend.
+
+    Args:
+        weights_path: .pt weights or an .onnx export
+        backend: 'auto' uses ONNX Runtime when an .onnx export at least as
+            new as the weights exists next to them; 'onnxruntime' exports
+            first if the export is missing or stale; 'torch' always uses
+            ultralytics/PyTorch
+
+    Returns:
+        InferenceBackend: ONNX Runtime backend, or the PyTorch one as fallback
+    """
+    if backend in ("auto", "onnxruntime"):
+        is_onnx = weights_path.lower().endswith(".onnx")
+        onnx_path = weights_path if is_onnx else onnx_path_for(weights_path)
+        try:
+            if not is_onnx and not onnx_export_is_current(weights_path, onnx_path):
+                if os.path.exists(onnx_path):
+                    print(f"⚠️ {os.path.basename(onnx_path)} is older than {os.path.basename(weights_path)}, "
+                          f"not using the stale export")
+                onnx_path = export_onnx(weights_path) if backend == "onnxruntime" else None
+            if onnx_path and os.path.exists(onnx_path):
+                detector = OnnxRuntimeBackend(onnx_path)
+                print(f"🧠 {os.path.basename(onnx_path)}: ONNX Runtime CPU backend")
+                return detector
+        except ImportError as e:
+            print(f"⚠️ ONNX Runtime not available ({e}), using PyTorch for {os.path.basename(weights_path)}")
+        except Exception as e:
+            print(f"⚠️ Could not load ONNX model for {os.path.basename(weights_path)}, using PyTorch: {e}")
+
+    detector = TorchBackend(weights_path)
+    print(f"🧠 {os.path.basename(weights_path)}: PyTorch CPU backend")
+    return detector
+
+
+# ---------------------------------------------------------------------------
+# Benchmark: PyTorch vs. ONNX Runtime on recorded roller frames
+# ---------------------------------------------------------------------------
+
+def _time_backend(detector, frames, conf, batch_size):
+    """Run every frame through a backend; return (seconds, per-frame latencies ms, predictions)"""
+    detector.predict(frames[:batch_size], conf)  # warm-up
+    latencies = []
+    predictions = []
+    start = time.perf_counter()
+    for offset in range(0, len(frames), batch_size):
+        batch = frames[offset:offset + batch_size]
+        batch_start = time.perf_counter()
+        predictions.extend(detector.predict(batch, conf))
+        latencies.append((time.perf_counter() - batch_start) * 1000)
+    return time.perf_counter() - start, latencies, predictions
+
+
+def run_benchmark(frames_dir, weights_path, conf=0.25, limit=200, batch_size=1, num_threads=None):
+    """
+    Compare the PyTorch and ONNX Runtime backends on the same frames.
+
+    Args:
+        frames_dir: Directory with recorded roller images
+        weights_path: .pt weights (exported to ONNX if no export exists yet)
+        conf: Confidence threshold
+        limit: Max frames to load
+        batch_size: Frames per predict call (2 = both cameras batched)
+        num_threads: CPU threads for both backends (None = backend defaults)
+
+    Returns:
+        dict: {'torch': {...}, 'onnxruntime': {...}, 'agreement': {...}}
+    """
+    frames = load_recorded_frames(frames_dir, limit)
+    if not frames:
+        print(f"❌ No frames found in {frames_dir}")
+        return {}
+
+    onnx_path = onnx_path_for(weights_path)
+    if not os.path.exists(onnx_path):
+        onnx_path = export_onnx(weights_path)
+
+    detectors = {'torch': TorchBackend(weights_path)}
+    if num_threads:
+        detectors['torch'].configure_threads(num_threads)
+        detectors['onnxruntime'] = OnnxRuntimeBackend(onnx_path, intra_op_threads=num_threads)
+    else:
+        detectors['onnxruntime'] = OnnxRuntimeBackend(onnx_path)
+
+    report = {}
+    outputs = {}
+    for name, detector in detectors.items():
+        seconds, latencies, outputs[name] = _time_backend(detector, frames, conf, batch_size)
+        latencies.sort()
+        report[name] = {
+            'frames': len(frames),
+            'throughput_fps': round(len(frames) / seconds, 2) if seconds else 0.0,
+            'latency_p50_ms': round(latencies[len(latencies) // 2], 2),
+            'latency_p99_ms': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))], 2)
+        }
+        print(f"📊 {name:<12} | {len(frames)} frames, batch {batch_size} | "
+              f"{report[name]['throughput_fps']:.1f} fps | latency p50/p99 "
+              f"{report[name]['latency_p50_ms']:.1f}/{report[name]['latency_p99_ms']:.1f} ms")
+
+    # Same classes detected on the same frame counts as agreement
+    same = sum(1 for torch_preds, onnx_preds in zip(outputs['torch'], outputs['onnxruntime'])
+               if sorted(p['class_name'] for p in torch_preds) == sorted(p['class_name'] for p in onnx_preds))
+    report['agreement'] = {'frames_matching': same, 'ratio': round(same / len(frames), 4)}
+    speedup = report['onnxruntime']['throughput_fps'] / report['torch']['throughput_fps'] \
+        if report['torch']['throughput_fps'] else 0.0
+    print(f"   ONNX Runtime speedup: {speedup:.2f}x, same detections on {same}/{len(frames)} frames")
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+    from config import MODEL_PATHS
+
+    parser = argparse.ArgumentParser(description="Benchmark PyTorch vs. ONNX Runtime inference")
+    parser.add_argument("frames_dir", nargs="?", help="Directory of recorded roller frames")
+    parser.add_argument("--weights", default=MODEL_PATHS["OD"])
+    parser.add_argument("--limit", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=1, help="Frames per call (2 = both cameras)")
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--export", action="store_true", help="Only export the weights to ONNX")
+    args = parser.parse_args()
+
+    if args.export:
+        export_onnx(args.weights)
+    elif not args.frames_dir:
+        parser.error("frames_dir is required for the benchmark")
+    else:
+        run_benchmark(args.frames_dir, args.weights, limit=args.limit, batch_size=args.batch,
+                      num_threads=args.threads)
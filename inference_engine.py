@@ -0,0 +1,466 @@
+"""
+Batched Inference Engine for WelVision
+Serializes OD and BigFace forward passes on one worker and batches frames
+from both cameras into a single CPU forward pass when they share weights
+"""
+
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+from config import INFERENCE_BATCH_WINDOW_MS, INFERENCE_NUM_THREADS
+from detections import Detections, as_detections
+
+
+def results_to_predictions(results):
+    """
+    Convert ultralytics Results into the prediction dicts used by the loggers.
+
+    Args:
+        results: List of Results as returned by model(frame) or InferenceEngine.infer
+
+    Returns:
+        list: [{'class_name': str, 'confidence': float, 'box': [x1, y1, x2, y2]}, ...]
+    """
+    predictions = []
+    for result in results:
+        predictions.extend(Detections.from_results(result).to_predictions())
+    return predictions
+
+
+class _InferenceRequest:
+    __slots__ = ("camera", "frame", "conf", "future", "submitted")
+
+    def __init__(self, camera, frame, conf):
+        self.camera = camera
+        self.frame = frame
+        self.conf = conf
+        self.future = Future()
+        self.submitted = time.perf_counter()
+
+
+class InferenceEngine:
+    """
+    Single-worker inference engine shared by both cameras.
+
+    Cameras submit frames and wait on the returned future. The worker waits up
+    to ``batch_window_ms`` for the other cameras to submit, then groups the
+    pending frames by model weights: cameras whose models load the same
+    weights file go through one batched forward pass, cameras with different
+    weights run back to back. Because only one thread ever calls into the
+    models, OD and BF no longer compete for the CPU thread pool.
+
+    Models are inference_backends.InferenceBackend instances (PyTorch or
+    ONNX Runtime); results are the prediction dicts the loggers consume.
+    ``swap_model`` replaces a camera's model between batches while running,
+    and ``run_exclusive`` runs other model work (e.g. warming up the model
+    about to be swapped in) on the worker so it never competes with a batch.
+
+    ``submit`` starts a cold engine; once ``stop`` has been called it raises
+    instead, so nothing restarts the worker during shutdown.
+    """
+
+    def __init__(self, models, batch_window_ms=INFERENCE_BATCH_WINDOW_MS,
+                 num_threads=INFERENCE_NUM_THREADS, stats_window=500):
+        """
+        Args:
+            models: dict mapping camera name ('od', 'bf') to a loaded InferenceBackend
+            batch_window_ms: Max time to wait for the other cameras' frames
+            num_threads: Intra-op threads for PyTorch backends (None/0 = all CPU cores)
+        """
+        self.batch_window = batch_window_ms / 1000.0
+        self.num_threads = num_threads or os.cpu_count() or 1
+        self._set_models({camera: model for camera, model in models.items() if model is not None})
+
+        # Model swaps and exclusive jobs requested from other threads, run by the worker between batches
+        self._pending_swaps = {}
+        self._pending_jobs = []
+        self._swap_lock = threading.Lock()
+
+        self._queue = queue.Queue()
+        self._running = False
+        self._stopped = False
+        self._worker = None
+        # Serializes start/stop with submit, so at most one worker ever runs
+        self._lifecycle_lock = threading.Lock()
+
+        self._latencies = deque(maxlen=stats_window)
+        self._batch_sizes = deque(maxlen=stats_window)
+        self.frames_processed = 0
+        self.forward_passes = 0
+        self.first_inference_ms = None
+
+    @staticmethod
+    def _weights_key(model):
+        """Identify a model by the weights file it was loaded from"""
+        return getattr(model, 'weights_key', None) or f"model-{id(model)}"
+
+    def _set_models(self, models):
+        """Install a camera -> model mapping (cameras sharing a weights file share one batch)"""
+        weight_groups = {}
+        group_models = {}
+        for camera, model in models.items():
+            key = self._weights_key(model)
+            weight_groups[camera] = key
+            group_models.setdefault(key, model)
+        self.models = models
+        self.weight_groups = weight_groups
+        self._group_models = group_models
+
+    def swap_model(self, camera, model):
+        """
+        Replace a camera's model without stopping inference.
+
+        The swap is applied by the worker between forward passes, so every
+        frame runs entirely on either the old or the new model. The new
+        model should already be warm (see model_registry).
+        """
+        model.configure_threads(self.num_threads)
+        with self._swap_lock:
+            self._pending_swaps[camera] = model
+        if not self._running:
+            self._apply_swaps()
+
+    def run_exclusive(self, fn, *args):
+        """
+        Run ``fn(*args)`` on the inference worker between batches.
+
+        Used for model work that would otherwise run beside inference and
+        fight it for the CPU thread pool, such as hot-swap warm-up. When the
+        worker is not running, ``fn`` runs right away on the calling thread.
+
+        Returns:
+            Future: resolves to ``fn``'s return value (fails with RuntimeError
+                    if the engine stops before running it)
+        """
+        future = Future()
+        with self._lifecycle_lock:
+            if self._running:
+                with self._swap_lock:
+                    self._pending_jobs.append((future, fn, args))
+                return future
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def _run_jobs(self):
+        """Run pending exclusive jobs (worker thread)"""
+        with self._swap_lock:
+            jobs, self._pending_jobs = self._pending_jobs, []
+        for future, fn, args in jobs:
+            if not future.set_running_or_notify_cancel():
+                continue  # The caller gave up waiting
+            try:
+                future.set_result(fn(*args))
+            except Exception as e:
+                future.set_exception(e)
+
+    def _apply_swaps(self):
+        """Install pending model swaps (worker thread, or caller while stopped)"""
+        with self._swap_lock:
+            swaps, self._pending_swaps = self._pending_swaps, {}
+        if swaps:
+            models = dict(self.models)
+            models.update(swaps)
+            self._set_models(models)
+            print(f"🔁 Inference engine now running new {'/'.join(c.upper() for c in swaps)} model")
+
+    def has_model(self, camera):
+        """Check whether a model is registered for the given camera"""
+        return camera in self.models
+
+    def shares_weights(self):
+        """True if all registered cameras run the same weights"""
+        return len(set(self.weight_groups.values())) == 1 and len(self.weight_groups) > 1
+
+    def start(self):
+        """Start the inference worker (also after ``stop``)"""
+        with self._lifecycle_lock:
+            self._start_locked()
+
+    def _start_locked(self):
+        if self._running:
+            return
+        self._configure_threads()
+        self._stopped = False
+        self._running = True
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+        mode = "batched (shared weights)" if self.shares_weights() else "serialized"
+        print(f"🧠 Inference engine started: {len(self.models)} camera(s), {mode}, "
+              f"window {self.batch_window * 1000:.0f} ms, {self.num_threads} threads")
+
+    def stop(self, timeout=2.0):
+        """Stop the worker and fail any requests still waiting"""
+        with self._lifecycle_lock:
+            self._stopped = True
+            self._running = False
+            worker, self._worker = self._worker, None
+        if worker and worker.is_alive() and worker is not threading.current_thread():
+            worker.join(timeout=timeout)
+        while True:
+            try:
+                request = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            request.future.set_exception(RuntimeError("Inference engine stopped"))
+        with self._swap_lock:
+            jobs, self._pending_jobs = self._pending_jobs, []
+        for future, _, _ in jobs:
+            if future.set_running_or_notify_cancel():
+                future.set_exception(RuntimeError("Inference engine stopped"))
+
+    def _configure_threads(self):
+        """Give the single inference worker the whole intra-op thread pool"""
+        for model in self._group_models.values():
+            model.configure_threads(self.num_threads)
+
+    def submit(self, camera, frame, conf=0.25):
+        """
+        Queue a frame for inference.
+
+        Args:
+            camera: 'od' or 'bf'
+            frame: BGR frame (numpy array)
+            conf: Confidence threshold for this camera
+
+        Returns:
+            Future: resolves to the frame's Detections (iterates as prediction dicts)
+
+        Raises:
+            KeyError: No model registered for ``camera``
+            RuntimeError: The engine has been stopped
+        """
+        if camera not in self.models:
+            raise KeyError(f"No model registered for camera '{camera}'")
+        request = _InferenceRequest(camera, frame, conf)
+        with self._lifecycle_lock:
+            if self._stopped:
+                raise RuntimeError("Inference engine stopped")
+            if not self._running:
+                self._start_locked()
+            self._queue.put(request)
+        return request.future
+
+    def infer(self, camera, frame, conf=0.25, timeout=None):
+        """Blocking helper: submit a frame and wait for its results"""
+        return self.submit(camera, frame, conf).result(timeout=timeout)
+
+    def _collect_batch(self):
+        """Wait for the first request, then gather others within the batch window"""
+        try:
+            first = self._queue.get(timeout=0.1)
+        except queue.Empty:
+            return []
+
+        batch = [first]
+        cameras = {first.camera}
+        deadline = time.perf_counter() + self.batch_window
+
+        while len(cameras) < len(self.models):
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(request)
+            cameras.add(request.camera)
+        return batch
+
+    def _run(self):
+        """Worker loop: one forward pass per weights group per tick"""
+        while self._running:
+            batch = self._collect_batch()
+            if self._pending_jobs:
+                self._run_jobs()
+            if self._pending_swaps:
+                self._apply_swaps()
+            if not batch:
+                continue
+
+            groups = {}
+            for request in batch:
+                groups.setdefault(self.weight_groups[request.camera], []).append(request)
+
+            for key, requests in groups.items():
+                self._run_group(self._group_models[key], requests)
+
+    def _run_group(self, model, requests):
+        """Run one forward pass for requests sharing a model"""
+        try:
+            conf = min(request.conf for request in requests)
+            frames = [request.frame for request in requests]
+            results = list(model.predict(frames, conf=conf))
+            self.forward_passes += 1
+            self._batch_sizes.append(len(frames))
+        except Exception as e:
+            for request in requests:
+                request.future.set_exception(e)
+            return
+
+        if len(results) != len(requests):
+            # Never leave a camera waiting on a frame the backend dropped
+            error = RuntimeError(f"{type(model).__name__} returned {len(results)} results "
+                                 f"for {len(requests)} frames")
+            for request in requests[len(results):]:
+                request.future.set_exception(error)
+            print(f"⚠️ Inference engine: {error}")
+
+        done = time.perf_counter()
+        for request, predictions in zip(requests, results):
+            predictions = as_detections(predictions)
+            if request.conf > conf:
+                predictions = predictions.filter(request.conf)
+            latency = (done - request.submitted) * 1000
+            if self.first_inference_ms is None:
+                self.first_inference_ms = round(latency, 2)
+                print(f"⏱️ First inference latency: {latency:.1f} ms ({request.camera.upper()})")
+            self._latencies.append(latency)
+            self.frames_processed += 1
+            request.future.set_result(predictions)
+
+    def get_stats(self):
+        """
+        Get engine throughput statistics.
+
+        Returns:
+            dict: frames, forward passes, first-request latency, average batch size
+                  and latency percentiles (ms)
+        """
+        latencies = sorted(self._latencies)
+        sizes = list(self._batch_sizes)
+
+        def pct(p):
+            if not latencies:
+                return 0.0
+            return round(latencies[min(len(latencies) - 1, int(p / 100.0 * len(latencies)))], 2)
+
+        return {
+            'frames_processed': self.frames_processed,
+            'forward_passes': self.forward_passes,
+            'first_inference_ms': self.first_inference_ms,
+            'avg_batch_size': round(sum(sizes) / len(sizes), 2) if sizes else 0.0,
+            'latency_p50_ms': pct(50),
+            'latency_p99_ms': pct(99)
+        }
+
+
+# ---------------------------------------------------------------------------
+# Benchmark: per-thread inference (current preview path) vs. InferenceEngine
+# ---------------------------------------------------------------------------
+
+def load_recorded_frames(frames_dir, limit=200):
+    """Load recorded roller frames (jpg/png/bmp) from a directory"""
+    import cv2
+
+    frames = []
+    for name in sorted(os.listdir(frames_dir)):
+        if name.lower().endswith(('.jpg', '.jpeg', '.png', '.bmp')):
+            frame = cv2.imread(os.path.join(frames_dir, name))
+            if frame is not None:
+                frames.append(frame)
+        if len(frames) >= limit:
+            break
+    return frames
+
+
+def _run_camera_threads(frames, infer_fn):
+    """Feed every frame to both cameras from two threads; return (seconds, latencies)"""
+    latencies = {'od': [], 'bf': []}
+
+    def camera_loop(camera):
+        for frame in frames:
+            start = time.perf_counter()
+            infer_fn(camera, frame)
+            latencies[camera].append((time.perf_counter() - start) * 1000)
+
+    threads = [threading.Thread(target=camera_loop, args=(camera,)) for camera in ('od', 'bf')]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, latencies['od'] + latencies['bf']
+
+
+def run_benchmark(frames_dir, od_weights, bf_weights, batch_window_ms=INFERENCE_BATCH_WINDOW_MS,
+                  conf=0.25, limit=200):
+    """
+    Compare the per-thread preview path with the batched engine on recorded frames.
+
+    Args:
+        frames_dir: Directory with recorded roller images
+        od_weights: OD model weights path
+        bf_weights: BigFace model weights path (use the same path to test batching)
+        batch_window_ms: Engine batch window
+        conf: Confidence threshold
+        limit: Max frames to load
+
+    Returns:
+        dict: {'per_thread': {...}, 'engine': {...}}
+    """
+    from inference_backends import load_backend
+
+    frames = load_recorded_frames(frames_dir, limit)
+    if not frames:
+        print(f"❌ No frames found in {frames_dir}")
+        return {}
+
+    model_od = load_backend(od_weights)
+    model_bf = load_backend(bf_weights)
+    for model in (model_od, model_bf):
+        model(frames[0], conf=conf)  # warm-up
+
+    models = {'od': model_od, 'bf': model_bf}
+    report = {}
+
+    def summarize(label, seconds, latencies):
+        latencies = sorted(latencies)
+        total = len(latencies)
+        summary = {
+            'frames': total,
+            'throughput_fps': round(total / seconds, 2) if seconds else 0.0,
+            'latency_p50_ms': round(latencies[total // 2], 2) if total else 0.0,
+            'latency_p99_ms': round(latencies[min(total - 1, int(total * 0.99))], 2) if total else 0.0
+        }
+        print(f"📊 {label:<10} | {summary['frames']} frames | {summary['throughput_fps']:.1f} fps | "
+              f"latency p50/p99 {summary['latency_p50_ms']:.1f}/{summary['latency_p99_ms']:.1f} ms")
+        return summary
+
+    seconds, latencies = _run_camera_threads(
+        frames, lambda camera, frame: models[camera](frame, conf=conf))
+    report['per_thread'] = summarize("per-thread", seconds, latencies)
+
+    engine = InferenceEngine(models, batch_window_ms=batch_window_ms)
+    engine.start()
+    seconds, latencies = _run_camera_threads(
+        frames, lambda camera, frame: engine.infer(camera, frame, conf=conf))
+    report['engine'] = summarize("engine", seconds, latencies)
+    report['engine'].update(engine.get_stats())
+    engine.stop()
+    print(f"   engine forward passes: {report['engine']['forward_passes']}, "
+          f"avg batch size: {report['engine']['avg_batch_size']}")
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+    from config import MODEL_PATHS
+
+    parser = argparse.ArgumentParser(description="Benchmark batched dual-camera inference")
+    parser.add_argument("frames_dir", help="Directory of recorded roller frames")
+    parser.add_argument("--od-weights", default=MODEL_PATHS["OD"])
+    parser.add_argument("--bf-weights", default=MODEL_PATHS["BIGFACE"])
+    parser.add_argument("--window-ms", type=float, default=INFERENCE_BATCH_WINDOW_MS)
+    parser.add_argument("--limit", type=int, default=200)
+    args = parser.parse_args()
+
+    run_benchmark(args.frames_dir, args.od_weights, args.bf_weights,
+                  batch_window_ms=args.window_ms, limit=args.limit)
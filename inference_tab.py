@@ -4,8 +4,11 @@ import numpy as np
 from database import db_manager
 from roller_inspection_logger import roller_logger
 from prediction_tracker import prediction_tracker
+from model_loader import model_loader, STATE_FAILED, STATE_READY
 import tkinter.messagebox as messagebox
 import uuid
+import threading
+from ui_executor import ui_executor
 
 class InferenceTab:
     def __init__(self, parent, app_instance):
@@ -15,8 +18,16 @@ class InferenceTab:
         # Initialize session tracking
         self.current_session_id = str(uuid.uuid4())
         self.session_started = False
+        # Inspection pipelines log rollers from their own threads
+        self._session_lock = threading.Lock()
+        self.current_roller_type = None
+        
+        # Start buttons stay disabled until the background model loader is ready
+        self.start_buttons = []
+        self._readiness_poll = None
         
         self.setup_tab()
+        self.update_model_readiness()
         
         # Load current session data on initialization
         self.load_current_session_data()
@@ -93,6 +104,12 @@ class InferenceTab:
                                               font=("Arial", 10), state="readonly", width=20)
         self.app.bf_model_combo.grid(row=1, column=1, padx=5, pady=2)
         
+        # Model readiness (background loading and warm-up)
+        self.app.model_ready_var = tk.StringVar(value="LOADING MODELS...")
+        self.app.model_ready_label = tk.Label(model_sub_frame, textvariable=self.app.model_ready_var,
+                                             font=("Arial", 10, "bold"), fg="#ffaa00", bg="#0a2158")
+        self.app.model_ready_label.grid(row=2, column=0, columnspan=2, pady=(2, 0))
+        
         # Load models into dropdowns
         self.load_model_dropdowns()
         
@@ -110,6 +127,9 @@ class InferenceTab:
         self.app.roller_name_combobox = ttk.Combobox(roller_frame, textvariable=self.app.roller_name_var, 
                                                 font=("Arial", 12), state="readonly")
         self.app.roller_name_combobox.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True, pady=5)
+        # Plain copy of the selection for logging threads, which must not read Tk variables
+        self.app.roller_name_var.trace_add(
+            "write", lambda *args: setattr(self, 'current_roller_type', self.app.roller_name_var.get() or None))
         
         # Load roller types from database and bind selection event
         self.load_roller_types()
@@ -287,6 +307,7 @@ class InferenceTab:
         # Three buttons with increased spacing and size - now with confirmation popups
         start_button = tk.Button(left_frame, text="Start", font=("Arial", 12, "bold"), fg="white", bg="#28a745", width=8, height=1, command=self.start_inspection_with_confirmation)
         start_button.pack(side=tk.LEFT, padx=8, pady=5)
+        self.start_buttons.append(start_button)
         
         stop_button = tk.Button(left_frame, text="Stop", font=("Arial", 12, "bold"), fg="white", bg="#dc3545", width=8, height=1, command=self.stop_inspection_with_confirmation)
         stop_button.pack(side=tk.LEFT, padx=8, pady=5)
@@ -327,6 +348,7 @@ class InferenceTab:
         
         start_button = tk.Button(buttons_frame, text="Start", font=("Arial", 12, "bold"), fg="white", bg="#28a745", width=10, command=self.start_inspection_with_confirmation)
         start_button.pack(side=tk.LEFT, padx=5, pady=5)
+        self.start_buttons.append(start_button)
         
         stop_button = tk.Button(buttons_frame, text="Stop", font=("Arial", 12, "bold"), fg="white", bg="#dc3545", width=10, command=self.stop_inspection_with_confirmation)
         stop_button.pack(side=tk.LEFT, padx=5, pady=5)
@@ -472,27 +494,46 @@ class InferenceTab:
         self.update_od_status(od_accepted, od_text)
     
     def load_model_dropdowns(self):
-        """Load available models into the dropdown menus"""
+        """
+        Load available models into the dropdown menus.
+        
+        The model lists are read on a ui_executor worker and the dropdowns
+        are filled on the Tk thread once they arrive.
+        """
+        ui_executor.submit(self._fetch_model_choices, key="inference.models",
+                           on_success=self._show_model_dropdowns,
+                           on_error=lambda e: print(f"❌ Error loading models into dropdowns: {e}"))
+    
+    @staticmethod
+    def _fetch_model_choices():
+        """Read the OD/BigFace model lists and active models (worker thread)"""
+        return {
+            'od_models': db_manager.get_od_models(),
+            'active_od': db_manager.get_active_od_model(),
+            'bf_models': db_manager.get_bigface_models(),
+            'active_bf': db_manager.get_active_bigface_model()
+        }
+    
+    def _show_model_dropdowns(self, choices):
+        """Fill the model dropdowns with the fetched models"""
         try:
             # Load OD models
-            od_models = db_manager.get_od_models()
-            od_model_names = [model['model_name'] for model in od_models]
+            od_model_names = [model['model_name'] for model in choices['od_models']]
             self.app.od_model_combo['values'] = od_model_names
             
             # Set active OD model as selected
-            active_od = db_manager.get_active_od_model()
+            active_od = choices['active_od']
             if active_od:
                 self.app.od_model_var.set(active_od['model_name'])
             elif od_model_names:
                 self.app.od_model_var.set(od_model_names[0])
             
             # Load BigFace models
-            bf_models = db_manager.get_bigface_models()
-            bf_model_names = [model['model_name'] for model in bf_models]
+            bf_model_names = [model['model_name'] for model in choices['bf_models']]
             self.app.bf_model_combo['values'] = bf_model_names
             
             # Set active BigFace model as selected
-            active_bf = db_manager.get_active_bigface_model()
+            active_bf = choices['active_bf']
             if active_bf:
                 self.app.bf_model_var.set(active_bf['model_name'])
             elif bf_model_names:
@@ -502,6 +543,10 @@ class InferenceTab:
             self.app.od_model_combo.bind('<<ComboboxSelected>>', self.on_od_model_changed)
             self.app.bf_model_combo.bind('<<ComboboxSelected>>', self.on_bf_model_changed)
             
+            # Run the selected models (no-op when they are already running)
+            self.on_od_model_changed()
+            self.on_bf_model_changed()
+            
             print(f"📊 Loaded {len(od_model_names)} OD models and {len(bf_model_names)} BigFace models")
             
         except Exception as e:
@@ -509,41 +554,37 @@ class InferenceTab:
     
     def on_od_model_changed(self, event=None):
         """Handle OD model selection change"""
-        try:
-            selected_model = self.app.od_model_var.get()
-            print(f"🔧 OD model changed to: {selected_model}")
-            
-            # Find the model and get its path
-            od_models = db_manager.get_od_models()
-            for model in od_models:
-                if model['model_name'] == selected_model:
-                    # Here you would load the actual model for inference
-                    print(f"📁 OD model path: {model['model_path']}")
-                    # Store the model info for inference
-                    self.app.current_od_model = model
-                    break
-            
-        except Exception as e:
-            print(f"❌ Error changing OD model: {e}")
+        self._select_model('od', "OD", self.app.od_model_var, db_manager.get_od_model_by_name)
     
     def on_bf_model_changed(self, event=None):
         """Handle BigFace model selection change"""
-        try:
-            selected_model = self.app.bf_model_var.get()
-            print(f"🔧 BigFace model changed to: {selected_model}")
-            
-            # Find the model and get its path
-            bf_models = db_manager.get_bigface_models()
-            for model in bf_models:
-                if model['model_name'] == selected_model:
-                    # Here you would load the actual model for inference
-                    print(f"📁 BigFace model path: {model['model_path']}")
-                    # Store the model info for inference
-                    self.app.current_bf_model = model
-                    break
-            
-        except Exception as e:
-            print(f"❌ Error changing BigFace model: {e}")
+        self._select_model('bf', "BigFace", self.app.bf_model_var, db_manager.get_bigface_model_by_name)
+    
+    def _select_model(self, component, label, model_var, lookup):
+        """
+        Look up the selected model on a ui_executor worker (a reference-cache
+        hit or, after the TTL, a DB read) and switch to it on the Tk thread.
+        """
+        selected_model = model_var.get()
+        if not selected_model:
+            return
+        print(f"🔧 {label} model changed to: {selected_model}")
+        ui_executor.submit(lookup, selected_model, key=f"inference.{component}_model",
+                           on_success=lambda model: self._use_model(component, label, model),
+                           on_error=lambda e: print(f"❌ Error changing {label} model: {e}"))
+    
+    def _use_model(self, component, label, model):
+        """Switch the engine to the looked-up model"""
+        if not model:
+            return
+        print(f"📁 {label} model path: {model['model_path']}")
+        # Store the model info for inference
+        setattr(self.app, f"current_{component}_model", model)
+        
+        # Load and warm up in the background; inspection keeps running on
+        # the current model until the engine swaps between frames
+        if model_loader.switch_model(component, model['model_path']):
+            self.update_model_readiness()
     
     def refresh_model_dropdowns(self):
         """Refresh the model dropdowns (call this when models are updated)"""
@@ -555,61 +596,81 @@ class InferenceTab:
             
     def refresh_roller_types(self):
         """Refresh the roller type dropdown (call this when roller types are updated)"""
-        try:
-            print("🔄 Refreshing roller type dropdown...")
-            # Store current selection to restore it if possible
-            current_selection = self.app.roller_name_var.get()
-            
-            # Reload roller types from database
-            self.load_roller_types()
-            
+        print("🔄 Refreshing roller type dropdown...")
+        # Store current selection to restore it if possible
+        current_selection = self.app.roller_name_var.get()
+        
+        def restore_selection(roller_types):
             # Try to restore previous selection if it still exists
-            if current_selection:
-                roller_types = list(self.app.roller_name_combobox['values'])
-                if current_selection in roller_types:
-                    self.app.roller_name_var.set(current_selection)
-                else:
-                    # If previous selection no longer exists, set to first available
-                    if roller_types:
-                        self.app.roller_name_var.set(roller_types[0])
-                        self.initialize_roller_info()
-                        
+            if current_selection and current_selection not in roller_types:
+                # If previous selection no longer exists, set to first available
+                if roller_types:
+                    self.app.roller_name_var.set(roller_types[0])
+                    self.initialize_roller_info()
             print("✅ Roller type dropdown refreshed successfully")
-        except Exception as e:
-            print(f"❌ Error refreshing roller type dropdown: {e}")
+        
+        # Reload roller types from database
+        self.load_roller_types(on_loaded=restore_selection)
     
     def log_component_inspection(self, component_type, predictions):
         """
-        Log component inspection result to appropriate CSV and update displays
+        Log component inspection result to appropriate CSV and update displays (Tk thread)
         
         Args:
             component_type: 'od' or 'bf'
             predictions: list of detection dictionaries [{'class_name': str, 'confidence': float}]
         """
+        self.show_component_result(component_type, self.record_component_inspection(component_type, predictions))
+    
+    def record_component_inspection(self, component_type, predictions):
+        """
+        Log component inspection result to the prediction and session CSVs
+        
+        Touches no widgets, so the inspection pipelines call it on their own
+        thread and post only ``show_component_result`` to Tk.
+        
+        Args:
+            component_type: 'od' or 'bf'
+            predictions: list of detection dictionaries [{'class_name': str, 'confidence': float}]
+        
+        Returns:
+            dict: prediction_tracker result (status, acceptance, defect counts) or None
+        """
         try:
             # Start session if not started
-            if not self.session_started:
-                roller_logger.start_new_session(self.current_session_id)
-                self.session_started = True
-                print(f"📝 Started new inspection session: {self.current_session_id}")
-            
-            # Get current roller type and employee info
-            current_roller = self.app.roller_name_var.get() if hasattr(self.app, 'roller_name_var') else None
-            current_employee = getattr(self.app, 'current_user_id', 'Unknown')
+            with self._session_lock:
+                if not self.session_started:
+                    roller_logger.start_new_session(self.current_session_id)
+                    self.session_started = True
+                    print(f"📝 Started new inspection session: {self.current_session_id}")
+                session_id = self.current_session_id
             
             # Log individual prediction with detailed tracking
             prediction_result = prediction_tracker.log_prediction(
                 component_type=component_type,
                 predictions=predictions,
-                session_id=self.current_session_id,
-                roller_type=current_roller,
-                employee_id=current_employee
+                session_id=session_id,
+                roller_type=self.current_roller_type,
+                employee_id=getattr(self.app, 'current_user_id', 'Unknown')
             )
             
             # Update component session data (existing functionality)
-            roller_logger.update_component_session(self.current_session_id, component_type, predictions)
+            roller_logger.update_component_session(session_id, component_type, predictions)
+            return prediction_result
             
-            # Update status indicators based on prediction result
+        except Exception as e:
+            print(f"❌ Error logging {component_type} inspection: {e}")
+            return None
+    
+    def show_component_result(self, component_type, prediction_result):
+        """
+        Show a logged inspection result on the status indicators (Tk thread)
+        
+        Args:
+            component_type: 'od' or 'bf'
+            prediction_result: Result of record_component_inspection (None if logging failed)
+        """
+        try:
             if prediction_result:
                 status_text = f"● {prediction_result['status']}"
                 if not prediction_result['is_accepted'] and prediction_result['defect_counts']:
@@ -627,13 +688,23 @@ class InferenceTab:
                 else:
                     self.update_od_status(accepted=prediction_result['is_accepted'], custom_text=status_text)
             
-            # Update the display with current session data
-            self.update_result_displays()
-            
-            print(f"📝 Logged {component_type.upper()} prediction: {prediction_result['status'] if prediction_result else 'ERROR'}")
+            # Refresh the result displays once per Tk idle cycle instead of per roller
+            self._schedule_result_display_update()
             
         except Exception as e:
-            print(f"❌ Error logging {component_type} inspection: {e}")
+            print(f"❌ Error showing {component_type} inspection result: {e}")
+    
+    def _schedule_result_display_update(self):
+        """Coalesce result display refreshes into one per Tk idle cycle"""
+        if getattr(self, '_display_update_pending', False):
+            return
+        self._display_update_pending = True
+        
+        def refresh():
+            self._display_update_pending = False
+            self.update_result_displays()
+        
+        self.parent.after_idle(refresh)
     
     def simulate_roller_inspection(self):
         """
@@ -668,21 +739,45 @@ class InferenceTab:
         except Exception as e:
             print(f"❌ Error in simulate_roller_inspection: {e}")
     
-    def reset_inspection_data(self):
+    def reset_inspection_data(self, on_complete=None):
         """
         Reset inspection data - transfer CSVs to database and clear CSV files
+        
+        The transfer runs in a worker thread with a progress dialog so the UI
+        stays responsive; results are handled back on the Tk thread.
+        
+        Args:
+            on_complete: Optional callable(success: bool) run on the Tk thread
+                once the reset has finished, been cancelled or failed
         """
+        # Ending the session and counting the CSVs touch disk (and wait for
+        # the prediction writer), so they run on a worker
+        session_id = self.current_session_id if self.session_started else None
+        ui_executor.submit(self._fetch_reset_stats, session_id, key="inference.reset_stats",
+                           on_success=lambda stats: self._confirm_reset(*stats, on_complete=on_complete),
+                           on_error=lambda e: self._on_reset_error(e, on_complete))
+    
+    @staticmethod
+    def _fetch_reset_stats(session_id):
+        """End the running session and collect session/prediction statistics (worker thread)"""
+        if session_id:
+            roller_logger.end_session(session_id)
+        return roller_logger.get_session_stats(), prediction_tracker.get_prediction_stats()
+    
+    def _on_reset_error(self, e, on_complete):
+        error_msg = f"Error during reset operation: {e}"
+        print(f"❌ {error_msg}")
+        messagebox.showerror("Reset Error", error_msg)
+        if on_complete:
+            on_complete(False)
+    
+    def _confirm_reset(self, session_stats, prediction_stats, on_complete=None):
+        """Ask for confirmation, then transfer the CSVs in a worker thread with a progress dialog"""
         try:
-            # End current session
-            if self.session_started:
-                roller_logger.end_session(self.current_session_id)
-            
-            # Get current session statistics before transfer
-            session_stats = roller_logger.get_session_stats()
-            prediction_stats = prediction_tracker.get_prediction_stats()
-            
             if session_stats['total_sessions'] == 0 and prediction_stats['total_predictions'] == 0:
                 messagebox.showinfo("Reset", "No inspection data to transfer.\nCSV files are already empty.")
+                if on_complete:
+                    on_complete(True)
                 return
             
             # Confirm with user - include both session and prediction data
@@ -703,20 +798,87 @@ class InferenceTab:
             )
             
             if not messagebox.askyesno("Confirm Reset", confirm_msg):
+                if on_complete:
+                    on_complete(False)
                 return
             
-            # Transfer session data to database and clear CSVs
-            session_success, session_message, session_counts = roller_logger.transfer_to_database_and_clear_csvs(
-                session_id=self.current_session_id
-            )
-            
-            # Transfer prediction data to database and clear CSVs
-            pred_success, pred_message, pred_counts = prediction_tracker.transfer_predictions_to_database_and_clear_csvs()
+            progress = self._create_transfer_progress_dialog()
+            session_id = self.current_session_id
+            
+            def report_progress(stage, component_type, done, total):
+                self.parent.after(0, lambda: self._update_transfer_progress(
+                    progress, stage, component_type, done, total))
+            
+            def transfer_worker():
+                try:
+                    # Transfer session data to database and clear CSVs
+                    session_result = roller_logger.transfer_to_database_and_clear_csvs(
+                        session_id=session_id,
+                        progress_callback=lambda c, d, t: report_progress("Sessions", c, d, t)
+                    )
+                    
+                    # Transfer prediction data to database and clear CSVs
+                    pred_result = prediction_tracker.transfer_predictions_to_database_and_clear_csvs(
+                        progress_callback=lambda c, d, t: report_progress("Predictions", c, d, t)
+                    )
+                except Exception as e:
+                    session_result = (False, str(e), {})
+                    pred_result = (False, str(e), {})
+                
+                self.parent.after(0, lambda: self._finish_reset(progress, session_result, pred_result, on_complete))
             
+            threading.Thread(target=transfer_worker, daemon=True).start()
+                
+        except Exception as e:
+            self._on_reset_error(e, on_complete)
+    
+    def _create_transfer_progress_dialog(self):
+        """Create a modal dialog showing database transfer progress"""
+        dialog = tk.Toplevel(self.parent)
+        dialog.title("Transferring Data")
+        dialog.configure(bg="#0a2158")
+        dialog.resizable(False, False)
+        dialog.transient(self.parent.winfo_toplevel())
+        dialog.protocol("WM_DELETE_WINDOW", lambda: None)  # Close only when transfer finishes
+        
+        status_var = tk.StringVar(value="Preparing transfer...")
+        tk.Label(dialog, textvariable=status_var, font=("Arial", 12), fg="white", bg="#0a2158",
+                 width=45, anchor="w").pack(padx=20, pady=(20, 10))
+        
+        bar = ttk.Progressbar(dialog, orient="horizontal", length=400, mode="determinate")
+        bar.pack(padx=20, pady=(0, 20))
+        
+        dialog.grab_set()
+        return {'dialog': dialog, 'status_var': status_var, 'bar': bar}
+    
+    def _update_transfer_progress(self, progress, stage, component_type, done, total):
+        """Tk thread: update the transfer progress dialog"""
+        try:
+            if not progress['dialog'].winfo_exists():
+                return
+            progress['bar']['maximum'] = max(total, 1)
+            progress['bar']['value'] = done
+            progress['status_var'].set(f"{stage} ({component_type.upper()}): {done:,} / {total:,} rows")
+        except tk.TclError:
+            pass
+    
+    def _finish_reset(self, progress, session_result, pred_result, on_complete=None):
+        """Tk thread: close the progress dialog and report the transfer result"""
+        try:
+            progress['dialog'].grab_release()
+            progress['dialog'].destroy()
+        except tk.TclError:
+            pass
+        
+        session_success, session_message, session_counts = session_result
+        pred_success, pred_message, pred_counts = pred_result
+        
+        try:
             if session_success and pred_success:
                 # Reset session tracking
-                self.current_session_id = str(uuid.uuid4())
-                self.session_started = False
+                with self._session_lock:
+                    self.current_session_id = str(uuid.uuid4())
+                    self.session_started = False
                 
                 # Reset status indicators
                 self.update_bf_status(accepted=True, custom_text="● READY")
@@ -753,12 +915,17 @@ class InferenceTab:
             error_msg = f"Error during reset operation: {e}"
             print(f"❌ {error_msg}")
             messagebox.showerror("Reset Error", error_msg)
+        
+        if on_complete:
+            on_complete(session_success and pred_success)
     
     def reset_with_exit_enable(self):
         """Reset inspection data and enable exit functionality"""
-        # First perform the normal reset
-        self.reset_inspection_data()
-        
+        # Perform the normal reset, then update status once the transfer finishes
+        self.reset_inspection_data(on_complete=self._after_reset_exit_check)
+    
+    def _after_reset_exit_check(self, success):
+        """Update system status and report whether exit is enabled after a reset"""
         # Update system status to show not processing (since reset stops inspection)
         self.update_system_status(False)
         
@@ -906,14 +1073,22 @@ class InferenceTab:
             # Fallback to reset displays
             self.reset_statistics_displays()
 
-    def load_roller_types(self):
-        """Load roller types from database and bind selection event"""
-        try:
-            roller_types = db_manager.get_roller_types()
+    def load_roller_types(self, on_loaded=None):
+        """
+        Load roller types from database into the dropdown.
+        
+        The types are read on a ui_executor worker; ``on_loaded(roller_types)``
+        runs on the Tk thread after the dropdown is filled.
+        """
+        def show_roller_types(roller_types):
             self.app.roller_name_combobox['values'] = roller_types
             print(f"📊 Loaded {len(roller_types)} roller types")
-        except Exception as e:
-            print(f"❌ Error loading roller types: {e}")
+            if on_loaded:
+                on_loaded(roller_types)
+        
+        ui_executor.submit(db_manager.get_roller_types, key="inference.roller_types",
+                           on_success=show_roller_types,
+                           on_error=lambda e: print(f"❌ Error loading roller types: {e}"))
 
     def on_roller_type_changed(self, event=None):
         """Callback function when roller type changes"""
@@ -927,50 +1102,69 @@ class InferenceTab:
             print(f"❌ Error changing roller type: {e}")
 
     def initialize_roller_info(self):
-        """Initialize roller info based on selected roller type"""
-        try:
-            selected_type = self.app.roller_name_var.get()
-            if not selected_type:
-                # If no type selected, try to set the first available type
-                roller_types = db_manager.get_roller_types()
-                if roller_types:
-                    selected_type = roller_types[0]
-                    self.app.roller_name_var.set(selected_type)
-                else:
-                    print("❌ No roller types available")
-                    return
-            
-            print(f"🔧 Initializing roller info for: {selected_type}")
-            
-            # Fetch roller info from database
-            roller_info = db_manager.get_roller_by_type(selected_type)
-            
-            if roller_info:
-                # Map database fields to UI display variables
-                diameter = roller_info.get('diameter', 0)
-                thickness = roller_info.get('thickness', 0)
-                length = roller_info.get('length', 0)
-                
-                # Update UI variables with formatted values
-                self.app.outer_diameter_var.set(f"{diameter} mm" if diameter else "N/A")
-                self.app.dimple_diameter_var.set(f"{thickness} mm" if thickness else "N/A")  # Using thickness as dimple diameter
-                self.app.roller_length_var.set(f"{length} mm" if length else "N/A")
-                
-                print(f"📊 Roller info updated - Diameter: {diameter}mm, Thickness: {thickness}mm, Length: {length}mm")
-            else:
-                print(f"❌ No roller info found for type: {selected_type}")
-                # Set default values if no data found
-                self.app.outer_diameter_var.set("N/A")
-                self.app.dimple_diameter_var.set("N/A")
-                self.app.roller_length_var.set("N/A")
-                
-        except Exception as e:
-            print(f"❌ Error initializing roller info: {e}")
-            # Set default values on error
+        """
+        Initialize roller info based on selected roller type.
+        
+        The roller record is read on a ui_executor worker and shown on the
+        Tk thread.
+        """
+        ui_executor.submit(self._fetch_roller_info, self.app.roller_name_var.get(), key="inference.roller_info",
+                           on_success=self._show_roller_info, on_error=self._on_roller_info_error)
+    
+    @staticmethod
+    def _fetch_roller_info(selected_type):
+        """
+        Read the roller record of a type (worker thread).
+        
+        Returns:
+            tuple: (roller type, roller info or None); the type is the first
+                   available one if none was selected, None if there is none
+        """
+        if not selected_type:
+            # If no type selected, try to use the first available type
+            roller_types = db_manager.get_roller_types()
+            if not roller_types:
+                return None, None
+            selected_type = roller_types[0]
+        return selected_type, db_manager.get_roller_by_type(selected_type)
+    
+    def _show_roller_info(self, result):
+        """Show the fetched roller dimensions"""
+        selected_type, roller_info = result
+        if selected_type is None:
+            print("❌ No roller types available")
+            return
+        if not self.app.roller_name_var.get():
+            self.app.roller_name_var.set(selected_type)
+        
+        print(f"🔧 Initializing roller info for: {selected_type}")
+        
+        if roller_info:
+            # Map database fields to UI display variables
+            diameter = roller_info.get('diameter', 0)
+            thickness = roller_info.get('thickness', 0)
+            length = roller_info.get('length', 0)
+            
+            # Update UI variables with formatted values
+            self.app.outer_diameter_var.set(f"{diameter} mm" if diameter else "N/A")
+            self.app.dimple_diameter_var.set(f"{thickness} mm" if thickness else "N/A")  # Using thickness as dimple diameter
+            self.app.roller_length_var.set(f"{length} mm" if length else "N/A")
+            
+            print(f"📊 Roller info updated - Diameter: {diameter}mm, Thickness: {thickness}mm, Length: {length}mm")
+        else:
+            print(f"❌ No roller info found for type: {selected_type}")
+            # Set default values if no data found
             self.app.outer_diameter_var.set("N/A")
             self.app.dimple_diameter_var.set("N/A")
             self.app.roller_length_var.set("N/A")
     
+    def _on_roller_info_error(self, e):
+        print(f"❌ Error initializing roller info: {e}")
+        # Set default values on error
+        self.app.outer_diameter_var.set("N/A")
+        self.app.dimple_diameter_var.set("N/A")
+        self.app.roller_length_var.set("N/A")
+    
     def update_mode_indicator(self, is_manual=False):
         """Update the system mode indicator
         Args:
@@ -1077,12 +1271,59 @@ class InferenceTab:
             if hasattr(self.parent, 'after'):
                 self.parent.after(2000, self.schedule_status_update)
     
+    def update_model_readiness(self):
+        """Show the model loader state and enable Start once the models are warm; polls while loading or switching"""
+        try:
+            if self._readiness_poll is not None:
+                self.parent.after_cancel(self._readiness_poll)
+                self._readiness_poll = None
+            
+            state = model_loader.state
+            switching = sorted(model_loader.switching)
+            if state == STATE_READY and switching:
+                # Inspection keeps running on the current model meanwhile
+                self.app.model_ready_var.set(f"SWITCHING {'/'.join(c.upper() for c in switching)} MODEL...")
+                self.app.model_ready_label.config(fg="#ffaa00")
+            elif state == STATE_READY and model_loader.switch_error:
+                self.app.model_ready_var.set("MODEL SWITCH FAILED")
+                self.app.model_ready_label.config(fg="#ff4444")
+            elif state == STATE_READY:
+                self.app.model_ready_var.set("MODELS READY")
+                self.app.model_ready_label.config(fg="#00ff00")
+            elif state == STATE_FAILED:
+                self.app.model_ready_var.set("MODEL LOAD FAILED")
+                self.app.model_ready_label.config(fg="#ff4444")
+            else:
+                self.app.model_ready_var.set("LOADING MODELS...")
+                self.app.model_ready_label.config(fg="#ffaa00")
+            
+            button_state = tk.NORMAL if state == STATE_READY else tk.DISABLED
+            for button in self.start_buttons:
+                button.config(state=button_state)
+            
+            if state not in (STATE_READY, STATE_FAILED) or switching:
+                self._readiness_poll = self.parent.after(250, self.update_model_readiness)
+        except tk.TclError:
+            # Tab destroyed (logout) while models were still loading
+            pass
+    
     def start_inspection_with_confirmation(self):
         """
         Start inspection with user confirmation popup.
         Displays a confirmation dialog before starting the inspection process.
         """
         try:
+            # Inspection needs warm models; Start is disabled until then
+            if not model_loader.is_ready():
+                if model_loader.state == STATE_FAILED:
+                    messagebox.showerror("Models Not Loaded",
+                                       f"The inspection models failed to load:\n\n{model_loader.error}")
+                else:
+                    messagebox.showinfo("Models Loading",
+                                      "The inspection models are still loading.\n\n"
+                                      "Start will be enabled once they are ready.")
+                return
+            
             # Check if inspection is already running
             if hasattr(self.app, 'inspection_running') and self.app.inspection_running:
                 messagebox.showwarning("Already Running", 
@@ -1204,7 +1445,7 @@ class InferenceTab:
                 
                 # Call the original reset method
                 self.reset_with_exit_enable()
-                print("✅ Data reset completed after user confirmation")
+                print("✅ Data reset started after user confirmation")
                 
             else:
                 print("🚫 Data reset cancelled by user")
@@ -1227,15 +1468,20 @@ class InferenceTab:
             if hasattr(self.app, 'start_camera_feeds'):
                 self.app.start_camera_feeds()
             
+            # Capture, infer and annotate both cameras into the live feeds
+            if hasattr(self.app, 'start_inspection_pipelines'):
+                self.app.start_inspection_pipelines()
+            
             # Update system status to show processing
             self.update_system_status(True)
             
             # Start session if not already started
-            if not self.session_started:
-                from roller_inspection_logger import roller_logger
-                roller_logger.start_new_session(self.current_session_id)
-                self.session_started = True
-                print(f"📝 Started new inspection session: {self.current_session_id}")
+            with self._session_lock:
+                if not self.session_started:
+                    from roller_inspection_logger import roller_logger
+                    roller_logger.start_new_session(self.current_session_id)
+                    self.session_started = True
+                    print(f"📝 Started new inspection session: {self.current_session_id}")
             
             print("🔄 Inspection process started successfully")
             print("📊 System status updated: Backend processing ACTIVE")
@@ -1257,7 +1503,9 @@ class InferenceTab:
             if hasattr(self.app, 'inspection_running'):
                 self.app.inspection_running = False
             
-            # Stop camera feeds
+            # Stop the inspection pipelines, then the camera feeds
+            if hasattr(self.app, 'stop_inspection_pipelines'):
+                self.app.stop_inspection_pipelines()
             if hasattr(self.app, 'stop_camera_feeds'):
                 self.app.stop_camera_feeds()
             
@@ -1265,11 +1513,12 @@ class InferenceTab:
             self.update_system_status(False)
             
             # End current session
-            if self.session_started:
-                from roller_inspection_logger import roller_logger
-                roller_logger.end_session(self.current_session_id)
-                self.session_started = False
-                print(f"📝 Ended inspection session: {self.current_session_id}")
+            with self._session_lock:
+                if self.session_started:
+                    from roller_inspection_logger import roller_logger
+                    roller_logger.end_session(self.current_session_id)
+                    self.session_started = False
+                    print(f"📝 Ended inspection session: {self.current_session_id}")
             
             print("⏹️ Inspection process stopped successfully")
             print("📊 System status updated: Backend processing INACTIVE")
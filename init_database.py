@@ -27,6 +27,7 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 try:
     from database import DatabaseManager
+    from db_pool import db_pool
     from config import DB_CONFIG, DEFAULT_OD_DEFECT_THRESHOLDS, DEFAULT_BF_DEFECT_THRESHOLDS
 except ImportError as e:
     print(f"❌ Error importing required modules: {e}")
@@ -60,62 +61,64 @@ def test_database_connection():
         print("4. Network connectivity")
         return False
 
-def create_users_table(db_manager):
+def create_users_table():
     """Create users table for authentication"""
     print("\n📋 Creating users table...")
     try:
-        cursor = db_manager.connection.cursor()
-        create_users_query = """
-        CREATE TABLE IF NOT EXISTS users (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            employee_id VARCHAR(20) UNIQUE NOT NULL,
-            email VARCHAR(100) UNIQUE NOT NULL,
-            password_hash VARCHAR(64) NOT NULL,
-            salt VARCHAR(64) NOT NULL,
-            role ENUM('Admin', 'Super Admin', 'Operator') NOT NULL,
-            is_active BOOLEAN DEFAULT TRUE,
-            failed_attempts INT DEFAULT 0,
-            locked_until DATETIME NULL,
-            last_login DATETIME NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-            INDEX idx_employee_id (employee_id),
-            INDEX idx_email (email),
-            INDEX idx_role (role),
-            INDEX idx_active (is_active)
-        )
-        """
-        cursor.execute(create_users_query)
-        db_manager.connection.commit()
-        cursor.close()
+        with db_pool.connection() as connection:
+            cursor = connection.cursor()
+            create_users_query = """
+            CREATE TABLE IF NOT EXISTS users (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                employee_id VARCHAR(20) UNIQUE NOT NULL,
+                email VARCHAR(100) UNIQUE NOT NULL,
+                password_hash VARCHAR(64) NOT NULL,
+                salt VARCHAR(64) NOT NULL,
+                role ENUM('Admin', 'Super Admin', 'Operator') NOT NULL,
+                is_active BOOLEAN DEFAULT TRUE,
+                failed_attempts INT DEFAULT 0,
+                locked_until DATETIME NULL,
+                last_login DATETIME NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                INDEX idx_employee_id (employee_id),
+                INDEX idx_email (email),
+                INDEX idx_role (role),
+                INDEX idx_active (is_active)
+            )
+            """
+            cursor.execute(create_users_query)
+            connection.commit()
+            cursor.close()
         print("✅ Users table created/verified")
         return True
     except Exception as e:
         print(f"❌ Error creating users table: {e}")
         return False
 
-def create_system_logs_table(db_manager):
+def create_system_logs_table():
     """Create system logs table for audit trail"""
     print("\n📋 Creating system logs table...")
     try:
-        cursor = db_manager.connection.cursor()
-        create_logs_query = """
-        CREATE TABLE IF NOT EXISTS system_logs (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            user_id VARCHAR(20),
-            action VARCHAR(100) NOT NULL,
-            details TEXT,
-            level ENUM('INFO', 'WARNING', 'ERROR', 'CRITICAL') DEFAULT 'INFO',
-            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            INDEX idx_user_id (user_id),
-            INDEX idx_action (action),
-            INDEX idx_level (level),
-            INDEX idx_timestamp (timestamp)
-        )
-        """
-        cursor.execute(create_logs_query)
-        db_manager.connection.commit()
-        cursor.close()
+        with db_pool.connection() as connection:
+            cursor = connection.cursor()
+            create_logs_query = """
+            CREATE TABLE IF NOT EXISTS system_logs (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                user_id VARCHAR(20),
+                action VARCHAR(100) NOT NULL,
+                details TEXT,
+                level ENUM('INFO', 'WARNING', 'ERROR', 'CRITICAL') DEFAULT 'INFO',
+                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                INDEX idx_user_id (user_id),
+                INDEX idx_action (action),
+                INDEX idx_level (level),
+                INDEX idx_timestamp (timestamp)
+            )
+            """
+            cursor.execute(create_logs_query)
+            connection.commit()
+            cursor.close()
         print("✅ System logs table created/verified")
         return True
     except Exception as e:
@@ -130,109 +133,23 @@ def initialize_all_tables():
     if not test_database_connection():
         return False
     
-    # Initialize database manager
-    db_manager = DatabaseManager()
-    if not db_manager.connect():
-        print("❌ Failed to connect to database")
-        return False
-    
-    success_count = 0
-    total_tables = 0
+    from db_migrations import bootstrap_schema, last_bootstrap
     
     try:
-        # Core system tables
-        print("\n🏗️  Creating core system tables...")
-        
-        # Users table
-        total_tables += 1
-        if create_users_table(db_manager):
-            success_count += 1
-        
-        # System logs table
-        total_tables += 1
-        if create_system_logs_table(db_manager):
-            success_count += 1
-        
-        # Roller management tables
-        print("\n🏗️  Creating roller management tables...")
-        
-        # Roller informations table
-        total_tables += 1
-        if db_manager.create_roller_table():
-            success_count += 1
-        
-        # Roller specifications table
-        total_tables += 1
-        if db_manager.create_roller_specifications_table():
-            success_count += 1
-        
-        # Global roller limits table
-        total_tables += 1
-        if db_manager.create_global_limits_table():
-            success_count += 1
-        
-        # Threshold management tables
-        print("\n🏗️  Creating threshold management tables...")
-        
-        # Threshold tracking tables
-        total_tables += 1
-        if db_manager.create_threshold_tables():
-            success_count += 1
-        
-        # Model management tables
-        print("\n🏗️  Creating model management tables...")
-        
-        # OD and BigFace model tables
-        total_tables += 1
-        if db_manager.create_model_management_table():
-            success_count += 1
-        
-        # Inspection session tables
-        print("\n🏗️  Creating inspection session tables...")
-        
-        # Inspection session tables
-        total_tables += 1
-        if db_manager.create_inspection_session_tables():
-            success_count += 1
-        
-        # Import additional table creation functions
-        try:
-            from prediction_tracker import PredictionTracker
-            from roller_inspection_logger import RollerInspectionLogger
-            
-            # Prediction tracking tables
-            print("\n🏗️  Creating prediction tracking tables...")
-            total_tables += 1
-            try:
-                prediction_tracker = PredictionTracker()
-                prediction_tracker._create_prediction_tables()
-                print("✅ Prediction tracking tables created/verified")
-                success_count += 1
-            except Exception as e:
-                print(f"❌ Error creating prediction tables: {e}")
-            
-            # Roller inspection logger tables
-            print("\n🏗️  Creating roller inspection logger tables...")
-            total_tables += 1
-            try:
-                inspection_logger = RollerInspectionLogger()
-                inspection_logger._create_database_tables()
-                print("✅ Roller inspection logger tables created/verified")
-                success_count += 1
-            except Exception as e:
-                print(f"❌ Error creating inspection logger tables: {e}")
-                
-        except ImportError as e:
-            print(f"⚠️  Warning: Could not import additional modules: {e}")
-            print("Some optional tables may not be created")
+        # One bootstrap step creates every table and applies pending migrations;
+        # it skips the DDL when the recorded schema version is already current
+        print("\n🏗️  Creating database tables...")
+        success, message, seconds = bootstrap_schema()
         
         # Summary
         print("\n" + "=" * 60)
         print("DATABASE INITIALIZATION SUMMARY")
         print("=" * 60)
-        print(f"✅ Successfully created: {success_count}/{total_tables} tables")
+        print(f"{'✅' if success else '❌'} {message}")
+        print(f"⏱️  Bootstrap took {seconds * 1000:.1f} ms "
+              f"({'tables created/verified' if last_bootstrap['ran_ddl'] else 'no DDL needed'})")
         
-        if success_count == total_tables:
+        if success:
             print("🎉 All database tables initialized successfully!")
             print("\nNext steps:")
             print("1. Create initial user accounts using the application")
@@ -241,16 +158,13 @@ def initialize_all_tables():
             print("4. Test the application functionality")
             return True
         else:
-            print(f"⚠️  {total_tables - success_count} tables failed to initialize")
+            print("⚠️  Some tables failed to initialize")
             print("Please check the error messages above and resolve issues")
             return False
             
     except Exception as e:
         print(f"❌ Critical error during initialization: {e}")
         return False
-    
-    finally:
-        db_manager.disconnect()
 
 def create_default_admin():
     """Create a default Super Admin user for initial setup"""
@@ -263,10 +177,11 @@ def create_default_admin():
     
     try:
         # Check if any Super Admin exists
-        cursor = db_manager.connection.cursor()
-        cursor.execute("SELECT COUNT(*) FROM users WHERE role = 'Super Admin'")
-        admin_count = cursor.fetchone()[0]
-        cursor.close()
+        with db_pool.connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute("SELECT COUNT(*) FROM users WHERE role = 'Super Admin'")
+            admin_count = cursor.fetchone()[0]
+            cursor.close()
         
         if admin_count > 0:
             print("✅ Super Admin user already exists, skipping creation")
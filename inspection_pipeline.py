@@ -0,0 +1,226 @@
+"""
+Live Inspection Pipeline for WelVision
+Per-camera capture -> infer -> annotate -> decide stages built on pipeline.Pipeline,
+feeding the Inference tab's frame rings and per-roller logging
+"""
+
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from detections import as_detections, draw_detections
+from pipeline import Pipeline
+
+
+def merge_roller_predictions(best, predictions):
+    """Keep the most confident detection of each class seen on a roller"""
+    # One candidate per class from the frame (vectorized), then compare with the roller so far
+    for prediction in as_detections(predictions).best_per_class():
+        current = best.get(prediction['class_name'])
+        if current is None or prediction['confidence'] > current['confidence']:
+            best[prediction['class_name']] = prediction
+    return best
+
+
+class CameraInspection:
+    """
+    Live inspection of one camera (or a stand-in frame source).
+
+    Stages run on their own threads (see pipeline.Pipeline), so capture,
+    inference and annotation overlap instead of adding up:
+
+    - capture: read the frame source (for a camera, the newest frame from
+      its LatestFrameGrabber), publish the frame to ``raw_ring``
+    - infer: presence gate, then the shared inference engine
+    - annotate: downscale the frame to ``annotated_ring``'s display shape,
+      draw the scaled detections on it and publish it (shown by the
+      Inference tab's LiveFeedDisplay)
+    - decide: merge the detections of all frames in one presence window
+      (one roller) and log the roller once the window ends
+
+    A roller is logged on the pipeline thread that finishes it (the decide
+    stage when the next frame leaves the window, the capture stage when its
+    window ended ``ROLLER_FLUSH_GRACE`` seconds ago without that happening,
+    or ``stop``); only the status display is posted to the Tk thread.
+    Frames of an already logged roller that arrive late are not merged.
+
+    Without proximity sensor edges there are no roller windows, so frames
+    are inferred and displayed but no rollers are logged. The source
+    records how old each frame is when its detections reach the decide
+    stage and reports it on ``stop``.
+    """
+
+    ROLLER_FLUSH_GRACE = 1.0   # Seconds after a window ends before capture logs its roller
+    FAILURE_LOG_EVERY = 50     # Consecutive failed reads between "failed to read" messages
+
+    def __init__(self, app, component, source, raw_ring, annotated_ring, gate=None):
+        """
+        Args:
+            app: WelVisionApp (inference engine, thresholds, Inference tab)
+            component: 'od' or 'bf'
+            source: FrameSource to read (not started yet; see frame_source.configured_source)
+            raw_ring: FrameRing for raw frames
+            annotated_ring: FrameRing of display size (see LIVE_FEED_SIZE) for annotated frames
+            gate: Optional PresenceGate for this camera
+        """
+        self.app = app
+        self.component = component
+        self.label = component.upper()
+        self.source = source
+        self.raw_ring = raw_ring
+        self.annotated_ring = annotated_ring
+        self.gate = gate
+        # Reused by the annotate stage (one thread) for the downscaled frame
+        self._display = np.empty(annotated_ring.frame_shape, dtype=np.uint8)
+
+        self.pipeline = None
+        self._roller_lock = threading.Lock()
+        self._roller = None
+        self._roller_best = {}
+        self._roller_inferred = False
+        self._last_roller = None
+        self.rollers_logged = 0
+        self.read_failures = 0
+        self._failure_streak = 0
+
+    @property
+    def threshold(self):
+        return getattr(self.app, f"{self.component}_conf_threshold", 0.25)
+
+    def start(self):
+        """Open the frame source and start the stages; returns False if the source is unavailable"""
+        if not self.source.start():
+            print(f"❌ {self.label} frame source {self.source.name} unavailable, inspection feed not started")
+            return False
+
+        self.pipeline = Pipeline(f"{self.label} inspection", self._capture, [
+            ("infer", self._infer),
+            ("annotate", self._annotate),
+            ("decide", self._decide)
+        ])
+        self.pipeline.start()
+        print(f"📷 {self.label} inspection pipeline started on {self.source.name}")
+        return True
+
+    def stop(self):
+        """Stop the stages, log the roller in progress and release the frame source"""
+        if self.pipeline is not None:
+            self.pipeline.stop()
+            with self._roller_lock:
+                predictions = self._take_roller()
+            self._log_roller(predictions)
+            self.pipeline.print_report()
+            if self.read_failures:
+                print(f"⚠️ {self.label} Camera: {self.read_failures} failed frame reads")
+            self.pipeline = None
+        if self.source.running:
+            self.source.stop()
+            self.source.print_report()
+
+    def _capture(self):
+        grabbed = self.source.read()
+        self._flush_expired_roller()
+        if grabbed is None:
+            if self.source.ended:
+                raise StopIteration
+            self.read_failures += 1
+            self._failure_streak += 1
+            if self._failure_streak % self.FAILURE_LOG_EVERY == 1:
+                print(f"❌ {self.label} Camera: Failed to read frame ({self._failure_streak} in a row)")
+            time.sleep(0.1)
+            return None
+        if self._failure_streak:
+            print(f"✅ {self.label} Camera: frames again after {self._failure_streak} failed reads")
+            self._failure_streak = 0
+
+        frame = grabbed.frame
+        height, width = self.raw_ring.frame_shape[:2]
+        if frame.shape[:2] != (height, width):
+            frame = cv2.resize(frame, (width, height))
+        self.raw_ring.write(frame)
+        return {'frame': frame, 'seq': grabbed.seq, 'capture_time': grabbed.capture_time,
+                'predictions': None, 'roller': None}
+
+    def _infer(self, item):
+        engine = self.app.inference_engine
+        if engine is None or not engine.has_model(self.component):
+            return item
+        if self.gate is not None:
+            if not self.gate.should_infer(item['capture_time']):
+                return item
+            item['roller'] = self.gate.window_at(item['capture_time'])
+        item['predictions'] = engine.infer(self.component, item['frame'], conf=self.threshold, timeout=5.0)
+        return item
+
+    def _annotate(self, item):
+        frame = item['frame']
+        display = self._display
+        height, width = display.shape[:2]
+        cv2.resize(frame, (width, height), dst=display, interpolation=cv2.INTER_AREA)
+        if item['predictions']:
+            # Boxes are drawn on the downscaled display image, never on the full-resolution frame
+            scale = (width / frame.shape[1], height / frame.shape[0])
+            draw_detections(display, item['predictions'], self.threshold, self.label, scale=scale,
+                            font_scale=0.4, thickness=1)
+        self.annotated_ring.write(display)
+        return item
+
+    def _decide(self, item):
+        roller = item['roller']
+        if roller is not None and self._last_roller is not None and roller <= self._last_roller:
+            roller = None  # late frame of a roller that was already logged
+        finished = None
+        with self._roller_lock:
+            if roller != self._roller:
+                finished = self._take_roller()
+                self._roller = roller
+            if item['predictions'] is not None and self._roller is not None:
+                self._roller_inferred = True
+                merge_roller_predictions(self._roller_best, item['predictions'])
+        if item['predictions'] is not None:
+            self.source.record_decision(item['capture_time'])
+        self._log_roller(finished)
+        return item
+
+    def _flush_expired_roller(self):
+        """Log the roller in progress if its window ended but no later frame reached decide"""
+        if self.gate is None or self._roller is None:
+            return
+        with self._roller_lock:
+            if self._roller is None:
+                return
+            end = self.gate.window_end(self._roller)
+            if end is not None and time.monotonic() < end + self.ROLLER_FLUSH_GRACE:
+                return
+            predictions = self._take_roller()
+        self._log_roller(predictions)
+
+    def _take_roller(self):
+        """
+        Finish the roller in progress (_roller_lock must be held).
+
+        Returns:
+            list: The roller's best detection per class, or None if no frame of it was inferred
+        """
+        predictions = None
+        if self._roller is not None:
+            self._last_roller = self._roller
+            if self._roller_inferred:
+                predictions = list(self._roller_best.values())
+                self.rollers_logged += 1
+        self._roller = None
+        self._roller_best = {}
+        self._roller_inferred = False
+        return predictions
+
+    def _log_roller(self, predictions):
+        """Log a finished roller on the calling thread and post its result to the Tk thread"""
+        if predictions is None:
+            return
+        inference_tab = getattr(self.app, 'inference_tab', None)
+        if inference_tab is None:
+            return
+        result = inference_tab.record_component_inspection(self.component, predictions)
+        self.app.after(0, lambda: inference_tab.show_component_result(self.component, result))
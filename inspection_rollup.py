@@ -0,0 +1,287 @@
+"""
+Daily Inspection Rollups for WelVision
+Per-day totals and defect counts by roller type and model, maintained on every CSV transfer
+"""
+
+from datetime import datetime, date, timedelta
+
+from mysql.connector import Error
+
+from db_pool import db_pool
+
+ROLLUP_TABLE = "inspection_daily_rollup"
+# One row per (day, model, roller type, session): distinct session counts over any range
+SESSION_DAYS_TABLE = "inspection_session_days"
+
+# Rollup column -> (predictions count column, chart label); BF has no
+# spherical mark / flat line / damage on end classes, those stay 0
+DEFECT_COLUMNS = {
+    'rust_rollers': ('rust_count', "Rust"),
+    'dent_rollers': ('dent_count', "Dent"),
+    'spherical_mark_rollers': ('spherical_mark_count', "Spherical Mark"),
+    'damage_rollers': ('damage_count', "Damage"),
+    'flat_line_rollers': ('flat_line_count', "Flat Line"),
+    'damage_on_end_rollers': ('damage_on_end_count', "Damage On End")
+}
+BF_DEFECT_COLUMNS = ('rust_rollers', 'dent_rollers', 'damage_rollers')
+
+
+def _as_date(value):
+    """Convert 'YYYY-MM-DD[ ...]', date or datetime into a date (None stays None)"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+
+
+class InspectionRollup:
+    """
+    Maintains ``inspection_daily_rollup``: one row per (day, roller type, model).
+
+    Rows are derived from the ``od_predictions`` / ``bf_predictions`` tables,
+    the only place that records both the roller type and per-defect counts of
+    each inspected roller. After a transfer, only the days it touched are
+    recomputed (a range scan on the predictions' timestamp index), so the
+    refresh is idempotent and a retried transfer never double counts. Report
+    queries then read O(days) rollup rows instead of O(sessions) raw rows.
+
+    The rollup's ``sessions`` column counts distinct sessions within its own
+    day, roller type and model only; a session spanning midnight or several
+    roller types appears in more than one row, so the column must not be
+    summed. Session totals are counted from ``inspection_session_days``,
+    which keeps one row per session and day instead.
+
+    The tables are created by the schema bootstrap (db_migrations); this
+    class never runs DDL, and the report queries are read-only.
+    """
+
+    @staticmethod
+    def create_tables(cursor):
+        """Create the rollup tables if missing (schema bootstrap / migration)"""
+        defect_columns = ",\n                ".join(f"{column} INT DEFAULT 0" for column in DEFECT_COLUMNS)
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {ROLLUP_TABLE} (
+                day DATE NOT NULL,
+                roller_type VARCHAR(50) NOT NULL DEFAULT '',
+                model_type CHAR(2) NOT NULL,
+                sessions INT DEFAULT 0,
+                total_inspected INT DEFAULT 0,
+                total_accepted INT DEFAULT 0,
+                total_rejected INT DEFAULT 0,
+                {defect_columns},
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+
+                PRIMARY KEY (day, model_type, roller_type),
+                INDEX idx_roller_day (roller_type, day)
+            )
+        """)
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {SESSION_DAYS_TABLE} (
+                day DATE NOT NULL,
+                roller_type VARCHAR(50) NOT NULL DEFAULT '',
+                model_type CHAR(2) NOT NULL,
+                session_id VARCHAR(100) NOT NULL,
+
+                PRIMARY KEY (day, model_type, roller_type, session_id),
+                INDEX idx_roller_day (roller_type, day)
+            )
+        """)
+
+    def create_schema(self):
+        """Bootstrap step: create the rollup tables on a pooled connection"""
+        with db_pool.connection() as connection:
+            cursor = connection.cursor()
+            try:
+                self.create_tables(cursor)
+            finally:
+                cursor.close()
+        print("✅ Daily inspection rollup tables created/verified")
+        return True
+
+    @staticmethod
+    def _predictions_exist(cursor, table):
+        cursor.execute("SELECT COUNT(*) FROM information_schema.tables "
+                       "WHERE table_schema = DATABASE() AND table_name = %s", (table,))
+        return cursor.fetchone()[0] > 0
+
+    def _rebuild_range(self, cursor, model_type, start, end):
+        """Recompute rollup rows for [start, end) days (None = unbounded) from the predictions"""
+        table = "od_predictions" if model_type == "OD" else "bf_predictions"
+        if not self._predictions_exist(cursor, table):
+            return
+
+        delete_conditions = ["model_type = %s"]
+        delete_params = [model_type]
+        source_conditions = []
+        source_params = []
+        if start is not None:
+            delete_conditions.append("day >= %s")
+            delete_params.append(start)
+            source_conditions.append("timestamp >= %s")
+            source_params.append(start)
+        if end is not None:
+            delete_conditions.append("day < %s")
+            delete_params.append(end)
+            source_conditions.append("timestamp < %s")
+            source_params.append(end)
+
+        defect_sums = []
+        for column, (count_column, _label) in DEFECT_COLUMNS.items():
+            if model_type == "OD" or column in BF_DEFECT_COLUMNS:
+                defect_sums.append(f"SUM({count_column} > 0)")
+            else:
+                defect_sums.append("0")
+        where = " WHERE " + " AND ".join(source_conditions) if source_conditions else ""
+
+        cursor.execute(f"DELETE FROM {ROLLUP_TABLE} WHERE " + " AND ".join(delete_conditions), delete_params)
+        cursor.execute(f"DELETE FROM {SESSION_DAYS_TABLE} WHERE " + " AND ".join(delete_conditions), delete_params)
+        cursor.execute(f"""
+            INSERT INTO {ROLLUP_TABLE}
+                (day, roller_type, model_type, sessions, total_inspected, total_accepted, total_rejected,
+                 {', '.join(DEFECT_COLUMNS)})
+            SELECT DATE(timestamp), COALESCE(roller_type, ''), %s, COUNT(DISTINCT session_id), COUNT(*),
+                   SUM(status = 'ACCEPTED'), SUM(status = 'REJECTED'), {', '.join(defect_sums)}
+            FROM {table}{where}
+            GROUP BY DATE(timestamp), COALESCE(roller_type, '')
+        """, [model_type] + source_params)
+        cursor.execute(f"""
+            INSERT INTO {SESSION_DAYS_TABLE} (day, roller_type, model_type, session_id)
+            SELECT DISTINCT DATE(timestamp), COALESCE(roller_type, ''), %s, session_id
+            FROM {table}{where}
+        """, [model_type] + source_params)
+
+    def refresh_days(self, model_type, days):
+        """
+        Recompute the rollup rows of the given days from the predictions table.
+
+        Args:
+            model_type: 'OD' or 'BF' ('od'/'bf' accepted)
+            days: Iterable of dates or 'YYYY-MM-DD...' strings touched by a transfer
+
+        Returns:
+            tuple: (success: bool, message: str)
+        """
+        model_type = model_type.upper()
+        days = sorted({_as_date(day) for day in days if day})
+        if not days:
+            return True, "No days to refresh"
+
+        try:
+            with db_pool.connection(autocommit=False) as connection:
+                cursor = connection.cursor()
+                try:
+                    # Consecutive days are refreshed as one range
+                    range_start = previous = days[0]
+                    for day in days[1:] + [None]:
+                        if day is not None and day == previous + timedelta(days=1):
+                            previous = day
+                            continue
+                        self._rebuild_range(cursor, model_type, range_start, previous + timedelta(days=1))
+                        range_start = previous = day
+                    connection.commit()
+                except Error:
+                    connection.rollback()
+                    raise
+                finally:
+                    cursor.close()
+            return True, f"Refreshed {len(days)} day(s) of {model_type} rollups"
+
+        except Error as e:
+            print(f"❌ Error refreshing {model_type} rollups: {e}")
+            return False, f"Database error: {e}"
+
+    def rebuild(self):
+        """Recompute every rollup row (e.g. after editing predictions by hand)"""
+        try:
+            with db_pool.connection(autocommit=False) as connection:
+                cursor = connection.cursor()
+                try:
+                    for model_type in ("OD", "BF"):
+                        self._rebuild_range(cursor, model_type, None, None)
+                    connection.commit()
+                except Error:
+                    connection.rollback()
+                    raise
+                finally:
+                    cursor.close()
+            return True, "Rollups rebuilt"
+        except Error as e:
+            print(f"❌ Error rebuilding rollups: {e}")
+            return False, f"Database error: {e}"
+
+    def _query(self, select, model_type, roller_type, start_date, end_date, table=ROLLUP_TABLE):
+        """Run a read-only aggregate over the rollup rows matching the report filters"""
+        conditions = []
+        params = []
+        if model_type:
+            conditions.append("model_type = %s")
+            params.append(model_type.upper())
+        if roller_type:
+            conditions.append("roller_type = %s")
+            params.append(roller_type)
+        start, end = _as_date(start_date), _as_date(end_date)
+        if start is not None:
+            conditions.append("day >= %s")
+            params.append(start)
+        if end is not None:
+            conditions.append("day <= %s")
+            params.append(end)
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+
+        with db_pool.connection() as connection:
+            cursor = connection.cursor(dictionary=True)
+            try:
+                cursor.execute(f"SELECT {select} FROM {table}{where}", params)
+                return cursor.fetchone() or {}
+            finally:
+                cursor.close()
+
+    def get_totals(self, model_type=None, roller_type=None, start_date=None, end_date=None):
+        """
+        Get inspected/accepted/rejected totals for the report filters.
+
+        Args:
+            model_type: 'OD', 'BF' or None for both
+            roller_type: Roller type or None for all
+            start_date, end_date: Inclusive date range
+
+        Returns:
+            dict: 'sessions', 'total_inspected', 'total_accepted', 'total_rejected'
+        """
+        keys = ('total_inspected', 'total_accepted', 'total_rejected')
+        try:
+            row = self._query(", ".join(f"COALESCE(SUM({key}), 0) AS {key}" for key in keys),
+                              model_type, roller_type, start_date, end_date)
+            totals = {key: int(row.get(key) or 0) for key in keys}
+            # Per-day session counts are not additive; count distinct sessions instead
+            row = self._query("COUNT(DISTINCT model_type, session_id) AS sessions",
+                              model_type, roller_type, start_date, end_date, table=SESSION_DAYS_TABLE)
+            totals['sessions'] = int(row.get('sessions') or 0)
+            return totals
+        except Error as e:
+            print(f"❌ Error reading rollup totals: {e}")
+            return {key: 0 for key in ('sessions',) + keys}
+
+    def get_defect_counts(self, model_type=None, roller_type=None, start_date=None, end_date=None):
+        """
+        Get the number of rollers with each defect for the report filters.
+
+        Returns:
+            dict: {chart label: rollers with that defect}, defects that cannot
+                  occur for the selected model are left out
+        """
+        columns = BF_DEFECT_COLUMNS if model_type and model_type.upper() == "BF" else tuple(DEFECT_COLUMNS)
+        try:
+            row = self._query(", ".join(f"COALESCE(SUM({column}), 0) AS {column}" for column in columns),
+                              model_type, roller_type, start_date, end_date)
+            return {DEFECT_COLUMNS[column][1]: int(row.get(column) or 0) for column in columns}
+        except Error as e:
+            print(f"❌ Error reading rollup defect counts: {e}")
+            return {}
+
+
+# Global rollup instance
+inspection_rollup = InspectionRollup()
@@ -0,0 +1,166 @@
+"""
+Live Feed Display Pipeline for WelVision
+Pushes frames from a shared FrameRing onto a Tk canvas with minimal copying
+"""
+
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+from PIL import Image, ImageTk
+
+from config import LIVE_FEED_SIZE, LIVE_FEED_INTERVAL_MS
+
+
+class LiveFeedDisplay:
+    """
+    Renders the newest frame of a FrameRing onto a Tk canvas.
+
+    A worker thread polls the ring's generation counter and does nothing
+    while the frame is unchanged. When a new frame arrives it is resized
+    straight from the shared-memory slot into a preallocated buffer (no full
+    frame copy), converted to a PIL image via the BGR raw decoder (no
+    separate cvtColor pass), and handed to the Tk thread with ``after()``.
+    The Tk thread pastes it into a single PhotoImage that was placed on the
+    canvas once, so no canvas items or PhotoImages are created per frame.
+    """
+
+    STAGES = ("resize", "convert", "paste")
+
+    def __init__(self, canvas, frame_ring, name="feed", size=LIVE_FEED_SIZE,
+                 interval_ms=LIVE_FEED_INTERVAL_MS, timing_window=300):
+        self.canvas = canvas
+        self.frame_ring = frame_ring
+        self.name = name
+        self.size = tuple(size)
+        self.interval = interval_ms / 1000.0
+
+        self.running = False
+        self.thread = None
+
+        self._photo = None
+        self._pending = None
+        self._pending_lock = threading.Lock()
+        self._resized = np.empty((self.size[1], self.size[0], 3), dtype=np.uint8)
+        self._last_generation = 0
+
+        # Per-stage timings (ms) and frame counters
+        self._timings = {stage: deque(maxlen=timing_window) for stage in self.STAGES}
+        self.frames_shown = 0
+        self.frames_unchanged = 0
+        self.frames_dropped = 0
+
+    def start(self):
+        """Create the canvas image once and start the worker thread"""
+        if self.running:
+            return
+        self._photo = ImageTk.PhotoImage(Image.new('RGB', self.size, (0, 0, 0)))
+        self.canvas.create_image(0, 0, anchor="nw", image=self._photo)
+        self.canvas.image = self._photo
+
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=1.0):
+        """Stop the worker thread"""
+        self.running = False
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=timeout)
+        self.thread = None
+
+    def _run(self):
+        """Worker loop: prepare new frames off the Tk thread"""
+        while self.running:
+            try:
+                if not self.canvas.winfo_exists():
+                    break
+                self._prepare_frame()
+            except Exception as e:
+                print(f"{self.name} display error: {e}")
+                break
+            time.sleep(self.interval)
+        self.running = False
+
+    def _prepare_frame(self):
+        """Resize and convert the newest frame if its generation changed"""
+        generation = self.frame_ring.latest_generation()
+        if generation == 0 or generation == self._last_generation:
+            self.frames_unchanged += 1
+            return
+
+        start = time.perf_counter()
+        generation, view, token = self.frame_ring.view_latest()
+        if view is None:
+            return
+        cv2.resize(view, self.size, dst=self._resized)
+        if not self.frame_ring.is_current(token):
+            # Writer recycled the slot while we were resizing; retry next tick
+            self.frames_dropped += 1
+            return
+        resized = time.perf_counter()
+
+        image = Image.frombuffer('RGB', self.size, self._resized, 'raw', 'BGR', 0, 1)
+        converted = time.perf_counter()
+
+        self._timings["resize"].append((resized - start) * 1000)
+        self._timings["convert"].append((converted - resized) * 1000)
+        self._last_generation = generation
+
+        with self._pending_lock:
+            already_scheduled = self._pending is not None
+            if already_scheduled:
+                self.frames_dropped += 1
+            self._pending = image
+
+        if not already_scheduled:
+            self.canvas.after(0, self._present)
+
+    def _present(self):
+        """Tk thread: paste the pending image into the shared PhotoImage"""
+        with self._pending_lock:
+            image = self._pending
+            self._pending = None
+        if image is None or not self.running or self._photo is None:
+            return
+
+        start = time.perf_counter()
+        try:
+            self._photo.paste(image)
+        except Exception as e:
+            print(f"{self.name} display paste error: {e}")
+            return
+        self._timings["paste"].append((time.perf_counter() - start) * 1000)
+        self.frames_shown += 1
+
+    def get_timing_report(self):
+        """
+        Get per-stage display timings.
+
+        Returns:
+            dict: {stage: {'avg_ms', 'max_ms', 'samples'}} plus frame counters
+        """
+        report = {}
+        for stage, samples in self._timings.items():
+            values = list(samples)
+            report[stage] = {
+                'avg_ms': round(sum(values) / len(values), 3) if values else 0.0,
+                'max_ms': round(max(values), 3) if values else 0.0,
+                'samples': len(values)
+            }
+        report['frames_shown'] = self.frames_shown
+        report['frames_unchanged'] = self.frames_unchanged
+        report['frames_dropped'] = self.frames_dropped
+        return report
+
+    def print_timing_report(self):
+        """Print a one-line summary of the display timings"""
+        report = self.get_timing_report()
+        stages = " | ".join(
+            f"{stage} {report[stage]['avg_ms']:.2f}/{report[stage]['max_ms']:.2f} ms"
+            for stage in self.STAGES
+        )
+        print(f"📊 {self.name} display (avg/max): {stages} | shown {report['frames_shown']}, "
+              f"unchanged ticks {report['frames_unchanged']}, dropped {report['frames_dropped']}")
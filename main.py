@@ -6,14 +6,9 @@ Modular implementation with separate tab files
 import tkinter as tk
 import tkinter.ttk as ttk
 import tkinter.messagebox as messagebox
-import cv2
-import PIL.Image, PIL.ImageTk
-from PIL import Image, ImageTk, ImageGrab
-import numpy as np
-import threading
+import os
 import time
-from multiprocessing import Process, Array, Queue, Lock, Value, Manager
-from ultralytics import YOLO
+from multiprocessing import Process, Queue, Lock, Value, Manager
 import snap7
 from snap7.util import set_bool
 from snap7.type import Areas
@@ -24,7 +19,14 @@ import uuid
 # Import configuration and utilities
 from config import *
 from utils import initialize_all_csv
+from frame_ring import FrameRing
+from live_display import LiveFeedDisplay
+from model_loader import model_loader
+from presence_gate import PresenceGate
+from inspection_pipeline import CameraInspection
+from frame_source import configured_source
 from database import db_manager
+from ui_executor import ui_executor
 
 # Import tab modules
 from inference_tab import InferenceTab
@@ -38,7 +40,15 @@ from model_management_tab import ModelManagementTab
 
 class WelVisionApp(tk.Tk):
     def __init__(self):
+        # Startup timings reported once each screen becomes usable
+        self.startup_timings = {}
+        startup_started = time.perf_counter()
+        
+        # Time every Tk callback from the first widget on, then start delivering
+        # background database results to this window's event loop
+        ui_executor.watchdog.install()
         super().__init__()
+        ui_executor.attach(self)
         self.title(APP_TITLE)
         self.geometry(APP_GEOMETRY)
         self.configure(bg=APP_BG_COLOR)
@@ -66,10 +76,11 @@ class WelVisionApp(tk.Tk):
         
         # Camera variables
         self.camera_running = False
-        self.od_thread = None
-        self.bf_thread = None
+        self.od_display = None
+        self.bf_display = None
         self.od_canvas = None
         self.bf_canvas = None
+        self.inspection_pipelines = []
         
         # Inspection status
         self.inspection_running = False
@@ -94,7 +105,14 @@ class WelVisionApp(tk.Tk):
         # Show login page on startup
         print("🔍 Initializing login page...")
         self.show_login_page()
+        self.startup_timings['login_screen_seconds'] = round(time.perf_counter() - startup_started, 2)
         print("✅ Login page should be visible")
+        print(f"⏱️ Login screen usable {self.startup_timings['login_screen_seconds']:.2f} s after start")
+
+    @property
+    def inference_engine(self):
+        """Shared inference engine, None until the background loader has the models warm"""
+        return model_loader.engine
 
     def center_window(self):
         screen_width = self.winfo_screenwidth()
@@ -279,6 +297,8 @@ class WelVisionApp(tk.Tk):
 
     def show_main_interface(self):
         """Show main interface with proper cleanup"""
+        interface_started = time.perf_counter()
+        
         # Stop any running processes first
         self.stop_camera_feeds()
         
@@ -375,6 +395,10 @@ class WelVisionApp(tk.Tk):
         self.update()  # Force update of all pending events
         
         print("✅ Main interface created and window should be visible")
+        self.startup_timings['main_interface_seconds'] = round(time.perf_counter() - interface_started, 2)
+        models_text = "models ready" if model_loader.is_ready() else "models still loading in the background"
+        print(f"⏱️ Main interface usable {self.startup_timings['main_interface_seconds']:.2f} s after login "
+              f"({models_text})")
 
     def initialize_system(self):
         """Initialize system components and models"""
@@ -388,12 +412,15 @@ class WelVisionApp(tk.Tk):
             # Initialize database tables including threshold tracking
             self.initialize_database_tables()
 
-            print("Loading YOLO model...")
-            self.model_bigface = YOLO(MODEL_PATHS["BIGFACE"])
-            self.model_od = YOLO(MODEL_PATHS["OD"])
-
-            self.model_bigface.to('cpu')
-            self.model_od.to('cpu')
+            # Load and warm up the OD/BigFace models off the UI thread; the shared
+            # inference engine (self.inference_engine) appears once they are warm.
+            # Start with the models marked active in Model Management when their files exist.
+            model_paths = {}
+            for camera, active in (('od', db_manager.get_active_od_model()),
+                                   ('bf', db_manager.get_active_bigface_model())):
+                if active and os.path.exists(active['model_path']):
+                    model_paths[camera] = active['model_path']
+            model_loader.start(model_paths)
 
             self.frame_shape = FRAME_SHAPE
 
@@ -409,20 +436,25 @@ class WelVisionApp(tk.Tk):
             self.proximity_count_od = Value('i', 0)
             self.proximity_count_bigface = Value('i', 0)
 
+            # Skip inference on frames captured while no roller is under the camera
+            self.od_presence_gate = PresenceGate("OD", self.proximity_count_od,
+                                                 lambda: self.shared_data.get('od_presence', False))
+            self.bf_presence_gate = PresenceGate("BF", self.proximity_count_bigface,
+                                                 lambda: self.shared_data.get('bigface_presence', False))
+
             self.roller_data_od = self.manager.dict()
             self.roller_queue_od = Queue()
             self.roller_queue_bigface = Queue()
             self.roller_updation_dict = self.manager.dict()
 
-            self.shared_frame_bigface = Array('B', np.zeros(FRAME_SHAPE, dtype=np.uint8).flatten())
-            self.shared_frame_od = Array('B', np.zeros(FRAME_SHAPE, dtype=np.uint8).flatten())
-            self.shared_annotated_bigface = Array('B', np.zeros(FRAME_SHAPE, dtype=np.uint8).flatten())
-            self.shared_annotated_od = Array('B', np.zeros(FRAME_SHAPE, dtype=np.uint8).flatten())
+            # Lock-free frame rings: camera writers never wait for display readers
+            self.shared_frame_bigface = FrameRing(FRAME_SHAPE, FRAME_RING_SLOTS)
+            self.shared_frame_od = FrameRing(FRAME_SHAPE, FRAME_RING_SLOTS)
+            # Annotated frames are only ever shown on the live feed canvases, so they are kept at that size
+            display_shape = (LIVE_FEED_SIZE[1], LIVE_FEED_SIZE[0], 3)
+            self.shared_annotated_bigface = FrameRing(display_shape, FRAME_RING_SLOTS)
+            self.shared_annotated_od = FrameRing(display_shape, FRAME_RING_SLOTS)
 
-            self.frame_lock_bigface = Lock()
-            self.frame_lock_od = Lock()
-            self.annotated_frame_lock_bigface = Lock()
-            self.annotated_frame_lock_od = Lock()
             self.queue_lock = Lock()
             
             # Load current threshold values from database
@@ -435,42 +467,14 @@ class WelVisionApp(tk.Tk):
             print(f"System initialization error: {e}")
 
     def initialize_database_tables(self):
-        """Initialize database tables for roller management and threshold tracking"""
+        """Create or upgrade the database schema (no DDL when the recorded schema version is current)"""
         try:
-            # Create roller table
-            success = db_manager.create_roller_table()
+            from db_migrations import bootstrap_schema
+            success, message, seconds = bootstrap_schema()
             if success:
-                self.update_status("✅ Roller informations table created/verified")
-            else:
-                self.update_status("⚠️ Warning: Roller database initialization failed")
-            
-            # Create roller specifications table
-            specs_success = db_manager.create_roller_specifications_table()
-            if specs_success:
-                print("✅ Roller specifications table initialized successfully")
-            else:
-                print("⚠️ Warning: Roller specifications table initialization failed")
-            
-            # Create threshold tracking tables
-            threshold_success = db_manager.create_threshold_tables()
-            if threshold_success:
-                print("✅ Threshold tracking tables initialized successfully")
+                self.update_status(f"✅ Database schema ready ({seconds * 1000:.0f} ms)")
             else:
-                print("⚠️ Warning: Threshold tracking initialization failed")
-            
-            # Create model management table
-            model_success = db_manager.create_model_management_table()
-            if model_success:
-                print("✅ Model management table initialized successfully")
-            else:
-                print("⚠️ Warning: Model management table initialization failed")
-            
-            # Create inspection session tables
-            session_success = db_manager.create_inspection_session_tables()
-            if session_success:
-                print("✅ Inspection session tables initialized successfully")
-            else:
-                print("⚠️ Warning: Inspection session tables initialization failed")
+                self.update_status(f"⚠️ Warning: Database schema setup failed: {message}")
                 
         except Exception as e:
             print(f"Database initialization error: {e}")
@@ -572,93 +576,71 @@ class WelVisionApp(tk.Tk):
             print(f"Error collecting slider values: {e}")
 
     def start_camera_feeds(self):
-        """Start camera feed threads with proper error handling"""
+        """Start live feed displays for the Inference tab canvases"""
         try:
             self.stop_camera_feeds()  # Stop any existing feeds first
             self.camera_running = True
             
-            if hasattr(self, 'inference_tab') and hasattr(self.inference_tab, 'od_canvas'):
-                self.od_canvas = self.inference_tab.od_canvas
-                self.od_thread = threading.Thread(target=self.update_od_camera, daemon=True)
-                self.od_thread.start()
+            if self.od_canvas is not None and hasattr(self, 'shared_annotated_od'):
+                self.od_display = LiveFeedDisplay(self.od_canvas, self.shared_annotated_od, name="OD")
+                self.od_display.start()
             
-            if hasattr(self, 'inference_tab') and hasattr(self.inference_tab, 'bf_canvas'):
-                self.bf_canvas = self.inference_tab.bf_canvas
-                self.bf_thread = threading.Thread(target=self.update_bf_camera, daemon=True)
-                self.bf_thread.start()
+            if self.bf_canvas is not None and hasattr(self, 'shared_annotated_bigface'):
+                self.bf_display = LiveFeedDisplay(self.bf_canvas, self.shared_annotated_bigface, name="BF")
+                self.bf_display.start()
                 
         except Exception as e:
             print(f"Error starting camera feeds: {e}")
 
+    def start_inspection_pipelines(self):
+        """Start capture -> infer -> annotate -> decide pipelines for both inspection cameras"""
+        self.stop_inspection_pipelines()
+        for component, camera_key, raw_ring, annotated_ring, gate in (
+                ('od', "OD", self.shared_frame_od, self.shared_annotated_od, self.od_presence_gate),
+                ('bf', "BF", self.shared_frame_bigface, self.shared_annotated_bigface, self.bf_presence_gate)):
+            try:
+                # Live camera, or the stand-in configured in FRAME_SOURCES
+                source = configured_source(camera_key, f"{camera_key} inspection",
+                                           frame_shape=raw_ring.frame_shape, fps=PIPELINE_TARGET_FPS)
+            except ValueError as e:
+                print(f"❌ {camera_key} inspection not started: {e}")
+                continue
+            inspection = CameraInspection(self, component, source, raw_ring, annotated_ring, gate)
+            if inspection.start():
+                self.inspection_pipelines.append(inspection)
+
+    def stop_inspection_pipelines(self):
+        """Stop the inspection pipelines and release their cameras"""
+        for inspection in self.inspection_pipelines:
+            try:
+                inspection.stop()
+            except Exception as e:
+                print(f"Error stopping {inspection.label} inspection pipeline: {e}")
+        self.inspection_pipelines = []
+
     def stop_camera_feeds(self):
-        """Stop camera feed threads safely"""
+        """Stop live feed displays safely"""
         try:
             self.camera_running = False
             
-            if hasattr(self, 'od_thread') and self.od_thread and self.od_thread.is_alive():
-                self.od_thread.join(timeout=1.0)
-            
-            if hasattr(self, 'bf_thread') and self.bf_thread and self.bf_thread.is_alive():
-                self.bf_thread.join(timeout=1.0)
+            for attr in ('od_display', 'bf_display'):
+                display = getattr(self, attr, None)
+                if display:
+                    display.stop()
+                    display.print_timing_report()
+                    setattr(self, attr, None)
                 
         except Exception as e:
             print(f"Error stopping camera feeds: {e}")
 
-    def update_od_camera(self):
-        """Update OD camera feed with error handling"""
-        while self.camera_running:
-            try:
-                if not hasattr(self, 'shared_annotated_od') or not hasattr(self, 'annotated_frame_lock_od'):
-                    time.sleep(0.1)
-                    continue
-                    
-                if self.od_canvas and self.od_canvas.winfo_exists():
-                    with self.annotated_frame_lock_od:
-                        np_frame = np.frombuffer(self.shared_annotated_od.get_obj(), dtype=np.uint8).reshape(FRAME_SHAPE)
-                        frame = np_frame.copy()
-
-                    resized_frame = cv2.resize(frame, (400, 250))
-                    img = PIL.Image.fromarray(cv2.cvtColor(resized_frame, cv2.COLOR_BGR2RGB))
-                    imgtk = PIL.ImageTk.PhotoImage(image=img)
-
-                    self.od_canvas.create_image(0, 0, anchor=tk.NW, image=imgtk)
-                    self.od_canvas.image = imgtk
-                else:
-                    break
-                    
-                time.sleep(0.03)
-                
-            except Exception as e:
-                print(f"OD camera error: {e}")
-                break
-
-    def update_bf_camera(self):
-        """Update BF camera feed with error handling"""
-        while self.camera_running:
-            try:
-                if not hasattr(self, 'shared_annotated_bigface') or not hasattr(self, 'annotated_frame_lock_bigface'):
-                    time.sleep(0.1)
-                    continue
-                    
-                if self.bf_canvas and self.bf_canvas.winfo_exists():
-                    with self.annotated_frame_lock_bigface:
-                        np_frame = np.frombuffer(self.shared_annotated_bigface.get_obj(), dtype=np.uint8).reshape(FRAME_SHAPE)
-                        frame = np_frame.copy()
-
-                    resized_frame = cv2.resize(frame, (400, 250))
-                    img = PIL.Image.fromarray(cv2.cvtColor(resized_frame, cv2.COLOR_BGR2RGB))
-                    imgtk = PIL.ImageTk.PhotoImage(image=img)
-
-                    self.bf_canvas.create_image(0, 0, anchor=tk.NW, image=imgtk)
-                    self.bf_canvas.image = imgtk
-                else:
-                    break
-                    
-                time.sleep(0.03)
-                
-            except Exception as e:
-                print(f"BF camera error: {e}")
-                break
+    def get_display_timings(self):
+        """Get per-stage timings of the live feed displays"""
+        timings = {}
+        for name, attr in (('OD', 'od_display'), ('BF', 'bf_display')):
+            display = getattr(self, attr, None)
+            if display:
+                timings[name] = display.get_timing_report()
+        return timings
 
     # Roller management methods
     def get_entry_value(self, field):
@@ -812,14 +794,19 @@ class WelVisionApp(tk.Tk):
             messagebox.showerror("Error", "Please select a roller to load.")
             return
         
+        # Extract roller ID from the selected TreeView item
+        item = self.tree.item(selected[0])
+        values = item['values']
+        roller_id = values[0]  # ID is always the first column
+        
+        # Fetch complete roller data from database using the ID (on a ui_executor worker)
+        ui_executor.submit(db_manager.get_roller_by_id, roller_id, key="app.read_roller",
+                           on_success=lambda roller: self._show_read_roller(roller_id, roller),
+                           on_error=self._on_read_roller_error)
+
+    def _show_read_roller(self, roller_id, roller):
+        """Fill the form with the fetched roller record"""
         try:
-            # Extract roller ID from the selected TreeView item
-            item = self.tree.item(selected[0])
-            values = item['values']
-            roller_id = values[0]  # ID is always the first column
-            
-            # Fetch complete roller data from database using the ID
-            roller = db_manager.get_roller_by_id(roller_id)
             if not roller:
                 messagebox.showerror("Error", "Roller not found in database.")
                 return
@@ -838,10 +825,13 @@ class WelVisionApp(tk.Tk):
             self.update_status(f"Loaded roller ID: {roller_id}")
             
         except Exception as e:
-            # Handle any unexpected errors during the read operation
-            error_msg = f"Error loading roller: {e}"
-            messagebox.showerror("Error", error_msg)
-            self.update_status(error_msg)
+            self._on_read_roller_error(e)
+
+    def _on_read_roller_error(self, e):
+        # Handle any unexpected errors during the read operation
+        error_msg = f"Error loading roller: {e}"
+        messagebox.showerror("Error", error_msg)
+        self.update_status(error_msg)
 
     def update_roller(self):
         """
@@ -1026,43 +1016,49 @@ class WelVisionApp(tk.Tk):
         This method is called after any CRUD operation to ensure
         the display reflects the current database state.
         
+        The records are read on a ui_executor worker; the TreeView is
+        refilled on the Tk thread once they arrive, and a newer refresh
+        supersedes one still in flight.
+        
         Returns:
             None: Updates TreeView display directly
         """
-        try:
-            # Safety check: Ensure TreeView widget exists
-            if not self.tree:
-                return
-                
-            # Clear existing data from TreeView to prevent duplicates
-            for item in self.tree.get_children():
-                self.tree.delete(item)
-            
-            # Fetch all roller records from database
-            rollers = db_manager.get_all_rollers()
-            
-            # Populate TreeView with roller data (global limits system - no per-roller specifications)
-            # Each roller dictionary contains: id, name, roller_type, diameter, thickness, length
-            for roller in rollers:
-                # Use 'name' field if roller_type is empty, or roller_type if name is empty
-                display_name = roller['roller_type'] or roller['name'] or "N/A"
-                
-                self.tree.insert("", tk.END, values=(
-                    roller['id'],  # Primary key for database operations
-                    display_name,  # Display name from either name or roller_type field
-                    roller['diameter'],  # Numeric value from database
-                    roller['thickness'],  # Numeric value from database
-                    roller['length']  # Numeric value from database
-                ))
-            
-            # Update status bar with loading confirmation
-            self.update_status(f"Loaded {len(rollers)} rollers from database")
+        # Safety check: Ensure TreeView widget exists
+        if not self.tree:
+            return
+        
+        # Fetch all roller records from database in the background
+        ui_executor.submit(db_manager.get_all_rollers, key="app.rollers",
+                           on_success=self._show_roller_data, on_error=self._on_roller_data_error)
+
+    def _show_roller_data(self, rollers):
+        """Fill the TreeView with the fetched roller records"""
+        # Clear existing data from TreeView to prevent duplicates
+        for item in self.tree.get_children():
+            self.tree.delete(item)
+        
+        # Populate TreeView with roller data (global limits system - no per-roller specifications)
+        # Each roller dictionary contains: id, name, roller_type, diameter, thickness, length
+        for roller in rollers:
+            # Use 'name' field if roller_type is empty, or roller_type if name is empty
+            display_name = roller['roller_type'] or roller['name'] or "N/A"
             
-        except Exception as e:
-            # Handle database connection or data retrieval errors
-            error_msg = f"Error loading roller data: {e}"
-            messagebox.showerror("Error", error_msg)
-            self.update_status(error_msg)
+            self.tree.insert("", tk.END, values=(
+                roller['id'],  # Primary key for database operations
+                display_name,  # Display name from either name or roller_type field
+                roller['diameter'],  # Numeric value from database
+                roller['thickness'],  # Numeric value from database
+                roller['length']  # Numeric value from database
+            ))
+        
+        # Update status bar with loading confirmation
+        self.update_status(f"Loaded {len(rollers)} rollers from database")
+
+    def _on_roller_data_error(self, e):
+        # Handle database connection or data retrieval errors
+        error_msg = f"Error loading roller data: {e}"
+        messagebox.showerror("Error", error_msg)
+        self.update_status(error_msg)
 
     def update_roller_types_dropdown(self):
         """No longer needed - roller type is now a text input box instead of dropdown"""
@@ -1410,8 +1406,25 @@ class WelVisionApp(tk.Tk):
             # Unbind all event handlers
             self.unbind_all("<Return>")
             
-            # Stop camera feeds
+            # Stop camera feeds and the inspection pipelines
             self.stop_camera_feeds()
+            self.stop_inspection_pipelines()
+
+            # Stop the inference engine
+            if self.inference_engine:
+                self.inference_engine.stop()
+
+            # Flush queued prediction records, snapshot session counters and
+            # close the session event log
+            from prediction_tracker import prediction_tracker
+            from roller_inspection_logger import roller_logger
+            prediction_tracker.close()
+            roller_logger.close()
+            
+            # Drop pending background reads, then close idle pooled database connections
+            ui_executor.shutdown()
+            from db_pool import db_pool
+            db_pool.close_all()
             
             # Clean up processes
             if hasattr(self, 'processes'):
@@ -1459,16 +1472,9 @@ class WelVisionApp(tk.Tk):
             self.settings_tab = SettingsTab(self.settings_frame, self, read_only=read_only_mode)
             
             self.data_tab = DataTab(self.data_frame, self)
+            # Session and prediction tables are part of the schema bootstrap
             self.initialize_database_tables()
             
-            # Initialize roller inspection logger and create database tables
-            from roller_inspection_logger import roller_logger
-            try:
-                roller_logger._create_database_tables()
-                print("✅ Roller inspection logger initialized with separate OD/BF tables")
-            except Exception as e:
-                print(f"⚠️ Warning: Could not initialize roller inspection logger: {e}")
-            
             self.diagnosis_tab = DiagnosisTab(self.diagnosis_frame, self)
             self.model_preview_tab = ModelPreviewTab(self.model_preview_frame, self)
             self.model_management_tab = ModelManagementTab(self.model_management_frame, self)
@@ -0,0 +1,228 @@
+"""
+Background Model Loader for WelVision
+Loads and warms up the OD and BigFace models off the UI thread so the main
+interface is usable while the weights are still loading, and hot-swaps
+the models the operator selects while inspection keeps running
+"""
+
+import os
+import threading
+import time
+
+from config import MODEL_PATHS
+from inference_engine import InferenceEngine
+from model_registry import model_registry
+
+# Readiness states exposed to the Inference tab
+STATE_IDLE = "idle"
+STATE_LOADING = "loading"
+STATE_READY = "ready"
+STATE_FAILED = "failed"
+
+
+class ModelLoader:
+    """
+    Loads the inspection models on a daemon thread and reports readiness.
+
+    Models come from the model registry, which loads each weights file with
+    ``load_backend`` and runs warm-up passes on a blank full-resolution
+    camera frame, so lazy initialisation (ONNX Runtime graph optimisation,
+    PyTorch fusing, allocator growth) is paid here instead of on the first
+    inspected roller. The InferenceEngine is published only once every
+    model is warm; until then ``engine`` is None and ``state`` tells the UI
+    whether to keep waiting or give up.
+
+    ``switch_model`` later loads another weights file the same way and
+    swaps it into the running engine between frames.
+    """
+
+    def __init__(self, model_paths=None, registry=model_registry):
+        """
+        Args:
+            model_paths: dict mapping camera name ('od', 'bf') to weights path
+            registry: ModelRegistry providing warm, cached models
+        """
+        self.model_paths = dict(model_paths or {'od': MODEL_PATHS["OD"], 'bf': MODEL_PATHS["BIGFACE"]})
+        self.registry = registry
+
+        self.state = STATE_IDLE
+        self.error = None
+        self.models = {}
+        self.engine = None
+        self.timings = {}
+        self._thread = None
+        self._lock = threading.Lock()
+        self._listeners = []
+
+        # Background model switches: camera -> request generation (latest wins) and target path
+        self._switch_generations = {}
+        self._switch_targets = {}
+        self.switching = set()
+        self.switch_error = None
+
+    def is_ready(self):
+        """True once every model is loaded, warmed up and the engine is running"""
+        return self.state == STATE_READY
+
+    def add_listener(self, callback):
+        """
+        Call ``callback(loader)`` when loading finishes (immediately if it already has).
+
+        The callback runs on the loader thread: it may store references but
+        must not touch Tk widgets (poll ``state`` from the UI instead).
+        """
+        with self._lock:
+            if self.state not in (STATE_READY, STATE_FAILED):
+                self._listeners.append(callback)
+                return
+        callback(self)
+
+    def start(self, model_paths=None):
+        """
+        Start loading in the background (no-op while loading or once ready).
+
+        Args:
+            model_paths: Optional camera -> weights path overrides
+
+        Returns:
+            bool: True if a new load was started
+        """
+        with self._lock:
+            if self.state in (STATE_LOADING, STATE_READY):
+                return False
+            if model_paths:
+                self.model_paths.update(model_paths)
+            self.state = STATE_LOADING
+            self.error = None
+            self._thread = threading.Thread(target=self._load, name="model-loader", daemon=True)
+            self._thread.start()
+        print(f"🧠 Loading {len(self.model_paths)} model(s) in the background...")
+        return True
+
+    def wait(self, timeout=None):
+        """Block until loading finishes; returns True if the models are ready"""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        return self.is_ready()
+
+    def _load(self):
+        started = time.perf_counter()
+        models = {}
+        timings = {}
+        engine = None
+        try:
+            # The registry keys models by file hash, so cameras with the same weights share one
+            for camera, path in self.model_paths.items():
+                model, info = self.registry.acquire(path)
+                self.registry.pin(camera, info['hash'])
+                models[camera] = model
+                if not info['cached']:
+                    timings[camera] = {'load_seconds': info['load_seconds'], 'warmup_ms': info['warmup_ms']}
+
+            engine = InferenceEngine(models)
+            engine.start()
+        except Exception as e:
+            if engine is not None:
+                engine.stop()
+            with self._lock:
+                self.state = STATE_FAILED
+                self.error = str(e)
+                listeners, self._listeners = self._listeners, []
+            print(f"❌ Model loading failed: {e}")
+        else:
+            timings['total_seconds'] = round(time.perf_counter() - started, 2)
+            with self._lock:
+                self.models = models
+                self.engine = engine
+                self.timings = timings
+                self.state = STATE_READY
+                listeners, self._listeners = self._listeners, []
+            print(f"⏱️ Models ready for inspection after {timings['total_seconds']:.2f} s")
+
+        for callback in listeners:
+            try:
+                callback(self)
+            except Exception as e:
+                print(f"⚠️ Model loader listener error: {e}")
+
+    def switch_model(self, camera, path):
+        """
+        Load ``path`` in the background and swap it into the engine for ``camera``.
+
+        Inspection keeps running on the current model until the new one is
+        warm; the engine then swaps between frames. Recently used weights
+        are still resident in the registry, so switching back is immediate.
+        If the operator switches again before a load finishes, only the
+        latest request is applied. Selecting the weights already running
+        (or already being loaded) does nothing.
+
+        Args:
+            camera: 'od' or 'bf'
+            path: Weights file of the selected model
+
+        Returns:
+            bool: True if a switch was started
+        """
+        with self._lock:
+            current = self._switch_targets[camera] if camera in self.switching else self.model_paths.get(camera)
+            if current == path:
+                return False
+            generation = self._switch_generations.get(camera, 0) + 1
+            self._switch_generations[camera] = generation
+            self._switch_targets[camera] = path
+            self.switching.add(camera)
+            self.switch_error = None
+        print(f"🔁 Switching {camera.upper()} model to {os.path.basename(path)} in the background...")
+        threading.Thread(target=self._switch, args=(camera, path, generation),
+                         name=f"model-switch-{camera}", daemon=True).start()
+        return True
+
+    def _switch(self, camera, path, generation):
+        # Switches made during the startup load apply on top of it
+        self.wait()
+        if self._switch_generations.get(camera) != generation:
+            return  # superseded while waiting, skip loading
+        try:
+            # Warm up on the engine worker, so inspection keeps the CPU threads to itself
+            model, info = self.registry.acquire(path, engine=self.engine)
+        except Exception as e:
+            with self._lock:
+                if self._switch_generations.get(camera) == generation:
+                    self.switching.discard(camera)
+                    self.switch_error = f"{camera.upper()}: {e}"
+            print(f"❌ Could not load {camera.upper()} model {path}: {e}")
+            return
+
+        with self._lock:
+            if self._switch_generations.get(camera) != generation:
+                return  # superseded by a newer selection
+            self.model_paths[camera] = path
+            self.models[camera] = model
+            self.registry.pin(camera, info['hash'])
+            if self.engine is not None:
+                self.engine.swap_model(camera, model)
+            self.switching.discard(camera)
+        source = "resident" if info['cached'] else f"loaded in {info['load_seconds']:.2f} s"
+        print(f"✅ {camera.upper()} model switched to {os.path.basename(path)} ({source})")
+
+    def get_stats(self):
+        """
+        Get loading and first-inference figures.
+
+        Returns:
+            dict: state, error, per-model load/warm-up timings, the engine's
+                  first real inference latency (ms, None until it happens),
+                  pending switches and registry figures
+        """
+        stats = {'state': self.state, 'error': self.error}
+        stats.update(self.timings)
+        stats['first_inference_ms'] = self.engine.first_inference_ms if self.engine else None
+        stats['switching'] = sorted(self.switching)
+        stats['switch_error'] = self.switch_error
+        stats['registry'] = self.registry.get_stats()
+        return stats
+
+
+# Global model loader instance
+model_loader = ModelLoader()
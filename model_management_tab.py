@@ -6,10 +6,16 @@ Handles uploading, listing, and managing AI models for inference
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import os
+import json
 import shutil
 from datetime import datetime
 import threading
 from database import db_manager
+from ui_executor import ui_executor
+from inference_backends import export_onnx, onnx_path_for
+from model_quantization import quantize_model, format_report
+from model_loader import model_loader
+from config import ONNX_EXPORT_ON_UPLOAD
 
 # UI Constants
 APP_BG_COLOR = "#0a2158"
@@ -139,14 +145,14 @@ class ModelManagementTab:
         table_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
         
         # Define columns
-        columns = ("ID", "Name", "Type", "Model Path", "Upload Date", "Uploaded By", "Active")
+        columns = ("ID", "Name", "Type", "Model Path", "Upload Date", "Uploaded By", "Active", "Precision")
         
         self.model_tree = ttk.Treeview(table_frame, columns=columns, show="headings", height=12)
         
         # Configure column headings and widths
         column_widths = {
             "ID": 50, "Name": 150, "Type": 80, "Model Path": 300,
-            "Upload Date": 120, "Uploaded By": 100, "Active": 60
+            "Upload Date": 120, "Uploaded By": 100, "Active": 60, "Precision": 70
         }
         
         for col in columns:
@@ -199,6 +205,10 @@ class ModelManagementTab:
                  bg=BUTTON_COLOR, fg="white", command=self.view_model_details, 
                  width=15, height=2).pack(side=tk.LEFT, padx=5)
         
+        tk.Button(left_frame, text="Quantize INT8", font=("Arial", 12, "bold"),
+                 bg=WARNING_COLOR, fg="black", command=self.quantize_selected_model, 
+                 width=15, height=2).pack(side=tk.LEFT, padx=5)
+        
         # Right side buttons
         right_frame = tk.Frame(action_frame, bg=APP_BG_COLOR)
         right_frame.pack(side=tk.RIGHT)
@@ -263,6 +273,11 @@ class ModelManagementTab:
             
             dest_path = os.path.join(dest_dir, f"{model_name}_{file_name}")
             
+            # An export left by a previous upload under the same name belongs to the old weights
+            stale_onnx_path = onnx_path_for(dest_path)
+            if stale_onnx_path != dest_path and os.path.exists(stale_onnx_path):
+                os.remove(stale_onnx_path)
+            
             # Copy file
             shutil.copy2(source_path, dest_path)
             
@@ -290,6 +305,10 @@ class ModelManagementTab:
                 self.refresh_model_list()
                 self.update_status("Model uploaded successfully")
                 
+                # PyTorch weights also get an ONNX export for the ONNX Runtime backend
+                if ONNX_EXPORT_ON_UPLOAD and dest_path.lower().endswith(('.pt', '.pth')):
+                    self.export_onnx_in_background(dest_path)
+                
                 # Refresh model dropdowns in inference tab if it exists
                 if hasattr(self.app, 'inference_tab'):
                     self.app.inference_tab.refresh_model_dropdowns()
@@ -304,58 +323,71 @@ class ModelManagementTab:
             messagebox.showerror("Error", f"Upload failed: {e}")
             self.update_status("Upload failed")
     
+    def export_onnx_in_background(self, weights_path):
+        """Export uploaded weights to ONNX next to the file on a dedicated thread"""
+        self.update_status("Exporting model to ONNX...")
+        ui_executor.submit_long(export_onnx, weights_path, name="onnx-export",
+                                on_success=lambda onnx_path: self.update_status(
+                                    f"ONNX export ready: {os.path.basename(onnx_path)}"),
+                                on_error=lambda e: self.update_status(f"ONNX export failed, PyTorch will be used: {e}"))
+    
     def refresh_model_list(self):
-        """Refresh the model list from database"""
-        try:
-            self.update_status("Loading models...")
-            
-            # Clear existing items
-            for item in self.model_tree.get_children():
-                self.model_tree.delete(item)
-            
-            # Get filter
-            filter_type = self.filter_var.get()
-            
-            # Get models from database based on filter
-            all_models = []
-            
-            if filter_type == "ALL" or filter_type == "OD":
-                od_models = db_manager.get_od_models()
-                for model in od_models:
-                    model['model_type'] = 'OD'
-                all_models.extend(od_models)
-            
-            if filter_type == "ALL" or filter_type == "BIGFACE":
-                bf_models = db_manager.get_bigface_models()
-                for model in bf_models:
-                    model['model_type'] = 'BIGFACE'
-                all_models.extend(bf_models)
+        """Refresh the model list from database (read on a worker, shown when ready)"""
+        self.update_status("Loading models...")
+        ui_executor.submit(self._fetch_models, self.filter_var.get(), key="models.refresh",
+                           on_success=self._populate_model_list, on_error=self._on_model_list_error)
+    
+    @staticmethod
+    def _fetch_models(filter_type):
+        """Read the models matching the type filter (runs on a worker thread)"""
+        all_models = []
+        
+        if filter_type == "ALL" or filter_type == "OD":
+            od_models = db_manager.get_od_models()
+            for model in od_models:
+                model['model_type'] = 'OD'
+            all_models.extend(od_models)
+        
+        if filter_type == "ALL" or filter_type == "BIGFACE":
+            bf_models = db_manager.get_bigface_models()
+            for model in bf_models:
+                model['model_type'] = 'BIGFACE'
+            all_models.extend(bf_models)
+        
+        return all_models
+    
+    def _populate_model_list(self, all_models):
+        """Show the fetched models in the table"""
+        # Clear existing items
+        for item in self.model_tree.get_children():
+            self.model_tree.delete(item)
+        
+        # Populate table
+        for model in all_models:
+            upload_date = model['upload_date'].strftime("%Y-%m-%d %H:%M") if model['upload_date'] else "N/A"
             
-            # Populate table
-            for model in all_models:
-                upload_date = model['upload_date'].strftime("%Y-%m-%d %H:%M") if model['upload_date'] else "N/A"
-                
-                values = (
-                    model['id'],
-                    model['model_name'],
-                    model['model_type'],
-                    model['model_path'],
-                    upload_date,
-                    model['uploaded_by'] or "N/A",
-                    "✅" if model['is_active'] else "❌"
-                )
-                
-                item = self.model_tree.insert("", tk.END, values=values)
-                
-                # Highlight active models
-                if model['is_active']:
-                    self.model_tree.set(item, "Active", "✅ ACTIVE")
+            values = (
+                model['id'],
+                model['model_name'],
+                model['model_type'],
+                model['model_path'],
+                upload_date,
+                model['uploaded_by'] or "N/A",
+                "✅" if model['is_active'] else "❌",
+                model.get('model_precision') or "FP32"
+            )
             
-            self.update_status(f"Loaded {len(all_models)} models")
+            item = self.model_tree.insert("", tk.END, values=values)
             
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load models: {e}")
-            self.update_status("Failed to load models")
+            # Highlight active models
+            if model['is_active']:
+                self.model_tree.set(item, "Active", "✅ ACTIVE")
+        
+        self.update_status(f"Loaded {len(all_models)} models")
+    
+    def _on_model_list_error(self, e):
+        messagebox.showerror("Error", f"Failed to load models: {e}")
+        self.update_status("Failed to load models")
     
     def apply_filter(self):
         """Apply model type filter"""
@@ -398,7 +430,11 @@ class ModelManagementTab:
                     success, message = False, "Invalid model type"
                 
                 if success:
-                    messagebox.showinfo("Success", f"Model '{model_name}' is now active!")
+                    # Swap the running model in the background (inspection keeps going)
+                    model_loader.switch_model('od' if model_type == "OD" else 'bf', values[3])
+                    
+                    messagebox.showinfo("Success", f"Model '{model_name}' is now active!\n\n"
+                                                   "It will be used for inference as soon as it has loaded.")
                     self.refresh_model_list()
                     self.update_status(f"Model '{model_name}' activated")
                     
@@ -447,6 +483,10 @@ class ModelManagementTab:
                         if os.path.exists(model_path):
                             os.remove(model_path)
                             print(f"🗑️ Deleted model file: {model_path}")
+                        onnx_path = onnx_path_for(model_path)
+                        if onnx_path != model_path and os.path.exists(onnx_path):
+                            os.remove(onnx_path)
+                            print(f"🗑️ Deleted ONNX export: {onnx_path}")
                     except Exception as file_err:
                         print(f"⚠️ Warning: Could not delete model file: {file_err}")
                     
@@ -463,22 +503,98 @@ class ModelManagementTab:
         except Exception as e:
             messagebox.showerror("Error", f"Deletion failed: {e}")
     
+    def quantize_selected_model(self):
+        """Create an INT8 variant of the selected model, calibrated on a folder of roller images"""
+        model_id = self.get_selected_model_id()
+        if not model_id:
+            return
+        
+        values = self.model_tree.item(self.model_tree.selection()[0])['values']
+        model_name, model_type, model_path = values[1], values[2], values[3]
+        if str(values[7]) == "INT8":
+            messagebox.showinfo("Quantize", f"Model '{model_name}' is already INT8")
+            return
+        
+        calibration_dir = filedialog.askdirectory(title="Select folder of calibration roller images")
+        if not calibration_dir:
+            return
+        
+        employee_id = getattr(self.app, 'current_user', 'SYSTEM')
+        self.update_status(f"Quantizing '{model_name}' to INT8, this can take a few minutes...")
+        # Minutes of work: a dedicated thread, so the UI executor's workers stay free for refreshes
+        ui_executor.submit_long(self._quantize_and_register, model_id, model_name, model_type, model_path,
+                                calibration_dir, employee_id, name="model-quantize",
+                                on_success=self._on_model_quantized, on_error=self._on_quantize_error)
+    
+    @staticmethod
+    def _quantize_and_register(model_id, model_name, model_type, model_path, calibration_dir, employee_id):
+        """Quantize, compare with FP32 and store the variant as a new model row (runs on its own thread)"""
+        int8_path, report = quantize_model(model_path, calibration_dir)
+        
+        upload = db_manager.upload_od_model if model_type == "OD" else db_manager.upload_bigface_model
+        int8_name = f"{model_name}_int8"
+        success, message = upload(model_name=int8_name, model_path=int8_path, uploaded_by=employee_id,
+                                  set_active=False, model_precision="INT8", base_model_id=model_id,
+                                  quantization_report=report)
+        if not success:
+            if os.path.exists(int8_path):
+                os.remove(int8_path)
+            raise RuntimeError(message)
+        return int8_name, report
+    
+    def _on_model_quantized(self, result):
+        int8_name, report = result
+        self.refresh_model_list()
+        self.update_status(f"INT8 model '{int8_name}' added")
+        messagebox.showinfo("INT8 Model Ready",
+                            f"Model '{int8_name}' was added (not active).\n\n{format_report(report)}\n\n"
+                            "Use 'Set as Active' to switch to it if the accuracy cost is acceptable.")
+        
+        # Refresh model dropdowns in inference tab if it exists
+        if hasattr(self.app, 'inference_tab'):
+            self.app.inference_tab.refresh_model_dropdowns()
+    
+    def _on_quantize_error(self, e):
+        messagebox.showerror("Error", f"Quantization failed: {e}")
+        self.update_status("Quantization failed")
+    
     def view_model_details(self):
-        """View detailed information about the selected model"""
+        """
+        View detailed information about the selected model.
+        
+        The model record (for the quantization report) is read on a
+        ui_executor worker; the window opens once it arrives.
+        """
         model_id = self.get_selected_model_id()
         if not model_id:
             return
         
+        # Get model details from the current selection
+        selection = self.model_tree.selection()[0]
+        values = self.model_tree.item(selection)['values']
+        ui_executor.submit(self._fetch_model_record, values[2], model_id, key="models.details",
+                           on_success=lambda record: self._show_model_details(model_id, values, record),
+                           on_error=lambda e: messagebox.showerror("Error", f"Failed to load model details: {e}"))
+    
+    @staticmethod
+    def _fetch_model_record(model_type, model_id):
+        """Find a model's database record (worker thread; lists are served from the reference cache)"""
+        models = db_manager.get_od_models() if model_type == "OD" else db_manager.get_bigface_models()
+        return next((model for model in models if model['id'] == model_id), None) or {}
+    
+    def _show_model_details(self, model_id, values, record):
+        """Open the details window for a model"""
         try:
-            # Get model details from the current selection
-            selection = self.model_tree.selection()[0]
-            values = self.model_tree.item(selection)['values']
             model_name = values[1]
             model_type = values[2]
             model_path = values[3]
             upload_date = values[4]
             uploaded_by = values[5]
             is_active = values[6]
+            precision = values[7]
+            
+            # Quantization report of INT8 variants
+            report = record.get('quantization_report')
             
             # Create details window
             details_window = tk.Toplevel(self.parent)
@@ -513,7 +629,15 @@ Uploaded By: {uploaded_by}
 Status
 {'=' * 50}
 Active: {is_active}
+Precision: {precision}
             """
+            if report:
+                report = json.loads(report) if isinstance(report, (str, bytes)) else report
+                info += f"""
+Quantization (vs base model ID {record.get('base_model_id')})
+{'=' * 50}
+{format_report(report)}
+"""
             
             details_text.config(state=tk.NORMAL)
             details_text.insert(tk.END, info.strip())
@@ -5,6 +5,12 @@ import cv2
 from PIL import Image, ImageTk, ImageDraw, ImageFont
 import threading
 import time
+from config import FRAME_SOURCES, PIPELINE_TARGET_FPS
+from pipeline import Pipeline
+from camera_registry import camera_registry
+from frame_source import configured_source
+from ui_executor import ui_executor
+from detections import as_detections, draw_detections
 
 class ModelPreviewTab:
     def __init__(self, parent, app_instance):
@@ -12,18 +18,24 @@ class ModelPreviewTab:
         self.app = app_instance
         self.preview_running = False
         
-        # Initialize webcam variables
+        # Frame sources of the preview feeds (live cameras or FRAME_SOURCES stand-ins)
         self.bf_camera = None
         self.od_camera = None
-        self.available_cameras = []
+        self.available_cameras = [0]  # Until discovery finishes
+        self.cameras_detecting = False
+        
+        # Staged preview pipelines and the newest frame waiting for the Tk thread, per camera
+        self.preview_pipelines = {}
+        self._pending_display = {}
+        self._pending_lock = threading.Lock()
         
         # Camera selection checkboxes
         self.od_camera_enabled = tk.BooleanVar(value=True)  # Default OD enabled
         self.bf_camera_enabled = tk.BooleanVar(value=True)  # Default BF enabled
         self.both_cameras_enabled = tk.BooleanVar(value=False)  # Default both disabled
         
-        self.detect_available_cameras()
         self.setup_tab()
+        self.detect_available_cameras()
     
     def setup_tab(self):
         # Create main container with scrollable capability
@@ -329,21 +341,37 @@ class ModelPreviewTab:
         self.parent.after(100, update_bf_placeholder)
         self.parent.after(100, update_od_placeholder)
     
-    def detect_available_cameras(self):
-        """Detect available cameras on the system"""
-        self.available_cameras = []
-        
-        # Test cameras 0 through 4 (most systems won't have more than 5 cameras)
-        for i in range(5):
-            cap = cv2.VideoCapture(i)
-            if cap.isOpened():
-                ret, frame = cap.read()
-                if ret:
-                    self.available_cameras.append(i)
-                cap.release()
-        
+    def detect_available_cameras(self, force=False):
+        """
+        Detect available cameras through the shared camera registry.
+        
+        Discovery runs on a ui_executor worker (cached results come back
+        immediately, probing happens in parallel with a timeout) and the
+        camera controls are rebuilt on the Tk thread when it finishes.
+        
+        Args:
+            force: Re-probe the hardware even if cached results are fresh
+        """
+        self.cameras_detecting = True
+        if hasattr(self, 'camera_status_label'):
+            self.camera_status_label.config(text="Detecting cameras...")
+        ui_executor.submit(camera_registry.discover, force, key="cameras.discover",
+                           on_success=self.on_cameras_detected,
+                           on_error=self.on_camera_detection_failed)
+    
+    def on_cameras_detected(self, devices):
+        """Tk thread: apply discovery results to the camera selection controls"""
+        self.cameras_detecting = False
+        self.available_cameras = sorted(index for index, device in devices.items() if device['available'])
         if not self.available_cameras:
             self.available_cameras = [0]  # Default fallback
+        self.setup_camera_selection_controls()
+    
+    def on_camera_detection_failed(self, error):
+        """Tk thread: keep the current camera list if discovery failed"""
+        self.cameras_detecting = False
+        print(f"❌ Camera detection failed: {error}")
+        self.setup_camera_selection_controls()
     
     def setup_camera_selection_controls(self):
         """Setup checkboxes for camera selection"""
@@ -402,7 +430,10 @@ class ModelPreviewTab:
         status_frame = tk.Frame(self.camera_checkbox_frame, bg="#0a2158")
         status_frame.pack(side=tk.RIGHT, padx=10)
         
-        status_text = f"Available: {len(self.available_cameras)} camera(s) detected"
+        if self.cameras_detecting:
+            status_text = "Detecting cameras..."
+        else:
+            status_text = f"Available: {len(self.available_cameras)} camera(s) detected"
         self.camera_status_label = tk.Label(status_frame, 
                                            text=status_text,
                                            font=("Arial", 9), fg="lightgray", bg="#0a2158")
@@ -430,9 +461,7 @@ class ModelPreviewTab:
             return
         
         print("🔄 Refreshing camera list...")
-        self.detect_available_cameras()
-        self.setup_camera_selection_controls()
-        print(f"✅ Found {len(self.available_cameras)} camera(s)")
+        self.detect_available_cameras(force=True)
     
     def start_preview(self):
         """Start the model preview with live camera feeds"""
@@ -448,85 +477,59 @@ class ModelPreviewTab:
             # Initialize cameras based on selection
             if self.both_cameras_enabled.get():
                 # Use separate cameras for OD and BF
-                if len(self.available_cameras) >= 2:
-                    try:
-                        self.od_camera = cv2.VideoCapture(0)
-                        if not self.od_camera.isOpened():
-                            print("❌ Error: Camera 0 (OD) failed to open!")
-                            return
-                        
-                        self.bf_camera = cv2.VideoCapture(1)
-                        if not self.bf_camera.isOpened():
-                            print("❌ Error: Camera 1 (BF) failed to open!")
-                            self.od_camera.release()
-                            self.od_camera = None
-                            return
-                        
-                        # Set camera properties for better performance
-                        for camera in [self.od_camera, self.bf_camera]:
-                            camera.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-                            camera.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-                            camera.set(cv2.CAP_PROP_FPS, 30)
-                        
-                        print("📷 Using Camera 0 for OD and Camera 1 for BF")
-                        
-                    except Exception as e:
-                        print(f"❌ Error initializing dual cameras: {str(e)}")
-                        return
-                else:
+                if len(self.available_cameras) < 2 and not any(FRAME_SOURCES.values()):
                     print("❌ Two cameras required for dual camera mode!")
                     return
+                self.od_camera = self.open_preview_camera('od', 0)
+                if self.od_camera is None:
+                    return
+                self.bf_camera = self.open_preview_camera('bf', 1)
+                if self.bf_camera is None:
+                    self.release_preview_camera('od')
+                    return
+                print("📷 Using Camera 0 for OD and Camera 1 for BF")
             
             elif self.od_camera_enabled.get():
-                try:
-                    self.od_camera = cv2.VideoCapture(0)
-                    if not self.od_camera.isOpened():
-                        print("❌ Error: Camera 0 (OD) failed to open!")
-                        return
-                    
-                    self.od_camera.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-                    self.od_camera.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-                    self.od_camera.set(cv2.CAP_PROP_FPS, 30)
-                    
-                    print("📷 Using Camera 0 for OD feed")
-                except:
-                    print("❌ Camera 0 not available for OD feed!")
+                self.od_camera = self.open_preview_camera('od', 0)
+                if self.od_camera is None:
                     return
+                print("📷 Using Camera 0 for OD feed")
             
             elif self.bf_camera_enabled.get():
-                try:
-                    self.bf_camera = cv2.VideoCapture(1 if len(self.available_cameras) > 1 else 0)
-                    if not self.bf_camera.isOpened():
-                        print("❌ Error: Camera 1 (BF) failed to open!")
-                        return
-                    
-                    self.bf_camera.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-                    self.bf_camera.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-                    self.bf_camera.set(cv2.CAP_PROP_FPS, 30)
-                    
-                    print("📷 Using Camera 1 for BF feed")
-                except:
-                    print("❌ Camera 1 not available for BF feed!")
+                index = 1 if len(self.available_cameras) > 1 else 0
+                self.bf_camera = self.open_preview_camera('bf', index)
+                if self.bf_camera is None:
                     return
+                print(f"📷 Using Camera {index} for BF feed")
             
         except Exception as e:
             print(f"❌ Camera initialization error: {str(e)}")
+            self.release_preview_camera('od')
+            self.release_preview_camera('bf')
             return
         
+        # Presence gate statistics cover this preview run
+        for gate_name in ('od_presence_gate', 'bf_presence_gate'):
+            gate = getattr(self.app, gate_name, None)
+            if gate is not None:
+                gate.reset_stats()
+        
         # Start preview
         self.preview_running = True
         self.start_preview_btn.config(state="disabled")
         self.stop_preview_btn.config(state="normal")
         
-        # Start camera threads
+        # Start one staged pipeline per camera
         if self.bf_camera:
-            threading.Thread(target=self.run_bf_preview, daemon=True).start()
+            self.preview_pipelines['bf'] = self.build_preview_pipeline('bf')
+            self.preview_pipelines['bf'].start()
             self.bf_prediction_status.config(text="● RUNNING", fg="#00ff00")
         else:
             self.bf_prediction_status.config(text="● DISABLED", fg="#6c757d")
         
         if self.od_camera:
-            threading.Thread(target=self.run_od_preview, daemon=True).start()
+            self.preview_pipelines['od'] = self.build_preview_pipeline('od')
+            self.preview_pipelines['od'].start()
             self.od_prediction_status.config(text="● RUNNING", fg="#00ff00")
         else:
             self.od_prediction_status.config(text="● DISABLED", fg="#6c757d")
@@ -537,174 +540,169 @@ class ModelPreviewTab:
         """Stop the model preview and release cameras"""
         self.preview_running = False
         
-        # Release cameras
+        # Stop the pipelines before their cameras are released
+        for pipeline in self.preview_pipelines.values():
+            pipeline.stop()
+            pipeline.print_report()
+        self.preview_pipelines = {}
+        with self._pending_lock:
+            self._pending_display.clear()
+        
+        # Stop the grabbers and release cameras
         if self.bf_camera:
-            self.bf_camera.release()
-            self.bf_camera = None
+            self.bf_camera.print_report()
+            self.release_preview_camera('bf')
             self.bf_prediction_status.config(text="● READY", fg="#ffc107")
         
         if self.od_camera:
-            self.od_camera.release()
-            self.od_camera = None
+            self.od_camera.print_report()
+            self.release_preview_camera('od')
             self.od_prediction_status.config(text="● READY", fg="#ffc107")
         
         # Update UI
         self.start_preview_btn.config(state="normal")
         self.stop_preview_btn.config(state="disabled")
         
+        # Report how many frames skipped inference because no roller was present
+        for gate_name in ('od_presence_gate', 'bf_presence_gate'):
+            gate = getattr(self.app, gate_name, None)
+            if gate is not None:
+                gate.print_report()
+        
         print("⏹️ Model preview stopped - webcam released")
     
-    def run_bf_preview(self):
-        if self.bf_camera is None:
-            return  # BF camera not enabled
-            
-        while self.preview_running and self.bf_camera and self.bf_camera.isOpened():
-            try:
-                ret, frame = self.bf_camera.read()
-                if not ret:
-                    print("❌ BF Camera: Failed to read frame")
-                    time.sleep(0.1)
-                    continue
-                
-                # Get threshold from app settings
-                threshold = getattr(self.app, 'bf_conf_threshold', 0.25)
-                
-                # Run YOLO inference if model is available
-                if hasattr(self.app, 'model_bf') and self.app.model_bf:
-                    try:
-                        results = self.app.model_bf(frame, conf=threshold, verbose=False)
-                        
-                        # Process results
-                        annotated_frame = frame.copy()
-                        max_confidence = 0
-                        
-                        for result in results:
-                            if result.boxes is not None and len(result.boxes) > 0:
-                                for box in result.boxes:
-                                    confidence = float(box.conf[0])
-                                    max_confidence = max(max_confidence, confidence)
-                                    
-                                    # Draw bounding boxes
-                                    x1, y1, x2, y2 = box.xyxy[0].int().tolist()
-                                    color = (0, 255, 0) if confidence >= threshold else (0, 0, 255)
-                                    cv2.rectangle(annotated_frame, (x1, y1), (x2, y2), color, 2)
-                                    
-                                    # Add confidence text
-                                    label = f"BF: {confidence:.2f}"
-                                    cv2.putText(annotated_frame, label, (x1, y1-10), 
-                                              cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
-                        
-                        # Update status indicator
-                        if max_confidence > 0:
-                            if max_confidence >= threshold:
-                                status = "ACCEPTED"
-                                status_color = "#00ff00"
-                            else:
-                                status = "REJECTED"
-                                status_color = "#ff0000"
-                            
-                            self.parent.after(0, lambda s=status, c=status_color: 
-                                             self.bf_prediction_status.config(text=f"● {s}", fg=c))
-                        
-                        # Convert and display the frame
-                        processed_frame = self.process_frame_for_display(annotated_frame)
-                        self.parent.after(0, lambda img=processed_frame: self.update_bf_canvas(img))
-                        
-                    except Exception as model_error:
-                        # Fallback: show raw camera feed
-                        processed_frame = self.process_frame_for_display(frame)
-                        self.parent.after(0, lambda img=processed_frame: self.update_bf_canvas(img))
-                        print(f"BF Model inference error: {model_error}")
-                
-                else:
-                    # No model available - show raw camera feed
-                    processed_frame = self.process_frame_for_display(frame)
-                    self.parent.after(0, lambda img=processed_frame: self.update_bf_canvas(img))
-                
-                time.sleep(0.03)  # ~30 FPS
-                
-            except Exception as e:
-                print(f"BF Preview error: {e}")
-                break
+    def open_preview_camera(self, component, index):
+        """
+        Open the frame source of a preview feed.
+        
+        A live camera is claimed in the camera registry and read through a
+        LatestFrameGrabber, so inference always gets the newest frame; a
+        stand-in configured in FRAME_SOURCES replaces the camera entirely.
+        
+        Returns:
+            FrameSource or None if the camera is in use elsewhere or failed to open
+        """
+        try:
+            source = configured_source(component.upper(), f"{component.upper()} preview", camera_index=index,
+                                       frame_shape=(480, 640, 3), fps=PIPELINE_TARGET_FPS)
+        except ValueError as e:
+            print(f"❌ {component.upper()} preview source: {e}")
+            return None
+        return source if source.start() else None
     
-    def run_od_preview(self):
-        if self.od_camera is None:
-            return  # OD camera not enabled
-            
-        while self.preview_running and self.od_camera and self.od_camera.isOpened():
+    def release_preview_camera(self, component):
+        """Stop a preview feed's frame source (hands a camera back to the registry)"""
+        attribute = f"{component}_camera"
+        source = getattr(self, attribute)
+        if source is None:
+            return
+        source.stop()
+        setattr(self, attribute, None)
+    
+    def build_preview_pipeline(self, component):
+        """
+        Build the capture -> infer -> annotate -> display pipeline of one preview camera.
+        
+        Each stage runs on its own thread with a one-frame latest-wins queue,
+        so a slow inference never delays capture and the canvas always gets
+        the newest annotated frame. Capture is paced by the frame source (the
+        camera itself, capped at PIPELINE_TARGET_FPS, or a stand-in's fps)
+        instead of a fixed sleep; a camera's LatestFrameGrabber hands out the
+        frame captured after the request, never one that sat in the driver
+        buffer.
+        """
+        camera = self.od_camera if component == 'od' else self.bf_camera
+        label = component.upper()
+        
+        def capture():
+            if not (self.preview_running and camera.isOpened()):
+                raise StopIteration
+            grabbed = camera.read()
+            if grabbed is None:
+                print(f"❌ {label} Camera: Failed to read frame")
+                time.sleep(0.1)
+                return None
+            return {'frame': grabbed.frame, 'seq': grabbed.seq, 'capture_time': grabbed.capture_time,
+                    'predictions': None}
+        
+        return Pipeline(f"{label} preview", capture, [
+            ("infer", lambda item: self.infer_preview_frame(component, item)),
+            ("annotate", lambda item: self.annotate_preview_frame(component, item)),
+            ("display", lambda item: self.display_preview_frame(component, item))
+        ])
+    
+    def infer_preview_frame(self, component, item):
+        """Pipeline stage: run the shared engine on frames with a roller present"""
+        engine = getattr(self.app, 'inference_engine', None)
+        gate = getattr(self.app, f"{component}_presence_gate", None)
+        if gate is not None and not gate.should_infer(item['capture_time']):
+            # No roller under the camera: leave the CPU to the other camera
+            return item
+        
+        if engine and engine.has_model(component):
+            threshold = getattr(self.app, f"{component}_conf_threshold", 0.25)
             try:
-                # Small delay to avoid camera conflicts (only needed when sharing cameras)
-                if self.bf_camera == self.od_camera:
-                    time.sleep(0.02)
-                ret, frame = self.od_camera.read()
-                if not ret:
-                    print("❌ OD Camera: Failed to read frame")
-                    time.sleep(0.1)
-                    continue
-                
-                # Get threshold from app settings
-                threshold = getattr(self.app, 'od_conf_threshold', 0.25)
-                
-                # Run YOLO inference if model is available
-                if hasattr(self.app, 'model_od') and self.app.model_od:
-                    try:
-                        results = self.app.model_od(frame, conf=threshold, verbose=False)
-                        
-                        # Process results
-                        annotated_frame = frame.copy()
-                        max_confidence = 0
-                        
-                        for result in results:
-                            if result.boxes is not None and len(result.boxes) > 0:
-                                for box in result.boxes:
-                                    confidence = float(box.conf[0])
-                                    max_confidence = max(max_confidence, confidence)
-                                    
-                                    # Draw bounding boxes
-                                    x1, y1, x2, y2 = box.xyxy[0].int().tolist()
-                                    color = (0, 255, 0) if confidence >= threshold else (0, 0, 255)
-                                    cv2.rectangle(annotated_frame, (x1, y1), (x2, y2), color, 2)
-                                    
-                                    # Add confidence text
-                                    label = f"OD: {confidence:.2f}"
-                                    cv2.putText(annotated_frame, label, (x1, y1-10), 
-                                              cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
-                        
-                        # Update status indicator
-                        if max_confidence > 0:
-                            if max_confidence >= threshold:
-                                status = "ACCEPTED"
-                                status_color = "#00ff00"
-                            else:
-                                status = "REJECTED"
-                                status_color = "#ff0000"
-                            
-                            self.parent.after(0, lambda s=status, c=status_color: 
-                                             self.od_prediction_status.config(text=f"● {s}", fg=c))
-                        
-                        # Convert and display the frame
-                        processed_frame = self.process_frame_for_display(annotated_frame)
-                        self.parent.after(0, lambda img=processed_frame: self.update_od_canvas(img))
-                        
-                    except Exception as model_error:
-                        # Fallback: show raw camera feed
-                        processed_frame = self.process_frame_for_display(frame)
-                        self.parent.after(0, lambda img=processed_frame: self.update_od_canvas(img))
-                        print(f"OD Model inference error: {model_error}")
-                
+                # Shared engine batches this frame with the other camera's
+                item['predictions'] = engine.infer(component, item['frame'], conf=threshold, timeout=5.0)
+            except Exception as model_error:
+                # Fallback: the raw camera feed is shown
+                print(f"{component.upper()} Model inference error: {model_error}")
+        return item
+    
+    def annotate_preview_frame(self, component, item):
+        """Pipeline stage: draw detections, work out the status and prepare the canvas image"""
+        predictions = item['predictions']
+        threshold = getattr(self.app, f"{component}_conf_threshold", 0.25)
+        item['status'] = None
+        if predictions is not None:
+            predictions = as_detections(predictions)
+            max_confidence = predictions.max_confidence()
+            if max_confidence > 0:
+                if max_confidence >= threshold:
+                    item['status'] = ("ACCEPTED", "#00ff00")
                 else:
-                    # No model available - show raw camera feed
-                    processed_frame = self.process_frame_for_display(frame)
-                    self.parent.after(0, lambda img=processed_frame: self.update_od_canvas(img))
-                
-                time.sleep(0.03)  # ~30 FPS
-                
-            except Exception as e:
-                print(f"OD Preview error: {e}")
-                break
+                    item['status'] = ("REJECTED", "#ff0000")
+            
+            camera = self.od_camera if component == 'od' else self.bf_camera
+            if camera is not None:
+                camera.record_decision(item['capture_time'])
+        
+        # Boxes are drawn on the downscaled canvas image, never on a full-resolution copy
+        item['image'] = self.process_frame_for_display(item['frame'], predictions, threshold, component.upper())
+        return item
+    
+    def display_preview_frame(self, component, item):
+        """Pipeline stage: hand the newest image to the Tk thread (one pending update per camera)"""
+        with self._pending_lock:
+            already_scheduled = component in self._pending_display
+            self._pending_display[component] = item
+        if not already_scheduled:
+            self.parent.after(0, lambda: self.show_pending_frame(component))
+        return item
     
-    def process_frame_for_display(self, frame):
-        """Convert OpenCV frame to PIL Image for display in canvas"""
+    def show_pending_frame(self, component):
+        """Tk thread: paint the newest prepared frame and status of a camera"""
+        with self._pending_lock:
+            item = self._pending_display.pop(component, None)
+        if item is None or not self.preview_running:
+            return
+        
+        status_label = self.od_prediction_status if component == 'od' else self.bf_prediction_status
+        if item['status']:
+            status, status_color = item['status']
+            status_label.config(text=f"● {status}", fg=status_color)
+        
+        if component == 'od':
+            self.update_od_canvas(item['image'])
+        else:
+            self.update_bf_canvas(item['image'])
+    
+    def process_frame_for_display(self, frame, detections=None, threshold=0.25, label=""):
+        """
+        Convert OpenCV frame to PIL Image for display in canvas.
+        
+        Detections (in frame pixels) are scaled and drawn onto the resized image.
+        """
         try:
             # Resize frame to fit canvas
             height, width = frame.shape[:2]
@@ -717,6 +715,9 @@ class ModelPreviewTab:
             
             # Resize frame
             resized_frame = cv2.resize(frame, (new_width, new_height))
+            if detections:
+                draw_detections(resized_frame, detections, threshold, label, scale=scale,
+                                font_scale=0.4, thickness=1)
             
             # Convert BGR to RGB
             rgb_frame = cv2.cvtColor(resized_frame, cv2.COLOR_BGR2RGB)
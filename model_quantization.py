@@ -0,0 +1,225 @@
+"""
+INT8 Post-Training Quantization for WelVision
+Quantizes an uploaded model with ONNX Runtime static quantization on calibration roller images
+and compares the INT8 variant against FP32 for accuracy and CPU latency
+"""
+
+import os
+import time
+
+import numpy as np
+
+from config import QUANT_CALIBRATION_IMAGES, QUANT_EVAL_FRACTION, QUANT_MATCH_IOU
+from inference_backends import OnnxRuntimeBackend, export_onnx, onnx_path_for
+from inference_engine import load_recorded_frames
+
+
+def int8_path_for(model_path):
+    """Path of the INT8 variant of a model (same folder, '_int8' suffix)"""
+    return os.path.splitext(model_path)[0] + "_int8.onnx"
+
+
+def _split_frames(frames, eval_fraction):
+    """Hold out every n-th image for the comparison; small folders use all images for both"""
+    if len(frames) < 10 or not eval_fraction:
+        return frames, frames
+    step = max(2, int(round(1 / eval_fraction)))
+    evaluation = frames[::step]
+    calibration = [frame for index, frame in enumerate(frames) if index % step]
+    return calibration, evaluation
+
+
+class _CalibrationReader:
+    """Feeds letterboxed calibration frames to quantize_static, one image per batch"""
+
+    def __init__(self, backend, frames):
+        self.backend = backend
+        self.frames = iter(frames)
+
+    def get_next(self):
+        frame = next(self.frames, None)
+        if frame is None:
+            return None
+        image, _, _ = self.backend._letterbox(frame)
+        return {self.backend.input_name: self.backend._to_tensor([image])}
+
+    def rewind(self):
+        pass
+
+
+def _copy_metadata(source_path, target_path):
+    """Keep the exporter's metadata (class names, stride, imgsz) on the quantized model"""
+    import onnx
+
+    source = onnx.load(source_path, load_external_data=False)
+    target = onnx.load(target_path)
+    existing = {prop.key for prop in target.metadata_props}
+    missing = [prop for prop in source.metadata_props if prop.key not in existing]
+    if missing:
+        for prop in missing:
+            target.metadata_props.add(key=prop.key, value=prop.value)
+        onnx.save(target, target_path)
+
+
+def _box_iou(a, b):
+    ix1, iy1 = max(a[0], b[0]), max(a[1], b[1])
+    ix2, iy2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0, ix2 - ix1) * max(0, iy2 - iy1)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def _compare_detections(reference, candidate, iou_threshold):
+    """Greedy same-class IoU matching of candidate detections against the reference"""
+    matched = 0
+    confidence_deltas = []
+    unused = list(candidate)
+    for ref in reference:
+        best, best_iou = None, iou_threshold
+        for cand in unused:
+            if cand['class_name'] != ref['class_name']:
+                continue
+            iou = _box_iou(ref['box'], cand['box'])
+            if iou >= best_iou:
+                best, best_iou = cand, iou
+        if best is not None:
+            unused.remove(best)
+            matched += 1
+            confidence_deltas.append(abs(best['confidence'] - ref['confidence']))
+    return matched, confidence_deltas
+
+
+def _measure(backend, frames, conf):
+    """Per-frame predictions and latencies (ms) after one warm-up pass"""
+    backend.predict(frames[:1], conf)
+    predictions, latencies = [], []
+    for frame in frames:
+        start = time.perf_counter()
+        predictions.append(backend.predict([frame], conf)[0])
+        latencies.append((time.perf_counter() - start) * 1000)
+    return predictions, latencies
+
+
+def compare_models(fp32_path, int8_path, frames, conf=0.25, iou_threshold=QUANT_MATCH_IOU):
+    """
+    Accuracy and latency of an INT8 model relative to its FP32 original.
+
+    FP32 detections are the reference: recall is the share of them the INT8
+    model reproduces (same class, IoU >= iou_threshold), precision the share
+    of INT8 detections that match one. ``decision_agreement`` is the share
+    of frames on which both models detect the same set of classes, i.e. would
+    accept/reject the roller the same way.
+
+    Returns:
+        dict: accuracy, latency and size figures
+    """
+    fp32 = OnnxRuntimeBackend(fp32_path)
+    int8 = OnnxRuntimeBackend(int8_path)
+    fp32_predictions, fp32_latencies = _measure(fp32, frames, conf)
+    int8_predictions, int8_latencies = _measure(int8, frames, conf)
+
+    matched = reference_total = candidate_total = same_decision = 0
+    confidence_deltas = []
+    for reference, candidate in zip(fp32_predictions, int8_predictions):
+        frame_matched, deltas = _compare_detections(reference, candidate, iou_threshold)
+        matched += frame_matched
+        confidence_deltas.extend(deltas)
+        reference_total += len(reference)
+        candidate_total += len(candidate)
+        if {p['class_name'] for p in reference} == {p['class_name'] for p in candidate}:
+            same_decision += 1
+
+    fp32_ms = float(np.median(fp32_latencies))
+    int8_ms = float(np.median(int8_latencies))
+    return {
+        'eval_images': len(frames),
+        'recall_vs_fp32': round(matched / reference_total, 4) if reference_total else 1.0,
+        'precision_vs_fp32': round(matched / candidate_total, 4) if candidate_total else 1.0,
+        'decision_agreement': round(same_decision / len(frames), 4) if frames else 0.0,
+        'mean_confidence_delta': round(float(np.mean(confidence_deltas)), 4) if confidence_deltas else 0.0,
+        'fp32_latency_ms': round(fp32_ms, 2),
+        'int8_latency_ms': round(int8_ms, 2),
+        'speedup': round(fp32_ms / int8_ms, 2) if int8_ms else 0.0,
+        'fp32_size_mb': round(os.path.getsize(fp32_path) / 1e6, 2),
+        'int8_size_mb': round(os.path.getsize(int8_path) / 1e6, 2)
+    }
+
+
+def quantize_model(model_path, calibration_dir, limit=QUANT_CALIBRATION_IMAGES, eval_fraction=QUANT_EVAL_FRACTION):
+    """
+    Produce an INT8 variant of a model and compare it with FP32.
+
+    .pt weights are exported to ONNX first. Quantization is static
+    (QDQ format, per-channel INT8 weights, UINT8 activations calibrated
+    with MinMax on the roller images), which ONNX Runtime executes with
+    integer kernels on CPU. Part of the images is held out to compare the
+    variant with the FP32 model.
+
+    Args:
+        model_path: Uploaded model (.pt or .onnx)
+        calibration_dir: Folder of representative roller images
+        limit: Max images to read from the folder
+        eval_fraction: Share of images held out for the comparison
+
+    Returns:
+        tuple: (int8_path: str, report: dict)
+    """
+    from onnxruntime.quantization import CalibrationMethod, QuantFormat, QuantType, quantize_static
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    frames = load_recorded_frames(calibration_dir, limit)
+    if not frames:
+        raise ValueError(f"No calibration images found in {calibration_dir}")
+    calibration, evaluation = _split_frames(frames, eval_fraction)
+
+    fp32_path = model_path if model_path.lower().endswith(".onnx") else onnx_path_for(model_path)
+    if not os.path.exists(fp32_path):
+        fp32_path = export_onnx(model_path)
+    int8_path = int8_path_for(model_path)
+    prepared_path = os.path.splitext(int8_path)[0] + "_prep.onnx"
+
+    start = time.perf_counter()
+    try:
+        quant_pre_process(fp32_path, prepared_path, skip_symbolic_shape=True)
+        reader = _CalibrationReader(OnnxRuntimeBackend(fp32_path), calibration)
+        quantize_static(prepared_path, int8_path, reader, quant_format=QuantFormat.QDQ,
+                        activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8,
+                        per_channel=True, calibrate_method=CalibrationMethod.MinMax)
+    finally:
+        if os.path.exists(prepared_path):
+            os.remove(prepared_path)
+    _copy_metadata(fp32_path, int8_path)
+    quantize_seconds = time.perf_counter() - start
+
+    report = compare_models(fp32_path, int8_path, evaluation)
+    report.update(calibration_images=len(calibration), quantize_seconds=round(quantize_seconds, 1),
+                  calibration_dir=calibration_dir)
+    print(f"✅ INT8 model {os.path.basename(int8_path)}: {report['speedup']}x faster, "
+          f"recall {report['recall_vs_fp32']:.1%} / precision {report['precision_vs_fp32']:.1%} vs FP32")
+    return int8_path, report
+
+
+def format_report(report):
+    """Human-readable summary of a quantization report"""
+    return (f"Latency (median): FP32 {report['fp32_latency_ms']} ms → INT8 {report['int8_latency_ms']} ms "
+            f"({report['speedup']}x)\n"
+            f"Size: {report['fp32_size_mb']} MB → {report['int8_size_mb']} MB\n"
+            f"Detections reproduced (recall vs FP32): {report['recall_vs_fp32']:.1%}\n"
+            f"INT8 detections matching FP32 (precision): {report['precision_vs_fp32']:.1%}\n"
+            f"Same accept/reject classes: {report['decision_agreement']:.1%} of frames\n"
+            f"Mean confidence change: {report['mean_confidence_delta']:.3f}\n"
+            f"Images: {report.get('calibration_images', '?')} calibration, {report['eval_images']} evaluation")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Quantize a model to INT8 and compare it with FP32")
+    parser.add_argument("model_path", help=".pt weights or .onnx model")
+    parser.add_argument("calibration_dir", help="Folder of calibration roller images")
+    parser.add_argument("--limit", type=int, default=QUANT_CALIBRATION_IMAGES)
+    args = parser.parse_args()
+
+    path, result = quantize_model(args.model_path, args.calibration_dir, limit=args.limit)
+    print(path)
+    print(format_report(result))
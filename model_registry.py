@@ -0,0 +1,189 @@
+"""
+Loaded Model Registry for WelVision
+Size-bounded LRU of loaded, warmed-up detectors keyed by weights file hash
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import TimeoutError
+
+import numpy as np
+
+from config import FRAME_SHAPE, MODEL_CACHE_MAX_MODELS, MODEL_WARMUP_PASSES, MODEL_WARMUP_TIMEOUT
+from inference_backends import backend_source, load_backend
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ModelRegistry:
+    """
+    Keeps recently used detectors resident so switching back costs nothing.
+
+    Models are keyed by the SHA-256 of their weights file, so the same
+    weights uploaded twice (or under another name) are loaded once, and a
+    file replaced in place is reloaded. When the backend would load an
+    ONNX export instead, the export's hash is part of the key, so a
+    model cached before its export was (re)written is not served after. Hashes are remembered per
+    (path, size, mtime) so a cache hit does not re-read the file. Each model
+    is warmed up on a blank camera frame before it is handed out. At most
+    ``max_models`` are kept; the least recently used one is dropped first,
+    except models marked in use by ``pin`` (the ones the engine is running).
+    """
+
+    def __init__(self, max_models=MODEL_CACHE_MAX_MODELS, warmup_passes=MODEL_WARMUP_PASSES,
+                 frame_shape=FRAME_SHAPE):
+        """
+        Args:
+            max_models: Loaded models kept resident
+            warmup_passes: Forward passes on a dummy frame after loading
+            frame_shape: Shape of the dummy frame (camera resolution)
+        """
+        self.max_models = max_models
+        self.warmup_passes = warmup_passes
+        self.frame_shape = frame_shape
+
+        self._models = OrderedDict()   # hash -> model, least recently used first
+        self._hashes = {}              # (abspath, size, mtime_ns) -> hash
+        self._pinned = {}              # owner (e.g. camera) -> hash
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def weights_hash(self, path):
+        """Content hash of a weights file, cached per (path, size, mtime)"""
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            digest = self._hashes.get(key)
+        if digest is None:
+            digest = file_sha256(path)
+            with self._lock:
+                self._hashes[key] = digest
+        return digest
+
+    def model_key(self, path):
+        """Cache key of a weights file: its hash, plus the hash of the export the backend would load"""
+        digest = self.weights_hash(path)
+        source = backend_source(path)
+        if source != path:
+            digest = f"{digest}+{self.weights_hash(source)}"
+        return digest
+
+    def _warm_up(self, model):
+        """Run the warm-up passes; returns per-pass latencies in ms"""
+        frame = np.zeros(self.frame_shape, dtype=np.uint8)
+        latencies = []
+        for _ in range(self.warmup_passes):
+            start = time.perf_counter()
+            model.predict([frame])
+            latencies.append((time.perf_counter() - start) * 1000)
+        return latencies
+
+    def _lookup(self, digest):
+        with self._lock:
+            model = self._models.get(digest)
+            if model is not None:
+                self._models.move_to_end(digest)
+                self._stats['hits'] += 1
+            return model
+
+    def acquire(self, path, engine=None):
+        """
+        Return a warm model for a weights file, loading it on a miss.
+
+        Blocks while loading, so call it from a background thread.
+
+        Args:
+            path: Weights file
+            engine: Running InferenceEngine, if any; the warm-up passes then
+                    run on its worker between batches instead of competing
+                    with inspection for the CPU threads
+
+        Returns:
+            tuple: (model, info) where info holds 'hash', 'cached' and, for
+                   a fresh load, 'load_seconds' and 'warmup_ms'
+
+        Raises:
+            TimeoutError: The warm-up on the engine worker did not finish
+                          within MODEL_WARMUP_TIMEOUT (the model is not cached)
+        """
+        digest = self.model_key(path)
+        model = self._lookup(digest)
+        if model is not None:
+            return model, {'hash': digest, 'cached': True}
+
+        # One load at a time: a second request for the same weights finds them cached
+        with self._load_lock:
+            model = self._lookup(digest)
+            if model is not None:
+                return model, {'hash': digest, 'cached': True}
+
+            start = time.perf_counter()
+            model = load_backend(path)
+            load_seconds = time.perf_counter() - start
+            if engine is not None:
+                model.configure_threads(engine.num_threads)
+                future = engine.run_exclusive(self._warm_up, model)
+                try:
+                    warmup = future.result(timeout=MODEL_WARMUP_TIMEOUT)
+                except TimeoutError:
+                    future.cancel()  # Still queued: the worker skips it
+                    raise TimeoutError(f"warm-up of {os.path.basename(path)} did not finish "
+                                       f"within {MODEL_WARMUP_TIMEOUT:.0f} s") from None
+            else:
+                warmup = self._warm_up(model)
+
+            with self._lock:
+                self._stats['misses'] += 1
+                self._models[digest] = model
+                self._evict()
+
+        warm_text = f", warm-up {warmup[0]:.0f} → {warmup[-1]:.0f} ms" if warmup else ""
+        print(f"✅ {os.path.basename(path)} loaded in {load_seconds:.2f} s{warm_text}")
+        return model, {'hash': digest, 'cached': False, 'load_seconds': round(load_seconds, 2),
+                       'warmup_ms': [round(ms, 1) for ms in warmup]}
+
+    def _evict(self):
+        """Drop least recently used, unpinned models beyond max_models (lock held)"""
+        pinned = set(self._pinned.values())
+        for digest in list(self._models):
+            if len(self._models) <= self.max_models:
+                break
+            if digest in pinned:
+                continue
+            del self._models[digest]
+            self._stats['evictions'] += 1
+            print(f"🗑️ Unloaded model {digest[:12]} (least recently used)")
+
+    def pin(self, owner, digest):
+        """Mark the model ``owner`` is running so it is never evicted"""
+        with self._lock:
+            self._pinned[owner] = digest
+            self._evict()
+
+    def get_stats(self):
+        """
+        Get registry statistics.
+
+        Returns:
+            dict: hits, misses, evictions, resident model count and pinned hashes
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['resident'] = len(self._models)
+            stats['pinned'] = {owner: digest[:12] for owner, digest in self._pinned.items()}
+        return stats
+
+
+# Global model registry instance
+model_registry = ModelRegistry()
@@ -5,9 +5,8 @@ Handles secure password hashing, verification, and user management
 
 import hashlib
 import secrets
-import mysql.connector
 from mysql.connector import Error
-from config import DB_CONFIG
+from db_pool import db_pool
 
 class PasswordManager:
     def __init__(self):
@@ -36,16 +35,10 @@ class PasswordManager:
         return hashed == stored_hash
     
     def connect_db(self):
-        """Connect to MySQL database"""
+        """Check out a pooled database connection (close() returns it to the pool)"""
         try:
-            connection = mysql.connector.connect(
-                host=DB_CONFIG['HOST'],
-                port=DB_CONFIG['PORT'],
-                database=DB_CONFIG['DATABASE'],
-                user=DB_CONFIG['USER'],
-                password=DB_CONFIG['PASSWORD']
-            )
-            return connection
+            # Explicit transactions, as with the dedicated connections used before pooling
+            return db_pool.acquire(autocommit=False)
         except Error as e:
             print(f"Database connection error: {e}")
             return None
@@ -65,9 +58,7 @@ class PasswordManager:
             print(f"Error counting Super Admins: {e}")
             return 0
         finally:
-            if connection.is_connected():
-                cursor.close()
-                connection.close()
+            connection.close()  # Returns the connection to the pool
     
     def get_super_admin_info(self):
         """Get information about existing Super Admin"""
@@ -89,9 +80,7 @@ class PasswordManager:
             print(f"Error getting Super Admin info: {e}")
             return None
         finally:
-            if connection.is_connected():
-                cursor.close()
-                connection.close()
+            connection.close()  # Returns the connection to the pool
     
     def create_user(self, employee_id, email, password, role):
         """Create a new user with hashed password"""
@@ -134,9 +123,7 @@ class PasswordManager:
         except Error as e:
             return False, f"Error creating user: {e}"
         finally:
-            if connection.is_connected():
-                cursor.close()
-                connection.close()
+            connection.close()  # Returns the connection to the pool
     
     def authenticate_user(self, employee_id, password, role):
         """Authenticate user with employee_id, password, and role"""
@@ -176,9 +163,7 @@ class PasswordManager:
         except Error as e:
             return False, f"Authentication error: {e}"
         finally:
-            if connection.is_connected():
-                cursor.close()
-                connection.close()
+            connection.close()  # Returns the connection to the pool
     
     def update_last_login(self, employee_id):
         """Update last login timestamp"""
@@ -194,9 +179,7 @@ class PasswordManager:
         except Error as e:
             print(f"Error updating last login: {e}")
         finally:
-            if connection.is_connected():
-                cursor.close()
-                connection.close()
+            connection.close()  # Returns the connection to the pool
     
     def change_password(self, employee_id, old_password, new_password):
         """Change user password"""
@@ -233,9 +216,7 @@ class PasswordManager:
         except Error as e:
             return False, f"Error changing password: {e}"
         finally:
-            if connection.is_connected():
-                cursor.close()
-                connection.close()
+            connection.close()  # Returns the connection to the pool
     
     def get_all_users(self):
         """Get all users for admin management"""
@@ -255,9 +236,7 @@ class PasswordManager:
             print(f"Error fetching users: {e}")
             return []
         finally:
-            if connection.is_connected():
-                cursor.close()
-                connection.close()
+            connection.close()  # Returns the connection to the pool
     
     def update_user(self, employee_id, email, role, is_active):
         """Update user information (admin function)"""
@@ -312,9 +291,7 @@ class PasswordManager:
         except Error as e:
             return False, f"Error updating user: {e}"
         finally:
-            if connection.is_connected():
-                cursor.close()
-                connection.close()
+            connection.close()  # Returns the connection to the pool
     
     def delete_user(self, employee_id):
         """Delete user (admin function) with foreign key constraint handling"""
@@ -373,9 +350,7 @@ class PasswordManager:
         except Error as e:
             return False, f"Error deleting user: {e}"
         finally:
-            if connection.is_connected():
-                cursor.close()
-                connection.close()
+            connection.close()  # Returns the connection to the pool
     
     def deactivate_user(self, employee_id):
         """Deactivate user instead of deleting (safer option)"""
@@ -408,9 +383,7 @@ class PasswordManager:
         except Error as e:
             return False, f"Error deactivating user: {e}"
         finally:
-            if connection.is_connected():
-                cursor.close()
-                connection.close()
+            connection.close()  # Returns the connection to the pool
     
     def admin_change_password(self, admin_id, target_employee_id, new_password):
         """Admin function to change another user's password with role hierarchy"""
@@ -466,9 +439,7 @@ class PasswordManager:
         except Error as e:
             return False, f"Error changing password: {e}"
         finally:
-            if connection.is_connected():
-                cursor.close()
-                connection.close()
+            connection.close()  # Returns the connection to the pool
 
 # Global password manager instance
 password_manager = PasswordManager()
@@ -0,0 +1,292 @@
+"""
+Staged Frame Pipeline for WelVision
+Runs capture, inference, annotation and display as separate workers connected
+by small bounded queues, so throughput is set by the slowest stage instead of
+the sum of all stages
+"""
+
+import threading
+import time
+from collections import deque
+
+from config import PIPELINE_QUEUE_SIZE
+
+# Queue policies
+LATEST = "latest"   # a full queue drops its oldest item (live cameras)
+BLOCK = "block"     # a full queue makes the producer wait (replays, nothing may be lost)
+
+
+class StageQueue:
+    """Bounded hand-off between two stages with a latest-wins or blocking policy"""
+
+    def __init__(self, maxsize=PIPELINE_QUEUE_SIZE, policy=LATEST, on_drop=None):
+        self.maxsize = max(1, maxsize)
+        self.policy = policy
+        self.on_drop = on_drop
+        self.dropped = 0
+        self.high_water = 0
+        self._items = deque()
+        self._condition = threading.Condition()
+
+    def put(self, item, running=lambda: True):
+        """Add an item; returns False if it was given up because the pipeline stopped"""
+        with self._condition:
+            while len(self._items) >= self.maxsize:
+                if self.policy == LATEST:
+                    self._items.popleft()
+                    self.dropped += 1
+                    if self.on_drop:
+                        self.on_drop()
+                    break
+                if not running():
+                    return False
+                self._condition.wait(0.1)
+            self._items.append(item)
+            self.high_water = max(self.high_water, len(self._items))
+            self._condition.notify_all()
+            return True
+
+    def get(self, timeout=0.1):
+        """Take the oldest item, or None after ``timeout`` seconds"""
+        with self._condition:
+            if not self._items:
+                self._condition.wait(timeout)
+                if not self._items:
+                    return None
+            item = self._items.popleft()
+            self._condition.notify_all()
+            return item
+
+    def clear(self):
+        with self._condition:
+            self._items.clear()
+            self._condition.notify_all()
+
+    def __len__(self):
+        return len(self._items)
+
+
+class FramePacer:
+    """Holds a producer to a target rate without adding delay when it is already slower"""
+
+    def __init__(self, fps):
+        self.interval = 1.0 / fps if fps else 0.0
+        self._next = None
+
+    def wait(self):
+        if not self.interval:
+            return
+        now = time.monotonic()
+        if self._next is None or now - self._next > self.interval:
+            # First frame, or the producer fell behind: restart the schedule instead of bursting
+            self._next = now
+        elif self._next > now:
+            time.sleep(self._next - now)
+        self._next += self.interval
+
+
+class _StageStats:
+    """Latency samples and busy time of one stage"""
+
+    def __init__(self, window):
+        self.latencies = deque(maxlen=window)
+        self.processed = 0
+        self.filtered = 0
+        self.errors = 0
+        self.busy = 0.0
+
+
+class Pipeline:
+    """
+    A source and a chain of stages, each on its own thread.
+
+    The source callable produces items (return None to produce nothing this
+    time, raise StopIteration at the end of a finite source). Each stage is
+    a ``(name, func)`` pair: ``func(item)`` returns the item for the next
+    stage, or None to drop it (e.g. a frame without a roller). The last
+    stage's output is discarded, so the final stage is the sink.
+
+    Stages are connected by StageQueues of ``queue_size`` items. With the
+    LATEST policy a stage that falls behind only ever sees the newest item
+    and the producer never waits; with BLOCK nothing is dropped and the
+    pipeline runs at the pace of its slowest stage.
+
+    ``get_stats`` reports, per stage, items processed and dropped, latency
+    percentiles and occupancy (share of wall time the stage was busy; the
+    busiest stage is the bottleneck). The source's time includes waiting
+    for the camera to deliver a frame.
+    """
+
+    def __init__(self, name, source, stages, queue_size=PIPELINE_QUEUE_SIZE, policy=LATEST,
+                 stats_window=300):
+        """
+        Args:
+            name: Label for reports and thread names
+            source: Callable producing the next item
+            stages: List of (stage name, callable) pairs
+            queue_size: Items buffered in front of each stage
+            policy: LATEST (drop oldest when full) or BLOCK (back-pressure)
+        """
+        self.name = name
+        self.source = source
+        self.stage_names = ["source"] + [stage_name for stage_name, _ in stages]
+        self._funcs = [func for _, func in stages]
+        self._queues = [StageQueue(queue_size, policy, on_drop=self._item_done) for _ in stages]
+        self._stats = {stage_name: _StageStats(stats_window) for stage_name in self.stage_names}
+
+        # Items produced by the source and not yet finished, dropped or filtered out
+        self._outstanding = 0
+        self._outstanding_lock = threading.Lock()
+
+        self.running = False
+        self._threads = []
+        self._source_done = threading.Event()
+        self._started_at = None
+        self._stopped_at = None
+
+    def start(self):
+        """Start the source and stage workers"""
+        if self.running:
+            return
+        self.running = True
+        self._source_done.clear()
+        self._outstanding = 0
+        self._started_at = time.monotonic()
+        self._stopped_at = None
+        self._threads = [threading.Thread(target=self._run_source, name=f"{self.name}-source", daemon=True)]
+        for index, stage_name in enumerate(self.stage_names[1:]):
+            self._threads.append(threading.Thread(target=self._run_stage, args=(index,),
+                                                  name=f"{self.name}-{stage_name}", daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout=1.0):
+        """Stop all workers; queued items are discarded"""
+        self.running = False
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout=timeout)
+        self._threads = []
+        for stage_queue in self._queues:
+            stage_queue.clear()
+        if self._stopped_at is None:
+            self._stopped_at = time.monotonic()
+
+    def wait(self, timeout=None):
+        """
+        Wait until a finite source is exhausted and every queued item is processed.
+
+        Returns:
+            bool: True if the pipeline drained within ``timeout``
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        if not self._source_done.wait(timeout):
+            return False
+        while self._outstanding:
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.005)
+        self._stopped_at = time.monotonic()
+        return True
+
+    def _item_added(self):
+        with self._outstanding_lock:
+            self._outstanding += 1
+
+    def _item_done(self):
+        with self._outstanding_lock:
+            self._outstanding -= 1
+
+    def _record(self, stage_name, started, result):
+        elapsed = time.monotonic() - started
+        stats = self._stats[stage_name]
+        stats.latencies.append(elapsed * 1000)
+        stats.busy += elapsed
+        stats.processed += 1
+        if result is None:
+            stats.filtered += 1
+
+    def _run_source(self):
+        first_queue = self._queues[0] if self._queues else None
+        while self.running:
+            started = time.monotonic()
+            try:
+                item = self.source()
+            except StopIteration:
+                break
+            except Exception as e:
+                self._stats["source"].errors += 1
+                print(f"❌ {self.name} source error: {e}")
+                time.sleep(0.1)
+                continue
+            self._record("source", started, item)
+            if item is not None and first_queue is not None:
+                self._item_added()
+                if not first_queue.put(item, lambda: self.running):
+                    break
+        self._source_done.set()
+
+    def _run_stage(self, index):
+        stage_name = self.stage_names[index + 1]
+        func = self._funcs[index]
+        in_queue = self._queues[index]
+        out_queue = self._queues[index + 1] if index + 1 < len(self._queues) else None
+        while self.running:
+            item = in_queue.get()
+            if item is None:
+                continue
+            started = time.monotonic()
+            try:
+                result = func(item)
+            except Exception as e:
+                result = None
+                self._stats[stage_name].errors += 1
+                print(f"❌ {self.name} {stage_name} error: {e}")
+            self._record(stage_name, started, result)
+            if result is not None and out_queue is not None:
+                out_queue.put(result, lambda: self.running)
+            else:
+                self._item_done()
+
+    def get_stats(self):
+        """
+        Get per-stage counters.
+
+        Returns:
+            dict: {stage: {'processed', 'dropped', 'filtered', 'errors', 'queued',
+                   'p50_ms', 'p99_ms', 'occupancy'}} and the pipeline 'elapsed_s'
+        """
+        end = self._stopped_at or time.monotonic()
+        elapsed = end - self._started_at if self._started_at else 0.0
+        report = {'elapsed_s': round(elapsed, 2)}
+        for index, stage_name in enumerate(self.stage_names):
+            stats = self._stats[stage_name]
+            latencies = sorted(stats.latencies)
+            in_queue = self._queues[index - 1] if index > 0 else None
+
+            def pct(p):
+                if not latencies:
+                    return 0.0
+                return round(latencies[min(len(latencies) - 1, int(p / 100.0 * len(latencies)))], 2)
+
+            report[stage_name] = {
+                'processed': stats.processed,
+                'dropped': in_queue.dropped if in_queue is not None else 0,
+                'filtered': stats.filtered,
+                'errors': stats.errors,
+                'queued': len(in_queue) if in_queue is not None else 0,
+                'p50_ms': pct(50),
+                'p99_ms': pct(99),
+                'occupancy': round(stats.busy / elapsed, 3) if elapsed > 0 else 0.0
+            }
+        return report
+
+    def print_report(self):
+        """Print one line per stage with latency, occupancy and drops"""
+        report = self.get_stats()
+        print(f"📊 {self.name} pipeline ({report['elapsed_s']:.1f} s):")
+        for stage_name in self.stage_names:
+            stats = report[stage_name]
+            print(f"   {stage_name:<10} {stats['processed']:6d} items | p50 {stats['p50_ms']:7.2f} ms | "
+                  f"p99 {stats['p99_ms']:7.2f} ms | busy {stats['occupancy']:5.1%} | "
+                  f"dropped {stats['dropped']} | filtered {stats['filtered']}")
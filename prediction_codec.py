@@ -0,0 +1,210 @@
+"""
+Compact Prediction Record Codec for WelVision
+Versioned fixed-width encoding of model detections for CSV and database storage
+"""
+
+import ast
+import base64
+import struct
+
+import numpy as np
+
+from detections import Detections
+
+# Format version 1:
+#   header    : uint8 version, uint16 detection count
+#   detection : uint8 class id, uint16 confidence (x10000), uint16 x1, y1, x2, y2 (pixels)
+# Little-endian; the bytes are stored as base64 text so they fit the CSVs
+# and the existing TEXT raw_predictions columns.
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<BH')
+DETECTION = struct.Struct('<BHHHHH')
+CONFIDENCE_SCALE = 10000
+
+# The detection layout as a NumPy record, for encoding a whole Detections array at once
+DETECTION_DTYPE = np.dtype([('class_id', 'u1'), ('confidence', '<u2'), ('box', '<u2', (4,))])
+
+# Class ids are part of the format: append new classes, never reorder
+CLASS_NAMES = ['roller', 'rust', 'dent', 'spherical_mark', 'damage', 'flat_line', 'damage_on_end']
+CLASS_IDS = {name: index for index, name in enumerate(CLASS_NAMES)}
+UNKNOWN_CLASS_ID = 255
+UNKNOWN_CLASS_NAME = 'unknown'
+
+
+def _class_id(class_name):
+    """Map a model class name to its format class id"""
+    return CLASS_IDS.get(str(class_name).lower().replace(' ', '_'), UNKNOWN_CLASS_ID)
+
+
+def _clamp16(value):
+    """Clamp a number into the uint16 range"""
+    return max(0, min(0xFFFF, int(round(value))))
+
+
+def encode_predictions(predictions):
+    """
+    Encode detections into the compact binary format.
+
+    Args:
+        predictions: Detections, or list of dicts with 'class_name', 'confidence'
+            and optional 'box' ([x1, y1, x2, y2] in pixels)
+
+    Returns:
+        bytes: Encoded record
+    """
+    if isinstance(predictions, Detections):
+        return _encode_detections(predictions)
+    parts = [HEADER.pack(FORMAT_VERSION, len(predictions))]
+    for pred in predictions:
+        box = pred.get('box') or (0, 0, 0, 0)
+        parts.append(DETECTION.pack(
+            _class_id(pred.get('class_name', '')),
+            _clamp16(float(pred.get('confidence', 0.0)) * CONFIDENCE_SCALE),
+            _clamp16(box[0]), _clamp16(box[1]), _clamp16(box[2]), _clamp16(box[3])
+        ))
+    return b''.join(parts)
+
+
+def _encode_detections(detections):
+    """
+    Vectorized ``encode_predictions`` for a Detections.
+
+    Produces the same bytes as encoding ``detections.to_predictions()``
+    (confidence rounded to 3 decimals, boxes truncated to whole pixels).
+    """
+    records = np.zeros(len(detections), dtype=DETECTION_DTYPE)
+    if len(detections):
+        model_ids, inverse = np.unique(detections.class_ids, return_inverse=True)
+        format_ids = np.array([_class_id(detections.class_name(model_id)) for model_id in model_ids.tolist()],
+                              dtype=np.uint8)
+        records['class_id'] = format_ids[inverse.reshape(-1)]
+        confidences = np.round(detections.confidences.astype(np.float64), 3) * CONFIDENCE_SCALE
+        records['confidence'] = np.clip(np.rint(confidences), 0, 0xFFFF)
+        records['box'] = np.clip(detections.boxes.astype(np.int64), 0, 0xFFFF)
+    return HEADER.pack(FORMAT_VERSION, len(detections)) + records.tobytes()
+
+
+def decode_predictions(data):
+    """
+    Decode a binary record produced by ``encode_predictions``.
+
+    Returns:
+        list: [{'class_name', 'confidence', 'box'}, ...]
+
+    Raises:
+        ValueError: On an unknown version or a truncated record
+    """
+    if len(data) < HEADER.size:
+        raise ValueError("Prediction record is truncated")
+    version, count = HEADER.unpack_from(data, 0)
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported prediction record version {version}")
+    if len(data) != HEADER.size + count * DETECTION.size:
+        raise ValueError("Prediction record length does not match its detection count")
+
+    predictions = []
+    for class_id, confidence, x1, y1, x2, y2 in DETECTION.iter_unpack(data[HEADER.size:]):
+        predictions.append({
+            'class_name': CLASS_NAMES[class_id] if class_id < len(CLASS_NAMES) else UNKNOWN_CLASS_NAME,
+            'confidence': confidence / CONFIDENCE_SCALE,
+            'box': [x1, y1, x2, y2]
+        })
+    return predictions
+
+
+def encode_predictions_text(predictions):
+    """Encode detections as base64 text for the CSV / raw_predictions column"""
+    return base64.b64encode(encode_predictions(predictions)).decode('ascii')
+
+
+def decode_predictions_text(text):
+    """
+    Decode a raw_predictions value.
+
+    Accepts both the compact base64 format and the legacy ``str(list)``
+    payloads written by earlier versions, so analytics can read any row.
+
+    Returns:
+        list: Prediction dicts ([] for empty values)
+    """
+    if not text:
+        return []
+    text = text.strip()
+    if text.startswith('['):
+        legacy = ast.literal_eval(text)
+        return [dict(pred) for pred in legacy]
+    return decode_predictions(base64.b64decode(text, validate=True))
+
+
+def normalize_predictions_text(text):
+    """Re-encode a legacy or compact raw_predictions value in the current format"""
+    if text and not text.lstrip().startswith('['):
+        return text
+    return encode_predictions_text(decode_predictions_text(text))
+
+
+# ---------------------------------------------------------------------------
+# Benchmark: compact format vs. the previous str(predictions) payload
+# ---------------------------------------------------------------------------
+
+def _sample_predictions(count):
+    """Build ``count`` representative detections"""
+    return [
+        {
+            'class_name': CLASS_NAMES[index % len(CLASS_NAMES)],
+            'confidence': round(0.5 + (index % 50) / 100.0, 3),
+            'box': [100 + index, 120 + index, 260 + index, 300 + index]
+        }
+        for index in range(count)
+    ]
+
+
+def run_benchmark(detection_counts=(0, 1, 5, 20), iterations=20000):
+    """
+    Compare payload size and encode/decode throughput of both formats.
+
+    Args:
+        detection_counts: Detections per record to test
+        iterations: Encode/decode repetitions per measurement
+
+    Returns:
+        list: One result dict per detection count
+    """
+    import time
+
+    report = []
+    for count in detection_counts:
+        predictions = _sample_predictions(count)
+        legacy_text = str(predictions)
+        compact_text = encode_predictions_text(predictions)
+
+        def rate(func, arg):
+            start = time.perf_counter()
+            for _ in range(iterations):
+                func(arg)
+            return iterations / (time.perf_counter() - start)
+
+        result = {
+            'detections': count,
+            'legacy_bytes': len(legacy_text.encode('utf-8')),
+            'compact_bytes': len(compact_text),
+            'legacy_encode_per_sec': rate(str, predictions),
+            'compact_encode_per_sec': rate(encode_predictions_text, predictions),
+            'legacy_decode_per_sec': rate(ast.literal_eval, legacy_text),
+            'compact_decode_per_sec': rate(decode_predictions_text, compact_text)
+        }
+        report.append(result)
+        print(f"📊 {count:3d} detections | size {result['legacy_bytes']:5d} B -> {result['compact_bytes']:4d} B | "
+              f"encode {result['legacy_encode_per_sec']:9.0f} -> {result['compact_encode_per_sec']:9.0f} rec/s | "
+              f"decode {result['legacy_decode_per_sec']:9.0f} -> {result['compact_decode_per_sec']:9.0f} rec/s")
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the compact prediction record format")
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    run_benchmark(iterations=args.iterations)
@@ -3,20 +3,60 @@ Enhanced Prediction Tracker - Individual Prediction Storage
 Stores every model prediction with detailed defect information and acceptance status
 """
 
+import atexit
 import csv
 import os
 import datetime
+import queue
+import threading
+import time
 import uuid
 from threading import Lock
-from database import db_manager
+from db_pool import db_pool
+from bulk_loader import bulk_load_csv
+from db_migrations import ensure_schema
+from inspection_rollup import inspection_rollup
+from prediction_codec import encode_predictions_text, normalize_predictions_text
+from detections import as_detections
+from config import (PREDICTION_QUEUE_SIZE, PREDICTION_FLUSH_ROWS, PREDICTION_FLUSH_INTERVAL_MS,
+                    PREDICTION_RETRY_INTERVAL_MS, PREDICTION_FSYNC)
 
 class PredictionTracker:
+    # Classes counted per component (normalized names); anything else is ignored
+    OD_CLASSES = ('rust', 'dent', 'spherical_mark', 'damage', 'flat_line', 'damage_on_end', 'roller')
+    BF_CLASSES = ('rust', 'dent', 'damage', 'roller')
+    
     def __init__(self):
         # CSV files for individual predictions
         self.od_predictions_csv = "od_predictions.csv"
         self.bf_predictions_csv = "bf_predictions.csv"
         self.csv_lock = Lock()
         
+        # Write-behind queue: log_prediction only enqueues, a writer thread
+        # batches records to the CSVs on a size/time policy. The queue is
+        # bounded: when the writer falls behind, logging never waits, the
+        # record is dropped (and counted) instead.
+        self.flush_rows = PREDICTION_FLUSH_ROWS
+        self.flush_interval = PREDICTION_FLUSH_INTERVAL_MS / 1000.0
+        self.retry_interval = PREDICTION_RETRY_INTERVAL_MS / 1000.0
+        self.fsync_batches = PREDICTION_FSYNC
+        self._queue = queue.Queue(maxsize=PREDICTION_QUEUE_SIZE)
+        self._files = {}
+        self._writer_thread = None
+        self._writer_lock = Lock()
+        self._stop_requested = False
+        self._metrics_lock = Lock()
+        self._metrics = {
+            'enqueued': 0,
+            'written': 0,
+            'batches': 0,
+            'dropped': 0,
+            'queue_high_water': 0,
+            'last_batch_ms': 0.0,
+            'max_batch_ms': 0.0,
+            'write_errors': 0
+        }
+        
         # OD Predictions CSV Headers
         self.od_prediction_headers = [
             'prediction_id',
@@ -38,7 +78,7 @@ class PredictionTracker:
             'avg_confidence',
             'max_confidence',
             'min_confidence',
-            # Raw prediction data (JSON string)
+            # Raw detections (prediction_codec compact encoding)
             'raw_predictions'
         ]
         
@@ -60,11 +100,13 @@ class PredictionTracker:
             'avg_confidence',
             'max_confidence',
             'min_confidence',
-            # Raw prediction data (JSON string)
+            # Raw detections (prediction_codec compact encoding)
             'raw_predictions'
         ]
         
         self.initialize_csv_files()
+        self._start_writer()
+        atexit.register(self.close)
     
     def initialize_csv_files(self):
         """Initialize prediction CSV files with headers if they don't exist"""
@@ -88,7 +130,8 @@ class PredictionTracker:
         
         Args:
             component_type: 'od' or 'bf'
-            predictions: List of prediction dictionaries [{'class_name': str, 'confidence': float}]
+            predictions: Detections or list of prediction dictionaries
+                [{'class_name': str, 'confidence': float, 'box': [x1, y1, x2, y2] (optional)}]
             session_id: Current session identifier
             roller_type: Type of roller being inspected
             employee_id: ID of the employee performing inspection
@@ -97,127 +140,336 @@ class PredictionTracker:
             dict: Prediction summary with acceptance status and defect counts
         """
         try:
-            with self.csv_lock:
-                prediction_id = str(uuid.uuid4())
-                timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                
-                # Analyze predictions
-                analysis = self._analyze_predictions(predictions, component_type)
-                
-                # Determine acceptance status
-                status = 'ACCEPTED' if analysis['is_accepted'] else 'REJECTED'
-                
-                # Prepare CSV row
-                if component_type.lower() == 'od':
-                    csv_file = self.od_predictions_csv
-                    row = [
-                        prediction_id,
-                        session_id,
-                        timestamp,
-                        roller_type or 'Unknown',
-                        employee_id or 'Unknown',
-                        status,
-                        analysis['total_detections'],
-                        analysis['defect_counts'].get('rust', 0),
-                        analysis['defect_counts'].get('dent', 0),
-                        analysis['defect_counts'].get('spherical_mark', 0),
-                        analysis['defect_counts'].get('damage', 0),
-                        analysis['defect_counts'].get('flat_line', 0),
-                        analysis['defect_counts'].get('damage_on_end', 0),
-                        analysis['defect_counts'].get('roller', 0),
-                        analysis['avg_confidence'],
-                        analysis['max_confidence'],
-                        analysis['min_confidence'],
-                        str(predictions)  # Raw predictions as string
-                    ]
-                else:  # bf
-                    csv_file = self.bf_predictions_csv
-                    row = [
-                        prediction_id,
-                        session_id,
-                        timestamp,
-                        roller_type or 'Unknown',
-                        employee_id or 'Unknown',
-                        status,
-                        analysis['total_detections'],
-                        analysis['defect_counts'].get('rust', 0),
-                        analysis['defect_counts'].get('dent', 0),
-                        analysis['defect_counts'].get('damage', 0),
-                        analysis['defect_counts'].get('roller', 0),
-                        analysis['avg_confidence'],
-                        analysis['max_confidence'],
-                        analysis['min_confidence'],
-                        str(predictions)  # Raw predictions as string
-                    ]
-                
-                # Write to CSV
-                with open(csv_file, 'a', newline='', encoding='utf-8') as file:
-                    writer = csv.writer(file)
-                    writer.writerow(row)
-                
-                print(f"📝 Logged {component_type.upper()} prediction: {prediction_id} - {status}")
-                
-                # Return summary for UI updates
-                return {
-                    'prediction_id': prediction_id,
-                    'status': status,
-                    'is_accepted': analysis['is_accepted'],
-                    'defect_counts': analysis['defect_counts'],
-                    'total_detections': analysis['total_detections'],
-                    'confidence_stats': {
-                        'avg': analysis['avg_confidence'],
-                        'max': analysis['max_confidence'],
-                        'min': analysis['min_confidence']
-                    }
+            prediction_id = str(uuid.uuid4())
+            timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            
+            # Analyze predictions
+            analysis = self._analyze_predictions(predictions, component_type)
+            
+            # Determine acceptance status
+            status = 'ACCEPTED' if analysis['is_accepted'] else 'REJECTED'
+            
+            # Compact versioned encoding of the raw detections (prediction_codec)
+            raw_predictions = encode_predictions_text(predictions)
+            
+            # Prepare CSV row
+            if component_type.lower() == 'od':
+                row = [
+                    prediction_id,
+                    session_id,
+                    timestamp,
+                    roller_type or 'Unknown',
+                    employee_id or 'Unknown',
+                    status,
+                    analysis['total_detections'],
+                    analysis['defect_counts'].get('rust', 0),
+                    analysis['defect_counts'].get('dent', 0),
+                    analysis['defect_counts'].get('spherical_mark', 0),
+                    analysis['defect_counts'].get('damage', 0),
+                    analysis['defect_counts'].get('flat_line', 0),
+                    analysis['defect_counts'].get('damage_on_end', 0),
+                    analysis['defect_counts'].get('roller', 0),
+                    analysis['avg_confidence'],
+                    analysis['max_confidence'],
+                    analysis['min_confidence'],
+                    raw_predictions
+                ]
+            else:  # bf
+                row = [
+                    prediction_id,
+                    session_id,
+                    timestamp,
+                    roller_type or 'Unknown',
+                    employee_id or 'Unknown',
+                    status,
+                    analysis['total_detections'],
+                    analysis['defect_counts'].get('rust', 0),
+                    analysis['defect_counts'].get('dent', 0),
+                    analysis['defect_counts'].get('damage', 0),
+                    analysis['defect_counts'].get('roller', 0),
+                    analysis['avg_confidence'],
+                    analysis['max_confidence'],
+                    analysis['min_confidence'],
+                    raw_predictions
+                ]
+            
+            # Hand the row to the writer thread; never waits on disk I/O or a full queue
+            self._enqueue(('od' if component_type.lower() == 'od' else 'bf', row))
+            
+            # Return summary for UI updates
+            return {
+                'prediction_id': prediction_id,
+                'status': status,
+                'is_accepted': analysis['is_accepted'],
+                'defect_counts': analysis['defect_counts'],
+                'total_detections': analysis['total_detections'],
+                'confidence_stats': {
+                    'avg': analysis['avg_confidence'],
+                    'max': analysis['max_confidence'],
+                    'min': analysis['min_confidence']
                 }
+            }
                 
         except Exception as e:
             print(f"❌ Error logging {component_type} prediction: {e}")
             return None
     
+    def _enqueue(self, item, timeout=None):
+        """
+        Queue a record (or flush marker) for the writer thread.
+        
+        Restarts the writer if it was closed. Records never block: a full
+        queue drops them, and a writer still stopping after ``close`` drains
+        them (or the next call starts its successor). Flush markers wait up
+        to ``timeout`` seconds, for the old writer and for queue space.
+        
+        Returns:
+            bool: False if the item was dropped
+        """
+        is_record = item[0] != 'flush'
+        if not self._start_writer(wait=not is_record):
+            if is_record:
+                self._count_drop("writer thread cannot be started")
+            return False
+        try:
+            if is_record:
+                self._queue.put_nowait(item)
+            else:
+                self._queue.put(item, timeout=timeout)
+        except queue.Full:
+            if is_record:
+                self._count_drop(f"queue full ({self._queue.maxsize} records)")
+            return False
+        with self._metrics_lock:
+            if is_record:
+                self._metrics['enqueued'] += 1
+            depth = self._queue.qsize()
+            if depth > self._metrics['queue_high_water']:
+                self._metrics['queue_high_water'] = depth
+        return True
+    
+    def _count_drop(self, reason):
+        """Count a lost record; the first and then every 1000th are reported"""
+        with self._metrics_lock:
+            self._metrics['dropped'] += 1
+            dropped = self._metrics['dropped']
+        if dropped == 1 or dropped % 1000 == 0:
+            print(f"❌ Prediction record dropped ({reason}), {dropped} lost so far")
+    
+    def _start_writer(self, wait=True):
+        """
+        Start the background CSV writer thread unless it is running.
+        
+        A writer still stopping after ``close`` is allowed to finish draining
+        first, so only one writer ever appends to the CSVs. With ``wait``
+        the successor is started once it has exited; without, the caller
+        never blocks and relies on the stopping writer draining the queue.
+        
+        Returns:
+            bool: True if a writer is running (or still stopping, without ``wait``)
+        """
+        while True:
+            with self._writer_lock:
+                thread = self._writer_thread
+                if thread is None or not thread.is_alive():
+                    self._stop_requested = False
+                    thread = threading.Thread(target=self._writer_loop, daemon=True)
+                    try:
+                        thread.start()
+                    except RuntimeError:
+                        # Interpreter shutdown: no new threads
+                        return False
+                    self._writer_thread = thread
+                    return True
+                if not self._stop_requested or not wait:
+                    return True
+            # Join outside the lock, so logging threads never wait behind it
+            thread.join(self.flush_interval + self.retry_interval)
+            if thread.is_alive():
+                return False
+    
+    def _writer_loop(self):
+        """Writer thread: batch queued records and append them to the CSVs"""
+        pending = []
+        waiters = []
+        deadline = None
+        retry_at = 0.0
+        
+        while True:
+            timeout = self.flush_interval if deadline is None else max(0.0, deadline - time.perf_counter())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            
+            if item is not None:
+                if item[0] == 'flush':
+                    waiters.append(item[1])
+                else:
+                    pending.append(item)
+                    if deadline is None:
+                        deadline = time.perf_counter() + self.flush_interval
+            
+            now = time.perf_counter()
+            due = deadline is not None and now >= deadline
+            if pending and now >= retry_at and (waiters or due or len(pending) >= self.flush_rows
+                                                or self._stop_requested):
+                # Records that failed to write stay pending and are retried
+                pending = self._write_batch(pending)
+                if pending:
+                    retry_at = deadline = now + self.retry_interval
+                else:
+                    deadline = None
+            
+            if waiters and not pending and self._queue.empty():
+                for event in waiters:
+                    event.set()
+                waiters = []
+            
+            if self._stop_requested and self._queue.empty() and not pending:
+                break
+        
+        self._close_files()
+    
+    def _write_batch(self, records):
+        """
+        Append a batch of records to the CSV files.
+        
+        Returns:
+            list: Records that could not be written (to be retried)
+        """
+        start = time.perf_counter()
+        rows_by_component = {}
+        for component_type, row in records:
+            rows_by_component.setdefault(component_type, []).append(row)
+        
+        failed = []
+        with self.csv_lock:
+            for component_type, rows in rows_by_component.items():
+                try:
+                    if component_type not in self._files:
+                        csv_file = self.od_predictions_csv if component_type == 'od' else self.bf_predictions_csv
+                        self._files[component_type] = open(csv_file, 'a', newline='', encoding='utf-8')
+                    file = self._files[component_type]
+                    csv.writer(file).writerows(rows)
+                    file.flush()
+                    if self.fsync_batches:
+                        os.fsync(file.fileno())
+                except Exception as e:
+                    # Reopen the file on the next attempt
+                    file = self._files.pop(component_type, None)
+                    if file is not None:
+                        try:
+                            file.close()
+                        except Exception:
+                            pass
+                    failed.extend((component_type, row) for row in rows)
+                    with self._metrics_lock:
+                        self._metrics['write_errors'] += 1
+                    print(f"❌ Error writing {len(rows)} {component_type.upper()} predictions to CSV "
+                          f"(retrying in {self.retry_interval:.1f} s): {e}")
+        
+        elapsed = (time.perf_counter() - start) * 1000
+        with self._metrics_lock:
+            self._metrics['written'] += len(records) - len(failed)
+            if not failed:
+                self._metrics['batches'] += 1
+                self._metrics['last_batch_ms'] = round(elapsed, 3)
+                self._metrics['max_batch_ms'] = round(max(self._metrics['max_batch_ms'], elapsed), 3)
+        return failed
+    
+    def _close_files(self):
+        """Close the writer's CSV handles (they are reopened on the next write)"""
+        with self.csv_lock:
+            for file in self._files.values():
+                try:
+                    file.close()
+                except Exception:
+                    pass
+            self._files = {}
+    
+    def flush(self, timeout=10.0):
+        """
+        Wait until every prediction logged so far is written to the CSV files.
+        
+        Returns:
+            bool: True if the writer confirmed the flush within the timeout
+        """
+        if self._writer_thread is None and self._queue.empty():
+            return True
+        event = threading.Event()
+        if not self._enqueue(('flush', event), timeout):
+            return False
+        return event.wait(timeout)
+    
+    def close(self, timeout=10.0):
+        """
+        Flush pending predictions and stop the writer thread.
+        
+        Predictions logged after ``close`` start a new writer, so they are
+        still written; call ``close`` again (atexit does) to flush them.
+        
+        Returns:
+            bool: True if everything was written and the writer stopped
+        """
+        if self._writer_thread is None and self._queue.empty():
+            return True
+        flushed = self.flush(timeout)
+        with self._writer_lock:
+            thread = self._writer_thread
+            # The writer exits once the queue and its pending batch are empty
+            self._stop_requested = True
+        if thread is None:
+            return flushed
+        if thread.is_alive():
+            # Wake the writer so it sees the stop request
+            try:
+                self._queue.put_nowait(('flush', threading.Event()))
+            except queue.Full:
+                pass
+        thread.join(timeout)
+        if thread.is_alive():
+            unwritten = self.get_queue_metrics()['pending']
+            print(f"❌ Prediction writer did not finish within {timeout:.0f} s, {unwritten} records not written yet")
+            return False
+        with self._writer_lock:
+            if self._writer_thread is thread:
+                self._writer_thread = None
+        return flushed
+    
+    def get_queue_metrics(self):
+        """
+        Get write-behind queue metrics.
+        
+        Returns:
+            dict: enqueued/written counts, current depth, high-water mark,
+                  dropped records (queue full or writer unavailable), batch
+                  timings and write errors (failed batches are retried)
+        """
+        with self._metrics_lock:
+            metrics = dict(self._metrics)
+        metrics['queue_depth'] = self._queue.qsize()
+        metrics['pending'] = metrics['enqueued'] - metrics['written']
+        metrics['avg_batch_size'] = round(metrics['written'] / metrics['batches'], 1) if metrics['batches'] else 0.0
+        return metrics
+    
     def _analyze_predictions(self, predictions, component_type):
         """
         Analyze predictions to extract defect counts and acceptance status
         
         Args:
-            predictions: List of prediction dictionaries
+            predictions: Detections or list of prediction dictionaries
             component_type: 'od' or 'bf'
             
         Returns:
             dict: Analysis results with defect counts and acceptance status
         """
-        defect_counts = {}
-        confidences = []
-        
-        # Count each type of defect
-        for pred in predictions:
-            class_name = pred.get('class_name', '').lower()
-            confidence = pred.get('confidence', 0.0)
-            confidences.append(confidence)
-            
-            # Normalize class names and count
-            if class_name in ['rust']:
-                defect_counts['rust'] = defect_counts.get('rust', 0) + 1
-            elif class_name in ['dent']:
-                defect_counts['dent'] = defect_counts.get('dent', 0) + 1
-            elif class_name in ['spherical_mark', 'spherical mark'] and component_type.lower() == 'od':
-                defect_counts['spherical_mark'] = defect_counts.get('spherical_mark', 0) + 1
-            elif class_name in ['damage']:
-                defect_counts['damage'] = defect_counts.get('damage', 0) + 1
-            elif class_name in ['flat_line', 'flat line'] and component_type.lower() == 'od':
-                defect_counts['flat_line'] = defect_counts.get('flat_line', 0) + 1
-            elif class_name in ['damage_on_end', 'damage on end'] and component_type.lower() == 'od':
-                defect_counts['damage_on_end'] = defect_counts.get('damage_on_end', 0) + 1
-            elif class_name in ['roller']:
-                defect_counts['roller'] = defect_counts.get('roller', 0) + 1
-        
-        # Calculate confidence statistics
-        if confidences:
-            avg_confidence = round(sum(confidences) / len(confidences), 3)
-            max_confidence = round(max(confidences), 3)
-            min_confidence = round(min(confidences), 3)
-        else:
-            avg_confidence = max_confidence = min_confidence = 0.0
+        # Per-class counts and confidence statistics on the detection arrays (vectorized)
+        detections = as_detections(predictions)
+        counted_classes = self.OD_CLASSES if component_type.lower() == 'od' else self.BF_CLASSES
+        defect_counts = {class_name: count for class_name, count in detections.class_counts().items()
+                         if class_name in counted_classes}
+        avg_confidence, max_confidence, min_confidence = detections.confidence_stats()
         
         # Determine acceptance: ACCEPTED only if predictions contain ONLY 'roller' class
         non_roller_defects = sum(count for key, count in defect_counts.items() if key != 'roller')
@@ -232,22 +484,34 @@ class PredictionTracker:
             'min_confidence': min_confidence
         }
     
-    def transfer_predictions_to_database_and_clear_csvs(self):
+    def transfer_predictions_to_database_and_clear_csvs(self, progress_callback=None):
         """
         Transfer all prediction records from CSV files to database and clear CSV files
         
+        Safe to call from a worker thread; the transfer uses its own connection
+        and is idempotent on prediction_id, so a failed transfer can be retried.
+        
+        Args:
+            progress_callback: Optional callable(component_type, rows_done, rows_total)
+            
         Returns:
             tuple: (success: bool, message: str, transferred_counts: dict)
         """
         try:
-            # Create database tables if not exist
-            self._create_prediction_tables()
+            # Make sure queued predictions are on disk before reading the CSVs
+            self.flush()
+            
+            # Tables are created by the schema bootstrap (no DDL once it has run)
+            if not ensure_schema():
+                return False, "Database schema is not available", {'od': 0, 'bf': 0}
             
             # Transfer OD predictions
-            od_success, od_message, od_count = self._transfer_predictions_data('od')
+            od_success, od_message, od_count = self._transfer_predictions_data(
+                'od', self._component_progress('od', progress_callback))
             
             # Transfer BF predictions
-            bf_success, bf_message, bf_count = self._transfer_predictions_data('bf')
+            bf_success, bf_message, bf_count = self._transfer_predictions_data(
+                'bf', self._component_progress('bf', progress_callback))
             
             if od_success and bf_success:
                 # Clear CSV files (keep headers)
@@ -264,82 +528,92 @@ class PredictionTracker:
             print(f"❌ {error_msg}")
             return False, error_msg, {'od': 0, 'bf': 0}
     
+    @staticmethod
+    def _component_progress(component_type, progress_callback):
+        """Bind a component type to a (component_type, done, total) progress callback"""
+        if progress_callback is None:
+            return None
+        return lambda done, total: progress_callback(component_type, done, total)
+    
     def _create_prediction_tables(self):
         """Create database tables for storing individual predictions"""
         try:
-            if not db_manager.connection or not db_manager.connection.is_connected():
-                if not db_manager.connect():
-                    raise Exception("Failed to connect to database")
-            
-            cursor = db_manager.connection.cursor()
-            
-            # Create OD predictions table
-            od_table_query = """
-            CREATE TABLE IF NOT EXISTS od_predictions (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                prediction_id VARCHAR(100) UNIQUE NOT NULL,
-                session_id VARCHAR(100) NOT NULL,
-                timestamp DATETIME NOT NULL,
-                roller_type VARCHAR(50),
-                employee_id VARCHAR(20),
-                status ENUM('ACCEPTED', 'REJECTED') NOT NULL,
-                total_detections INT DEFAULT 0,
-                rust_count INT DEFAULT 0,
-                dent_count INT DEFAULT 0,
-                spherical_mark_count INT DEFAULT 0,
-                damage_count INT DEFAULT 0,
-                flat_line_count INT DEFAULT 0,
-                damage_on_end_count INT DEFAULT 0,
-                roller_count INT DEFAULT 0,
-                avg_confidence DECIMAL(5,3) DEFAULT 0.000,
-                max_confidence DECIMAL(5,3) DEFAULT 0.000,
-                min_confidence DECIMAL(5,3) DEFAULT 0.000,
-                raw_predictions TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            with db_pool.connection() as connection:
+                cursor = connection.cursor()
                 
-                INDEX idx_prediction_id (prediction_id),
-                INDEX idx_session_id (session_id),
-                INDEX idx_timestamp (timestamp),
-                INDEX idx_status (status),
-                INDEX idx_roller_type (roller_type),
-                INDEX idx_employee_id (employee_id)
-            )
-            """
-            
-            # Create BF predictions table
-            bf_table_query = """
-            CREATE TABLE IF NOT EXISTS bf_predictions (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                prediction_id VARCHAR(100) UNIQUE NOT NULL,
-                session_id VARCHAR(100) NOT NULL,
-                timestamp DATETIME NOT NULL,
-                roller_type VARCHAR(50),
-                employee_id VARCHAR(20),
-                status ENUM('ACCEPTED', 'REJECTED') NOT NULL,
-                total_detections INT DEFAULT 0,
-                rust_count INT DEFAULT 0,
-                dent_count INT DEFAULT 0,
-                damage_count INT DEFAULT 0,
-                roller_count INT DEFAULT 0,
-                avg_confidence DECIMAL(5,3) DEFAULT 0.000,
-                max_confidence DECIMAL(5,3) DEFAULT 0.000,
-                min_confidence DECIMAL(5,3) DEFAULT 0.000,
-                raw_predictions TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                # Create OD predictions table
+                od_table_query = """
+                CREATE TABLE IF NOT EXISTS od_predictions (
+                    id INT AUTO_INCREMENT PRIMARY KEY,
+                    prediction_id VARCHAR(100) UNIQUE NOT NULL,
+                    session_id VARCHAR(100) NOT NULL,
+                    timestamp DATETIME NOT NULL,
+                    roller_type VARCHAR(50),
+                    employee_id VARCHAR(20),
+                    status ENUM('ACCEPTED', 'REJECTED') NOT NULL,
+                    total_detections INT DEFAULT 0,
+                    rust_count INT DEFAULT 0,
+                    dent_count INT DEFAULT 0,
+                    spherical_mark_count INT DEFAULT 0,
+                    damage_count INT DEFAULT 0,
+                    flat_line_count INT DEFAULT 0,
+                    damage_on_end_count INT DEFAULT 0,
+                    roller_count INT DEFAULT 0,
+                    avg_confidence DECIMAL(5,3) DEFAULT 0.000,
+                    max_confidence DECIMAL(5,3) DEFAULT 0.000,
+                    min_confidence DECIMAL(5,3) DEFAULT 0.000,
+                    raw_predictions TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 
-                INDEX idx_prediction_id (prediction_id),
-                INDEX idx_session_id (session_id),
-                INDEX idx_timestamp (timestamp),
-                INDEX idx_status (status),
-                INDEX idx_roller_type (roller_type),
-                INDEX idx_employee_id (employee_id)
-            )
-            """
+                    INDEX idx_prediction_id (prediction_id),
+                    INDEX idx_session_id (session_id),
+                    INDEX idx_timestamp (timestamp),
+                    INDEX idx_status (status),
+                    INDEX idx_roller_type (roller_type),
+                    INDEX idx_employee_id (employee_id),
+                    INDEX idx_session_roller (session_id, roller_type),
+                    INDEX idx_roller_timestamp (roller_type, timestamp),
+                    INDEX idx_employee_timestamp (employee_id, timestamp)
+                )
+                """
             
-            cursor.execute(od_table_query)
-            cursor.execute(bf_table_query)
-            db_manager.connection.commit()
-            cursor.close()
+                # Create BF predictions table
+                bf_table_query = """
+                CREATE TABLE IF NOT EXISTS bf_predictions (
+                    id INT AUTO_INCREMENT PRIMARY KEY,
+                    prediction_id VARCHAR(100) UNIQUE NOT NULL,
+                    session_id VARCHAR(100) NOT NULL,
+                    timestamp DATETIME NOT NULL,
+                    roller_type VARCHAR(50),
+                    employee_id VARCHAR(20),
+                    status ENUM('ACCEPTED', 'REJECTED') NOT NULL,
+                    total_detections INT DEFAULT 0,
+                    rust_count INT DEFAULT 0,
+                    dent_count INT DEFAULT 0,
+                    damage_count INT DEFAULT 0,
+                    roller_count INT DEFAULT 0,
+                    avg_confidence DECIMAL(5,3) DEFAULT 0.000,
+                    max_confidence DECIMAL(5,3) DEFAULT 0.000,
+                    min_confidence DECIMAL(5,3) DEFAULT 0.000,
+                    raw_predictions TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                
+                    INDEX idx_prediction_id (prediction_id),
+                    INDEX idx_session_id (session_id),
+                    INDEX idx_timestamp (timestamp),
+                    INDEX idx_status (status),
+                    INDEX idx_roller_type (roller_type),
+                    INDEX idx_employee_id (employee_id),
+                    INDEX idx_session_roller (session_id, roller_type),
+                    INDEX idx_roller_timestamp (roller_type, timestamp),
+                    INDEX idx_employee_timestamp (employee_id, timestamp)
+                )
+                """
+            
+                cursor.execute(od_table_query)
+                cursor.execute(bf_table_query)
+                connection.commit()
+                cursor.close()
             
             print("✅ OD and BF prediction tables created/verified")
             
@@ -347,126 +621,76 @@ class PredictionTracker:
             print(f"❌ Error creating prediction tables: {e}")
             raise
     
-    def _transfer_predictions_data(self, component_type):
-        """Transfer prediction data from CSV to database for a specific component type"""
+    def _transfer_predictions_data(self, component_type, progress_callback=None):
+        """Bulk-load prediction data from CSV to database for a specific component type"""
         try:
             csv_file = self.od_predictions_csv if component_type == 'od' else self.bf_predictions_csv
-            table_name = f"{component_type}_predictions"
-            
-            if not os.path.exists(csv_file):
-                return True, f"No {component_type.upper()} CSV file found", 0
-            
-            transferred_count = 0
-            
-            with open(csv_file, 'r', newline='', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                
-                for row in reader:
-                    # Skip empty rows or header-only files
-                    if not row.get('prediction_id'):
-                        continue
-                    
-                    success = self._insert_prediction_to_database(row, component_type)
-                    if success:
-                        transferred_count += 1
+            columns = self.od_prediction_headers if component_type == 'od' else self.bf_prediction_headers
+            days = set()
+            
+            # bulk_load_csv calls this for every row (it never uses LOAD DATA with
+            # a transform), so the days and the raw_predictions normalization
+            # cover the whole file
+            def row_values(row):
+                days.add(row['timestamp'][:10])
+                return self._prediction_row_values(row, columns)
+            
+            success, message, transferred_count = bulk_load_csv(
+                csv_file,
+                f"{component_type}_predictions",
+                columns,
+                row_values,
+                key_column='prediction_id',
+                progress_callback=progress_callback
+            )
+            if not success:
+                print(f"❌ {message}")
+                return success, message, transferred_count
             
-            return True, f"Transferred {transferred_count} {component_type.upper()} predictions", transferred_count
+            # Bring the daily rollups of the days just loaded up to date
+            rollup_success, rollup_message = inspection_rollup.refresh_days(component_type, days)
+            if not rollup_success:
+                return False, rollup_message, transferred_count
+            return success, message, transferred_count
             
         except Exception as e:
             error_msg = f"Error transferring {component_type} predictions: {e}"
             print(f"❌ {error_msg}")
             return False, error_msg, 0
     
-    def _insert_prediction_to_database(self, csv_row, component_type):
-        """Insert a single prediction record into the database"""
-        try:
-            cursor = db_manager.connection.cursor()
-            table_name = f"{component_type}_predictions"
-            
-            if component_type == 'od':
-                insert_query = f"""
-                INSERT INTO {table_name} (
-                    prediction_id, session_id, timestamp, roller_type, employee_id,
-                    status, total_detections, rust_count, dent_count, spherical_mark_count,
-                    damage_count, flat_line_count, damage_on_end_count, roller_count,
-                    avg_confidence, max_confidence, min_confidence, raw_predictions
-                ) VALUES (
-                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                )
-                """
-                
-                values = (
-                    csv_row['prediction_id'],
-                    csv_row['session_id'],
-                    csv_row['timestamp'],
-                    csv_row['roller_type'],
-                    csv_row['employee_id'],
-                    csv_row['status'],
-                    int(csv_row['total_detections']),
-                    int(csv_row['rust_count']),
-                    int(csv_row['dent_count']),
-                    int(csv_row['spherical_mark_count']),
-                    int(csv_row['damage_count']),
-                    int(csv_row['flat_line_count']),
-                    int(csv_row['damage_on_end_count']),
-                    int(csv_row['roller_count']),
-                    float(csv_row['avg_confidence']),
-                    float(csv_row['max_confidence']),
-                    float(csv_row['min_confidence']),
-                    csv_row['raw_predictions']
-                )
-            else:  # bf
-                insert_query = f"""
-                INSERT INTO {table_name} (
-                    prediction_id, session_id, timestamp, roller_type, employee_id,
-                    status, total_detections, rust_count, dent_count, damage_count,
-                    roller_count, avg_confidence, max_confidence, min_confidence, raw_predictions
-                ) VALUES (
-                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                )
-                """
-                
-                values = (
-                    csv_row['prediction_id'],
-                    csv_row['session_id'],
-                    csv_row['timestamp'],
-                    csv_row['roller_type'],
-                    csv_row['employee_id'],
-                    csv_row['status'],
-                    int(csv_row['total_detections']),
-                    int(csv_row['rust_count']),
-                    int(csv_row['dent_count']),
-                    int(csv_row['damage_count']),
-                    int(csv_row['roller_count']),
-                    float(csv_row['avg_confidence']),
-                    float(csv_row['max_confidence']),
-                    float(csv_row['min_confidence']),
-                    csv_row['raw_predictions']
-                )
-            
-            cursor.execute(insert_query, values)
-            db_manager.connection.commit()
-            cursor.close()
-            
-            return True
-            
-        except Exception as e:
-            print(f"❌ Error inserting {component_type} prediction to database: {e}")
-            db_manager.connection.rollback()
-            return False
+    def _prediction_row_values(self, csv_row, columns):
+        """Convert a prediction CSV row into database values (in column order)"""
+        values = []
+        for column in columns:
+            value = csv_row[column]
+            if column.endswith('_count') or column == 'total_detections':
+                value = int(value)
+            elif column.endswith('_confidence'):
+                value = float(value)
+            elif column == 'raw_predictions':
+                # Rows logged before the compact format are converted on transfer
+                value = normalize_predictions_text(value)
+            values.append(value)
+        return tuple(values)
     
     def _clear_prediction_csv_files(self):
         """Clear prediction CSV files but keep headers"""
         try:
-            # Clear OD predictions CSV
-            with open(self.od_predictions_csv, 'w', newline='', encoding='utf-8') as file:
-                writer = csv.writer(file)
-                writer.writerow(self.od_prediction_headers)
-            
-            # Clear BF predictions CSV
-            with open(self.bf_predictions_csv, 'w', newline='', encoding='utf-8') as file:
-                writer = csv.writer(file)
-                writer.writerow(self.bf_prediction_headers)
+            with self.csv_lock:
+                # Drop the writer's handles; it reopens the files on its next batch
+                for file in self._files.values():
+                    file.close()
+                self._files = {}
+                
+                # Clear OD predictions CSV
+                with open(self.od_predictions_csv, 'w', newline='', encoding='utf-8') as file:
+                    writer = csv.writer(file)
+                    writer.writerow(self.od_prediction_headers)
+                
+                # Clear BF predictions CSV
+                with open(self.bf_predictions_csv, 'w', newline='', encoding='utf-8') as file:
+                    writer = csv.writer(file)
+                    writer.writerow(self.bf_prediction_headers)
             
             print("✅ Prediction CSV files cleared (headers preserved)")
             
@@ -477,6 +701,8 @@ class PredictionTracker:
     def get_prediction_stats(self):
         """Get statistics from current prediction CSV files"""
         try:
+            self.flush()
+            
             od_stats = self._get_prediction_component_stats('od')
             bf_stats = self._get_prediction_component_stats('bf')
             
@@ -0,0 +1,191 @@
+"""
+Presence-Gated Inference for WelVision
+Runs the detector only on frames captured while a roller is under the camera,
+as signalled by the proximity sensors
+"""
+
+import threading
+import time
+from collections import deque
+
+from config import PRESENCE_DELAY_MS, PRESENCE_GATING_ENABLED, PRESENCE_WINDOW_MS
+
+
+class PresenceGate:
+    """
+    Decides per frame whether the detector should run.
+
+    A proximity sensor edge (roller reaching the sensor) opens a window of
+    ``window_ms`` that starts ``delay_ms`` later, the travel time from the
+    sensor to the camera's field of view. While a level sensor keeps
+    reporting presence the window is held open. Frames captured inside a
+    window are inferred, all others are skipped.
+
+    Sensor input comes either pushed (``sensor_edge`` / ``set_present``) or
+    pulled on every frame from the shared proximity counter and presence
+    flag that the PLC reader updates. Until the first edge is seen the gate
+    lets every frame through, so a camera without a wired sensor keeps
+    being inspected instead of silently going idle.
+    """
+
+    def __init__(self, name, counter=None, presence_source=None, delay_ms=PRESENCE_DELAY_MS,
+                 window_ms=PRESENCE_WINDOW_MS, enabled=PRESENCE_GATING_ENABLED):
+        """
+        Args:
+            name: Camera label for reports ('OD', 'BF')
+            counter: Optional multiprocessing Value counting sensor edges
+            presence_source: Optional callable returning the current sensor level
+            delay_ms: Sensor edge to roller-under-camera delay
+            window_ms: Minimum time frames are inferred after the delayed edge
+            enabled: False lets every frame through (statistics still kept)
+        """
+        self.name = name
+        self.counter = counter
+        self.presence_source = presence_source
+        self.delay = delay_ms / 1000.0
+        self.window = window_ms / 1000.0
+        self.enabled = enabled
+
+        self._windows = deque()          # (start, end) monotonic times, oldest first
+        self._present = False
+        self._last_count = self._read_counter()
+        self._lock = threading.Lock()
+
+        self.edges = 0
+        self.frames = 0
+        self.inferred = 0
+        self.skipped = 0
+
+    def _read_counter(self):
+        if self.counter is None:
+            return 0
+        try:
+            return self.counter.value
+        except Exception:
+            return 0
+
+    def sensor_edge(self, timestamp=None):
+        """Record a roller reaching the sensor (defaults to now)"""
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        start = timestamp + self.delay
+        with self._lock:
+            self.edges += 1
+            self._windows.append((start, start + self.window))
+
+    def set_present(self, present, timestamp=None):
+        """Record the sensor level; a rising edge opens a window, a high level holds it open"""
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        if present and not self._present:
+            self.sensor_edge(timestamp)
+        elif present:
+            with self._lock:
+                if self._windows:
+                    start, end = self._windows[-1]
+                    self._windows[-1] = (start, max(end, timestamp + self.delay))
+        self._present = bool(present)
+
+    def poll(self, timestamp=None):
+        """Pull new edges from the shared counter and the current presence level"""
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        count = self._read_counter()
+        if count != self._last_count:
+            # Several edges between polls collapse into one window at poll time
+            self._last_count = count
+            self.sensor_edge(timestamp)
+            # The level input then only holds this window open instead of opening another
+            self._present = True
+        if self.presence_source is not None:
+            try:
+                self.set_present(self.presence_source(), timestamp)
+            except Exception:
+                pass
+
+    def should_infer(self, capture_time=None):
+        """
+        Decide whether a frame should go through the detector.
+
+        Args:
+            capture_time: time.monotonic() when the frame was captured (defaults to now)
+
+        Returns:
+            bool: True to run inference, False to skip the frame
+        """
+        capture_time = time.monotonic() if capture_time is None else capture_time
+        self.poll()
+        with self._lock:
+            # Windows that ended more than a second ago can no longer match a frame
+            while self._windows and self._windows[0][1] < capture_time - 1.0:
+                self._windows.popleft()
+            if not self.enabled or not self.edges:
+                present = True
+            else:
+                present = any(start <= capture_time <= end for start, end in self._windows)
+
+            self.frames += 1
+            if present:
+                self.inferred += 1
+            else:
+                self.skipped += 1
+        return present
+
+    def window_at(self, capture_time):
+        """
+        Identify the roller window a frame belongs to.
+
+        Returns:
+            float: Start time of the window containing ``capture_time`` (one per
+                   roller), or None outside windows or before any sensor edge
+        """
+        with self._lock:
+            for start, end in self._windows:
+                if start <= capture_time <= end:
+                    return start
+        return None
+
+    def window_end(self, start):
+        """
+        End time of the roller window that starts at ``start``.
+
+        Returns:
+            float: Current end of the window (a level sensor may still extend
+                   it), or None once the window has been pruned
+        """
+        with self._lock:
+            for window_start, end in self._windows:
+                if window_start == start:
+                    return end
+        return None
+
+    def get_stats(self):
+        """
+        Get gating statistics.
+
+        Returns:
+            dict: frames seen, inferred and skipped, skipped percentage, sensor
+                  edges and whether gating is active (enabled and a sensor seen)
+        """
+        with self._lock:
+            return {
+                'frames': self.frames,
+                'inferred': self.inferred,
+                'skipped': self.skipped,
+                'skipped_pct': round(self.skipped * 100.0 / self.frames, 1) if self.frames else 0.0,
+                'sensor_edges': self.edges,
+                'gating_active': self.enabled and self.edges > 0
+            }
+
+    def print_report(self):
+        """Print the share of frames that skipped inference"""
+        stats = self.get_stats()
+        if not stats['frames']:
+            return
+        if stats['gating_active']:
+            print(f"📊 {self.name} presence gate: {stats['skipped']}/{stats['frames']} frames skipped "
+                  f"({stats['skipped_pct']:.1f}%), {stats['sensor_edges']} roller(s) sensed")
+        else:
+            print(f"📊 {self.name} presence gate: no sensor edges seen, all {stats['frames']} frames inferred")
+
+    def reset_stats(self):
+        """Start a new statistics period (e.g. a new preview run)"""
+        with self._lock:
+            self.frames = self.inferred = self.skipped = 0
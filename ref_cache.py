@@ -0,0 +1,106 @@
+"""
+Reference Data Cache for WelVision
+Read-through TTL cache for roller types, thresholds and model lists with explicit invalidation
+"""
+
+import copy
+import functools
+import threading
+import time
+
+from config import REF_CACHE_TTL
+
+
+class RefCache:
+    """
+    Thread-safe in-process cache for small, rarely changing reference data.
+
+    Entries are grouped by kind ('rollers', 'thresholds', 'od_models',
+    'bigface_models'); each kind has its own TTL. ``invalidate(kind)`` drops
+    every entry of a kind and is called by the DatabaseManager methods that
+    write that data. Each kind also has a generation number, so a load that
+    started before an invalidation never stores its (stale) result.
+    Callers get deep copies and may modify them freely.
+    """
+
+    def __init__(self, ttls=None):
+        self.ttls = dict(REF_CACHE_TTL if ttls is None else ttls)
+        self._entries = {}       # (kind, key) -> (expires_at, value)
+        self._generations = {}   # kind -> int
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def _kind_stats(self, kind):
+        stats = self._stats.get(kind)
+        if stats is None:
+            stats = self._stats[kind] = {'hits': 0, 'misses': 0, 'invalidations': 0}
+        return stats
+
+    def get_or_load(self, kind, key, loader):
+        """
+        Return the cached value for (kind, key), calling ``loader()`` on a miss.
+
+        Empty results (None, [], {}) are returned but not cached, so a
+        failed or empty read is retried on the next call.
+        """
+        if kind not in self.ttls:
+            raise KeyError(f"Unknown cache kind '{kind}'")
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get((kind, key))
+            stats = self._kind_stats(kind)
+            if entry is not None and entry[0] > now:
+                stats['hits'] += 1
+                return copy.deepcopy(entry[1])
+            stats['misses'] += 1
+            generation = self._generations.get(kind, 0)
+
+        value = loader()
+
+        if value:
+            with self._lock:
+                if self._generations.get(kind, 0) == generation:
+                    self._entries[(kind, key)] = (time.monotonic() + self.ttls[kind], copy.deepcopy(value))
+        return value
+
+    def invalidate(self, *kinds):
+        """Drop all entries of the given kinds (all kinds if none given)"""
+        with self._lock:
+            kinds = kinds or tuple(self.ttls)
+            for kind in kinds:
+                self._generations[kind] = self._generations.get(kind, 0) + 1
+                self._kind_stats(kind)['invalidations'] += 1
+            for entry_key in [entry_key for entry_key in self._entries if entry_key[0] in kinds]:
+                del self._entries[entry_key]
+
+    def get_stats(self):
+        """
+        Get cache statistics.
+
+        Returns:
+            dict: {kind: {'hits', 'misses', 'invalidations', 'entries', 'hit_rate'}}
+        """
+        with self._lock:
+            report = {}
+            for kind in self.ttls:
+                stats = dict(self._kind_stats(kind))
+                lookups = stats['hits'] + stats['misses']
+                stats['entries'] = sum(1 for entry_key in self._entries if entry_key[0] == kind)
+                stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+                report[kind] = stats
+            return report
+
+
+# Global cache instance
+ref_cache = RefCache()
+
+
+def cached(kind):
+    """Decorator: serve a DatabaseManager read method through ref_cache, keyed by its arguments"""
+    def decorate(method):
+        @functools.wraps(method)
+        def wrapper(self, *args):
+            return ref_cache.get_or_load(kind, (method.__name__,) + args, lambda: method(self, *args))
+        return wrapper
+    return decorate
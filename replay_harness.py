@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+WelVision Offline Replay Harness
+================================
+
+Feeds recorded roller images (a directory or a video file) or synthetic
+frames through the inspection pipeline without cameras or the GUI: detection (YOLO models or a
+stub detector), PredictionTracker.log_prediction and
+RollerInspectionLogger.update_component_session, in the same order as
+InferenceTab.log_component_inspection. Runs as fast as possible and reports
+rollers/sec plus p50/p99 latency per stage. With --fps the frames arrive at
+a fixed rate instead, e.g. 90 for a load test at 3x line speed.
+
+The loggers write their CSV files into a scratch working directory, so
+replays never touch the production CSVs.
+
+Usage:
+    python replay_harness.py <frames_dir_or_video|synthetic> [--bf <source>] [--stub] [--limit N] [--fps N]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+
+# Add current directory to path
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(APP_DIR)
+
+STAGES = ("decode", "od_detect", "bf_detect", "log_prediction", "update_session")
+
+
+def iter_frames(source, limit=None, fps=0):
+    """
+    Yield BGR frames from a frame source (see frame_source.open_frame_source).
+
+    Args:
+        source: Image directory, video file or ``synthetic[:WxH]``
+        limit: Max frames to yield (None = all)
+        fps: Frame rate (0 = as fast as they are consumed)
+    """
+    from frame_source import open_frame_source
+
+    frame_source = open_frame_source(source, f"replay {os.path.basename(source)}", fps=fps)
+    if not frame_source.start():
+        return
+    count = 0
+    try:
+        while limit is None or count < limit:
+            grabbed = frame_source.read()
+            if grabbed is None:
+                break
+            count += 1
+            yield grabbed.frame
+    finally:
+        frame_source.stop()
+
+
+class StubDetector:
+    """
+    Deterministic stand-in for a YOLO model.
+
+    Always reports a roller and, for ``defect_rate`` of the frames, one of
+    the component's defect classes. ``delay_ms`` emulates inference time.
+    """
+
+    CLASSES = {
+        'od': ['rust', 'dent', 'spherical_mark', 'damage', 'flat_line', 'damage_on_end'],
+        'bf': ['rust', 'dent', 'damage']
+    }
+
+    def __init__(self, component_type, defect_rate=0.1, delay_ms=0.0, seed=0):
+        self.component_type = component_type
+        self.defect_rate = defect_rate
+        self.delay = delay_ms / 1000.0
+        self.random = random.Random(seed)
+
+    def __call__(self, frame):
+        if self.delay:
+            time.sleep(self.delay)
+        predictions = [{'class_name': 'roller', 'confidence': round(self.random.uniform(0.6, 0.99), 3)}]
+        if self.random.random() < self.defect_rate:
+            predictions.append({
+                'class_name': self.random.choice(self.CLASSES[self.component_type]),
+                'confidence': round(self.random.uniform(0.3, 0.95), 3)
+            })
+        return predictions
+
+
+class YoloDetector:
+    """Wraps a YOLO model (configured inference backend) so it returns prediction dicts like StubDetector"""
+
+    def __init__(self, model_path, conf=0.25):
+        from inference_backends import load_backend
+
+        self.model = load_backend(model_path)
+        self.conf = conf
+
+    def __call__(self, frame):
+        return self.model(frame, conf=self.conf)
+
+
+def _percentile(values, pct):
+    """Return the pct-th percentile of a list (nearest rank)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))]
+
+
+def run_replay(od_source, bf_source=None, od_detector=None, bf_detector=None, limit=None,
+               roller_type='Replay', employee_id='replay', workdir=None, quiet=True, fps=0):
+    """
+    Replay recorded frames through detection, prediction logging and session updates.
+
+    Args:
+        od_source: Image directory, video or ``synthetic`` for the OD camera
+        bf_source: Image directory, video or ``synthetic`` for the BF camera (defaults to od_source)
+        od_detector, bf_detector: Callables frame -> predictions (default: StubDetector)
+        limit: Max rollers to replay
+        roller_type, employee_id: Values recorded with each prediction
+        workdir: Directory for the logger CSVs (default: a temporary directory)
+        quiet: Suppress the loggers' per-roller console output
+        fps: Rollers per second fed in (0 = as fast as possible); the pacing
+             wait is counted in the decode stage
+
+    Returns:
+        dict: rollers, seconds, rollers_per_sec, target_fps, {stage: {'p50_ms', 'p99_ms'}}
+              and the prediction writer's queue metrics
+    """
+    od_detector = od_detector or StubDetector('od')
+    bf_detector = bf_detector or StubDetector('bf', seed=1)
+
+    scratch = workdir is None
+    workdir = workdir or tempfile.mkdtemp(prefix="welvision_replay_")
+    original_cwd = os.getcwd()
+    # Files are resolved before changing into workdir; 'synthetic' stays as is
+    od_source = os.path.abspath(od_source) if os.path.exists(od_source) else od_source
+    bf_source = (os.path.abspath(bf_source) if os.path.exists(bf_source) else bf_source) if bf_source else od_source
+
+    timings = {stage: [] for stage in STAGES}
+    rollers = 0
+    accepted = 0
+
+    os.chdir(workdir)
+    try:
+        output = io.StringIO() if quiet else sys.stdout
+        with contextlib.redirect_stdout(output):
+            # Imported here so the loggers create their CSVs inside workdir
+            from roller_inspection_logger import RollerInspectionLogger
+            from prediction_tracker import PredictionTracker
+
+            session_logger = RollerInspectionLogger()
+            tracker = PredictionTracker()
+            session_id = f"REPLAY_{uuid.uuid4().hex[:8]}"
+            session_logger.start_new_session(session_id)
+
+            od_frames = iter_frames(od_source, limit, fps)
+            bf_frames = iter_frames(bf_source, limit) if bf_source != od_source else None
+
+            start = time.perf_counter()
+            while True:
+                t0 = time.perf_counter()
+                od_frame = next(od_frames, None)
+                bf_frame = next(bf_frames, None) if bf_frames else od_frame
+                if od_frame is None or bf_frame is None:
+                    break
+                t1 = time.perf_counter()
+                od_predictions = od_detector(od_frame)
+                t2 = time.perf_counter()
+                bf_predictions = bf_detector(bf_frame)
+                t3 = time.perf_counter()
+
+                log_time = 0.0
+                session_time = 0.0
+                roller_accepted = True
+                for component_type, predictions in (('bf', bf_predictions), ('od', od_predictions)):
+                    s0 = time.perf_counter()
+                    result = tracker.log_prediction(component_type, predictions, session_id,
+                                                    roller_type=roller_type, employee_id=employee_id)
+                    s1 = time.perf_counter()
+                    session_logger.update_component_session(session_id, component_type, predictions)
+                    s2 = time.perf_counter()
+                    log_time += s1 - s0
+                    session_time += s2 - s1
+                    roller_accepted = roller_accepted and bool(result and result['is_accepted'])
+
+                timings["decode"].append((t1 - t0) * 1000)
+                timings["od_detect"].append((t2 - t1) * 1000)
+                timings["bf_detect"].append((t3 - t2) * 1000)
+                timings["log_prediction"].append(log_time * 1000)
+                timings["update_session"].append(session_time * 1000)
+                rollers += 1
+                accepted += roller_accepted
+
+            elapsed = time.perf_counter() - start
+            session_logger.end_session(session_id)
+            
+            # Drain the prediction write-behind queue while still in workdir
+            drain_start = time.perf_counter()
+            tracker.close()
+            drain_seconds = time.perf_counter() - drain_start
+            writer_metrics = tracker.get_queue_metrics()
+            session_logger.close()
+    finally:
+        os.chdir(original_cwd)
+        if scratch:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        'rollers': rollers,
+        'accepted': accepted,
+        'seconds': round(elapsed, 3),
+        'rollers_per_sec': round(rollers / elapsed, 2) if elapsed > 0 else 0.0,
+        'target_fps': fps,
+        'drain_seconds': round(drain_seconds, 3),
+        'writer': writer_metrics,
+        'stages': {
+            stage: {
+                'p50_ms': round(_percentile(values, 50), 3),
+                'p99_ms': round(_percentile(values, 99), 3)
+            }
+            for stage, values in timings.items()
+        }
+    }
+    return report
+
+
+def print_report(report):
+    """Print the replay summary"""
+    print(f"📊 Replayed {report['rollers']} rollers in {report['seconds']:.2f}s "
+          f"({report['rollers_per_sec']:.1f} rollers/sec, {report['accepted']} accepted)")
+    if report.get('target_fps'):
+        status = "kept up" if report['rollers_per_sec'] >= 0.95 * report['target_fps'] else "fell behind"
+        print(f"   fed at {report['target_fps']:.0f} rollers/sec: {status}")
+    for stage in STAGES:
+        stats = report['stages'][stage]
+        print(f"   {stage:<15} p50 {stats['p50_ms']:8.3f} ms | p99 {stats['p99_ms']:8.3f} ms")
+    writer = report['writer']
+    print(f"   prediction writer: {writer['written']} records in {writer['batches']} batches "
+          f"(max batch {writer['max_batch_ms']:.1f} ms), queue high-water {writer['queue_high_water']}, "
+          f"dropped {writer['dropped']}, drained in {report['drain_seconds']:.3f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded frames through the inspection pipeline")
+    parser.add_argument("source", help="Image directory, video or 'synthetic[:WxH]' for the OD camera")
+    parser.add_argument("--bf", help="Image directory, video or 'synthetic' for the BF camera (default: same as source)")
+    parser.add_argument("--stub", action="store_true", help="Use the stub detector instead of the YOLO models")
+    parser.add_argument("--stub-delay-ms", type=float, default=0.0, help="Emulated stub inference time")
+    parser.add_argument("--defect-rate", type=float, default=0.1, help="Stub defect probability per frame")
+    parser.add_argument("--od-model", help="OD weights (default: config MODEL_PATHS['OD'])")
+    parser.add_argument("--bf-model", help="BF weights (default: config MODEL_PATHS['BIGFACE'])")
+    parser.add_argument("--limit", type=int, help="Max rollers to replay (default 1000 for synthetic sources)")
+    parser.add_argument("--fps", type=float, default=0.0,
+                        help="Rollers per second fed in, e.g. 90 for 3x line speed (default: as fast as possible)")
+    parser.add_argument("--workdir", help="Keep the logger CSVs in this directory")
+    parser.add_argument("--verbose", action="store_true", help="Show the loggers' per-roller output")
+    args = parser.parse_args()
+
+    if args.stub:
+        od_detector = StubDetector('od', args.defect_rate, args.stub_delay_ms)
+        bf_detector = StubDetector('bf', args.defect_rate, args.stub_delay_ms, seed=1)
+    else:
+        from config import MODEL_PATHS
+
+        od_detector = YoloDetector(os.path.abspath(args.od_model or MODEL_PATHS["OD"]))
+        bf_detector = YoloDetector(os.path.abspath(args.bf_model or MODEL_PATHS["BIGFACE"]))
+
+    limit = args.limit
+    if limit is None and any(spec.startswith('synthetic') for spec in (args.source, args.bf or '')):
+        limit = 1000  # Synthetic frames never run out
+
+    workdir = os.path.abspath(args.workdir) if args.workdir else None
+    if workdir:
+        os.makedirs(workdir, exist_ok=True)
+
+    try:
+        report = run_replay(args.source, args.bf, od_detector, bf_detector, limit=limit,
+                            workdir=workdir, quiet=not args.verbose, fps=args.fps)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    if report['rollers'] == 0:
+        print(f"❌ No frames found in {args.source}")
+        sys.exit(1)
+    print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,14 +6,35 @@ Tracks roller acceptance/rejection with detailed defect counts for each componen
 import csv
 import os
 import datetime
+import threading
 from threading import Lock
-from database import db_manager
+from db_pool import db_pool
+from bulk_loader import bulk_load_csv, rejects_file_for
+from db_migrations import ensure_schema
+from inspection_rollup import inspection_rollup
+from config import SESSION_SNAPSHOT_INTERVAL, SESSION_LOG_FSYNC
+from detections import as_detections
 
 class RollerInspectionLogger:
     def __init__(self):
-        self.od_csv_file = "od_inspection_sessions.csv"
-        self.bf_csv_file = "bf_inspection_sessions.csv"
+        # Absolute, so snapshots on the background thread always hit the same files
+        self.od_csv_file = os.path.abspath("od_inspection_sessions.csv")
+        self.bf_csv_file = os.path.abspath("bf_inspection_sessions.csv")
+        self.event_log_file = os.path.abspath("inspection_sessions.log")
+        # Event log being compacted into the CSVs by a snapshot in progress
+        self.previous_event_log_file = self.event_log_file + ".prev"
         self.csv_lock = Lock()
+        # Serializes snapshots; the CSV files are written without holding csv_lock
+        self._snapshot_lock = Lock()
+        
+        # Session counters live in memory; every change is appended to the
+        # event log and the CSVs are rewritten only as periodic snapshots
+        self.snapshot_interval = SESSION_SNAPSHOT_INTERVAL
+        self.fsync_events = SESSION_LOG_FSYNC
+        self._sessions = {'od': {}, 'bf': {}}
+        self._event_log = None
+        self._event_writer = None
+        self._events_since_snapshot = 0
         
         # OD CSV Headers
         self.od_csv_headers = [
@@ -49,6 +70,7 @@ class RollerInspectionLogger:
         ]
         
         self.initialize_csv_files()
+        self._recover_sessions()
     
     def initialize_csv_files(self):
         """Initialize both CSV files with headers if they don't exist"""
@@ -66,6 +88,174 @@ class RollerInspectionLogger:
                 writer.writerow(self.bf_csv_headers)
             print(f"✅ Created BF CSV log file: {self.bf_csv_file}")
     
+    def _headers(self, component_type):
+        """Return the CSV headers for a component"""
+        return self.od_csv_headers if component_type == 'od' else self.bf_csv_headers
+    
+    def _csv_file(self, component_type):
+        """Return the snapshot CSV file for a component"""
+        return self.od_csv_file if component_type == 'od' else self.bf_csv_file
+    
+    def _parse_row(self, component_type, values):
+        """Convert a CSV/event-log row into an in-memory session record"""
+        row = dict(zip(self._headers(component_type), values))
+        for key in self._headers(component_type)[3:]:
+            row[key] = int(row[key])
+        return row
+    
+    def _recover_sessions(self):
+        """
+        Rebuild in-memory session counters after startup or a crash.
+        
+        Loads the last CSV snapshot, then replays the event log of an
+        interrupted snapshot and the current event log on top of it. Every
+        event carries the complete session row, so replaying an event that
+        is already part of the snapshot is harmless.
+        """
+        try:
+            for component_type in ('od', 'bf'):
+                sessions = {}
+                csv_file = self._csv_file(component_type)
+                if os.path.exists(csv_file):
+                    with open(csv_file, 'r', newline='', encoding='utf-8') as file:
+                        reader = csv.reader(file)
+                        next(reader, None)
+                        for values in reader:
+                            if values:
+                                sessions[values[0]] = self._parse_row(component_type, values)
+                self._sessions[component_type] = sessions
+            
+            replayed = 0
+            for log_file in (self.previous_event_log_file, self.event_log_file):
+                if not os.path.exists(log_file):
+                    continue
+                with open(log_file, 'r', newline='', encoding='utf-8') as file:
+                    for values in csv.reader(file):
+                        if not values or values[0] not in self._sessions:
+                            continue
+                        component_type, values = values[0], values[1:]
+                        if len(values) != len(self._headers(component_type)):
+                            continue  # Torn last line from an interrupted write
+                        try:
+                            self._sessions[component_type][values[0]] = self._parse_row(component_type, values)
+                            replayed += 1
+                        except ValueError:
+                            continue
+            
+            if replayed:
+                print(f"🔄 Recovered {replayed} session events from {self.event_log_file}")
+            self._snapshot()
+                
+        except Exception as e:
+            print(f"❌ Error recovering inspection sessions: {e}")
+    
+    def _open_event_log(self):
+        """(Re)open the append-only event log"""
+        if self._event_log:
+            self._event_log.close()
+        self._event_log = open(self.event_log_file, 'a', newline='', encoding='utf-8')
+        self._event_writer = csv.writer(self._event_log)
+    
+    def _append_event(self, component_type, session_data):
+        """Append the updated session row to the event log (csv_lock must be held)"""
+        if self._event_log is None:
+            self._open_event_log()
+        headers = self._headers(component_type)
+        self._event_writer.writerow([component_type] + [session_data[key] for key in headers])
+        self._event_log.flush()
+        if self.fsync_events:
+            os.fsync(self._event_log.fileno())
+        
+        self._events_since_snapshot += 1
+        if self._events_since_snapshot >= self.snapshot_interval:
+            # Reset here so the following events don't start more snapshots
+            self._events_since_snapshot = 0
+            threading.Thread(target=self._background_snapshot, name="session-snapshot", daemon=True).start()
+    
+    def _background_snapshot(self):
+        """Periodic snapshot off the logging path; skipped if another snapshot is running"""
+        if not self._snapshot_lock.acquire(blocking=False):
+            return
+        try:
+            if self._event_log is None:
+                return  # Closed since the snapshot was requested
+            self._write_snapshot()
+        except Exception as e:
+            print(f"❌ Error writing session snapshot: {e}")
+        finally:
+            self._snapshot_lock.release()
+    
+    def _rotate_event_log(self):
+        """Start a fresh event log; the old one is kept until the snapshot covering it is durable (csv_lock held)"""
+        if self._event_log:
+            self._event_log.close()
+            self._event_log = None
+            self._event_writer = None
+        if os.path.exists(self.event_log_file):
+            if os.path.exists(self.previous_event_log_file):
+                # An earlier snapshot failed: keep its events too until this one succeeds
+                with open(self.event_log_file, 'r', newline='', encoding='utf-8') as source, \
+                        open(self.previous_event_log_file, 'a', newline='', encoding='utf-8') as target:
+                    target.write(source.read())
+                os.remove(self.event_log_file)
+            else:
+                os.replace(self.event_log_file, self.previous_event_log_file)
+        self._open_event_log()
+        self._events_since_snapshot = 0
+    
+    def _write_snapshot(self):
+        """
+        Compact in-memory sessions into the CSV files (_snapshot_lock must be held).
+        
+        Only copying the rows and rotating the event log happen under
+        csv_lock; the CSV writes and fsyncs run without it, so logging
+        continues meanwhile into the new event log.
+        """
+        with self.csv_lock:
+            sessions = {component_type: [dict(row) for row in self._sessions[component_type].values()]
+                        for component_type in ('od', 'bf')}
+            self._rotate_event_log()
+        
+        for component_type in ('od', 'bf'):
+            csv_file = self._csv_file(component_type)
+            temp_file = csv_file + '.tmp'
+            with open(temp_file, 'w', newline='', encoding='utf-8') as file:
+                writer = csv.DictWriter(file, fieldnames=self._headers(component_type))
+                writer.writeheader()
+                writer.writerows(sessions[component_type])
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_file, csv_file)
+        
+        # Snapshot is durable, so the events it covers can be dropped
+        if os.path.exists(self.previous_event_log_file):
+            os.remove(self.previous_event_log_file)
+    
+    def _snapshot(self):
+        """Write a snapshot now, waiting for one in progress (csv_lock must not be held)"""
+        with self._snapshot_lock:
+            self._write_snapshot()
+    
+    def flush(self):
+        """Write a snapshot so the CSV files reflect every logged event"""
+        try:
+            self._snapshot()
+        except Exception as e:
+            print(f"❌ Error writing session snapshot: {e}")
+    
+    def close(self):
+        """Write a final snapshot and close the event log"""
+        with self._snapshot_lock:
+            try:
+                self._write_snapshot()
+            except Exception as e:
+                print(f"❌ Error writing session snapshot: {e}")
+            with self.csv_lock:
+                if self._event_log:
+                    self._event_log.close()
+                    self._event_log = None
+                    self._event_writer = None
+    
     def start_new_session(self, session_id):
         """
         Start a new inspection session for both OD and BF
@@ -77,47 +267,18 @@ class RollerInspectionLogger:
             with self.csv_lock:
                 start_time = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
                 
-                # Initialize OD session
-                od_row = [
-                    session_id,
-                    start_time,
-                    '',  # end_of_session - will be filled when session ends
-                    0,   # total_inspected
-                    0,   # total_accepted
-                    0,   # total_rejected
-                    0,   # rust_detections
-                    0,   # dent_detections
-                    0,   # spherical_mark_detections
-                    0,   # damage_detections
-                    0,   # flat_line_detections
-                    0,   # damage_on_end_detections
-                    0    # roller_detections
-                ]
-                
-                # Initialize BF session
-                bf_row = [
-                    session_id,
-                    start_time,
-                    '',  # end_of_session
-                    0,   # total_inspected
-                    0,   # total_accepted
-                    0,   # total_rejected
-                    0,   # rust_detections
-                    0,   # dent_detections
-                    0,   # damage_detections
-                    0    # roller_detections
-                ]
-                
-                # Write initial session rows
-                with open(self.od_csv_file, 'a', newline='', encoding='utf-8') as file:
-                    writer = csv.writer(file)
-                    writer.writerow(od_row)
-                
-                with open(self.bf_csv_file, 'a', newline='', encoding='utf-8') as file:
-                    writer = csv.writer(file)
-                    writer.writerow(bf_row)
-                
-                print(f"📝 Started new inspection session: {session_id}")
+                for component_type in ('od', 'bf'):
+                    headers = self._headers(component_type)
+                    session_data = {key: 0 for key in headers}
+                    session_data['session_id'] = session_id
+                    session_data['start_of_session'] = start_time
+                    session_data['end_of_session'] = ''  # Filled when session ends
+                    self._sessions[component_type][session_id] = session_data
+            
+            # New sessions are rare; snapshot so the CSVs list them immediately
+            self._snapshot()
+            
+            print(f"📝 Started new inspection session: {session_id}")
                 
         except Exception as e:
             print(f"❌ Error starting new session: {e}")
@@ -126,52 +287,40 @@ class RollerInspectionLogger:
         """
         Update session data for a specific component (OD or BF)
         
+        Counters are updated in memory and the new row is appended to the
+        event log, so the cost per roller does not depend on the CSV size.
+        
         Args:
             session_id: Session identifier
             component_type: 'od' or 'bf'
             predictions: List of prediction dictionaries
         """
         try:
+            component_type = component_type.lower()
+            
+            # Count defects in predictions
+            defect_counts = self._count_defects(predictions, component_type)
+            
+            # Determine if component is accepted (only roller detections)
+            is_accepted = self._is_component_accepted(defect_counts, component_type)
+            
             with self.csv_lock:
-                csv_file = self.od_csv_file if component_type.lower() == 'od' else self.bf_csv_file
-                
-                # Read current session data
-                session_data = self._read_current_session(csv_file, session_id)
+                session_data = self._sessions[component_type].get(session_id)
                 if not session_data:
                     return
                 
-                # Count defects in predictions
-                defect_counts = self._count_defects(predictions, component_type)
-                
-                # Determine if component is accepted (only roller detections)
-                is_accepted = self._is_component_accepted(defect_counts, component_type)
-                
                 # Update session totals
-                session_data['total_inspected'] = str(int(session_data['total_inspected']) + 1)
+                session_data['total_inspected'] += 1
                 if is_accepted:
-                    session_data['total_accepted'] = str(int(session_data['total_accepted']) + 1)
+                    session_data['total_accepted'] += 1
                 else:
-                    session_data['total_rejected'] = str(int(session_data['total_rejected']) + 1)
+                    session_data['total_rejected'] += 1
                 
                 # Update defect counts
-                if component_type.lower() == 'od':
-                    session_data['rust_detections'] = str(int(session_data['rust_detections']) + defect_counts.get('rust', 0))
-                    session_data['dent_detections'] = str(int(session_data['dent_detections']) + defect_counts.get('dent', 0))
-                    session_data['spherical_mark_detections'] = str(int(session_data['spherical_mark_detections']) + defect_counts.get('spherical_mark', 0))
-                    session_data['damage_detections'] = str(int(session_data['damage_detections']) + defect_counts.get('damage', 0))
-                    session_data['flat_line_detections'] = str(int(session_data['flat_line_detections']) + defect_counts.get('flat_line', 0))
-                    session_data['damage_on_end_detections'] = str(int(session_data['damage_on_end_detections']) + defect_counts.get('damage_on_end', 0))
-                    session_data['roller_detections'] = str(int(session_data['roller_detections']) + defect_counts.get('roller', 0))
-                else:  # bf
-                    session_data['rust_detections'] = str(int(session_data['rust_detections']) + defect_counts.get('rust', 0))
-                    session_data['dent_detections'] = str(int(session_data['dent_detections']) + defect_counts.get('dent', 0))
-                    session_data['damage_detections'] = str(int(session_data['damage_detections']) + defect_counts.get('damage', 0))
-                    session_data['roller_detections'] = str(int(session_data['roller_detections']) + defect_counts.get('roller', 0))
+                for defect, count in defect_counts.items():
+                    session_data[f'{defect}_detections'] += count
                 
-                # Write updated session data back to CSV
-                self._update_session_in_csv(csv_file, session_id, session_data)
-                
-                print(f"📊 Updated {component_type.upper()} session: {session_id} - {'ACCEPTED' if is_accepted else 'REJECTED'}")
+                self._append_event(component_type, session_data)
                 
         except Exception as e:
             print(f"❌ Error updating {component_type} session: {e}")
@@ -188,57 +337,17 @@ class RollerInspectionLogger:
                 end_time = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
                 
                 # Update both OD and BF sessions
-                for csv_file in [self.od_csv_file, self.bf_csv_file]:
-                    session_data = self._read_current_session(csv_file, session_id)
+                for component_type in ('od', 'bf'):
+                    session_data = self._sessions[component_type].get(session_id)
                     if session_data:
                         session_data['end_of_session'] = end_time
-                        self._update_session_in_csv(csv_file, session_id, session_data)
-                
-                print(f"🏁 Ended inspection session: {session_id} at {end_time}")
-                
-        except Exception as e:
-            print(f"❌ Error ending session: {e}")
-    
-    def _read_current_session(self, csv_file, session_id):
-        """Read current session data from CSV file"""
-        try:
-            if not os.path.exists(csv_file):
-                return None
-                
-            with open(csv_file, 'r', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    if row['session_id'] == session_id:
-                        return row
-            return None
-            
-        except Exception as e:
-            print(f"❌ Error reading session from {csv_file}: {e}")
-            return None
-    
-    def _update_session_in_csv(self, csv_file, session_id, updated_data):
-        """Update specific session row in CSV file"""
-        try:
-            # Read all data
-            all_rows = []
-            headers = self.od_csv_headers if 'od_' in csv_file else self.bf_csv_headers
             
-            with open(csv_file, 'r', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    if row['session_id'] == session_id:
-                        all_rows.append(updated_data)
-                    else:
-                        all_rows.append(row)
+            self._snapshot()
             
-            # Write all data back
-            with open(csv_file, 'w', newline='', encoding='utf-8') as file:
-                writer = csv.DictWriter(file, fieldnames=headers)
-                writer.writeheader()
-                writer.writerows(all_rows)
+            print(f"🏁 Ended inspection session: {session_id} at {end_time}")
                 
         except Exception as e:
-            print(f"❌ Error updating session in {csv_file}: {e}")
+            print(f"❌ Error ending session: {e}")
     
     def _count_defects(self, predictions, component_type):
         """Count defect types from model predictions"""
@@ -249,10 +358,10 @@ class RollerInspectionLogger:
         
         counts = {defect: 0 for defect in defect_types}
         
-        for pred in predictions:
-            class_name = pred.get('class_name', '').lower().replace(' ', '_')
+        # Vectorized per-class counts of the frame's detections
+        for class_name, count in as_detections(predictions).class_counts().items():
             if class_name in counts:
-                counts[class_name] += 1
+                counts[class_name] += count
         
         return counts
     
@@ -261,29 +370,43 @@ class RollerInspectionLogger:
         total_defects = sum(count for defect, count in defect_counts.items() if defect != 'roller')
         return total_defects == 0
     
-    def transfer_to_database_and_clear_csvs(self, session_id=None):
+    def transfer_to_database_and_clear_csvs(self, session_id=None, progress_callback=None):
         """
         Transfer all CSV entries to database and clear CSV files
         
+        Safe to call from a worker thread; the transfer uses its own connection.
+        The sessions are copied under csv_lock and loaded from that copy, so
+        inspection keeps logging meanwhile. Afterwards only sessions that
+        ended and did not change since the copy are dropped; the active
+        session stays in memory and is upserted again by the next transfer.
+        
         Args:
             session_id: Optional session ID for tracking
+            progress_callback: Optional callable(component_type, rows_done, rows_total)
             
         Returns:
             tuple: (success: bool, message: str, transferred_counts: dict)
         """
         try:
-            # Create database tables if not exist
-            self._create_database_tables()
+            # Tables are created by the schema bootstrap (no DDL once it has run)
+            if not ensure_schema():
+                return False, "Database schema is not available", {'od': 0, 'bf': 0}
+            
+            with self.csv_lock:
+                transferred = {component_type: {key: dict(row) for key, row in sessions.items()}
+                               for component_type, sessions in self._sessions.items()}
             
             # Transfer OD data
-            od_success, od_message, od_count = self._transfer_component_data('od', session_id)
+            od_success, od_message, od_count = self._transfer_component_data(
+                'od', transferred['od'], session_id, self._component_progress('od', progress_callback))
             
             # Transfer BF data  
-            bf_success, bf_message, bf_count = self._transfer_component_data('bf', session_id)
+            bf_success, bf_message, bf_count = self._transfer_component_data(
+                'bf', transferred['bf'], session_id, self._component_progress('bf', progress_callback))
             
             if od_success and bf_success:
-                # Clear CSV files (keep headers)
-                self._clear_csv_files()
+                # Drop the transferred sessions from memory and the CSV files (keep headers)
+                self._clear_csv_files(transferred)
                 
                 message = f"Transferred {od_count} OD and {bf_count} BF session records to database"
                 return True, message, {'od': od_count, 'bf': bf_count}
@@ -296,198 +419,153 @@ class RollerInspectionLogger:
             print(f"❌ {error_msg}")
             return False, error_msg, {'od': 0, 'bf': 0}
     
-    def _transfer_component_data(self, component_type, session_id):
-        """Transfer data for specific component to database"""
+    def _transfer_component_data(self, component_type, sessions, session_id, progress_callback=None):
+        """Bulk-load a copy of a component's sessions to the database"""
+        transfer_file = self._csv_file(component_type) + '.transfer'
         try:
-            csv_file = self.od_csv_file if component_type == 'od' else self.bf_csv_file
-            table_name = f"{component_type}_inspection_sessions"
-            
-            if not os.path.exists(csv_file):
-                return True, f"No {component_type.upper()} CSV file to transfer", 0
-            
-            # Read CSV data
-            csv_data = []
-            with open(csv_file, 'r', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                csv_data = list(reader)
+            headers = self._headers(component_type)
+            days = {row['start_of_session'][:10] for row in sessions.values()}
             
-            if not csv_data:
-                return True, f"{component_type.upper()} CSV file is empty", 0
-            
-            # Insert data to database
-            transferred_count = 0
-            failed_count = 0
-            
-            for row in csv_data:
-                success = self._insert_component_session_to_database(row, component_type, session_id)
-                if success:
-                    transferred_count += 1
-                else:
-                    failed_count += 1
-            
-            message = f"Transferred {transferred_count} {component_type.upper()} records"
-            if failed_count > 0:
-                message += f", {failed_count} failed"
+            with open(transfer_file, 'w', newline='', encoding='utf-8') as file:
+                writer = csv.DictWriter(file, fieldnames=headers)
+                writer.writeheader()
+                writer.writerows(sessions.values())
+            
+            # Session rows are upserted by session_id so re-running a transfer
+            # updates the counters instead of duplicating sessions
+            success, message, count = bulk_load_csv(
+                transfer_file,
+                f"{component_type}_inspection_sessions",
+                headers,
+                lambda row: self._session_row_values(row, headers),
+                key_column='session_id',
+                replace_existing=True,
+                progress_callback=progress_callback,
+                rejects_file=rejects_file_for(self._csv_file(component_type))
+            )
             
-            return True, message, transferred_count
+            # Refresh the daily rollups of the sessions' days, so they are
+            # current whichever transfer completes a day last
+            if success:
+                success, rollup_message = inspection_rollup.refresh_days(component_type, days)
+                if not success:
+                    message = rollup_message
+            return success, message, count
             
         except Exception as e:
             return False, f"Error transferring {component_type} data: {e}", 0
+        finally:
+            if os.path.exists(transfer_file):
+                os.remove(transfer_file)
+    
+    def _session_row_values(self, csv_row, headers):
+        """Convert a session CSV row into database values (in column order)"""
+        return (
+            csv_row['session_id'],
+            csv_row['start_of_session'],
+            csv_row['end_of_session'] or None,
+        ) + tuple(int(csv_row[key]) for key in headers[3:])
+    
+    @staticmethod
+    def _component_progress(component_type, progress_callback):
+        """Bind a component type to a (component_type, done, total) progress callback"""
+        if progress_callback is None:
+            return None
+        return lambda done, total: progress_callback(component_type, done, total)
     
     def _create_database_tables(self):
         """Create separate database tables for OD and BF inspection sessions"""
         try:
-            if not db_manager.connection or not db_manager.connection.is_connected():
-                if not db_manager.connect():
-                    raise Exception("Failed to connect to database")
-            
-            cursor = db_manager.connection.cursor()
-            
-            # Create OD inspection sessions table
-            od_table_query = """
-            CREATE TABLE IF NOT EXISTS od_inspection_sessions (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                session_id VARCHAR(100) NOT NULL,
-                start_of_session DATETIME NOT NULL,
-                end_of_session DATETIME,
-                total_inspected INT DEFAULT 0,
-                total_accepted INT DEFAULT 0,
-                total_rejected INT DEFAULT 0,
-                rust_detections INT DEFAULT 0,
-                dent_detections INT DEFAULT 0,
-                spherical_mark_detections INT DEFAULT 0,
-                damage_detections INT DEFAULT 0,
-                flat_line_detections INT DEFAULT 0,
-                damage_on_end_detections INT DEFAULT 0,
-                roller_detections INT DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                
-                INDEX idx_session_id (session_id),
-                INDEX idx_start_time (start_of_session)
-            )
-            """
-            
-            # Create BF inspection sessions table
-            bf_table_query = """
-            CREATE TABLE IF NOT EXISTS bf_inspection_sessions (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                session_id VARCHAR(100) NOT NULL,
-                start_of_session DATETIME NOT NULL,
-                end_of_session DATETIME,
-                total_inspected INT DEFAULT 0,
-                total_accepted INT DEFAULT 0,
-                total_rejected INT DEFAULT 0,
-                rust_detections INT DEFAULT 0,
-                dent_detections INT DEFAULT 0,
-                damage_detections INT DEFAULT 0,
-                roller_detections INT DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            with db_pool.connection() as connection:
+                cursor = connection.cursor()
+            
+                # Create OD inspection sessions table
+                od_table_query = """
+                CREATE TABLE IF NOT EXISTS od_inspection_sessions (
+                    id INT AUTO_INCREMENT PRIMARY KEY,
+                    session_id VARCHAR(100) NOT NULL,
+                    start_of_session DATETIME NOT NULL,
+                    end_of_session DATETIME,
+                    total_inspected INT DEFAULT 0,
+                    total_accepted INT DEFAULT 0,
+                    total_rejected INT DEFAULT 0,
+                    rust_detections INT DEFAULT 0,
+                    dent_detections INT DEFAULT 0,
+                    spherical_mark_detections INT DEFAULT 0,
+                    damage_detections INT DEFAULT 0,
+                    flat_line_detections INT DEFAULT 0,
+                    damage_on_end_detections INT DEFAULT 0,
+                    roller_detections INT DEFAULT 0,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 
-                INDEX idx_session_id (session_id),
-                INDEX idx_start_time (start_of_session)
-            )
-            """
-            
-            cursor.execute(od_table_query)
-            cursor.execute(bf_table_query)
-            db_manager.connection.commit()
-            cursor.close()
-            
-            print("✅ OD and BF inspection session tables created/verified")
-            
-        except Exception as e:
-            print(f"❌ Error creating database tables: {e}")
-            raise
-    
-    def _insert_component_session_to_database(self, csv_row, component_type, session_id=None):
-        """Insert a single component session row into the database"""
-        try:
-            cursor = db_manager.connection.cursor()
-            table_name = f"{component_type}_inspection_sessions"
-            
-            if component_type == 'od':
-                insert_query = f"""
-                INSERT INTO {table_name} (
-                    session_id, start_of_session, end_of_session, total_inspected, 
-                    total_accepted, total_rejected, rust_detections, dent_detections,
-                    spherical_mark_detections, damage_detections, flat_line_detections,
-                    damage_on_end_detections, roller_detections
-                ) VALUES (
-                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
+                    INDEX idx_session_id (session_id),
+                    INDEX idx_start_time (start_of_session),
+                    INDEX idx_start_session (start_of_session, session_id)
                 )
                 """
+            
+                # Create BF inspection sessions table
+                bf_table_query = """
+                CREATE TABLE IF NOT EXISTS bf_inspection_sessions (
+                    id INT AUTO_INCREMENT PRIMARY KEY,
+                    session_id VARCHAR(100) NOT NULL,
+                    start_of_session DATETIME NOT NULL,
+                    end_of_session DATETIME,
+                    total_inspected INT DEFAULT 0,
+                    total_accepted INT DEFAULT 0,
+                    total_rejected INT DEFAULT 0,
+                    rust_detections INT DEFAULT 0,
+                    dent_detections INT DEFAULT 0,
+                    damage_detections INT DEFAULT 0,
+                    roller_detections INT DEFAULT 0,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 
-                values = (
-                    csv_row['session_id'],
-                    csv_row['start_of_session'],
-                    csv_row['end_of_session'] if csv_row['end_of_session'] else None,
-                    int(csv_row['total_inspected']),
-                    int(csv_row['total_accepted']),
-                    int(csv_row['total_rejected']),
-                    int(csv_row['rust_detections']),
-                    int(csv_row['dent_detections']),
-                    int(csv_row['spherical_mark_detections']),
-                    int(csv_row['damage_detections']),
-                    int(csv_row['flat_line_detections']),
-                    int(csv_row['damage_on_end_detections']),
-                    int(csv_row['roller_detections'])
-                )
-            else:  # bf
-                insert_query = f"""
-                INSERT INTO {table_name} (
-                    session_id, start_of_session, end_of_session, total_inspected,
-                    total_accepted, total_rejected, rust_detections, dent_detections,
-                    damage_detections, roller_detections
-                ) VALUES (
-                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
+                    INDEX idx_session_id (session_id),
+                    INDEX idx_start_time (start_of_session),
+                    INDEX idx_start_session (start_of_session, session_id)
                 )
                 """
-                
-                values = (
-                    csv_row['session_id'],
-                    csv_row['start_of_session'],
-                    csv_row['end_of_session'] if csv_row['end_of_session'] else None,
-                    int(csv_row['total_inspected']),
-                    int(csv_row['total_accepted']),
-                    int(csv_row['total_rejected']),
-                    int(csv_row['rust_detections']),
-                    int(csv_row['dent_detections']),
-                    int(csv_row['damage_detections']),
-                    int(csv_row['roller_detections'])
-                )
             
-            cursor.execute(insert_query, values)
-            db_manager.connection.commit()
-            cursor.close()
+                cursor.execute(od_table_query)
+                cursor.execute(bf_table_query)
+                connection.commit()
+                cursor.close()
             
-            return True
+            print("✅ OD and BF inspection session tables created/verified")
             
         except Exception as e:
-            print(f"❌ Error inserting {component_type} session to database: {e}")
-            db_manager.connection.rollback()
-            return False
+            print(f"❌ Error creating database tables: {e}")
+            raise
     
-    def _clear_csv_files(self):
-        """Clear both CSV files but keep headers"""
+    def _clear_csv_files(self, transferred):
+        """
+        Drop transferred sessions from memory and the CSV files (keeping headers).
+        
+        A session is kept if it is still running or changed after the copy
+        that was transferred, so no counter or event is lost.
+        
+        Args:
+            transferred: {component_type: {session_id: row}} as copied for the transfer
+        """
         try:
-            # Clear OD CSV
-            with open(self.od_csv_file, 'w', newline='', encoding='utf-8') as file:
-                writer = csv.writer(file)
-                writer.writerow(self.od_csv_headers)
-            
-            # Clear BF CSV
-            with open(self.bf_csv_file, 'w', newline='', encoding='utf-8') as file:
-                writer = csv.writer(file)
-                writer.writerow(self.bf_csv_headers)
+            cleared = 0
+            with self.csv_lock:
+                for component_type, rows in transferred.items():
+                    sessions = self._sessions[component_type]
+                    for key, row in rows.items():
+                        if row['end_of_session'] and sessions.get(key) == row:
+                            del sessions[key]
+                            cleared += 1
+            self._snapshot()
                 
-            print("🧹 Cleared both OD and BF CSV files")
+            print(f"🧹 Cleared {cleared} transferred session rows from the OD and BF CSV files")
             
         except Exception as e:
             print(f"❌ Error clearing CSV files: {e}")
     
     def get_session_stats(self):
         """
-        Get current statistics from both CSV files
+        Get current statistics from the in-memory session counters
         
         Returns:
             dict: Combined statistics
@@ -509,19 +587,13 @@ class RollerInspectionLogger:
     def _get_component_stats(self, component_type):
         """Get statistics for specific component"""
         try:
-            csv_file = self.od_csv_file if component_type == 'od' else self.bf_csv_file
-            
-            if not os.path.exists(csv_file):
-                return {'sessions': 0, 'total_inspected': 0, 'total_accepted': 0, 'total_rejected': 0}
-            
-            with open(csv_file, 'r', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                data = list(reader)
+            with self.csv_lock:
+                data = list(self._sessions[component_type].values())
             
             sessions = len(data)
-            total_inspected = sum(int(row['total_inspected']) for row in data)
-            total_accepted = sum(int(row['total_accepted']) for row in data)
-            total_rejected = sum(int(row['total_rejected']) for row in data)
+            total_inspected = sum(row['total_inspected'] for row in data)
+            total_accepted = sum(row['total_accepted'] for row in data)
+            total_rejected = sum(row['total_rejected'] for row in data)
             
             return {
                 'sessions': sessions,
@@ -536,4 +608,4 @@ class RollerInspectionLogger:
             return {'sessions': 0, 'total_inspected': 0, 'total_accepted': 0, 'total_rejected': 0}
 
 # Global logger instance
-roller_logger = RollerInspectionLogger() 
\ No newline at end of file
+roller_logger = RollerInspectionLogger() 
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+WelVision Session Log Benchmark
+===============================
+
+Measures the per-roller cost of RollerInspectionLogger.update_component_session
+(append to the session event log) against the previous design (scan the
+session CSV, then rewrite the whole file) as the number of sessions grows.
+
+Every run works in its own temporary directory, and roller_inspection_logger
+is imported only after changing into it, so the global logger never recovers,
+snapshots or truncates the production session log and CSVs.
+
+Usage:
+    python session_log_benchmark.py [--updates N]
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+# Add current directory to path
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(APP_DIR)
+
+
+def _legacy_update(logger, session_id, predictions):
+    """Previous design: scan the CSV for the session, then rewrite the whole file"""
+    csv_file = logger.od_csv_file
+    with open(csv_file, 'r', encoding='utf-8') as file:
+        rows = list(csv.DictReader(file))
+    defect_counts = logger._count_defects(predictions, 'od')
+    accepted = logger._is_component_accepted(defect_counts, 'od')
+    for row in rows:
+        if row['session_id'] == session_id:
+            row['total_inspected'] = str(int(row['total_inspected']) + 1)
+            key = 'total_accepted' if accepted else 'total_rejected'
+            row[key] = str(int(row[key]) + 1)
+            for defect, count in defect_counts.items():
+                row[f'{defect}_detections'] = str(int(row[f'{defect}_detections']) + count)
+    with open(csv_file, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, fieldnames=logger.od_csv_headers)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def run_benchmark(session_counts=(10, 100, 1000, 5000), updates=200):
+    """
+    Measure per-update cost as the session CSV grows.
+
+    Args:
+        session_counts: Number of existing sessions in the CSV for each run
+        updates: Roller updates timed per run
+
+    Returns:
+        list: [{'sessions', 'legacy_us', 'event_log_us'}, ...] (median microseconds)
+    """
+    predictions = [{'class_name': 'roller', 'confidence': 0.9}, {'class_name': 'rust', 'confidence': 0.7}]
+    original_cwd = os.getcwd()
+    report = []
+
+    for count in session_counts:
+        workdir = tempfile.mkdtemp(prefix="welvision_sessions_")
+        os.chdir(workdir)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                # Imported here so the module's global logger is created inside workdir
+                from roller_inspection_logger import RollerInspectionLogger
+
+                logger = RollerInspectionLogger()
+                with logger.csv_lock:
+                    for index in range(count):
+                        for component_type in ('od', 'bf'):
+                            row = {key: 0 for key in logger._headers(component_type)}
+                            row.update(session_id=f"S{index}", start_of_session='2025-01-01 00:00:00',
+                                       end_of_session='2025-01-01 01:00:00')
+                            logger._sessions[component_type][row['session_id']] = row
+                logger.flush()
+                session_id = f"S{count - 1}"
+
+                timings = {'legacy': [], 'event_log': []}
+                for _ in range(updates):
+                    start = time.perf_counter()
+                    _legacy_update(logger, session_id, predictions)
+                    timings['legacy'].append(time.perf_counter() - start)
+                logger._recover_sessions()
+                for _ in range(updates):
+                    start = time.perf_counter()
+                    logger.update_component_session(session_id, 'od', predictions)
+                    timings['event_log'].append(time.perf_counter() - start)
+                logger.close()
+        finally:
+            os.chdir(original_cwd)
+            shutil.rmtree(workdir, ignore_errors=True)
+
+        result = {'sessions': count}
+        for mode, values in timings.items():
+            values.sort()
+            result[f'{mode}_us'] = round(values[len(values) // 2] * 1e6, 1)
+        report.append(result)
+        print(f"📊 {count:6d} sessions | CSV rewrite {result['legacy_us']:10.1f} µs/update | "
+              f"event log {result['event_log_us']:8.1f} µs/update")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark inspection session updates")
+    parser.add_argument("--updates", type=int, default=200, help="Updates timed per session count")
+    args = parser.parse_args()
+
+    run_benchmark(updates=args.updates)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,8 @@ from tkcalendar import DateEntry  # For calendar date picker
 import os
 import webbrowser
 from datetime import datetime, timedelta
+from ui_executor import ui_executor
+from camera_registry import camera_registry
 
 class SettingsTab:
     def __init__(self, parent, app_instance, read_only=False):
@@ -422,14 +424,10 @@ class SettingsTab:
             print(f"Error setting up history table: {e}")
 
     def refresh_history_data(self):
-        """Refresh the history data in the table"""
+        """Refresh the history data in the table (read on a worker, shown when ready)"""
         try:
             if not hasattr(self, 'tree') or not self.tree:
                 return
-                
-            # Clear existing data
-            for item in self.tree.get_children():
-                self.tree.delete(item)
             
             # Get filter values
             model_type = getattr(self, 'model_var', tk.StringVar(value="All")).get()
@@ -442,30 +440,39 @@ class SettingsTab:
                 end_date = end_date.get()
             
             # Get history from database (this would need to be implemented in database.py)
-            try:
-                from database import db_manager
-                history_data = db_manager.get_settings_history(model_type, start_date, end_date)
-                
-                # Populate table
-                for record in history_data:
-                    self.tree.insert("", "end", values=record)
-                    
-                print(f"✅ Loaded {len(history_data)} history records")
-                
-            except Exception as db_error:
-                print(f"Database error: {db_error}")
-                # Show sample data if database fails
-                sample_data = [
-                    ("2024-01-15 10:30:00", "admin", "System", "Configuration Update", "Application settings modified"),
-                    ("2024-01-14 15:45:00", "user1", "GUI", "Title Change", "Application title updated"),
-                ]
-                
-                for record in sample_data:
-                    self.tree.insert("", "end", values=record)
+            from database import db_manager
+            ui_executor.submit(lambda: db_manager.get_settings_history(model_type, start_date, end_date),
+                               key="settings.history", on_success=self._show_history_data,
+                               on_error=self._on_history_error)
                     
         except Exception as e:
             print(f"Error refreshing history data: {e}")
 
+    def _show_history_data(self, history_data):
+        """Fill the history table with the fetched records"""
+        # Clear existing data
+        for item in self.tree.get_children():
+            self.tree.delete(item)
+        
+        # Populate table
+        for record in history_data:
+            self.tree.insert("", "end", values=record)
+            
+        print(f"✅ Loaded {len(history_data)} history records")
+
+    def _on_history_error(self, db_error):
+        print(f"Database error: {db_error}")
+        # Show sample data if database fails
+        sample_data = [
+            ("2024-01-15 10:30:00", "admin", "System", "Configuration Update", "Application settings modified"),
+            ("2024-01-14 15:45:00", "user1", "GUI", "Title Change", "Application title updated"),
+        ]
+        
+        for item in self.tree.get_children():
+            self.tree.delete(item)
+        for record in sample_data:
+            self.tree.insert("", "end", values=record)
+
     def export_history_excel(self):
         """Export history data to Excel file"""
         try:
@@ -680,10 +687,15 @@ BF Camera (1): Checking...
         """
         Check camera connection status for OD and BF cameras.
         
+        Served by the shared camera registry: results younger than
+        CAMERA_REGISTRY_TTL come from cache, and a camera held by the
+        preview or inspection is reported as connected without reopening it.
+        Blocks while a discovery runs, so call it off the Tk thread.
+        
         Returns:
             dict: Camera connection status
         """
-        import cv2
+        from config import CAMERA_INDEX, FRAME_SOURCES
         
         camera_status = {
             'od_camera_connected': False,
@@ -693,45 +705,18 @@ BF Camera (1): Checking...
         }
         
         try:
-            # Check OD Camera (Camera 0)
-            try:
-                od_cap = cv2.VideoCapture(0)
-                if od_cap.isOpened():
-                    ret, frame = od_cap.read()
-                    if ret and frame is not None:
-                        camera_status['od_camera_connected'] = True
-                        camera_status['od_camera_error'] = None
-                    else:
-                        camera_status['od_camera_connected'] = False
-                        camera_status['od_camera_error'] = "Failed to read frame"
-                else:
-                    camera_status['od_camera_connected'] = False
-                    camera_status['od_camera_error'] = "Failed to open camera"
-                od_cap.release()
-                
-            except Exception as e:
-                camera_status['od_camera_connected'] = False
-                camera_status['od_camera_error'] = str(e)
-            
-            # Check BF Camera (Camera 1)
-            try:
-                bf_cap = cv2.VideoCapture(1)
-                if bf_cap.isOpened():
-                    ret, frame = bf_cap.read()
-                    if ret and frame is not None:
-                        camera_status['bf_camera_connected'] = True
-                        camera_status['bf_camera_error'] = None
-                    else:
-                        camera_status['bf_camera_connected'] = False
-                        camera_status['bf_camera_error'] = "Failed to read frame"
-                else:
-                    camera_status['bf_camera_connected'] = False
-                    camera_status['bf_camera_error'] = "Failed to open camera"
-                bf_cap.release()
-                
-            except Exception as e:
-                camera_status['bf_camera_connected'] = False
-                camera_status['bf_camera_error'] = str(e)
+            camera_registry.discover()
+            for component in ('od', 'bf'):
+                standin = FRAME_SOURCES.get(component.upper())
+                if standin:
+                    # A configured stand-in replaces the camera in preview and inspection
+                    camera_status[f'{component}_camera_connected'] = True
+                    camera_status[f'{component}_camera_error'] = f"stand-in source: {standin}"
+                    continue
+                status = camera_registry.status(CAMERA_INDEX[component.upper()])
+                camera_status[f'{component}_camera_connected'] = status['connected']
+                camera_status[f'{component}_camera_error'] = (
+                    f"in use by {status['holder']}" if status['holder'] else status['error'])
             
         except Exception as e:
             print(f"❌ Error checking cameras: {e}")
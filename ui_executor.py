@@ -0,0 +1,293 @@
+"""
+Background Execution for the WelVision UI
+Runs blocking database calls on a small worker pool and hands results back to the Tk thread,
+plus a watchdog that logs Tk callbacks exceeding a time budget
+"""
+
+import os
+import queue
+import threading
+import time
+import tkinter
+from concurrent.futures import Future, ThreadPoolExecutor, CancelledError
+
+from config import UI_EXECUTOR_WORKERS, UI_EXECUTOR_POLL_MS, TK_CALLBACK_BUDGET_MS
+from db_pool import db_pool
+
+
+def _unwrap_callback(func):
+    """Return the user function behind Misc.after()'s internal ``callit`` wrapper"""
+    code = getattr(func, '__code__', None)
+    if code is not None and code.co_name == 'callit' and 'func' in code.co_freevars:
+        return func.__closure__[code.co_freevars.index('func')].cell_contents
+    return func
+
+
+def _callback_name(func):
+    """Readable name of a Tk callback for the watchdog log"""
+    func = getattr(func, '__func__', func)
+    name = getattr(func, '__qualname__', None) or getattr(func, '__name__', None) or repr(func)
+    code = getattr(func, '__code__', None)
+    if name.endswith('<lambda>') and code is not None:
+        name = f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    return name
+
+
+class CallbackWatchdog:
+    """
+    Times every Python callback Tk invokes (commands, bindings, after()).
+
+    Installed by replacing ``tkinter.CallWrapper``, the object Tk calls for
+    every registered Python function, so it must be installed before the
+    widgets are created. Each callback costs two ``perf_counter`` calls;
+    callbacks over ``budget_ms`` are logged with their name.
+    """
+
+    def __init__(self, budget_ms=TK_CALLBACK_BUDGET_MS):
+        self.budget_ms = budget_ms
+        self.slow_callbacks = 0
+        self.worst_ms = 0.0
+        self.worst_callback = None
+        self._original = None
+
+    def check(self, func, elapsed_ms):
+        """Record one callback duration, logging it if over budget"""
+        if self.budget_ms and elapsed_ms > self.budget_ms:
+            self.slow_callbacks += 1
+            name = _callback_name(func)
+            if elapsed_ms > self.worst_ms:
+                self.worst_ms = elapsed_ms
+                self.worst_callback = name
+            print(f"⚠️ Tk callback {name} blocked the UI for {elapsed_ms:.0f} ms "
+                  f"(budget {self.budget_ms} ms)")
+
+    def install(self):
+        """Start timing Tk callbacks registered from now on"""
+        if self._original is not None or not self.budget_ms:
+            return
+        original = self._original = tkinter.CallWrapper
+        watchdog = self
+
+        class TimedCallWrapper(original):
+            def __init__(self, func, subst, widget):
+                super().__init__(func, subst, widget)
+                self.target = _unwrap_callback(func)
+                self.exempt = getattr(self.target, '_watchdog_exempt', False)
+
+            def __call__(self, *args):
+                if self.exempt:
+                    return original.__call__(self, *args)
+                start = time.perf_counter()
+                try:
+                    return original.__call__(self, *args)
+                finally:
+                    watchdog.check(self.target, (time.perf_counter() - start) * 1000)
+
+        tkinter.CallWrapper = TimedCallWrapper
+        print(f"⏱️ Tk callback watchdog active (budget {self.budget_ms} ms)")
+
+    def uninstall(self):
+        """Restore the stock CallWrapper"""
+        if self._original is not None:
+            tkinter.CallWrapper = self._original
+            self._original = None
+
+
+class UIExecutor:
+    """
+    Worker pool for blocking calls made on behalf of the Tk UI.
+
+    ``submit`` runs a function on a worker thread and returns its Future.
+    The optional ``on_success`` / ``on_error`` callbacks always run on the
+    Tk thread: finished futures are queued and drained by an ``after()``
+    loop, so workers never touch widgets. Requests that share a ``key``
+    supersede each other: submitting a new one cancels the previous one if
+    it has not started yet, and drops its callbacks if it has, so only the
+    latest filter/refresh ever reaches the screen.
+
+    Each task returns its thread's pooled connection when it finishes, so
+    idle workers do not hold database connections.
+
+    The pool is sized for short reads. Jobs that take seconds to minutes
+    (ONNX export, quantization) go through ``submit_long``, which runs each
+    on its own thread with the same Tk-thread delivery, so they never queue
+    the tabs' refreshes behind them.
+    """
+
+    def __init__(self, max_workers=UI_EXECUTOR_WORKERS, poll_ms=UI_EXECUTOR_POLL_MS,
+                 budget_ms=TK_CALLBACK_BUDGET_MS):
+        self.max_workers = max_workers
+        self.poll_ms = poll_ms
+        self.watchdog = CallbackWatchdog(budget_ms)
+
+        self._pool = None
+        self._root = None
+        self._done = queue.SimpleQueue()
+        self._latest = {}  # key -> Future of the newest request
+        self._lock = threading.Lock()
+        self._stats = {'submitted': 0, 'completed': 0, 'failed': 0, 'cancelled': 0, 'superseded': 0}
+
+    def attach(self, root):
+        """Start delivering results to the given Tk root's event loop"""
+        self._root = root
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="ui-db")
+        self._pump()
+
+    def shutdown(self):
+        """Cancel queued work and stop the workers (running calls finish in the background)"""
+        self._root = None
+        with self._lock:
+            for future in self._latest.values():
+                future.cancel()
+            self._latest.clear()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+
+    @staticmethod
+    def _run(fn, args, kwargs):
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            db_pool.release_thread_connection()
+
+    def submit(self, fn, *args, key=None, on_success=None, on_error=None, **kwargs):
+        """
+        Run ``fn(*args, **kwargs)`` on a worker thread.
+
+        Args:
+            fn: Blocking callable (usually a db_manager method)
+            key: Requests with the same key supersede each other (e.g. 'models.refresh')
+            on_success: Called on the Tk thread with the result
+            on_error: Called on the Tk thread with the exception (default: print it)
+
+        Returns:
+            Future: the worker's future; ``cancel()`` it to drop a request
+        """
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="ui-db")
+
+        future = self._pool.submit(self._run, fn, args, kwargs)
+        self._track(future, key, on_success, on_error)
+        return future
+
+    def submit_long(self, fn, *args, name="ui-job", key=None, on_success=None, on_error=None, **kwargs):
+        """
+        Run a long job on a dedicated thread instead of the worker pool.
+
+        Takes the same arguments as ``submit``, plus ``name`` for the thread.
+        A started job cannot be cancelled; superseding it only drops its
+        callbacks.
+
+        Returns:
+            Future: the job's future
+        """
+        future = Future()
+
+        def run():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                result = self._run(fn, args, kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+        self._track(future, key, on_success, on_error)
+        threading.Thread(target=run, name=name, daemon=True).start()
+        return future
+
+    def _track(self, future, key, on_success, on_error):
+        """Register a submitted future for supersession and Tk-thread delivery"""
+        with self._lock:
+            self._stats['submitted'] += 1
+            if key is not None:
+                previous = self._latest.get(key)
+                self._latest[key] = future
+                if previous is not None and not previous.done():
+                    previous.cancel()
+                    self._stats['superseded'] += 1
+
+        future.add_done_callback(lambda done: self._done.put((done, key, on_success, on_error)))
+
+    def cancel(self, key):
+        """Cancel the pending request with the given key, if any"""
+        with self._lock:
+            future = self._latest.pop(key, None)
+        if future is not None:
+            future.cancel()
+
+    def is_pending(self, key):
+        """True while a request with the given key has not been delivered"""
+        with self._lock:
+            return key in self._latest
+
+    def _pump(self):
+        """Deliver finished futures on the Tk thread, then reschedule"""
+        if self._root is None:
+            return
+        while True:
+            try:
+                future, key, on_success, on_error = self._done.get_nowait()
+            except queue.Empty:
+                break
+            self._deliver(future, key, on_success, on_error)
+        try:
+            self._root.after(self.poll_ms, self._pump)
+        except tkinter.TclError:
+            self._root = None  # window destroyed
+
+    _pump._watchdog_exempt = True  # each delivered callback is timed on its own
+
+    def _deliver(self, future, key, on_success, on_error):
+        with self._lock:
+            if key is not None:
+                if self._latest.get(key) is not future:
+                    return  # superseded by a newer request
+                del self._latest[key]
+
+        try:
+            result = future.result()
+        except CancelledError:
+            self._stats['cancelled'] += 1
+            return
+        except Exception as e:
+            self._stats['failed'] += 1
+            callback, value = on_error, e
+            if callback is None:
+                print(f"❌ Background database call failed: {e}")
+                return
+        else:
+            self._stats['completed'] += 1
+            callback, value = on_success, result
+            if callback is None:
+                return
+
+        start = time.perf_counter()
+        try:
+            callback(value)
+        except Exception as e:
+            print(f"❌ Error in UI callback {_callback_name(callback)}: {e}")
+        finally:
+            self.watchdog.check(callback, (time.perf_counter() - start) * 1000)
+
+    def get_stats(self):
+        """
+        Get executor and watchdog statistics.
+
+        Returns:
+            dict: request counters, pending requests and slow Tk callbacks
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['pending'] = len(self._latest)
+        stats.update(slow_callbacks=self.watchdog.slow_callbacks,
+                     worst_callback=self.watchdog.worst_callback,
+                     worst_callback_ms=round(self.watchdog.worst_ms, 1))
+        return stats
+
+
+# Global executor instance
+ui_executor = UIExecutor()
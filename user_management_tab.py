@@ -5,6 +5,8 @@ User Management Tab for WelVision Application
 import tkinter as tk
 import tkinter.ttk as ttk
 import tkinter.messagebox as messagebox
+from ui_executor import ui_executor
+from db_pool import db_pool
 
 class UserManagementTab:
     def __init__(self, parent, app_instance):
@@ -396,44 +398,44 @@ class UserManagementTab:
                  bg="#6c757d", fg="white", command=self.clear_form, width=15).pack(side=tk.LEFT)
     
     def refresh_user_list(self):
-        """Refresh the user list from database"""
-        try:
+        """Refresh the user list from database (read on a worker, shown when ready)"""
+        if hasattr(self, 'status_label'):
+            self.status_label.config(text="🔄 Refreshing...", fg="yellow")
+        
+        from password_manager import password_manager
+        ui_executor.submit(password_manager.get_all_users, key="users.list",
+                           on_success=self._show_user_list, on_error=self._on_user_list_error)
+    
+    def _show_user_list(self, users):
+        """Show the fetched users in the tree"""
+        # Clear existing items
+        for item in self.user_tree.get_children():
+            self.user_tree.delete(item)
+        
+        if not users:
             if hasattr(self, 'status_label'):
-                self.status_label.config(text="🔄 Refreshing...", fg="yellow")
-            
-            from password_manager import password_manager
-            
-            # Clear existing items
-            for item in self.user_tree.get_children():
-                self.user_tree.delete(item)
-            
-            # Get users from database
-            users = password_manager.get_all_users()
-            
-            if not users:
-                if hasattr(self, 'status_label'):
-                    self.status_label.config(text="⚠️ No users found", fg="orange")
-                return
+                self.status_label.config(text="⚠️ No users found", fg="orange")
+            return
+        
+        for user in users:
+            employee_id, email, role, created_at, last_login, is_active = user
             
-            for user in users:
-                employee_id, email, role, created_at, last_login, is_active = user
-                
-                status = "🟢 Active" if is_active else "🔴 Inactive"
-                created_str = str(created_at).split()[0] if created_at else "N/A"
-                last_login_str = str(last_login).split()[0] if last_login else "Never"
-                
-                values = (employee_id, email, role, status, created_str, last_login_str)
-                self.user_tree.insert("", tk.END, values=values)
+            status = "🟢 Active" if is_active else "🔴 Inactive"
+            created_str = str(created_at).split()[0] if created_at else "N/A"
+            last_login_str = str(last_login).split()[0] if last_login else "Never"
             
-            if hasattr(self, 'status_label'):
-                self.status_label.config(text=f"✅ {len(users)} users loaded", fg="#28a745")
-                self.parent.after(3000, lambda: self.status_label.config(text="Ready", fg="#b0c4de"))
-                
-        except Exception as e:
-            error_msg = f"Failed to refresh user list: {str(e)}"
-            if hasattr(self, 'status_label'):
-                self.status_label.config(text="❌ Failed to load users", fg="red")
-            messagebox.showerror("Error", error_msg)
+            values = (employee_id, email, role, status, created_str, last_login_str)
+            self.user_tree.insert("", tk.END, values=values)
+        
+        if hasattr(self, 'status_label'):
+            self.status_label.config(text=f"✅ {len(users)} users loaded", fg="#28a745")
+            self.parent.after(3000, lambda: self.status_label.config(text="Ready", fg="#b0c4de"))
+    
+    def _on_user_list_error(self, e):
+        error_msg = f"Failed to refresh user list: {str(e)}"
+        if hasattr(self, 'status_label'):
+            self.status_label.config(text="❌ Failed to load users", fg="red")
+        messagebox.showerror("Error", error_msg)
     
     def filter_users(self, event=None):
         """Filter users based on search term"""
@@ -444,32 +446,33 @@ class UserManagementTab:
             self.refresh_user_list()
             return
         
+        # Each keystroke supersedes the previous lookup, only the latest is shown
+        from password_manager import password_manager
+        ui_executor.submit(password_manager.get_all_users, key="users.list",
+                           on_success=lambda users: self._show_filtered_users(users, search_term),
+                           on_error=lambda e: messagebox.showerror("Error", f"Failed to filter users: {str(e)}"))
+    
+    def _show_filtered_users(self, users, search_term):
+        """Show the users matching the search term"""
         # Clear current items
         for item in self.user_tree.get_children():
             self.user_tree.delete(item)
         
-        try:
-            from password_manager import password_manager
-            users = password_manager.get_all_users()
+        for user in users:
+            employee_id, email, role, created_at, last_login, is_active = user
             
-            for user in users:
-                employee_id, email, role, created_at, last_login, is_active = user
+            # Check if search term matches any field
+            if (search_term in employee_id.lower() or 
+                search_term in email.lower() or 
+                search_term in role.lower()):
                 
-                # Check if search term matches any field
-                if (search_term in employee_id.lower() or 
-                    search_term in email.lower() or 
-                    search_term in role.lower()):
-                    
-                    status = "🟢 Active" if is_active else "🔴 Inactive"
-                    created_str = str(created_at).split()[0] if created_at else "N/A"
-                    last_login_str = str(last_login).split()[0] if last_login else "Never"
-                    
-                    self.user_tree.insert("", tk.END, values=(
-                        employee_id, email, role, status, created_str, last_login_str
-                    ))
-                    
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to filter users: {str(e)}")
+                status = "🟢 Active" if is_active else "🔴 Inactive"
+                created_str = str(created_at).split()[0] if created_at else "N/A"
+                last_login_str = str(last_login).split()[0] if last_login else "Never"
+                
+                self.user_tree.insert("", tk.END, values=(
+                    employee_id, email, role, status, created_str, last_login_str
+                ))
     
     def on_user_select(self, event):
         """Handle user selection in the tree - just highlight, don't auto-load"""
@@ -1137,51 +1140,51 @@ class UserManagementTab:
                  bg="#6c757d", fg="white", command=self.clear_roller_form, width=15).pack(side=tk.LEFT)
     
     def refresh_roller_list(self):
-        """Refresh the roller list from database"""
-        try:
-            # Check if roller tree exists before trying to refresh
-            if not hasattr(self, 'roller_tree'):
-                print("Roller tree not initialized yet, skipping refresh")
-                return
-                
-            if hasattr(self, 'roller_status_label'):
-                self.roller_status_label.config(text="🔄 Refreshing...", fg="yellow")
-            
-            from database import db_manager
-            
-            # Clear existing items
-            for item in self.roller_tree.get_children():
-                self.roller_tree.delete(item)
-            
-            # Get rollers from database
-            rollers = db_manager.get_all_rollers()
-            
-            if not rollers:
-                if hasattr(self, 'roller_status_label'):
-                    self.roller_status_label.config(text="⚠️ No rollers found", fg="orange")
-                return
-            
-            for roller in rollers:
-                roller_id = roller.get('id', '')
-                name = roller.get('name', '')
-                roller_type = roller.get('roller_type', '')
-                diameter = f"{roller.get('diameter', 0):.3f}"
-                thickness = f"{roller.get('thickness', 0):.3f}"
-                length = f"{roller.get('length', 0):.3f}"
-                status = roller.get('status', 'Active')
-                
-                values = (roller_id, name, roller_type, diameter, thickness, length, status)
-                self.roller_tree.insert("", tk.END, values=values)
+        """Refresh the roller list from database (read on a worker, shown when ready)"""
+        # Check if roller tree exists before trying to refresh
+        if not hasattr(self, 'roller_tree'):
+            print("Roller tree not initialized yet, skipping refresh")
+            return
             
+        if hasattr(self, 'roller_status_label'):
+            self.roller_status_label.config(text="🔄 Refreshing...", fg="yellow")
+        
+        from database import db_manager
+        ui_executor.submit(db_manager.get_all_rollers, key="rollers.list",
+                           on_success=self._show_roller_list, on_error=self._on_roller_list_error)
+    
+    def _show_roller_list(self, rollers):
+        """Show the fetched rollers in the tree"""
+        # Clear existing items
+        for item in self.roller_tree.get_children():
+            self.roller_tree.delete(item)
+        
+        if not rollers:
             if hasattr(self, 'roller_status_label'):
-                self.roller_status_label.config(text=f"✅ {len(rollers)} rollers loaded", fg="#28a745")
-                self.parent.after(3000, lambda: self.roller_status_label.config(text="Ready", fg="#b0c4de"))
-                
-        except Exception as e:
-            error_msg = f"Failed to refresh roller list: {str(e)}"
-            if hasattr(self, 'roller_status_label'):
-                self.roller_status_label.config(text="❌ Failed to load rollers", fg="red")
-            print(f"Error: {error_msg}")
+                self.roller_status_label.config(text="⚠️ No rollers found", fg="orange")
+            return
+        
+        for roller in rollers:
+            roller_id = roller.get('id', '')
+            name = roller.get('name', '')
+            roller_type = roller.get('roller_type', '')
+            diameter = f"{roller.get('diameter', 0):.3f}"
+            thickness = f"{roller.get('thickness', 0):.3f}"
+            length = f"{roller.get('length', 0):.3f}"
+            status = roller.get('status', 'Active')
+            
+            values = (roller_id, name, roller_type, diameter, thickness, length, status)
+            self.roller_tree.insert("", tk.END, values=values)
+        
+        if hasattr(self, 'roller_status_label'):
+            self.roller_status_label.config(text=f"✅ {len(rollers)} rollers loaded", fg="#28a745")
+            self.parent.after(3000, lambda: self.roller_status_label.config(text="Ready", fg="#b0c4de"))
+    
+    def _on_roller_list_error(self, e):
+        error_msg = f"Failed to refresh roller list: {str(e)}"
+        if hasattr(self, 'roller_status_label'):
+            self.roller_status_label.config(text="❌ Failed to load rollers", fg="red")
+        print(f"Error: {error_msg}")
     
     def filter_rollers(self, event=None):
         """Filter rollers based on search term"""
@@ -1195,38 +1198,39 @@ class UserManagementTab:
             self.refresh_roller_list()
             return
         
+        # Each keystroke supersedes the previous lookup, only the latest is shown
+        from database import db_manager
+        ui_executor.submit(db_manager.get_all_rollers, key="rollers.list",
+                           on_success=lambda rollers: self._show_filtered_rollers(rollers, search_term),
+                           on_error=lambda e: print(f"Error filtering rollers: {str(e)}"))
+    
+    def _show_filtered_rollers(self, rollers, search_term):
+        """Show the rollers matching the search term"""
         # Clear current items
         for item in self.roller_tree.get_children():
             self.roller_tree.delete(item)
         
-        try:
-            from database import db_manager
-            rollers = db_manager.get_all_rollers()
+        for roller in rollers:
+            name = roller.get('name', '').lower()
+            roller_type = roller.get('roller_type', '').lower()
+            description = roller.get('description', '').lower()
             
-            for roller in rollers:
-                name = roller.get('name', '').lower()
-                roller_type = roller.get('roller_type', '').lower()
-                description = roller.get('description', '').lower()
+            # Check if search term matches any field
+            if (search_term in name or 
+                search_term in roller_type or 
+                search_term in description):
                 
-                # Check if search term matches any field
-                if (search_term in name or 
-                    search_term in roller_type or 
-                    search_term in description):
-                    
-                    roller_id = roller.get('id', '')
-                    name_display = roller.get('name', '')
-                    roller_type_display = roller.get('roller_type', '')
-                    diameter = f"{roller.get('diameter', 0):.3f}"
-                    thickness = f"{roller.get('thickness', 0):.3f}"
-                    length = f"{roller.get('length', 0):.3f}"
-                    status = roller.get('status', 'Active')
-                    
-                    self.roller_tree.insert("", tk.END, values=(
-                        roller_id, name_display, roller_type_display, diameter, thickness, length, status
-                    ))
-                    
-        except Exception as e:
-            print(f"Error filtering rollers: {str(e)}")
+                roller_id = roller.get('id', '')
+                name_display = roller.get('name', '')
+                roller_type_display = roller.get('roller_type', '')
+                diameter = f"{roller.get('diameter', 0):.3f}"
+                thickness = f"{roller.get('thickness', 0):.3f}"
+                length = f"{roller.get('length', 0):.3f}"
+                status = roller.get('status', 'Active')
+                
+                self.roller_tree.insert("", tk.END, values=(
+                    roller_id, name_display, roller_type_display, diameter, thickness, length, status
+                ))
     
     def on_roller_select(self, event):
         """Handle roller selection in the tree"""
@@ -1255,50 +1259,58 @@ class UserManagementTab:
             messagebox.showwarning("Warning", "Please select a roller from the table to read its information")
             return
         
-        try:
-            item = self.roller_tree.item(selection[0])
-            values = item['values']
-            
-            if values:
-                # Get full roller data from database
-                roller_id = values[0]
-                from database import db_manager
-                
-                # Get roller by ID
-                cursor = db_manager.connection.cursor()
+        item = self.roller_tree.item(selection[0])
+        values = item['values']
+        if not values:
+            messagebox.showerror("Error", "Unable to read roller data from selection")
+            return
+        
+        # Get full roller data from database (on a ui_executor worker)
+        ui_executor.submit(self._fetch_roller_row, values[0], key="rollers.read",
+                           on_success=self._show_roller_row,
+                           on_error=lambda e: messagebox.showerror("Error", f"Failed to read roller data: {str(e)}"))
+    
+    @staticmethod
+    def _fetch_roller_row(roller_id):
+        """Read one roller_informations row by ID (worker thread)"""
+        with db_pool.connection() as connection:
+            cursor = connection.cursor()
+            try:
                 cursor.execute("SELECT * FROM roller_informations WHERE id = %s", (roller_id,))
-                roller_data = cursor.fetchone()
+                return cursor.fetchone()
+            finally:
                 cursor.close()
+    
+    def _show_roller_row(self, roller_data):
+        """Load a fetched roller row into the form"""
+        try:
+            if roller_data:
+                # Map database fields to form variables
+                self.roller_form_vars['id'].set(str(roller_data[0]))  # id
+                self.roller_form_vars['name'].set(roller_data[1] or '')  # name
+                self.roller_form_vars['diameter'].set(str(roller_data[2] or 0))  # diameter
+                self.roller_form_vars['thickness'].set(str(roller_data[3] or 0))  # thickness
+                self.roller_form_vars['length'].set(str(roller_data[4] or 0))  # length
+                self.roller_form_vars['roller_type'].set(roller_data[5] or '')  # roller_type
+                self.roller_form_vars['description'].set(roller_data[6] or '')  # description
+                self.roller_form_vars['status'].set(roller_data[7] or 'Active')  # status
                 
-                if roller_data:
-                    # Map database fields to form variables
-                    self.roller_form_vars['id'].set(str(roller_data[0]))  # id
-                    self.roller_form_vars['name'].set(roller_data[1] or '')  # name
-                    self.roller_form_vars['diameter'].set(str(roller_data[2] or 0))  # diameter
-                    self.roller_form_vars['thickness'].set(str(roller_data[3] or 0))  # thickness
-                    self.roller_form_vars['length'].set(str(roller_data[4] or 0))  # length
-                    self.roller_form_vars['roller_type'].set(roller_data[5] or '')  # roller_type
-                    self.roller_form_vars['description'].set(roller_data[6] or '')  # description
-                    self.roller_form_vars['status'].set(roller_data[7] or 'Active')  # status
-                    
-                    # Update status
-                    if hasattr(self, 'roller_status_label'):
-                        self.roller_status_label.config(text=f"📖 Loaded: {roller_data[1]} data into form", fg="#28a745")
-                        self.parent.after(3000, lambda: self.roller_status_label.config(text="Ready", fg="#b0c4de"))
-                    
-                    messagebox.showinfo("Roller Loaded", 
-                                      f"Roller information for '{roller_data[1]}' has been loaded into the form.\n\n"
-                                      f"ID: {roller_data[0]}\n"
-                                      f"Name: {roller_data[1]}\n"
-                                      f"Type: {roller_data[5]}\n"
-                                      f"Dimensions: {roller_data[2]}×{roller_data[3]}×{roller_data[4]} mm\n"
-                                      f"Status: {roller_data[7]}\n\n"
-                                      f"You can now make changes and click 'Update Roller' to save them.")
-                else:
-                    messagebox.showerror("Error", "Roller data not found in database")
-            else:
-                messagebox.showerror("Error", "Unable to read roller data from selection")
+                # Update status
+                if hasattr(self, 'roller_status_label'):
+                    self.roller_status_label.config(text=f"📖 Loaded: {roller_data[1]} data into form", fg="#28a745")
+                    self.parent.after(3000, lambda: self.roller_status_label.config(text="Ready", fg="#b0c4de"))
                 
+                messagebox.showinfo("Roller Loaded", 
+                                  f"Roller information for '{roller_data[1]}' has been loaded into the form.\n\n"
+                                  f"ID: {roller_data[0]}\n"
+                                  f"Name: {roller_data[1]}\n"
+                                  f"Type: {roller_data[5]}\n"
+                                  f"Dimensions: {roller_data[2]}×{roller_data[3]}×{roller_data[4]} mm\n"
+                                  f"Status: {roller_data[7]}\n\n"
+                                  f"You can now make changes and click 'Update Roller' to save them.")
+            else:
+                messagebox.showerror("Error", "Roller data not found in database")
+            
         except Exception as e:
             messagebox.showerror("Error", f"Failed to read roller data: {str(e)}")
     
@@ -1354,32 +1366,45 @@ class UserManagementTab:
                           f"Status: {status}")
             
             if messagebox.askyesno("Confirm Update", confirm_msg):
-                from database import db_manager
-                
-                # Update in database
-                cursor = db_manager.connection.cursor()
+                # Update in database (on a ui_executor worker)
+                ui_executor.submit(self._update_roller_row, roller_id,
+                                   (name, diameter, thickness, length, roller_type, description, status),
+                                   on_success=lambda _: self._on_roller_updated(name),
+                                   on_error=lambda e: messagebox.showerror("Error", f"Failed to update roller: {str(e)}"))
+            
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to update roller: {str(e)}")
+    
+    @staticmethod
+    def _update_roller_row(roller_id, values):
+        """Write the edited roller_informations row (worker thread)"""
+        from ref_cache import ref_cache
+        
+        with db_pool.connection() as connection:
+            cursor = connection.cursor()
+            try:
                 update_query = """
                 UPDATE roller_informations 
                 SET name = %s, diameter = %s, thickness = %s, length = %s, 
                     roller_type = %s, description = %s, status = %s, updated_at = NOW()
                 WHERE id = %s
                 """
-                cursor.execute(update_query, (name, diameter, thickness, length, 
-                                            roller_type, description, status, roller_id))
-                db_manager.connection.commit()
+                cursor.execute(update_query, values + (roller_id,))
+                connection.commit()
+            finally:
                 cursor.close()
-                
-                messagebox.showinfo("Success", f"✅ Roller '{name}' updated successfully!")
-                self.refresh_roller_list()
-                self.clear_roller_form()
-                
-                # Update status
-                if hasattr(self, 'roller_status_label'):
-                    self.roller_status_label.config(text=f"✅ Updated: {name}", fg="#28a745")
-                    self.parent.after(3000, lambda: self.roller_status_label.config(text="Ready", fg="#b0c4de"))
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to update roller: {str(e)}")
+        ref_cache.invalidate('rollers')
+    
+    def _on_roller_updated(self, name):
+        """Report a saved roller update and refresh the list"""
+        messagebox.showinfo("Success", f"✅ Roller '{name}' updated successfully!")
+        self.refresh_roller_list()
+        self.clear_roller_form()
+        
+        # Update status
+        if hasattr(self, 'roller_status_label'):
+            self.roller_status_label.config(text=f"✅ Updated: {name}", fg="#28a745")
+            self.parent.after(3000, lambda: self.roller_status_label.config(text="Ready", fg="#b0c4de"))
     
     def clear_roller_form(self):
         """Clear all roller form fields"""